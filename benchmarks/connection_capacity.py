@@ -0,0 +1,157 @@
+"""
+Benchmark comparing the thread-per-connection MultiplayerServer with the asyncio AsyncMultiplayerServer.
+
+Starts each server in a subprocess, opens idle client connections to it and reports how many connections were held,
+the server memory per idle connection and the number of server threads. Run from the repository root with:
+
+    python -m benchmarks.connection_capacity --connections 2000
+"""
+
+import argparse
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+from game.server.framing import recv_frame
+
+SERVER_COMMANDS = {
+    "threaded": "from game.server.multiplayer_server import MultiplayerServer; MultiplayerServer(port={port}).run()",
+    "asyncio": "from game.server.async_multiplayer_server import AsyncMultiplayerServer; "
+    "AsyncMultiplayerServer(port={port}, loop_name='{loop}').run()",
+}
+
+
+def read_process_status(pid):
+    """
+    Reads the resident memory and the thread count of a process from procfs.
+
+    Args:
+        pid (int): The process ID.
+
+    Returns:
+        tuple: The resident memory in KiB and the number of threads, or (None, None) if procfs is unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as status_file:
+            status = dict(line.split(":", 1) for line in status_file if ":" in line)
+    except OSError:
+        return None, None
+    return int(status["VmRSS"].split()[0]), int(status["Threads"])
+
+
+def wait_for_server(port, timeout=10):
+    """
+    Waits until the server accepts connections.
+
+    Args:
+        port (int): The port of the server.
+        timeout (float, optional): Seconds to wait. Defaults to 10.
+
+    Raises:
+        TimeoutError: If the server does not start in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("localhost", port), timeout=1) as probe:
+                recv_frame(probe)
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError("Server did not start in time.")
+
+
+def open_connections(port, connections_count):
+    """
+    Opens idle connections to the server, stopping at the first failure.
+
+    Args:
+        port (int): The port of the server.
+        connections_count (int): The number of connections to open.
+
+    Returns:
+        list: The open sockets.
+    """
+    sockets = []
+    for _ in range(connections_count):
+        try:
+            client = socket.create_connection(("localhost", port), timeout=5)
+            recv_frame(client)
+        except OSError as exception:
+            print(f"  stopped after {len(sockets)} connections: {exception}")
+            break
+        sockets.append(client)
+    return sockets
+
+
+def run_benchmark(server_kind, port, connections_count, loop_name):
+    """
+    Benchmarks one server kind.
+
+    Args:
+        server_kind (str): "threaded" or "asyncio".
+        port (int): The port to run the server on.
+        connections_count (int): The number of idle connections to open.
+        loop_name (str): The event loop of the asyncio server.
+
+    Returns:
+        dict: The measured results.
+    """
+    command = SERVER_COMMANDS[server_kind].format(port=port, loop=loop_name)
+    server_process = subprocess.Popen(  # pylint: disable=R1732
+        [sys.executable, "-c", command], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_server(port)
+        time.sleep(0.5)
+        idle_rss, idle_threads = read_process_status(server_process.pid)
+
+        started = time.perf_counter()
+        sockets = open_connections(port, connections_count)
+        connect_seconds = time.perf_counter() - started
+        time.sleep(1)
+        loaded_rss, loaded_threads = read_process_status(server_process.pid)
+
+        for client in sockets:
+            client.close()
+    finally:
+        server_process.terminate()
+        server_process.wait()
+
+    held = len(sockets)
+    per_connection = (loaded_rss - idle_rss) / held if held and idle_rss is not None else None
+    return {
+        "server": server_kind,
+        "connections held": held,
+        "connections per second": round(held / connect_seconds) if connect_seconds else None,
+        "RSS idle (KiB)": idle_rss,
+        "RSS loaded (KiB)": loaded_rss,
+        "RSS per connection (KiB)": round(per_connection, 2) if per_connection is not None else None,
+        "server threads": loaded_threads,
+    }
+
+
+def main():
+    """
+    Runs the benchmark for both servers and prints the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=5600)
+    parser.add_argument("--loop", default="asyncio", help="Event loop of the asyncio server, e.g. uvloop.")
+    arguments = parser.parse_args()
+
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard_limit, hard_limit))
+
+    for server_kind in SERVER_COMMANDS:
+        print(f"Benchmarking {server_kind} server...")
+        results = run_benchmark(server_kind, arguments.port, arguments.connections, arguments.loop)
+        for name, value in results.items():
+            print(f"  {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
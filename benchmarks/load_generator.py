@@ -0,0 +1,676 @@
+"""
+Load generator playing complete games against a local server with a swarm of simulated clients.
+
+Starts the server in a subprocess and connects pairs of headless clients to it, spread over one or more processes
+running an asyncio loop each. Every pair plays games for as long as the run lasts: the host creates a room and waits
+for the guest to join it by ID, both send a random board, wait for the opponent to be ready with the events pushed
+by the server and shoot in turns, choosing their shots with a simple bot policy, until one fleet is sunk.
+
+Reports the connections held, the games and commands per second, the latency percentiles of every command measured
+by the clients and the resident memory and CPU usage of the server. Run from the repository root with:
+
+    python -m benchmarks.load_generator --clients 2000 --duration 60 --processes 4
+
+The shots of a client are limited by the server's rate limits, so keep `--think-time` at a human pace.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.connection_capacity import read_process_status, wait_for_server
+from game.interface.base_board import BaseBoard
+from game.server.codec import CODECS, JSON_CODEC, decode_message, is_event_message
+from game.server.framing import encode_frame, read_frame
+from game.server.metrics import LatencyHistogram
+from game.players import command_literals
+
+SERVER_MODULES = {
+    "threaded": "game.server.multiplayer_server",
+    "asyncio": "game.server.async_multiplayer_server",
+}
+
+RATE_LIMITED_MESSAGE = "Too many commands!"
+EVENT_TIMEOUT = 90
+BOARDS_POOL_SIZE = 64
+
+
+class LoadStatistics:
+    """
+    What the clients of one process measured. The statistics of several processes are merged into one.
+    """
+
+    def __init__(self):
+        """
+        Initializes empty LoadStatistics.
+        """
+        self.connections_held = 0
+        self.connections_open = 0
+        self.connect_failures = 0
+        self.games_completed = 0
+        self.games_abandoned = 0
+        self.errors = {}
+        self.latencies = {}
+
+    def connection_opened(self):
+        """
+        Counts an opened connection and updates the most connections held at once.
+        """
+        self.connections_open += 1
+        self.connections_held = max(self.connections_held, self.connections_open)
+
+    def connection_closed(self):
+        """
+        Counts a closed connection.
+        """
+        self.connections_open -= 1
+
+    def record_error(self, message):
+        """
+        Counts an error.
+
+        Args:
+            message (str): The message of the error.
+        """
+        self.errors[message] = self.errors.get(message, 0) + 1
+
+    def record_response(self, command, duration, response):
+        """
+        Records the latency of a command and counts its errors, except the expected ones of a game.
+
+        Args:
+            command (str): The name of the command.
+            duration (float): The seconds from sending the command to receiving its response.
+            response (dict): The response.
+        """
+        histogram = self.latencies.get(command)
+        if histogram is None:
+            histogram = self.latencies[command] = LatencyHistogram()
+        histogram.record(duration)
+        if response.get("status") == "error" and not response.get("args", {}).get("has_battle_ended"):
+            self.record_error(f"{command}: {response.get('message')}")
+
+    def merge(self, other):
+        """
+        Adds the statistics of another process.
+
+        Args:
+            other (LoadStatistics): The statistics of the other process.
+        """
+        self.connections_held += other.connections_held
+        self.connect_failures += other.connect_failures
+        self.games_completed += other.games_completed
+        self.games_abandoned += other.games_abandoned
+        for message, count in other.errors.items():
+            self.errors[message] = self.errors.get(message, 0) + count
+        for command, histogram in other.latencies.items():
+            self.latencies.setdefault(command, LatencyHistogram()).merge(histogram)
+
+
+class RandomShotPolicy:
+    """
+    Shoots at the cells of the board in a random order.
+    """
+
+    def __init__(self, rows_count=BaseBoard.BOARD_ROWS_DEFAULT, cols_count=BaseBoard.BOARD_COLS_DEFAULT):
+        """
+        Initializes the RandomShotPolicy.
+
+        Args:
+            rows_count (int, optional): The number of rows of the board. Defaults to BaseBoard.BOARD_ROWS_DEFAULT.
+            cols_count (int, optional): The number of columns of the board. Defaults to BaseBoard.BOARD_COLS_DEFAULT.
+        """
+        self.rows_count = rows_count
+        self.cols_count = cols_count
+        self.remaining_cells = [(row, col) for row in range(rows_count) for col in range(cols_count)]
+        random.shuffle(self.remaining_cells)
+        self.shot_cells = set()
+
+    def next_shot(self):
+        """
+        Chooses the next shot.
+
+        Returns:
+            tuple: The row and the column of the shot.
+        """
+        while True:
+            cell = self.remaining_cells.pop()
+            if cell not in self.shot_cells:
+                self.shot_cells.add(cell)
+                return cell
+
+    def record_result(self, row, col, has_hit_ship, sunk_ship):
+        """
+        Learns from the result of a shot. The cells around a sunk ship count as shot, as they do on the server.
+
+        Args:
+            row (int): The row of the shot.
+            col (int): The column of the shot.
+            has_hit_ship (bool): Whether the shot hit a ship.
+            sunk_ship (str): The serialized ship sunk by the shot, or None.
+        """
+        if sunk_ship is None:
+            return
+
+        ship = json.loads(sunk_ship)
+        rows_count, cols_count = (1, ship["ship_length"]) if ship["is_horizontal"] else (ship["ship_length"], 1)
+        for around_row in range(ship["row"] - 1, ship["row"] + rows_count + 1):
+            for around_col in range(ship["col"] - 1, ship["col"] + cols_count + 1):
+                self.shot_cells.add((around_row, around_col))
+
+
+class HuntShotPolicy(RandomShotPolicy):
+    """
+    Shoots at random until a ship is hit, then at the cells around the hits until the ship is sunk.
+    """
+
+    def __init__(self, rows_count=BaseBoard.BOARD_ROWS_DEFAULT, cols_count=BaseBoard.BOARD_COLS_DEFAULT):
+        """
+        Initializes the HuntShotPolicy.
+
+        Args:
+            rows_count (int, optional): The number of rows of the board. Defaults to BaseBoard.BOARD_ROWS_DEFAULT.
+            cols_count (int, optional): The number of columns of the board. Defaults to BaseBoard.BOARD_COLS_DEFAULT.
+        """
+        super().__init__(rows_count, cols_count)
+        self.target_cells = []
+
+    def next_shot(self):
+        """
+        Chooses the next shot, around the last hits if a ship is damaged.
+
+        Returns:
+            tuple: The row and the column of the shot.
+        """
+        while self.target_cells:
+            cell = self.target_cells.pop()
+            if cell not in self.shot_cells:
+                self.shot_cells.add(cell)
+                return cell
+        return super().next_shot()
+
+    def record_result(self, row, col, has_hit_ship, sunk_ship):
+        """
+        Targets the cells around a hit, and stops targeting once the ship is sunk.
+
+        Args:
+            row (int): The row of the shot.
+            col (int): The column of the shot.
+            has_hit_ship (bool): Whether the shot hit a ship.
+            sunk_ship (str): The serialized ship sunk by the shot, or None.
+        """
+        super().record_result(row, col, has_hit_ship, sunk_ship)
+        if sunk_ship is not None:
+            self.target_cells.clear()
+        elif has_hit_ship:
+            for next_row, next_col in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if 0 <= next_row < self.rows_count and 0 <= next_col < self.cols_count:
+                    self.target_cells.append((next_row, next_col))
+
+
+SHOT_POLICIES = {"random": RandomShotPolicy, "hunt": HuntShotPolicy}
+
+
+class SimulatedClient:
+    """
+    Headless client with one connection to the server. A reader task sorts the received messages into the response
+    to the pending command and the pushed events.
+    """
+
+    def __init__(self, name, statistics):
+        """
+        Initializes the SimulatedClient.
+
+        Args:
+            name (str): The name of the player.
+            statistics (LoadStatistics): The statistics the client records to.
+        """
+        self.name = name
+        self.statistics = statistics
+        self.codec = JSON_CODEC
+        self.reader = None
+        self.writer = None
+        self.reader_task = None
+        self.pending_response = None
+        self.events = asyncio.Queue()
+
+    async def connect(self, host, port, codec_name):
+        """
+        Connects to the server, negotiates the codec and subscribes to the pushed events.
+
+        Args:
+            host (str): The address of the server.
+            port (int): The port of the server.
+            codec_name (str): The codec of the messages, "json" or "binary".
+        """
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.statistics.connection_opened()
+        await read_frame(self.reader)
+        self.reader_task = asyncio.create_task(self._read_messages())
+
+        if codec_name != JSON_CODEC.NAME:
+            await self.request(command_literals.COMMAND_NEGOTIATE_CODEC, codecs=[codec_name])
+            self.codec = CODECS[codec_name]
+        await self.request(command_literals.COMMAND_SUBSCRIBE_EVENTS)
+
+    async def _read_messages(self):
+        """
+        Reads the messages of the server until the connection is lost.
+        """
+        try:
+            while True:
+                data = await read_frame(self.reader)
+                if is_event_message(data):
+                    self.events.put_nowait(decode_message(data))
+                elif self.pending_response is not None and not self.pending_response.done():
+                    self.pending_response.set_result(decode_message(data))
+        except (asyncio.IncompleteReadError, ConnectionError) as exception:
+            if self.pending_response is not None and not self.pending_response.done():
+                self.pending_response.set_exception(ConnectionError(f"Connection lost: {exception}"))
+
+    async def request(self, command, **args):
+        """
+        Sends a command and waits for its response, sending it again after a pause while it is rate limited.
+
+        Args:
+            command (str): The name of the command.
+            **args: The arguments of the command.
+
+        Returns:
+            dict: The response.
+        """
+        data = encode_frame(self.codec.encode({"command": command, "args": args}))
+        for attempt in range(1, 10):
+            self.pending_response = asyncio.get_running_loop().create_future()
+            started = time.perf_counter()
+            self.writer.write(data)
+            response = await self.pending_response
+            self.statistics.record_response(command, time.perf_counter() - started, response)
+            if response.get("message") != RATE_LIMITED_MESSAGE:
+                return response
+            await asyncio.sleep(0.1 * attempt)
+        return response
+
+    async def next_event(self):
+        """
+        Waits for the next pushed event.
+
+        Returns:
+            dict: The event.
+        """
+        return await asyncio.wait_for(self.events.get(), EVENT_TIMEOUT)
+
+    async def wait_for_opponent_ready(self):
+        """
+        Waits until both players have sent their boards.
+
+        Returns:
+            bool: Whether the client has the first turn.
+        """
+        response = await self.request(command_literals.COMMAND_WAIT_FOR_OPPONENT_READY, timeout=EVENT_TIMEOUT)
+        if response["status"] == "error":
+            raise RuntimeError(response["message"])
+        if response["args"].get("is_waiting"):
+            response = await self.next_event()
+            if response["event"] != command_literals.EVENT_OPPONENT_READY:
+                raise RuntimeError(response["message"])
+        return response["args"]["is_turn"]
+
+    async def play_battle(self, is_turn, shot_policy, think_time):
+        """
+        Shoots in turns until the battle ends.
+
+        Args:
+            is_turn (bool): Whether the client has the first turn.
+            shot_policy (RandomShotPolicy): The policy choosing the shots.
+            think_time (float): The seconds to wait before every shot.
+        """
+        while True:
+            if not is_turn:
+                event = await self.next_event()
+                if event["event"] == command_literals.EVENT_BATTLE_END or event["args"].get("has_battle_ended"):
+                    return
+                is_turn = event["args"].get("is_turn", False)
+                continue
+
+            await asyncio.sleep(think_time)
+            row, col = shot_policy.next_shot()
+            response = await self.request(command_literals.COMMAND_REGISTER_SHOT, row=row, col=col)
+            args = response["args"]
+            if args.get("has_battle_ended"):
+                return
+            if args.get("is_shot_valid") is False:
+                continue
+            if response["status"] == "error":
+                raise RuntimeError(response["message"])
+
+            shot_policy.record_result(row, col, args["has_hit_ship"], args["sunk_ship"])
+            is_turn = args["is_turn"]
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        if self.reader_task is not None:
+            self.reader_task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+            self.statistics.connection_closed()
+
+
+class GamePair:
+    """
+    Two simulated clients playing games against each other, the host creating the rooms and the guest joining them.
+    """
+
+    def __init__(self, index, statistics, boards, shot_policy_class, think_time):
+        """
+        Initializes the GamePair.
+
+        Args:
+            index (int): The number of the pair, used in the names of the players.
+            statistics (LoadStatistics): The statistics the clients record to.
+            boards (list): Serialized boards the players choose from.
+            shot_policy_class (type): The policy choosing the shots, see SHOT_POLICIES.
+            think_time (float): The seconds a player waits before every shot.
+        """
+        self.statistics = statistics
+        self.boards = boards
+        self.shot_policy_class = shot_policy_class
+        self.think_time = think_time
+        self.host = SimulatedClient(f"host-{index}", statistics)
+        self.guest = SimulatedClient(f"guest-{index}", statistics)
+
+    async def run(self, host, port, codec_name, deadline):
+        """
+        Connects both clients and plays games until the deadline.
+
+        Args:
+            host (str): The address of the server.
+            port (int): The port of the server.
+            codec_name (str): The codec of the messages.
+            deadline (float): The monotonic time after which no game is started.
+        """
+        try:
+            await asyncio.gather(self.host.connect(host, port, codec_name), self.guest.connect(host, port, codec_name))
+        except OSError as exception:
+            self.statistics.connect_failures += 1
+            self.statistics.record_error(f"connect: {exception.__class__.__name__}")
+            self.close()
+            return
+
+        try:
+            while time.monotonic() < deadline:
+                await self.play_game()
+                self.statistics.games_completed += 1
+        except asyncio.CancelledError:
+            self.statistics.games_abandoned += 1
+            raise
+        except (ConnectionError, RuntimeError, asyncio.TimeoutError) as exception:
+            self.statistics.games_abandoned += 1
+            self.statistics.record_error(f"game: {exception.__class__.__name__}: {exception}")
+        finally:
+            self.close()
+
+    async def play_game(self):
+        """
+        Plays one game from the creation of the room to the end of the battle, then closes the room.
+        """
+        for client in (self.host, self.guest):
+            while not client.events.empty():
+                client.events.get_nowait()
+
+        response = await self.host.request(command_literals.COMMAND_CREATE_ROOM, client_name=self.host.name)
+        if response["status"] == "error":
+            raise RuntimeError(response["message"])
+
+        await asyncio.gather(self._play_host(), self._play_guest(response["args"]["room_id"]))
+        await self.host.request(command_literals.COMMAND_EXIT_ROOM)
+
+    async def _play_host(self):
+        """
+        Waits for the guest to join, then places the host's fleet and plays the battle.
+        """
+        response = await self.host.request(command_literals.COMMAND_WAIT_FOR_OPPONENT_JOIN, timeout=EVENT_TIMEOUT)
+        if response["args"].get("is_waiting"):
+            event = await self.host.next_event()
+            if event["event"] != command_literals.EVENT_OPPONENT_JOINED:
+                raise RuntimeError(event["message"])
+        await self._play_battle(self.host)
+
+    async def _play_guest(self, room_id):
+        """
+        Joins the host's room, then places the guest's fleet and plays the battle.
+
+        Args:
+            room_id (str): The ID of the host's room.
+        """
+        response = await self.guest.request(
+            command_literals.COMMAND_JOIN_ROOM_WITH_ID, room_id=room_id, client_name=self.guest.name
+        )
+        if response["status"] == "error":
+            raise RuntimeError(response["message"])
+        await self._play_battle(self.guest)
+
+    async def _play_battle(self, client):
+        """
+        Sends a random board, waits for the opponent's and plays the battle.
+
+        Args:
+            client (SimulatedClient): The player.
+        """
+        response = await client.request(command_literals.COMMAND_SEND_BOARD, board_json=random.choice(self.boards))
+        if response["status"] == "error":
+            raise RuntimeError(response["message"])
+
+        is_turn = await client.wait_for_opponent_ready()
+        await client.play_battle(is_turn, self.shot_policy_class(), self.think_time)
+
+    def close(self):
+        """
+        Closes the connections of both clients.
+        """
+        self.host.close()
+        self.guest.close()
+
+
+async def run_swarm(host, port, pairs_count, duration, ramp_up, codec_name, shot_policy_name, think_time):
+    """
+    Runs game pairs against the server, starting them evenly over the ramp-up, until the duration has passed. The
+    games still being played at the end are abandoned.
+
+    Args:
+        host (str): The address of the server.
+        port (int): The port of the server.
+        pairs_count (int): The number of game pairs.
+        duration (float): The seconds to play for, ramp-up included.
+        ramp_up (float): The seconds over which the pairs connect.
+        codec_name (str): The codec of the messages.
+        shot_policy_name (str): The shot policy of the players, see SHOT_POLICIES.
+        think_time (float): The seconds a player waits before every shot.
+
+    Returns:
+        LoadStatistics: The statistics of the run.
+    """
+    statistics = LoadStatistics()
+    boards = []
+    for _ in range(BOARDS_POOL_SIZE):
+        board = BaseBoard()
+        board.random_shuffle_ships()
+        boards.append(board.serialize_board())
+
+    deadline = time.monotonic() + duration
+    tasks = []
+    for index in range(pairs_count):
+        pair = GamePair(f"{os.getpid()}-{index}", statistics, boards, SHOT_POLICIES[shot_policy_name], think_time)
+        tasks.append(asyncio.create_task(pair.run(host, port, codec_name, deadline)))
+        if ramp_up:
+            await asyncio.sleep(ramp_up / pairs_count)
+
+    _, pending_tasks = await asyncio.wait(tasks, timeout=max(deadline - time.monotonic(), 0))
+    for task in pending_tasks:
+        task.cancel()
+    await asyncio.gather(*pending_tasks, return_exceptions=True)
+    return statistics
+
+
+def run_swarm_process(arguments):
+    """
+    Entry point of a load generating process.
+
+    Args:
+        arguments (tuple): The arguments of `run_swarm`.
+
+    Returns:
+        LoadStatistics: The statistics of the process.
+    """
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard_limit, hard_limit))
+    return asyncio.run(run_swarm(*arguments))
+
+
+def read_process_cpu_seconds(pid):
+    """
+    Reads the CPU time used by a process from procfs.
+
+    Args:
+        pid (int): The process ID.
+
+    Returns:
+        float: The user and system CPU seconds, or None if procfs is unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as stat_file:
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def run_load(arguments):
+    """
+    Starts the server and the load generating processes, samples the server while they run and prints the results.
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments.
+    """
+    server_process = subprocess.Popen(  # pylint: disable=R1732
+        [sys.executable, "-m", SERVER_MODULES[arguments.server], "--port", str(arguments.port), "--log-level", "ERROR"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_server(arguments.port)
+        idle_rss, _ = read_process_status(server_process.pid)
+        started_cpu_seconds = read_process_cpu_seconds(server_process.pid)
+        started = time.monotonic()
+
+        pairs_per_process = [arguments.clients // 2 // arguments.processes] * arguments.processes
+        for index in range(arguments.clients // 2 % arguments.processes):
+            pairs_per_process[index] += 1
+        process_arguments = [
+            (
+                "localhost",
+                arguments.port,
+                pairs_count,
+                arguments.duration,
+                arguments.ramp_up,
+                arguments.codec,
+                arguments.policy,
+                arguments.think_time,
+            )
+            for pairs_count in pairs_per_process
+        ]
+
+        peak_rss, peak_threads = idle_rss, None
+        with multiprocessing.Pool(arguments.processes) as pool:
+            results = pool.map_async(run_swarm_process, process_arguments)
+            while not results.ready():
+                results.wait(1)
+                rss, threads = read_process_status(server_process.pid)
+                if rss is not None:
+                    peak_rss, peak_threads = max(peak_rss, rss), max(peak_threads or 0, threads)
+            elapsed = time.monotonic() - started
+            ended_cpu_seconds = read_process_cpu_seconds(server_process.pid)
+            process_statistics = results.get()
+    finally:
+        server_process.terminate()
+        server_process.wait()
+
+    statistics = LoadStatistics()
+    for other in process_statistics:
+        statistics.merge(other)
+    print_report(arguments, statistics, elapsed, idle_rss, peak_rss, peak_threads, started_cpu_seconds, ended_cpu_seconds)
+
+
+def print_report(arguments, statistics, elapsed, idle_rss, peak_rss, peak_threads, started_cpu, ended_cpu):
+    """
+    Prints the results of a run.
+
+    Args:
+        arguments (argparse.Namespace): The command line arguments.
+        statistics (LoadStatistics): The merged statistics of the clients.
+        elapsed (float): The seconds the run lasted.
+        idle_rss (int): The resident memory of the idle server in KiB.
+        peak_rss (int): The highest resident memory of the server in KiB.
+        peak_threads (int): The most threads of the server.
+        started_cpu (float): The CPU seconds of the server before the run.
+        ended_cpu (float): The CPU seconds of the server after the run.
+    """
+    commands_count = sum(histogram.count for histogram in statistics.latencies.values())
+    all_commands = LatencyHistogram()
+    for histogram in statistics.latencies.values():
+        all_commands.merge(histogram)
+
+    print(f"{arguments.server} server, {arguments.clients} clients in {arguments.processes} processes, {elapsed:.1f} s")
+    print(f"  connections held: {statistics.connections_held} ({statistics.connect_failures} pairs failed to connect)")
+    print(f"  games completed: {statistics.games_completed} ({statistics.games_completed / elapsed:.2f} games/s)")
+    print(f"  games abandoned: {statistics.games_abandoned}")
+    print(f"  commands: {commands_count} ({commands_count / elapsed:.0f} commands/s)")
+    if idle_rss is not None:
+        print(f"  server RSS: {idle_rss} KiB idle, {peak_rss} KiB peak, {peak_threads} threads peak")
+    if started_cpu is not None and ended_cpu is not None:
+        print(f"  server CPU: {ended_cpu - started_cpu:.1f} s ({(ended_cpu - started_cpu) / elapsed:.0%} of one core)")
+
+    print("  latency (ms):")
+    for command, histogram in sorted(statistics.latencies.items()) + [("all commands", all_commands)]:
+        summary = histogram.get_summary()
+        print(
+            f"    {command}: {summary['count']} calls, p50 {summary['p50_ms']}, p95 {summary['p95_ms']},"
+            f" p99 {summary['p99_ms']}, max {summary['max_ms']}"
+        )
+
+    if statistics.errors:
+        print("  errors:")
+        for message, count in sorted(statistics.errors.items(), key=lambda item: item[1], reverse=True):
+            print(f"    {message}: {count}")
+
+
+def main():
+    """
+    Parses the command line and runs the load.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=SERVER_MODULES, default="threaded")
+    parser.add_argument("--clients", type=int, default=1000, help="Number of simulated clients, two per game.")
+    parser.add_argument("--processes", type=int, default=1, help="Number of load generating processes.")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to play for, ramp-up included.")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds over which the clients connect.")
+    parser.add_argument("--think-time", type=float, default=0.1, help="Seconds a player waits before every shot.")
+    parser.add_argument("--policy", choices=SHOT_POLICIES, default="hunt", help="Shot policy of the players.")
+    parser.add_argument("--codec", choices=CODECS, default="binary")
+    parser.add_argument("--port", type=int, default=5601)
+    arguments = parser.parse_args()
+
+    run_load(arguments)
+
+
+if __name__ == "__main__":
+    main()
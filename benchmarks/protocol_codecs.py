@@ -0,0 +1,110 @@
+"""
+Benchmark comparing the JSON and the binary codec of the messages exchanged during a battle.
+
+Encodes and decodes the messages of one shot exchange - the shot command, the shot result, the opponent's shot
+pushed to the other player and the poll for it - with each codec and reports the bytes on the wire, framing
+included, and the CPU time spent encoding and decoding them. Run from the repository root with:
+
+    python -m benchmarks.protocol_codecs --iterations 100000
+"""
+
+import argparse
+import time
+
+from game.server.codec import CODECS
+from game.server.command_handler import CommandHandler
+from game.server.framing import HEADER
+from game.players import command_literals
+
+OPPONENT_SHOT_ARGS = {
+    "row": 4,
+    "col": 7,
+    "is_turn": True,
+    "turn_end_time": 81234.56789,
+    "has_battle_ended": False,
+    "is_winner": False,
+    "is_timeout": False,
+    "sequence": 37,
+}
+
+SHOT_EXCHANGE = {
+    "shot command": {"command": command_literals.COMMAND_REGISTER_SHOT, "args": {"row": 4, "col": 7}},
+    "shot result": CommandHandler.success_response(
+        "Shot registered!",
+        has_hit_ship=True,
+        has_sunk_ship=False,
+        sunk_ship=None,
+        is_turn=True,
+        turn_end_time=81234.56789,
+        has_battle_ended=False,
+        is_winner=False,
+        is_timeout=False,
+    ),
+    "opponent shot event": CommandHandler.event_message(
+        command_literals.EVENT_OPPONENT_SHOT, "Shot was made by the opponent!", **OPPONENT_SHOT_ARGS
+    ),
+    "shot poll": {"command": command_literals.COMMAND_ASK_TO_RECEIVE_SHOT, "args": {}},
+    "shot poll response": CommandHandler.success_response("Shot was made by the opponent!", **OPPONENT_SHOT_ARGS),
+}
+
+
+def measure_seconds(function, argument, iterations):
+    """
+    Measures the CPU time of calling a function repeatedly.
+
+    Args:
+        function (callable): The function.
+        argument (object): The argument of every call.
+        iterations (int): The number of calls.
+
+    Returns:
+        float: The CPU seconds per call.
+    """
+    started = time.process_time()
+    for _ in range(iterations):
+        function(argument)
+    return (time.process_time() - started) / iterations
+
+
+def run_benchmark(codec, iterations):
+    """
+    Benchmarks one codec on the messages of a shot exchange.
+
+    Args:
+        codec (JsonCodec or BinaryCodec): The codec.
+        iterations (int): The number of times every message is encoded and decoded.
+
+    Returns:
+        dict: The bytes, encoding and decoding microseconds of every message.
+    """
+    results = {}
+    for name, message in SHOT_EXCHANGE.items():
+        data = codec.encode(message)
+        assert codec.decode(data) == message
+        results[name] = (
+            HEADER.size + len(data),
+            measure_seconds(codec.encode, message, iterations) * 1e6,
+            measure_seconds(codec.decode, data, iterations) * 1e6,
+        )
+    return results
+
+
+def main():
+    """
+    Runs the benchmark for every codec and prints the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100000)
+    arguments = parser.parse_args()
+
+    for codec_name, codec in CODECS.items():
+        print(f"Benchmarking {codec_name} codec...")
+        results = run_benchmark(codec, arguments.iterations)
+        for name, (size, encode_us, decode_us) in results.items():
+            print(f"  {name}: {size} bytes, encode {encode_us:.2f} us, decode {decode_us:.2f} us")
+        sizes, encode_times, decode_times = zip(*results.values())
+        print(f"  shot exchange: {sum(sizes)} bytes, encode {sum(encode_times):.2f} us, decode {sum(decode_times):.2f} us")
+
+
+if __name__ == "__main__":
+    main()
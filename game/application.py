@@ -3,6 +3,7 @@
 import pygame
 from game.visuals.utils import constants
 from game.menus.start_menu import StartMenu
+from game.server.network_worker import COMPLETED_REQUESTS
 
 
 class Application:  # pylint: disable=R0903
@@ -39,15 +40,28 @@ class Application:  # pylint: disable=R0903
         """
         Starts and runs the main loop of the application.
 
-        Continuously handles events, updates the menu, and renders the display until the application is closed.
+        Continuously handles the responses received from the server, handles events, updates the menu, and renders
+        the display until the application is closed.
         """
         while self.running:
             self.clock.tick(self.fps)
+            self._handle_completed_requests()
             self._handle_events()
             self._draw_menu()
 
         pygame.quit()
 
+    def _handle_completed_requests(self):
+        """
+        Runs the callbacks of the requests that the network worker completed since the last frame.
+
+        Changes the menu if a callback asked for it.
+        """
+        COMPLETED_REQUESTS.process()
+
+        if self.menu.next_menu:
+            self.menu = self.menu.next_menu
+
     def _handle_events(self):
         """
         Handles Pygame events such as user inputs and window events.
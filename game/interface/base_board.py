@@ -5,6 +5,7 @@ from collections import defaultdict
 import json
 
 from game.interface.ship import Ship
+from game.tracing import span, traced
 
 
 class BaseBoard:
@@ -63,34 +64,36 @@ class BaseBoard:
             ship_constructor(4),
         }
 
-    def _get_random_row_for_ship(self, ship_length, is_horizontal):
+    def _get_random_row_for_ship(self, ship_length, is_horizontal, rng=random):
         """
         Returns a random row index for placing a ship on the game board.
 
         Parameters:
             ship_length (int): The length of the ship.
             is_horizontal (bool): Indicates whether the ship will be placed horizontally or vertically.
+            rng (random.Random, optional): The random generator. Defaults to the random module.
 
         Returns:
             int: A random row index within the valid range for placing the ship.
         """
-        return random.randint(0, self.rows_count - (not is_horizontal) * ship_length)
+        return rng.randint(0, self.rows_count - (not is_horizontal) * ship_length)
 
-    def _get_random_col_for_ship(self, ship_length, is_horizontal):
+    def _get_random_col_for_ship(self, ship_length, is_horizontal, rng=random):
         """
         Generates a random column index for placing a ship on the game board.
 
         Parameters:
         - ship_length (int): The length of the ship.
         - is_horizontal (bool): Indicates whether the ship is placed horizontally or vertically.
+        - rng (random.Random, optional): The random generator. Defaults to the random module.
 
         Returns:
         - int: The randomly generated column index.
 
         """
-        return random.randint(0, self.columns_count - is_horizontal * ship_length)
+        return rng.randint(0, self.columns_count - is_horizontal * ship_length)
 
-    def random_shuffle_ships(self):
+    def random_shuffle_ships(self, rng=random):
         """
         Randomly shuffles the placement of ships on the board.
         This method removes all existing ships from the board and then randomly places each ship
@@ -99,6 +102,9 @@ class BaseBoard:
         then moved to the generated position and checked for validity. If the placement is valid,
         the ship is placed on the board, otherwise, a new random position is generated until a valid
         placement is found.
+
+        Parameters:
+            rng (random.Random, optional): The random generator. Defaults to the random module.
         """
         self._remove_all_ships()
 
@@ -106,9 +112,9 @@ class BaseBoard:
             placed = False
 
             while not placed:
-                is_horizontal = random.choice([True, False])
-                row = self._get_random_row_for_ship(ship.ship_length, is_horizontal)
-                col = self._get_random_col_for_ship(ship.ship_length, is_horizontal)
+                is_horizontal = rng.choice([True, False])
+                row = self._get_random_row_for_ship(ship.ship_length, is_horizontal, rng)
+                col = self._get_random_col_for_ship(ship.ship_length, is_horizontal, rng)
 
                 ship.move(row, col, is_horizontal)
 
@@ -368,6 +374,7 @@ class BaseBoard:
 
         return repr_str
 
+    @traced
     def serialize_board(self):
         """
         Serializes the board data into a JSON string.
@@ -404,6 +411,7 @@ class BaseBoard:
                 raise ValueError("Invalid ship placement detected.")
 
     @staticmethod
+    @traced
     def deserialize_board(board_data):
         """
         Deserialize the board data and create a BaseBoard object.
@@ -414,14 +422,16 @@ class BaseBoard:
         Returns:
             BaseBoard: The deserialized BaseBoard object.
         """
-        board_json = json.loads(board_data)
+        with span("parse_board"):
+            board_json = json.loads(board_data)
 
         board = BaseBoard(
             rows_count=board_json["rows_count"],
             columns_count=board_json["columns_count"],
         )
 
-        board.place_ships_from_json(board_json)
+        with span("validate_board"):
+            board.place_ships_from_json(board_json)
 
         return board
 
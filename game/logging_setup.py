@@ -0,0 +1,173 @@
+"""
+Module for the logging of the game server and the network clients.
+
+Every module logs to its own logger under the "game" logger. Nothing is configured on import, so until
+`configure_logging` is called only warnings and errors reach stderr and the debug records of the command hot path
+are dropped by the level check before any message is formatted. Once configured, records are handed over to a queue
+and formatted and written by a listener thread, so the threads serving the clients never wait for stderr.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+
+from game.players import command_literals
+
+LOGGER_NAME = "game"
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Only one of every that many records is kept for the commands and events that are sent many times per battle
+DEFAULT_SAMPLE_RATES = {
+    command_literals.COMMAND_REGISTER_SHOT: 50,
+    command_literals.COMMAND_ASK_TO_RECEIVE_SHOT: 50,
+    command_literals.COMMAND_HAS_OPPONENT_JOINED: 50,
+    command_literals.COMMAND_IS_OPPONENT_READY: 50,
+}
+
+_listener = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps the first and then one of every `sample_rate` records that share a sample key, given to the logging call
+    with `extra={"sample_key": ...}`. Records without a sample key, or with a key without a rate, are all kept.
+    """
+
+    def __init__(self, sample_rates=None):
+        """
+        Initializes the SamplingFilter.
+
+        Args:
+            sample_rates (dict, optional): The sample rate of every sample key. Defaults to None, meaning
+                DEFAULT_SAMPLE_RATES.
+        """
+        super().__init__()
+        self.sample_rates = DEFAULT_SAMPLE_RATES if sample_rates is None else sample_rates
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        """
+        Decides if a record is kept.
+
+        Args:
+            record (logging.LogRecord): The record.
+
+        Returns:
+            bool: True if the record is kept, False otherwise.
+        """
+        sample_key = getattr(record, "sample_key", None)
+        sample_rate = self.sample_rates.get(sample_key, 1)
+        if sample_rate <= 1:
+            return True
+
+        with self.lock:
+            count = self.counts.get(sample_key, 0)
+            self.counts[sample_key] = count + 1
+
+        record.sample_rate = sample_rate
+        return count % sample_rate == 0
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formatter that appends the fields of a record, given to the logging call with `extra={"fields": {...}}`, as
+    key=value pairs, and the sample rate of sampled records.
+    """
+
+    def format(self, record):
+        """
+        Formats a record.
+
+        Args:
+            record (logging.LogRecord): The record.
+
+        Returns:
+            str: The formatted record.
+        """
+        message = super().format(record)
+        fields = dict(getattr(record, "fields", None) or {})
+        if getattr(record, "sample_rate", 1) > 1:
+            fields["sampled_1_in"] = record.sample_rate
+        if not fields:
+            return message
+        return message + " " + " ".join(f"{key}={value!r}" for key, value in fields.items())
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves the formatting of the records to the listener thread. The arguments of the records
+    have to stay unchanged after the logging call, which holds for the strings and numbers logged by the game.
+    """
+
+    def prepare(self, record):
+        """
+        Returns the record to put in the queue, unformatted.
+
+        Args:
+            record (logging.LogRecord): The record.
+
+        Returns:
+            logging.LogRecord: The same record.
+        """
+        return record
+
+
+def configure_logging(level=logging.INFO, sample_rates=None, stream=None):
+    """
+    Sends the records of the "game" logger through a queue to a listener thread that writes them to a stream.
+    Calling it again replaces the previous configuration.
+
+    Args:
+        level (int or str, optional): The minimal level of the logged records. Defaults to logging.INFO.
+        sample_rates (dict, optional): The sample rate of every sample key, see `SamplingFilter`. Defaults to None,
+            meaning DEFAULT_SAMPLE_RATES.
+        stream (file, optional): The stream to write to. Defaults to None, meaning stderr.
+
+    Returns:
+        logging.handlers.QueueListener: The started listener.
+    """
+    global _listener  # pylint: disable=W0603
+    stop_logging()
+
+    stream_handler = logging.StreamHandler(stream or sys.stderr)
+    stream_handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level)
+    logger.handlers = [queue_handler]
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """
+    Stops the listener thread started by `configure_logging` after it has written the queued records.
+    """
+    global _listener  # pylint: disable=W0603
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def add_logging_arguments(parser):
+    """
+    Adds the logging options of the servers to a command line parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser.
+    """
+    parser.add_argument("--log-level", default="INFO", help="DEBUG logs every command, sampled for the frequent ones.")
+
+
+atexit.register(stop_logging)
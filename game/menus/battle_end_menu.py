@@ -8,6 +8,7 @@ from game.visuals.utils import colors
 from game.visuals.utils.buttons import BasicButton
 from game.menus.menu import Menu
 from game.visuals.utils.draw_utils import DrawUtils
+from game.players import command_literals
 
 
 class BattleEndMenu(Menu):
@@ -33,7 +34,7 @@ class BattleEndMenu(Menu):
         self.exit_room_button = BasicButton(x=490, y=630, text="Exit room")
         self.ending_message = self.get_ending_message()
         print(self.ending_message)
-        self.player.request_enemy_board()
+        self.player.send_command_async(command_literals.COMMAND_REQUEST_ENEMY_BOARD, self.player.apply_enemy_board_response)
 
     def draw(self, screen):
         """
@@ -109,5 +110,6 @@ class BattleEndMenu(Menu):
 
         if event.type == pygame.MOUSEBUTTONDOWN:
             if self.exit_room_button.is_active():
+                self.player.network_client.close()
                 first_menu_type = self.get_first_menu_in_evolution()
                 self.next_menu = first_menu_type(self.player.name)
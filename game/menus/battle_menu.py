@@ -8,6 +8,7 @@ import pygame
 from game.menus.menu import Menu
 from game.visuals.utils.draw_utils import DrawUtils
 from game.menus.battle_end_menu import BattleEndMenu
+from game.players import command_literals
 
 
 class BattleMenu(Menu):
@@ -17,6 +18,7 @@ class BattleMenu(Menu):
     """
 
     ASK_RECEIVE_SHOT_EVENT = pygame.USEREVENT + 5
+    RECEIVE_EVENTS_EVENT = pygame.USEREVENT + 6
 
     def __init__(self, menus_evolution, player, opponent_name):
         """
@@ -31,11 +33,25 @@ class BattleMenu(Menu):
         self.player = player
         self.opponent_name = opponent_name
 
-        pygame.time.set_timer(self.ASK_RECEIVE_SHOT_EVENT, 1000)
-
         self.last_hovered_tile = None
         self.is_battle_over = False
 
+        pygame.time.set_timer(self.ASK_RECEIVE_SHOT_EVENT, 1000)
+        self.player.send_command_async(
+            command_literals.COMMAND_SUBSCRIBE_EVENTS, **self.track_request(self.handle_subscription_response)
+        )
+
+    def handle_subscription_response(self, response):
+        """
+        Handle the response for subscribing to the events. Starts receiving the events if the server pushes them.
+
+        Args:
+            response (dict): The server's response.
+        """
+        self.player.apply_subscription_response(response)
+        if self.player.is_subscribed_to_events:
+            pygame.time.set_timer(self.RECEIVE_EVENTS_EVENT, 100)
+
     def draw(self, screen):
         """
         Draw the battle menu on the screen, including the game boards, titles, and timers.
@@ -114,8 +130,11 @@ class BattleMenu(Menu):
                 self.clear_hovered_tile()
                 self.send_shot_command(pos)
 
+        if event.type == self.RECEIVE_EVENTS_EVENT:
+            self.player.receive_events()
+
         if event.type == self.ASK_RECEIVE_SHOT_EVENT:
-            if not self.player.is_turn:
+            if not self.player.is_turn and self.should_ask_for_shot():
                 self.ask_for_shot_command()
 
         self.is_battle_over = self.player.is_in_finished_battle
@@ -132,11 +151,26 @@ class BattleMenu(Menu):
         """
         return self.player.enemy_board_view.is_position_in_board(pos)
 
+    def should_ask_for_shot(self):
+        """
+        Check if the opponent's shot should be requested from the server. When the shots are pushed, the server is
+        asked only after the opponent's turn has run out, so that the timeout gets detected.
+
+        Returns:
+            bool: True if the shot should be requested, False otherwise.
+        """
+        return not self.player.is_subscribed_to_events or self.get_time_till_turn_end() == 0
+
     def ask_for_shot_command(self):
         """
-        Request the player to receive a shot from the opponent.
+        Request the player to receive a shot from the opponent, unless another request waits for its response.
         """
-        self.player.ask_to_receive_shot()
+        if self.is_waiting_for_response:
+            return
+
+        self.player.send_command_async(
+            command_literals.COMMAND_ASK_TO_RECEIVE_SHOT, **self.track_request(self.player.apply_received_shot_response)
+        )
 
     def send_shot_command(self, pos):
         """
@@ -147,11 +181,26 @@ class BattleMenu(Menu):
         """
         row, col = self.player.enemy_board_view.get_row_col_by_mouse(pos)
 
-        if self.player.enemy_board_view.is_coordinate_shot_at(row, col):
+        if self.is_waiting_for_response or self.player.enemy_board_view.is_coordinate_shot_at(row, col):
             return
 
-        self.player.shot(row, col)
+        self.player.send_command_async(
+            command_literals.COMMAND_REGISTER_SHOT,
+            **self.track_request(lambda response: self.handle_shot_response(row, col, response)),
+            row=row,
+            col=col,
+        )
+
+    def handle_shot_response(self, row, col, response):
+        """
+        Handle the response for a shot, updating the enemy board view and the battle state.
 
+        Args:
+            row (int): The row where the shot was taken.
+            col (int): The column where the shot was taken.
+            response (dict): The server's response.
+        """
+        self.player.apply_shot_response(row, col, response)
         self.is_battle_over = self.player.is_in_finished_battle
 
     def update_hovered_tile(self, mouse_pos):
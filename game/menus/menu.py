@@ -38,6 +38,7 @@ class Menu:
         self.message_x = message_x
         self.message_y = message_y
         self.next_menu = None
+        self.is_waiting_for_response = False
 
         self.add_self_to_evolution()
 
@@ -90,6 +91,35 @@ class Menu:
         if self.message:
             DrawUtils.draw_message(screen, self.message, x=self.message_x, y=self.message_y)
 
+    def track_request(self, response_handler, error_handler=None):
+        """
+        Marks the menu as waiting for the response of a request sent without blocking, until the response or the
+        failure of the request is handled. Menus send one such request at a time.
+
+        Args:
+            response_handler (callable): Called with the response.
+            error_handler (callable, optional): Called with the exception if the request failed. Defaults to None,
+                meaning that the failure is shown as a message.
+
+        Returns:
+            dict: The "callback" and "error_callback" to give to the request, which clear the waiting state and
+                handle the response or the exception.
+        """
+        self.is_waiting_for_response = True
+
+        def handle_response(response):
+            self.is_waiting_for_response = False
+            response_handler(response)
+
+        def handle_error(exception):
+            self.is_waiting_for_response = False
+            if error_handler is not None:
+                error_handler(exception)
+            else:
+                self.show_message(f"Request failed: {exception}")
+
+        return {"callback": handle_response, "error_callback": handle_error}
+
     def show_message(self, message):
         """
         Display a message on the screen and set a timer to clear it using a custom pygame event.
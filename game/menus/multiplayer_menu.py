@@ -52,17 +52,16 @@ class MultiplayerMenu(Menu):
             self.handle_keydown(event)
 
         if self.create_room_button.is_active():
-            response = self.player.create_room()
-            self.handle_create_room_response(response)
+            self.create_room()
 
         if self.join_room_with_id_button.is_active():
             self.process_join_room_by_id()
 
         if self.join_random_room_button.is_active():
-            response = self.player.join_random_room()
-            self.handle_join_room_response(response)
+            self.join_random_room()
 
         if self.go_back_button.is_active():
+            self.player.network_client.close()
             previous_menu_type = self.get_father_in_evolution()
             self.next_menu = previous_menu_type(self.player.name)
 
@@ -81,17 +80,37 @@ class MultiplayerMenu(Menu):
             if len(self.room_id_input) < self.GAME_ROOM_ID_LENGTH:
                 self.room_id_input += str(event.key - pygame.K_0)
 
+    def create_room(self):
+        """
+        Send the request to create a room, unless another request waits for its response.
+        """
+        if self.is_waiting_for_response:
+            return
+
+        self.player.call_async(self.player.create_room, **self.track_request(self.handle_create_room_response))
+
+    def join_random_room(self):
+        """
+        Send the request to join a random room, unless another request waits for its response.
+        """
+        if self.is_waiting_for_response:
+            return
+
+        self.player.call_async(self.player.join_random_room, **self.track_request(self.handle_join_room_response))
+
     def process_join_room_by_id(self):
         """
         Process joining a room by ID, validating the room ID length and sending the join request.
         """
+        if self.is_waiting_for_response:
+            return
+
         if len(self.room_id_input) != self.GAME_ROOM_ID_LENGTH:
             self.show_message("Enter a valid Room ID using the keyboard!")
             return
 
         room_id = self.room_id_input
-        response = self.player.join_room_with_id(room_id)
-        self.handle_join_room_response(response)
+        self.player.call_async(self.player.join_room_with_id, room_id, **self.track_request(self.handle_join_room_response))
 
     def handle_create_room_response(self, response):
         """
@@ -8,6 +8,7 @@ from game.visuals.utils.buttons import BasicButton
 from game.menus.menu import Menu
 from game.visuals.utils.draw_utils import DrawUtils
 from game.menus.ship_placement_menu import ShipPlacementMenu
+from game.players import command_literals
 
 
 class RoomMenu(Menu):
@@ -18,10 +19,11 @@ class RoomMenu(Menu):
 
     CHECK_OPPONENT_EVENT = pygame.USEREVENT + 3
     UPDATE_WAITING_MESSAGE_EVENT = pygame.USEREVENT + 4
+    RECEIVE_EVENTS_EVENT = pygame.USEREVENT + 7
 
     def __init__(self, menus_evolution, player, room_id):
         """
-        Initialize the RoomMenu with buttons for room management and sets up timers for checking opponent status.
+        Initialize the RoomMenu with buttons for room management and starts waiting for the opponent.
 
         Args:
             menus_evolution (list): List of menus in the evolution stack.
@@ -36,11 +38,12 @@ class RoomMenu(Menu):
 
         self.is_room_private = False
 
-        pygame.time.set_timer(self.CHECK_OPPONENT_EVENT, 2000)
         pygame.time.set_timer(self.UPDATE_WAITING_MESSAGE_EVENT, 500)
 
         self.waiting_dots = 0
 
+        self.wait_for_opponent()
+
     def handle_event(self, event):
         """
         Handle user events including button clicks and custom events.
@@ -59,23 +62,55 @@ class RoomMenu(Menu):
         if event.type == self.CHECK_OPPONENT_EVENT:
             self.check_has_opponent_joined()
 
+        if event.type == self.RECEIVE_EVENTS_EVENT:
+            self.handle_received_events()
+
         if event.type == self.UPDATE_WAITING_MESSAGE_EVENT:
             self.update_waiting_dots()
 
     def exit_room(self):
         """
-        Handle exiting the room. Navigates back to the previous menu if successful.
+        Send the request to exit the room, unless another request waits for its response.
+        """
+        if self.is_waiting_for_response:
+            return
+
+        self.player.send_command_async(
+            command_literals.COMMAND_EXIT_ROOM, **self.track_request(self.handle_exit_room_response)
+        )
+
+    def handle_exit_room_response(self, response):
+        """
+        Handle the response for exiting the room. Navigates back to the previous menu if successful.
+
+        Args:
+            response (dict): The server's response.
         """
-        response = self.player.exit_room()
         if response.get("status") == "success":
+            pygame.time.set_timer(self.CHECK_OPPONENT_EVENT, 0)
+            pygame.time.set_timer(self.RECEIVE_EVENTS_EVENT, 0)
             previous_menu_type = self.get_father_in_evolution()
             self.next_menu = previous_menu_type(self.menus_evolution, self.player.network_client, self.player.name)
 
     def change_room_publicity(self):
         """
-        Handle changing the room's publicity status between private and public.
+        Send the request to change the room's publicity status between private and public, unless another request
+        waits for its response.
+        """
+        if self.is_waiting_for_response:
+            return
+
+        self.player.send_command_async(
+            command_literals.COMMAND_CHANGE_ROOM_PUBLICITY, **self.track_request(self.handle_room_publicity_response)
+        )
+
+    def handle_room_publicity_response(self, response):
+        """
+        Handle the response for changing the room's publicity status.
+
+        Args:
+            response (dict): The server's response.
         """
-        response = self.player.change_room_publicity()
         if response.get("status") == "success":
             self.is_room_private = response["args"]["is_private"]
 
@@ -88,14 +123,74 @@ class RoomMenu(Menu):
         """
         return "Private - Join with code only!" if self.is_room_private else "Public - Anyone can join!"
 
+    def wait_for_opponent(self):
+        """
+        Ask the server to notify the player when an opponent joins. Falls back to checking every 2 seconds if the
+        server can not notify the player.
+        """
+        self.player.send_command_async(
+            command_literals.COMMAND_WAIT_FOR_OPPONENT_JOIN, **self.track_request(self.handle_wait_response)
+        )
+
+    def handle_wait_response(self, response):
+        """
+        Handle the response for waiting for the opponent. Navigates to ShipPlacementMenu if the opponent has already
+        joined.
+
+        Args:
+            response (dict): The server's response.
+        """
+        if response.get("status") != "success":
+            pygame.time.set_timer(self.CHECK_OPPONENT_EVENT, 2000)
+            return
+
+        if response["args"].get("is_waiting", False):
+            pygame.time.set_timer(self.RECEIVE_EVENTS_EVENT, 100)
+            return
+
+        self.open_ship_placement(response["args"]["opponent_name"])
+
+    def handle_received_events(self):
+        """
+        Handle the events pushed by the server while waiting. Renews the wait when it times out.
+        """
+        for event in self.player.receive_events():
+            if event["event"] == command_literals.EVENT_OPPONENT_JOINED:
+                self.open_ship_placement(event["args"]["opponent_name"])
+            elif event["event"] == command_literals.EVENT_WAIT_TIMEOUT:
+                self.wait_for_opponent()
+
     def check_has_opponent_joined(self):
         """
-        Check if an opponent has joined the room. Navigates to ShipPlacementMenu if an opponent has joined.
+        Check if an opponent has joined the room, unless another request waits for its response.
+        """
+        if self.is_waiting_for_response:
+            return
+
+        self.player.send_command_async(
+            command_literals.COMMAND_HAS_OPPONENT_JOINED, **self.track_request(self.handle_has_opponent_joined_response)
+        )
+
+    def handle_has_opponent_joined_response(self, response):
+        """
+        Handle the response for checking the opponent. Navigates to ShipPlacementMenu if an opponent has joined.
+
+        Args:
+            response (dict): The server's response.
         """
-        response = self.player.has_opponent_joined()
         if response.get("status") == "success":
-            opponent_name = response["args"]["opponent_name"]
-            self.next_menu = ShipPlacementMenu(self.menus_evolution, self.player, self.room_id, opponent_name)
+            self.open_ship_placement(response["args"]["opponent_name"])
+
+    def open_ship_placement(self, opponent_name):
+        """
+        Stop waiting for the opponent and navigate to the ShipPlacementMenu.
+
+        Args:
+            opponent_name (str): The name of the opponent.
+        """
+        pygame.time.set_timer(self.CHECK_OPPONENT_EVENT, 0)
+        pygame.time.set_timer(self.RECEIVE_EVENTS_EVENT, 0)
+        self.next_menu = ShipPlacementMenu(self.menus_evolution, self.player, self.room_id, opponent_name)
 
     def update_waiting_dots(self):
         """
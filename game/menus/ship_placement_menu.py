@@ -10,6 +10,7 @@ from game.menus.menu import Menu
 from game.visuals.utils import colors
 from game.visuals.utils.draw_utils import DrawUtils
 from game.menus.battle_menu import BattleMenu
+from game.players import command_literals
 
 
 class ShipPlacementMenu(Menu):
@@ -20,6 +21,7 @@ class ShipPlacementMenu(Menu):
 
     IS_OPPONENT_READY_EVENT = pygame.USEREVENT + 1
     WAITING_MESSAGE_UPDATE_EVENT = pygame.USEREVENT + 2
+    RECEIVE_EVENTS_EVENT = pygame.USEREVENT + 8
 
     def __init__(self, menus_evolution, player, room_id, opponent_name):
         """
@@ -48,7 +50,6 @@ class ShipPlacementMenu(Menu):
 
         self.waiting_dots = 0
 
-        pygame.time.set_timer(self.IS_OPPONENT_READY_EVENT, 2000)
         pygame.time.set_timer(self.WAITING_MESSAGE_UPDATE_EVENT, 500)
 
     def handle_event(self, event):
@@ -64,10 +65,13 @@ class ShipPlacementMenu(Menu):
             if event.type == self.IS_OPPONENT_READY_EVENT:
                 self.handle_is_opponent_ready()
 
+            elif event.type == self.RECEIVE_EVENTS_EVENT:
+                self.handle_received_events()
+
             elif event.type == self.WAITING_MESSAGE_UPDATE_EVENT:
                 self.update_waiting_dots()
 
-        else:
+        elif not self.is_waiting_for_response:
             if event.type == pygame.MOUSEBUTTONDOWN:
                 self.on_mouse_button_down(event)
             elif event.type == pygame.MOUSEBUTTONUP:
@@ -83,18 +87,90 @@ class ShipPlacementMenu(Menu):
 
     def handle_is_opponent_ready(self):
         """
-        Handle the event where the opponent is ready. Transitions to the BattleMenu if the opponent is ready.
+        Ask the server if the opponent is ready, unless another request waits for its response.
         """
-        response = self.player.is_opponent_ready()
+        if self.is_waiting_for_response:
+            return
+
+        self.player.send_command_async(
+            command_literals.COMMAND_IS_OPPONENT_READY, **self.track_request(self.handle_is_opponent_ready_response)
+        )
 
+    def handle_is_opponent_ready_response(self, response):
+        """
+        Handle the response for checking the opponent. Transitions to the BattleMenu if the opponent is ready.
+
+        Args:
+            response (dict): The server's response.
+        """
+        self.player.apply_readiness_response(response)
         if response["status"] == "success":
-            self.next_menu = BattleMenu(self.menus_evolution, self.player, self.opponent_name)
+            self.open_battle()
+
+    def wait_for_opponent_ready(self):
+        """
+        Ask the server to notify the player when the opponent is ready. Falls back to checking every 2 seconds if
+        the server can not notify the player.
+        """
+        self.player.send_command_async(
+            command_literals.COMMAND_WAIT_FOR_OPPONENT_READY, **self.track_request(self.handle_wait_response)
+        )
+
+    def handle_wait_response(self, response):
+        """
+        Handle the response for waiting for the opponent. Transitions to the BattleMenu if the opponent is already
+        ready.
+
+        Args:
+            response (dict): The server's response.
+        """
+        self.player.apply_wait_for_ready_response(response)
+        if response["status"] != "success":
+            pygame.time.set_timer(self.IS_OPPONENT_READY_EVENT, 2000)
+            return
+
+        if response["args"].get("is_waiting", False):
+            pygame.time.set_timer(self.RECEIVE_EVENTS_EVENT, 100)
+            return
+
+        self.open_battle()
+
+    def handle_received_events(self):
+        """
+        Handle the events pushed by the server while waiting. Renews the wait when it times out.
+        """
+        for event in self.player.receive_events():
+            if event["event"] == command_literals.EVENT_OPPONENT_READY:
+                self.open_battle()
+            elif event["event"] == command_literals.EVENT_WAIT_TIMEOUT:
+                self.wait_for_opponent_ready()
+
+    def open_battle(self):
+        """
+        Stop waiting for the opponent and navigate to the BattleMenu.
+        """
+        pygame.time.set_timer(self.IS_OPPONENT_READY_EVENT, 0)
+        pygame.time.set_timer(self.RECEIVE_EVENTS_EVENT, 0)
+        self.next_menu = BattleMenu(self.menus_evolution, self.player, self.opponent_name)
 
     def handle_sending_board(self):
         """
-        Handle sending the board to the opponent. Disables the buttons once the board is sent.
+        Send the board to the server. The ships can not be moved until the server answers.
+        """
+        self.player.send_command_async(
+            command_literals.COMMAND_SEND_BOARD,
+            **self.track_request(self.handle_send_board_response),
+            board_json=self.player.board.serialize_board(),
+        )
+
+    def handle_send_board_response(self, response):
+        """
+        Handle the response for sending the board. Disables the buttons once the board is sent.
+
+        Args:
+            response (dict): The server's response.
         """
-        response = self.player.send_board()
+        self.player.apply_board_response(response)
         if response["status"] == "error":
             self.show_message(response["message"])
             return
@@ -102,6 +178,7 @@ class ShipPlacementMenu(Menu):
         self.start_button.set_disabled(True)
         self.shuffle_button.set_disabled(True)
         print("Wait for opponent to send board!")
+        self.wait_for_opponent_ready()
 
     def update_waiting_dots(self):
         """
@@ -6,6 +6,7 @@ and starting either an offline or multiplayer game.
 import pygame
 from game.visuals.utils.buttons import BasicButton
 from game.server.network import MultiplayerNetwork, OfflineNetwork
+from game.server.network_worker import NetworkWorker
 from game.server.game_server import SinglePlayerServer
 from game.menus.menu import Menu
 from game.players.player import Player
@@ -94,21 +95,45 @@ class StartMenu(Menu):
 
     def start_multiplayer_game(self):
         """
-        Start a multiplayer game by connecting to a MultiplayerNetwork instance.
-        Navigate to the MultiplayerMenu for online play.
+        Start a multiplayer game by connecting to the server on a network worker, so the menu keeps responding
+        while connecting. Navigate to the MultiplayerMenu for online play once connected.
         """
-        try:
-            network_client = MultiplayerNetwork()
-        except ConnectionError:
-            self.show_message("Unable to connect to the server!")
+        if self.is_waiting_for_response:
             return
 
+        network_client = NetworkWorker(MultiplayerNetwork)
+        self.show_message("Connecting to the server...")
+        network_client.connect(
+            **self.track_request(
+                lambda _: self.open_multiplayer_menu(network_client),
+                lambda _: self.handle_connection_error(network_client),
+            )
+        )
+
+    def open_multiplayer_menu(self, network_client):
+        """
+        Navigate to the MultiplayerMenu once connected to the server.
+
+        Args:
+            network_client (NetworkWorker): The network connected to the server.
+        """
+        self.message = ""
         self.next_menu = MultiplayerMenu(
             self.menus_evolution,
             network_client,
             self.get_player_name_input(),
         )
 
+    def handle_connection_error(self, network_client):
+        """
+        Report that the server could not be reached and stop the network worker.
+
+        Args:
+            network_client (NetworkWorker): The network that failed to connect.
+        """
+        network_client.close()
+        self.show_message("Unable to connect to the server!")
+
     def draw(self, screen):
         """
         Draw the start menu on the screen, including buttons, labels, and input text.
@@ -4,6 +4,7 @@ the `Player` class to provide automated gameplay with a hunting strategy for att
 """
 
 import random
+from collections import Counter
 from game.players.player import Player
 
 
@@ -13,14 +14,26 @@ class BattleBot(Player):
     to locate and sink ships, and handles attack logic based on the game state.
     """
 
-    def __init__(self, network_client):
+    def __init__(self, network_client, placement_prior=None, placement_strategy=None, density_cache=None):
         """
         Initialize the BattleBot with a network client.
 
         Args:
             network_client: The network client used to communicate with the game server.
+            placement_prior (numpy.ndarray, optional): Per-cell probabilities of a cell being occupied by an enemy
+                ship, as returned by `PlacementHeatmap.get_prior`. Defaults to None, meaning uniform targeting.
+            placement_strategy (AdversarialPlacementStrategy, optional): Strategy that arranges the ships before the
+                board is sent. Defaults to None, meaning random placement.
+            density_cache (DensityGridCache, optional): Cache of density grids used to target the cell covered by the
+                most placements of the remaining ships. Defaults to None, meaning random targeting.
         """
         super().__init__("BattleBot", network_client)
+        self.placement_prior = placement_prior
+        if placement_prior is not None and placement_prior.shape != (self.board.rows_count, self.board.columns_count):
+            self.placement_prior = None
+        self.placement_strategy = placement_strategy
+        self.density_cache = density_cache
+
         self.shot_history = None
         self.hit_stack = None
         self.hunting_mode = False
@@ -39,6 +52,17 @@ class BattleBot(Player):
         self.last_hit = None
         self.is_horizontal = None
 
+    def send_board(self):
+        """
+        Arrange the ships with the placement strategy, if there is one, and send the board to the server.
+
+        Returns:
+            dict: The server's response indicating the result of sending the board.
+        """
+        if self.placement_strategy is not None:
+            self.placement_strategy.place_ships(self.board)
+        return super().send_board()
+
     def stop_bot(self):
         """
         Mark the bot as being in a finished battle.
@@ -85,12 +109,81 @@ class BattleBot(Player):
         Returns:
             tuple: (row, col) coordinates of the random position.
         """
+        if self.density_cache is not None:
+            return self._select_densest_position()
+
+        if self.placement_prior is not None:
+            return self._select_weighted_position()
+
         while True:
             row = random.randint(0, self.board.rows_count - 1)
             col = random.randint(0, self.board.columns_count - 1)
             if (row, col) not in self.shot_history:
                 return row, col
 
+    def _select_weighted_position(self):
+        """
+        Select a position that has not been attacked yet, weighted by the placement prior.
+
+        Returns:
+            tuple: (row, col) coordinates of the selected position.
+        """
+        candidates = self._get_unshot_positions()
+        weights = [self.placement_prior[row, col] for row, col in candidates]
+        return random.choices(candidates, weights=weights)[0]
+
+    def _select_densest_position(self):
+        """
+        Select the position that is covered by the most placements of the remaining enemy ships, weighted by the
+        placement prior if there is one.
+
+        Returns:
+            tuple: (row, col) coordinates of the selected position.
+        """
+        blocked_coordinates = [
+            coordinate for coordinate, shots_count in self.enemy_board_view.shot_coordinates.items() if shots_count > 0
+        ]
+        weights = self.density_cache.get_grid(
+            self.board.rows_count,
+            self.board.columns_count,
+            blocked_coordinates,
+            self._get_remaining_ship_lengths(),
+        )
+        if self.placement_prior is not None:
+            weights = weights * self.placement_prior
+
+        candidates = self._get_unshot_positions()
+        best_weight = max(weights[candidate] for candidate in candidates)
+        return random.choice([candidate for candidate in candidates if weights[candidate] == best_weight])
+
+    def _get_unshot_positions(self):
+        """
+        Get all positions on the board that have not been attacked yet.
+
+        Returns:
+            list of tuples: List of (row, col) positions.
+        """
+        return [
+            (row, col)
+            for row in range(self.board.rows_count)
+            for col in range(self.board.columns_count)
+            if (row, col) not in self.shot_history and not self.enemy_board_view.is_coordinate_shot_at(row, col)
+        ]
+
+    def _get_remaining_ship_lengths(self):
+        """
+        Get the lengths of the enemy ships that have not been sunk yet, assuming the enemy has the same fleet.
+
+        Returns:
+            list: The lengths of the remaining ships.
+        """
+        fleet = Counter(ship.ship_length for ship in self.board.unplaced_ships)
+        fleet.update(ship.ship_length for ship_list in self.board.ships_map.values() for ship in ship_list)
+        sunk_ships = Counter(
+            ship.ship_length for ship_list in self.enemy_board_view.ships_map.values() for ship in ship_list
+        )
+        return list((fleet - sunk_ships).elements())
+
     def _process_attack_result(self, response, row, col):
         """
         Process the result of an attack and update the bot's strategy based on whether a ship was hit or sunk.
@@ -1,4 +1,4 @@
-"""Contains literals for the commands that the players can send to the server."""
+"""Contains literals for the commands that the players can send to the server and the events it pushes to them."""
 
 COMMAND_CREATE_ROOM = "create_room"
 COMMAND_JOIN_ROOM_WITH_ID = "join_room_with_id"
@@ -11,3 +11,16 @@ COMMAND_ASK_TO_RECEIVE_SHOT = "ask_to_receive_shot"
 COMMAND_IS_OPPONENT_READY = "is_opponent_ready"
 COMMAND_CHANGE_ROOM_PUBLICITY = "change_room_publicity"
 COMMAND_REQUEST_ENEMY_BOARD = "request_enemy_board"
+COMMAND_SUBSCRIBE_EVENTS = "subscribe_events"
+COMMAND_WAIT_FOR_OPPONENT_JOIN = "wait_for_opponent_join"
+COMMAND_WAIT_FOR_OPPONENT_READY = "wait_for_opponent_ready"
+COMMAND_NEGOTIATE_CODEC = "negotiate_codec"
+COMMAND_FETCH_EVENTS = "fetch_events"
+COMMAND_BATCH = "batch"
+COMMAND_RESUME_SESSION = "resume_session"
+
+EVENT_OPPONENT_SHOT = "opponent_shot"
+EVENT_BATTLE_END = "battle_end"
+EVENT_OPPONENT_JOINED = "opponent_joined"
+EVENT_OPPONENT_READY = "opponent_ready"
+EVENT_WAIT_TIMEOUT = "wait_timeout"
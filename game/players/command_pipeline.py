@@ -0,0 +1,211 @@
+"""
+Module for pipelining the commands of a player, sending several commands to the server in one round trip.
+"""
+
+import functools
+
+from game.players import command_literals
+
+
+class CommandPipeline:
+    """
+    Queues commands of a player and sends them to the server as one batch. The server runs them in order and answers
+    with the responses of all of them, which are applied to the player's state as if the commands were sent one by
+    one. Servers that do not support batches are sent the commands one by one.
+
+    Example:
+        with player.pipeline() as pipeline:
+            pipeline.create_room()
+            pipeline.send_board()
+            pipeline.subscribe_to_events()
+    """
+
+    UNKNOWN_COMMAND_MESSAGE = "Unknown command"
+
+    def __init__(self, player, stop_on_error=False):
+        """
+        Initializes an empty CommandPipeline.
+
+        Args:
+            player (Player): The player sending the commands.
+            stop_on_error (bool, optional): Whether the server skips the commands after the first one that fails.
+                Defaults to False.
+        """
+        self.player = player
+        self.stop_on_error = stop_on_error
+        self.commands = []
+        self.response_handlers = []
+
+    def __len__(self):
+        """
+        Returns the number of queued commands.
+
+        Returns:
+            int: The number of commands.
+        """
+        return len(self.commands)
+
+    def __enter__(self):
+        """
+        Returns the pipeline to queue commands in a `with` block.
+
+        Returns:
+            CommandPipeline: The pipeline.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Sends the queued commands when the `with` block ends, unless it raised an exception.
+
+        Args:
+            exc_type (type): The type of the raised exception, or None.
+            exc_value (Exception): The raised exception, or None.
+            traceback (traceback): The traceback of the raised exception, or None.
+        """
+        if exc_type is None:
+            self.send()
+
+    def add(self, command_type, response_handler=None, **kwargs):
+        """
+        Queues a command.
+
+        Args:
+            command_type (str): The type of the command.
+            response_handler (callable, optional): Called with the command's response once it is received. Defaults
+                to None.
+            **kwargs: Arguments of the command.
+
+        Returns:
+            CommandPipeline: The pipeline, so calls can be chained.
+        """
+        self.commands.append({"command": command_type, "args": kwargs})
+        self.response_handlers.append(response_handler)
+        return self
+
+    def create_room(self, bucket=None):
+        """
+        Queues creating a room, see `Player.create_room`.
+
+        Args:
+            bucket (str, optional): The matchmaking bucket of the room. Defaults to None, the default bucket.
+
+        Returns:
+            CommandPipeline: The pipeline.
+        """
+        return self.add(
+            command_literals.COMMAND_CREATE_ROOM,
+            self.player.reset_event_cursor,
+            client_name=self.player.name,
+            bucket=bucket,
+        )
+
+    def send_board(self):
+        """
+        Queues sending the player's board, see `Player.send_board`.
+
+        Returns:
+            CommandPipeline: The pipeline.
+        """
+        return self.add(
+            command_literals.COMMAND_SEND_BOARD,
+            self.player.apply_board_response,
+            board_json=self.player.board.serialize_board(),
+        )
+
+    def subscribe_to_events(self):
+        """
+        Queues subscribing to pushed events, see `Player.subscribe_to_events`.
+
+        Returns:
+            CommandPipeline: The pipeline.
+        """
+        return self.add(command_literals.COMMAND_SUBSCRIBE_EVENTS, self.player.apply_subscription_response)
+
+    def is_opponent_ready(self):
+        """
+        Queues checking if the opponent is ready, see `Player.is_opponent_ready`.
+
+        Returns:
+            CommandPipeline: The pipeline.
+        """
+        return self.add(command_literals.COMMAND_IS_OPPONENT_READY, self.player.apply_readiness_response)
+
+    def shot(self, row, col):
+        """
+        Queues a shot, see `Player.shot`. Shots queued after a miss are answered with "Not player's turn!", or
+        skipped if the pipeline stops on errors.
+
+        Args:
+            row (int): The row where the shot is taken.
+            col (int): The column where the shot is taken.
+
+        Returns:
+            CommandPipeline: The pipeline.
+        """
+        return self.add(
+            command_literals.COMMAND_REGISTER_SHOT,
+            functools.partial(self.player.apply_shot_response, row, col),
+            row=row,
+            col=col,
+        )
+
+    def ask_to_receive_shot(self):
+        """
+        Queues asking for the opponent's shot, see `Player.ask_to_receive_shot`.
+
+        Returns:
+            CommandPipeline: The pipeline.
+        """
+        return self.add(
+            command_literals.COMMAND_ASK_TO_RECEIVE_SHOT,
+            self.player.apply_received_shot_response,
+        )
+
+    def send(self):
+        """
+        Sends the queued commands in one batch and applies their responses in order.
+
+        Returns:
+            list: The responses of the commands, without the ones skipped after an error if the pipeline stops on
+                errors. If the batch fails for another reason than the server not knowing batches, such as a lost
+                connection or a rate limit, every command gets the batch's error, since they may have been handled.
+        """
+        commands, response_handlers = self.commands, self.response_handlers
+        self.commands, self.response_handlers = [], []
+        if not commands:
+            return []
+
+        response = self.player.send_command(
+            command_literals.COMMAND_BATCH, commands=commands, stop_on_error=self.stop_on_error
+        )
+        if response["status"] == "success":
+            responses = response["args"]["responses"]
+        elif response["message"] == self.UNKNOWN_COMMAND_MESSAGE:
+            responses = self._send_one_by_one(commands)
+        else:
+            responses = [response] * len(commands)
+
+        for response_handler, command_response in zip(response_handlers, responses):
+            if response_handler is not None:
+                response_handler(command_response)
+
+        return responses
+
+    def _send_one_by_one(self, commands):
+        """
+        Sends the commands one by one, for servers that reject the batch.
+
+        Args:
+            commands (list): The commands.
+
+        Returns:
+            list: The responses of the commands.
+        """
+        responses = []
+        for command_data in commands:
+            command_response = self.player.send_command(command_data["command"], **command_data["args"])
+            responses.append(command_response)
+            if self.stop_on_error and command_response["status"] != "success":
+                break
+        return responses
@@ -0,0 +1,205 @@
+"""
+Module for computing the probability density grid that density based bots use for targeting. The density of a cell
+is the number of placements of the remaining enemy ships that cover it. `DensityGridCache` memoizes the grids by the
+state of the enemy view and derives the grid after a new shot from the previous one when possible.
+"""
+
+from collections import OrderedDict, Counter
+
+import numpy as np
+
+
+class DensityGridCache:
+    """
+    Bounded LRU cache of density grids keyed on the enemy view state, with hit and miss counters.
+
+    On a miss, if the previous state only differs by newly blocked cells, the new grid is derived from the previous
+    one by subtracting the placements that the new cells invalidate instead of recounting the whole board.
+    """
+
+    MAX_SIZE = 256
+
+    def __init__(self, max_size=MAX_SIZE):
+        """
+        Initializes a DensityGridCache.
+
+        Args:
+            max_size (int, optional): Maximum number of cached grids. Defaults to MAX_SIZE.
+        """
+        self.max_size = max_size
+        self.grids = OrderedDict()
+        self.last_key = None
+        self.hits = 0
+        self.misses = 0
+        self.incremental_updates = 0
+
+    @staticmethod
+    def make_key(rows_count, columns_count, blocked_coordinates, ship_lengths):
+        """
+        Builds the cache key of an enemy view state.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+            blocked_coordinates (iterable): The coordinates that can not hold a remaining ship.
+            ship_lengths (iterable): The lengths of the remaining ships.
+
+        Returns:
+            tuple: The cache key.
+        """
+        return rows_count, columns_count, frozenset(blocked_coordinates), tuple(sorted(ship_lengths))
+
+    def get_grid(self, rows_count, columns_count, blocked_coordinates, ship_lengths):
+        """
+        Returns the density grid of an enemy view state, computing it if it is not cached.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+            blocked_coordinates (iterable): The coordinates that can not hold a remaining ship.
+            ship_lengths (iterable): The lengths of the remaining ships.
+
+        Returns:
+            numpy.ndarray: The read-only density grid.
+        """
+        key = self.make_key(rows_count, columns_count, blocked_coordinates, ship_lengths)
+
+        grid = self.grids.get(key)
+        if grid is not None:
+            self.hits += 1
+            self.grids.move_to_end(key)
+            self.last_key = key
+            return grid
+
+        self.misses += 1
+        grid = self._derive_from_last_grid(key)
+        if grid is None:
+            grid = DensityGridCache.compute_grid(*key)
+        grid.setflags(write=False)
+
+        self.grids[key] = grid
+        if len(self.grids) > self.max_size:
+            self.grids.popitem(last=False)
+        self.last_key = key
+        return grid
+
+    def _derive_from_last_grid(self, key):
+        """
+        Derives the grid of a state from the grid of the last requested state, if it is still cached and the new
+        state only adds blocked cells to it.
+
+        Args:
+            key (tuple): The cache key of the new state.
+
+        Returns:
+            numpy.ndarray: The derived grid, or None if it can not be derived.
+        """
+        last_grid = self.grids.get(self.last_key)
+        if last_grid is None:
+            return None
+
+        last_rows_count, last_columns_count, last_blocked, last_ship_lengths = self.last_key
+        rows_count, columns_count, blocked, ship_lengths = key
+        if (last_rows_count, last_columns_count, last_ship_lengths) != (rows_count, columns_count, ship_lengths):
+            return None
+        if not last_blocked <= blocked:
+            return None
+
+        grid = last_grid.copy()
+        current_blocked = set(last_blocked)
+        for coordinate in blocked - last_blocked:
+            DensityGridCache._subtract_covering_placements(grid, coordinate, current_blocked, ship_lengths)
+            current_blocked.add(coordinate)
+
+        self.incremental_updates += 1
+        return grid
+
+    @staticmethod
+    def _subtract_covering_placements(grid, coordinate, blocked, ship_lengths):
+        """
+        Subtracts from the grid the still valid placements that cover a newly blocked coordinate.
+
+        Args:
+            grid (numpy.ndarray): The grid to update in place.
+            coordinate (tuple): The newly blocked (row, col) coordinate.
+            blocked (set): The coordinates blocked before the new one.
+            ship_lengths (tuple): The lengths of the remaining ships.
+        """
+        rows_count, columns_count = grid.shape
+        row, col = coordinate
+
+        for ship_length, ships_count in Counter(ship_lengths).items():
+            orientations = ((0, 1), (1, 0)) if ship_length > 1 else ((0, 1),)
+            for delta_row, delta_col in orientations:
+                for shift in range(ship_length):
+                    start_row, start_col = row - shift * delta_row, col - shift * delta_col
+                    cells = [(start_row + tile * delta_row, start_col + tile * delta_col) for tile in range(ship_length)]
+
+                    is_in_board = all(
+                        0 <= cell_row < rows_count and 0 <= cell_col < columns_count for cell_row, cell_col in cells
+                    )
+                    if not is_in_board or any(cell in blocked for cell in cells):
+                        continue
+
+                    for cell in cells:
+                        grid[cell] -= ships_count
+
+    @staticmethod
+    def compute_grid(rows_count, columns_count, blocked_coordinates, ship_lengths):
+        """
+        Counts for each cell the number of valid placements of the remaining ships that cover it.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+            blocked_coordinates (iterable): The coordinates that can not hold a remaining ship.
+            ship_lengths (iterable): The lengths of the remaining ships.
+
+        Returns:
+            numpy.ndarray: The density grid.
+        """
+        blocked = np.zeros((rows_count, columns_count), dtype=bool)
+        for row, col in blocked_coordinates:
+            blocked[row, col] = True
+
+        grid = np.zeros((rows_count, columns_count), dtype=np.int32)
+        for ship_length, ships_count in Counter(ship_lengths).items():
+            grid += ships_count * DensityGridCache._count_line_placements(blocked, ship_length)
+            if ship_length > 1:
+                grid += ships_count * DensityGridCache._count_line_placements(blocked.T, ship_length).T
+        return grid
+
+    @staticmethod
+    def _count_line_placements(blocked, ship_length):
+        """
+        Counts the horizontal placements of a ship covering each cell, using sliding window sums.
+
+        Args:
+            blocked (numpy.ndarray): Boolean grid of the blocked cells.
+            ship_length (int): The length of the ship.
+
+        Returns:
+            numpy.ndarray: The number of valid placements covering each cell.
+        """
+        rows_count, columns_count = blocked.shape
+        counts = np.zeros((rows_count, columns_count), dtype=np.int32)
+        if ship_length > columns_count:
+            return counts
+
+        blocked_prefix = np.zeros((rows_count, columns_count + 1), dtype=np.int32)
+        np.cumsum(blocked, axis=1, out=blocked_prefix[:, 1:])
+        starts_count = columns_count - ship_length + 1
+        is_valid_start = (blocked_prefix[:, ship_length:] - blocked_prefix[:, :starts_count]) == 0
+
+        for tile in range(ship_length):
+            last_col = tile + starts_count
+            counts[:, tile:last_col] += is_valid_start
+        return counts
+
+    def clear(self):
+        """
+        Removes all cached grids and resets the counters.
+        """
+        self.grids.clear()
+        self.last_key = None
+        self.hits = self.misses = self.incremental_updates = 0
@@ -0,0 +1,264 @@
+"""
+Module for aggregating the ship placements of real players into heatmaps. The server records every board
+revealed at the end of a battle and the bots use the aggregated heatmaps as a prior for their targeting.
+"""
+
+import atexit
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from game.interface.ship import Ship
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PlacementHeatmap:
+    """
+    Accumulates per-cell ship counts of revealed boards, keeping one compact NumPy array per board size.
+    """
+
+    DEFAULT_STORAGE_PATH = "placement_heatmaps.npz"
+    SAVE_EVERY_BOARDS = 10
+    COUNTS_DTYPE = np.uint32
+
+    def __init__(self, storage_path=None, save_every_boards=SAVE_EVERY_BOARDS, save_in_background=False):
+        """
+        Initializes a PlacementHeatmap and loads the persisted heatmaps if the storage file exists. Once a board is
+        recorded, the boards not saved yet are saved when the process exits.
+
+        Args:
+            storage_path (str, optional): Path of the file the heatmaps are persisted to. Defaults to None,
+                meaning that the heatmaps are kept only in memory.
+            save_every_boards (int, optional): Number of recorded boards after which the heatmaps are saved.
+                Defaults to SAVE_EVERY_BOARDS.
+            save_in_background (bool, optional): Whether the heatmaps are saved on a thread of their own instead of
+                the one recording the board, for servers running an event loop. Defaults to False.
+        """
+        self.storage_path = storage_path
+        self.save_every_boards = save_every_boards
+        self.save_in_background = save_in_background
+        self.counts = {}
+        self.boards_counts = {}
+        self.unsaved_boards = 0
+        self.is_save_pending = False
+        self.is_flush_registered = False
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+
+        if storage_path is not None and os.path.exists(storage_path):
+            self.load()
+
+    def _get_counts_for_size(self, rows_count, columns_count):
+        """
+        Returns the counts array for a board size, creating an empty one if needed.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+
+        Returns:
+            numpy.ndarray: The counts array for the board size.
+        """
+        size = (rows_count, columns_count)
+        if size not in self.counts:
+            self.counts[size] = np.zeros(size, dtype=self.COUNTS_DTYPE)
+            self.boards_counts[size] = 0
+        return self.counts[size]
+
+    def record_board(self, board_data):
+        """
+        Adds the ships of a serialized board to the heatmap of its size.
+
+        Args:
+            board_data (str): The serialized board data as returned by `BaseBoard.serialize_board`.
+        """
+        board_json = json.loads(board_data)
+        rows_count, columns_count = board_json["rows_count"], board_json["columns_count"]
+
+        occupied_coordinates = [
+            coordinate for ship_json in board_json["ships"] for coordinate in Ship.deserialize(ship_json).coordinates
+        ]
+        if not occupied_coordinates:
+            return
+
+        rows, cols = zip(*occupied_coordinates)
+
+        with self.lock:
+            counts = self._get_counts_for_size(rows_count, columns_count)
+            counts[list(rows), list(cols)] += 1
+            self.boards_counts[(rows_count, columns_count)] += 1
+            self.unsaved_boards += 1
+            should_save = (
+                self.storage_path is not None and self.unsaved_boards >= self.save_every_boards and not self.is_save_pending
+            )
+            if should_save:
+                self.is_save_pending = True
+            should_register_flush = self.storage_path is not None and not self.is_flush_registered
+            self.is_flush_registered = True
+
+        if should_register_flush:
+            atexit.register(self.flush)
+        if not should_save:
+            return
+        if self.save_in_background:
+            threading.Thread(target=self._save_logging_errors, name="heatmap-save", daemon=True).start()
+        else:
+            self._save_logging_errors()
+
+    def get_boards_count(self, rows_count, columns_count):
+        """
+        Returns the number of boards recorded for a board size.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+
+        Returns:
+            int: The number of recorded boards.
+        """
+        return self.boards_counts.get((rows_count, columns_count), 0)
+
+    def get_prior(self, rows_count, columns_count, smoothing=1):
+        """
+        Returns the estimated probability of each cell to be occupied by a ship.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+            smoothing (int, optional): Additive smoothing applied to the counts. Defaults to 1.
+
+        Returns:
+            numpy.ndarray: The per-cell probabilities, or None if no boards of that size were recorded.
+        """
+        with self.lock:
+            boards_count = self.get_boards_count(rows_count, columns_count)
+            if boards_count == 0:
+                return None
+            counts = self.counts[(rows_count, columns_count)].astype(np.float64)
+
+        return (counts + smoothing) / (boards_count + 2 * smoothing)
+
+    @staticmethod
+    def _size_to_key(size):
+        """
+        Converts a board size to the key it is stored under.
+
+        Args:
+            size (tuple): The rows and columns count of the board.
+
+        Returns:
+            str: The storage key.
+        """
+        return f"{size[0]}x{size[1]}"
+
+    @staticmethod
+    def _key_to_size(key):
+        """
+        Converts a storage key back to a board size.
+
+        Args:
+            key (str): The storage key.
+
+        Returns:
+            tuple: The rows and columns count of the board.
+        """
+        rows_count, columns_count = key.split("x")
+        return int(rows_count), int(columns_count)
+
+    def save(self):
+        """
+        Persists the heatmaps to the storage file, replacing it atomically. Every save writes a temporary file of
+        its own, and the saves run one at a time so the latest heatmaps are written last.
+        """
+        with self.save_lock:
+            with self.lock:
+                arrays = {}
+                for size, counts in self.counts.items():
+                    key = self._size_to_key(size)
+                    arrays[f"counts_{key}"] = counts.copy()
+                    arrays[f"boards_{key}"] = np.array(self.boards_counts[size], dtype=np.uint64)
+                self.unsaved_boards = 0
+                self.is_save_pending = False
+
+            buffer = io.BytesIO()
+            np.savez_compressed(buffer, **arrays)
+
+            directory, file_name = os.path.split(os.path.abspath(self.storage_path))
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=f"{file_name}.", suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "wb") as storage_file:
+                    storage_file.write(buffer.getvalue())
+                os.replace(temporary_path, self.storage_path)
+            except BaseException:
+                os.remove(temporary_path)
+                raise
+
+    def _save_logging_errors(self):
+        """
+        Persists the heatmaps, logging the errors instead of raising them to the recording of a board.
+        """
+        try:
+            self.save()
+        except OSError:
+            LOGGER.exception("Could not save the placement heatmaps")
+
+    def flush(self):
+        """
+        Persists the boards recorded since the last save, if any.
+        """
+        if self.storage_path is not None and self.unsaved_boards:
+            self._save_logging_errors()
+
+    def _read_storage_file(self, storage_path):
+        """
+        Reads the heatmaps persisted to a storage file.
+
+        Args:
+            storage_path (str): Path of the file.
+
+        Returns:
+            tuple: The counts arrays and the numbers of boards, both by board size.
+        """
+        with np.load(storage_path) as stored:
+            counts = {}
+            boards_counts = {}
+            for name in stored.files:
+                if not name.startswith("counts_"):
+                    continue
+                key = name.split("_", 1)[1]
+                size = self._key_to_size(key)
+                counts[size] = stored[name].astype(self.COUNTS_DTYPE)
+                boards_counts[size] = int(stored[f"boards_{key}"])
+        return counts, boards_counts
+
+    def load(self):
+        """
+        Loads the heatmaps from the storage file, replacing the ones in memory.
+        """
+        counts, boards_counts = self._read_storage_file(self.storage_path)
+
+        with self.lock:
+            self.counts = counts
+            self.boards_counts = boards_counts
+            self.unsaved_boards = 0
+
+    def merge_file(self, storage_path):
+        """
+        Adds the heatmaps persisted to another storage file to the ones in memory, which are saved at the next save.
+
+        Args:
+            storage_path (str): Path of the file, for example the one of another process.
+        """
+        counts, boards_counts = self._read_storage_file(storage_path)
+
+        with self.lock:
+            for size, size_counts in counts.items():
+                self._get_counts_for_size(*size)[...] += size_counts
+                self.boards_counts[size] += boards_counts[size]
+                self.unsaved_boards += boards_counts[size]
@@ -0,0 +1,252 @@
+"""
+Module for choosing the ship placement of a bot. The `AdversarialPlacementStrategy` generates candidate fleets and
+keeps the one that simulated hunters need the most shots to find, scoring the candidates in batches with the
+vectorized `FleetEvaluator`.
+"""
+
+import random
+
+import numpy as np
+
+from game.interface.base_board import BaseBoard
+from game.interface.ship import Ship
+
+
+class FleetEvaluator:
+    """
+    Scores candidate fleets by the number of shots a set of simulated hunters needs to sink them.
+
+    Every hunter is described by a rank for each cell of the board - the position of the cell in the order the hunter
+    shoots at. A ship is found at the lowest rank among its cells, after which the hunter sinks it with the rest of its
+    cells. The evaluation is done for all candidates and hunters at once with NumPy.
+    """
+
+    def __init__(self, rows_count, columns_count, hunter_orders):
+        """
+        Initializes a FleetEvaluator.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+            hunter_orders (list): The shooting orders of the hunters, each being a list of (row, col) coordinates
+                covering the whole board.
+        """
+        self.rows_count = rows_count
+        self.columns_count = columns_count
+        self.cells_count = rows_count * columns_count
+        self.hunter_ranks = np.empty((len(hunter_orders), self.cells_count), dtype=np.int32)
+
+        for hunter_index, order in enumerate(hunter_orders):
+            cell_indexes = [row * columns_count + col for row, col in order]
+            self.hunter_ranks[hunter_index, cell_indexes] = np.arange(self.cells_count, dtype=np.int32)
+
+    def encode_fleet(self, ships):
+        """
+        Encodes a fleet as a flat array holding the 1-based index of the ship occupying each cell, or 0 for water.
+
+        Args:
+            ships (list): The placed ships of the fleet.
+
+        Returns:
+            numpy.ndarray: The encoded fleet.
+        """
+        fleet = np.zeros(self.cells_count, dtype=np.int8)
+        for ship_index, ship in enumerate(ships, start=1):
+            for row, col in ship.coordinates:
+                fleet[row * self.columns_count + col] = ship_index
+        return fleet
+
+    def score_fleets(self, fleets):
+        """
+        Calculates the average number of shots the hunters need to sink each of the fleets.
+
+        Args:
+            fleets (numpy.ndarray): The encoded fleets with shape (fleets count, cells count).
+
+        Returns:
+            numpy.ndarray: The expected number of shots for each fleet.
+        """
+        ships_count = int(fleets.max())
+        ranks = self.hunter_ranks[:, None, :]
+        last_discovery = np.zeros((self.hunter_ranks.shape[0], fleets.shape[0]), dtype=np.int32)
+        target_shots = np.zeros(fleets.shape[0], dtype=np.int32)
+
+        for ship_index in range(1, ships_count + 1):
+            ship_cells = fleets == ship_index
+            discovery = np.where(ship_cells[None, :, :], ranks, self.cells_count).min(axis=2)
+            np.maximum(last_discovery, discovery, out=last_discovery)
+            target_shots += ship_cells.sum(axis=1) - 1
+
+        return (last_discovery + 1).mean(axis=0) + target_shots
+
+    @staticmethod
+    def get_parity_order(rows_count, columns_count, rng=random):
+        """
+        Returns the shooting order of a parity hunter, which shoots at one color of the checkerboard first.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+            rng (random.Random, optional): The random generator breaking the ties. Defaults to the random module.
+
+        Returns:
+            list: The (row, col) coordinates in shooting order.
+        """
+        parity = rng.randint(0, 1)
+        cells = [(row, col) for row in range(rows_count) for col in range(columns_count)]
+        rng.shuffle(cells)
+        return sorted(cells, key=lambda cell: (cell[0] + cell[1]) % 2 != parity)
+
+    @staticmethod
+    def get_density_order(density, rng=random):
+        """
+        Returns the shooting order of a density hunter, which shoots at the most probable cells first.
+
+        Args:
+            density (numpy.ndarray): The per-cell weights the hunter believes in.
+            rng (random.Random, optional): The random generator breaking the ties. Defaults to the random module.
+
+        Returns:
+            list: The (row, col) coordinates in shooting order.
+        """
+        rows_count, columns_count = density.shape
+        cells = [(row, col) for row in range(rows_count) for col in range(columns_count)]
+        rng.shuffle(cells)
+        return sorted(cells, key=lambda cell: -density[cell])
+
+    @staticmethod
+    def get_placements_density(rows_count, columns_count, ship_lengths):
+        """
+        Counts for each cell the number of in-board placements of the ships that cover it.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+            ship_lengths (list): The lengths of the ships.
+
+        Returns:
+            numpy.ndarray: The placement counts for every cell.
+        """
+        density = np.zeros((rows_count, columns_count), dtype=np.int32)
+        for ship_length in ship_lengths:
+            for offset in range(ship_length):
+                last_col = columns_count - ship_length + 1 + offset
+                density[:, offset:last_col] += 1
+                if ship_length > 1:
+                    last_row = rows_count - ship_length + 1 + offset
+                    density[offset:last_row, :] += 1
+        return density
+
+
+class AdversarialPlacementStrategy:
+    """
+    Placement strategy that picks, out of many random candidate fleets, the one that is hardest to find for parity
+    and density hunters. The density hunters use the placement prior when one is given, so the chosen fleet favours
+    the cells that opponents usually shoot at late.
+    """
+
+    CANDIDATES_COUNT = 300
+    HUNTERS_COUNT = 8
+
+    def __init__(self, placement_prior=None, candidates_count=CANDIDATES_COUNT, hunters_count=HUNTERS_COUNT, rng=None):
+        """
+        Initializes an AdversarialPlacementStrategy.
+
+        Args:
+            placement_prior (numpy.ndarray, optional): Per-cell probabilities of a ship placement as returned by
+                `PlacementHeatmap.get_prior`. Defaults to None.
+            candidates_count (int, optional): Number of candidate fleets to evaluate. Defaults to CANDIDATES_COUNT.
+            hunters_count (int, optional): Number of simulated hunters. Defaults to HUNTERS_COUNT.
+            rng (random.Random, optional): The random generator. Defaults to a new one.
+        """
+        self.placement_prior = placement_prior
+        self.candidates_count = candidates_count
+        self.hunters_count = hunters_count
+        self.rng = rng if rng is not None else random.Random()
+
+    def _get_hunter_orders(self, rows_count, columns_count, ship_lengths):
+        """
+        Builds the shooting orders of the simulated hunters, half of them parity and half density based.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+            ship_lengths (list): The lengths of the ships in the fleet.
+
+        Returns:
+            list: The shooting orders of the hunters.
+        """
+        density = self.placement_prior
+        if density is None or density.shape != (rows_count, columns_count):
+            density = FleetEvaluator.get_placements_density(rows_count, columns_count, ship_lengths)
+
+        parity_hunters_count = self.hunters_count // 2
+        return [
+            FleetEvaluator.get_parity_order(rows_count, columns_count, self.rng) for _ in range(parity_hunters_count)
+        ] + [FleetEvaluator.get_density_order(density, self.rng) for _ in range(self.hunters_count - parity_hunters_count)]
+
+    def _generate_candidates(self, rows_count, columns_count, ship_lengths):
+        """
+        Generates random valid fleets with the given ships.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+            ship_lengths (list): The lengths of the ships in the fleet.
+
+        Returns:
+            list: The candidates, each being a list of (ship_length, row, col, is_horizontal) placements.
+        """
+        candidates = []
+        for _ in range(self.candidates_count):
+            ships = [Ship(ship_length) for ship_length in ship_lengths]
+            scratch_board = BaseBoard(rows_count, columns_count, set(ships))
+            scratch_board.random_shuffle_ships(self.rng)
+            candidates.append([(ship.ship_length, ship.row, ship.col, ship.is_horizontal) for ship in ships])
+        return candidates
+
+    def choose_placement(self, rows_count, columns_count, ship_lengths):
+        """
+        Chooses the candidate fleet that needs the most shots to be sunk by the simulated hunters.
+
+        Args:
+            rows_count (int): The number of rows of the board.
+            columns_count (int): The number of columns of the board.
+            ship_lengths (list): The lengths of the ships in the fleet.
+
+        Returns:
+            list: The chosen (ship_length, row, col, is_horizontal) placements.
+        """
+        evaluator = FleetEvaluator(
+            rows_count, columns_count, self._get_hunter_orders(rows_count, columns_count, ship_lengths)
+        )
+        candidates = self._generate_candidates(rows_count, columns_count, ship_lengths)
+        fleets = np.stack(
+            [
+                evaluator.encode_fleet([Ship(length, row, col, is_horizontal) for length, row, col, is_horizontal in fleet])
+                for fleet in candidates
+            ]
+        )
+        scores = evaluator.score_fleets(fleets)
+        return candidates[int(np.argmax(scores))]
+
+    def place_ships(self, board):
+        """
+        Rearranges the ships of a board according to the chosen placement.
+
+        Args:
+            board (BaseBoard): The board whose ships are rearranged.
+        """
+        ships = list(board.unplaced_ships) + [ship for ship_list in board.ships_map.values() for ship in ship_list]
+        for ship in ships:
+            if ship not in board.unplaced_ships:
+                board.remove_ship(ship)
+
+        ships.sort(key=lambda ship: ship.ship_length)
+        placement = sorted(
+            self.choose_placement(board.rows_count, board.columns_count, [ship.ship_length for ship in ships])
+        )
+
+        for ship, (_, row, col, is_horizontal) in zip(ships, placement):
+            ship.move(row, col, is_horizontal)
+            board.place_ship(ship)
@@ -3,10 +3,11 @@ Module for managing the Player in the game, including communication with the ser
 and handling the game state related to the player's actions and board.
 """
 
-import json
 from game.visuals.visual_board import VisualBoard, VisualBoardEnemyView
 from game.interface.ship import Ship
 from game.players import command_literals
+from game.players.command_pipeline import CommandPipeline
+from game.server.network import connection_error_response
 
 
 class Player:
@@ -34,6 +35,9 @@ class Player:
         self.is_winner = False
         self.is_timeout = False
 
+        self.is_subscribed_to_events = False
+        self.last_event_sequence = 0
+
     def send_command(self, command_type, **kwargs):
         """
         Sends a command to the server and returns the response.
@@ -46,19 +50,71 @@ class Player:
             dict: The server's response as a dictionary.
         """
         command_data = {"command": command_type, "args": kwargs}
-        command_json = json.dumps(command_data)
-        response_json = self.network_client.send(command_json)
-        response = json.loads(response_json)
-        return response
+        return self.network_client.send(command_data)
+
+    def send_command_async(self, command_type, callback=None, error_callback=None, **kwargs):
+        """
+        Sends a command to the server without waiting for its response, when the network runs on a worker thread.
+
+        Args:
+            command_type (str): The type of the command to send.
+            callback (callable, optional): Called with the server's response once it is received, by the thread
+                processing the completed requests. Defaults to None.
+            error_callback (callable, optional): Called with the exception if the command could not be sent, by the
+                thread processing the completed requests. Defaults to None.
+            **kwargs: Additional arguments for the command.
+
+        Returns:
+            Future: The future of the server's response.
+        """
+        command_data = {"command": command_type, "args": kwargs}
+        return self.network_client.request(command_data, callback=callback, error_callback=error_callback)
+
+    def call_async(self, method, *args, callback=None, error_callback=None, **kwargs):
+        """
+        Calls a method of the player that sends several commands, such as joining a room that may redirect the player
+        to another server node, without waiting for it, when the network runs on a worker thread.
+
+        Args:
+            method (callable): The method of the player.
+            *args: Positional arguments for the method.
+            callback (callable, optional): Called with the method's result, by the thread processing the completed
+                requests. Defaults to None.
+            error_callback (callable, optional): Called with the exception raised by the method, by the thread
+                processing the completed requests. Defaults to None.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            Future: The future of the method's result.
+        """
+        return self.network_client.submit(method, *args, callback=callback, error_callback=error_callback, **kwargs)
 
-    def create_room(self):
+    def pipeline(self, stop_on_error=False):
+        """
+        Starts a pipeline that sends several commands to the server in one round trip.
+
+        Args:
+            stop_on_error (bool, optional): Whether the server skips the commands after the first one that fails.
+                Defaults to False.
+
+        Returns:
+            CommandPipeline: The pipeline, which sends the queued commands when `send` is called or when the `with`
+                block using it ends.
+        """
+        return CommandPipeline(self, stop_on_error)
+
+    def create_room(self, bucket=None):
         """
         Sends a command to create a new room.
 
+        Args:
+            bucket (str, optional): The matchmaking bucket of the room. Defaults to None, the default bucket.
+
         Returns:
             dict: The server's response indicating the result of the room creation.
         """
-        response = self.send_command(command_literals.COMMAND_CREATE_ROOM, client_name=self.name)
+        response = self.send_command(command_literals.COMMAND_CREATE_ROOM, client_name=self.name, bucket=bucket)
+        self.reset_event_cursor(response)
         return response
 
     def join_room_with_id(self, room_id):
@@ -76,18 +132,64 @@ class Player:
             room_id=room_id,
             client_name=self.name,
         )
+        response = self._join_redirected_room(response)
+        self.reset_event_cursor(response)
         return response
 
-    def join_random_room(self):
+    def join_random_room(self, bucket=None):
         """
         Sends a command to join a random room.
 
+        Args:
+            bucket (str, optional): The matchmaking bucket to join a room in. Defaults to None, the default bucket.
+
         Returns:
             dict: The server's response indicating the result of joining the random room.
         """
-        response = self.send_command(command_literals.COMMAND_JOIN_RANDOM_ROOM, client_name=self.name)
+        response = self.send_command(command_literals.COMMAND_JOIN_RANDOM_ROOM, client_name=self.name, bucket=bucket)
+        response = self._join_redirected_room(response)
+        self.reset_event_cursor(response)
         return response
 
+    def reset_event_cursor(self, response):
+        """
+        Starts reading the event log of a room from its beginning once the player has entered the room.
+
+        Args:
+            response (dict): The server's response to creating or joining a room.
+        """
+        if response["status"] == "success":
+            self.last_event_sequence = 0
+
+    def _join_redirected_room(self, response):
+        """
+        Connects to the server node hosting a room and joins the room there, if the server redirected the player
+        to it.
+
+        Args:
+            response (dict): The server's response to joining a room.
+
+        Returns:
+            dict: The response of the node hosting the room, an error response if the node can not be reached, or
+                the given response if the player was not redirected or the network can not connect to other nodes.
+        """
+        node_id = response.get("args", {}).get("node_id")
+        if node_id is None:
+            return response
+
+        try:
+            if not self.network_client.connect_to_node(node_id):
+                return response
+        except ConnectionError as exception:
+            return connection_error_response(f"Could not connect to the server hosting the room: {exception}")
+
+        self.is_subscribed_to_events = False
+        return self.send_command(
+            command_literals.COMMAND_JOIN_ROOM_WITH_ID,
+            room_id=response["args"]["room_id"],
+            client_name=self.name,
+        )
+
     def send_board(self):
         """
         Sends the player's board to the server.
@@ -97,9 +199,18 @@ class Player:
         """
         board_json = self.board.serialize_board()
         response = self.send_command(command_literals.COMMAND_SEND_BOARD, board_json=board_json)
-        self.has_sent_board = response["status"]
+        self.apply_board_response(response)
         return response
 
+    def apply_board_response(self, response):
+        """
+        Records the server's response to sending the board.
+
+        Args:
+            response (dict): The server's response.
+        """
+        self.has_sent_board = response["status"]
+
     def request_enemy_board(self):
         """
         Requests the enemy's board data from the server and updates the enemy board view.
@@ -108,13 +219,18 @@ class Player:
             dict: The server's response with the enemy board data.
         """
         response = self.send_command(command_literals.COMMAND_REQUEST_ENEMY_BOARD)
+        self.apply_enemy_board_response(response)
+        return response
 
-        if response["status"] != "success":
-            return response
+    def apply_enemy_board_response(self, response):
+        """
+        Reveals the enemy's ships sent in the server's response.
 
-        board_data = response["args"]["enemy_board_data"]
-        self.enemy_board_view.reveal_ships_from_board_data(board_data)
-        return response
+        Args:
+            response (dict): The server's response.
+        """
+        if response["status"] == "success":
+            self.enemy_board_view.reveal_ships_from_board_data(response["args"]["enemy_board_data"])
 
     def exit_room(self):
         """
@@ -154,13 +270,61 @@ class Player:
             dict: The server's response indicating whether the opponent is ready.
         """
         response = self.send_command(command_literals.COMMAND_IS_OPPONENT_READY)
+        self.apply_readiness_response(response)
+        return response
 
+    def apply_readiness_response(self, response):
+        """
+        Starts the battle if the server's response tells that the opponent is ready.
+
+        Args:
+            response (dict): The server's response.
+        """
         if response["status"] == "success":
-            self.is_turn = response["args"]["is_turn"]
-            self.turn_end_time = response["args"]["turn_end_time"]
+            self._register_battle_start(response["args"])
+
+    def wait_for_opponent_join(self):
+        """
+        Sends a command to wait until the opponent joins the room. If the opponent has not joined yet, the server
+        answers later with an opponent_joined or wait_timeout event.
+
+        Returns:
+            dict: The server's response with the opponent's name, or with "is_waiting" set if the player waits.
+        """
+        return self.send_command(command_literals.COMMAND_WAIT_FOR_OPPONENT_JOIN)
 
+    def wait_for_opponent_ready(self):
+        """
+        Sends a command to wait until the opponent is ready. If the opponent has not sent the board yet, the server
+        answers later with an opponent_ready or wait_timeout event.
+
+        Returns:
+            dict: The server's response with the game's readiness status, or with "is_waiting" set if the player waits.
+        """
+        response = self.send_command(command_literals.COMMAND_WAIT_FOR_OPPONENT_READY)
+        self.apply_wait_for_ready_response(response)
         return response
 
+    def apply_wait_for_ready_response(self, response):
+        """
+        Starts the battle if the server's response to waiting tells that the opponent is ready.
+
+        Args:
+            response (dict): The server's response.
+        """
+        if response["status"] == "success" and not response["args"].get("is_waiting", False):
+            self._register_battle_start(response["args"])
+
+    def _register_battle_start(self, response_args):
+        """
+        Updates the turn state from the arguments of the battle start.
+
+        Args:
+            response_args (dict): The arguments from the server response indicating the game's readiness status.
+        """
+        self.is_turn = response_args["is_turn"]
+        self.turn_end_time = response_args["turn_end_time"]
+
     def shot(self, row, col):
         """
         Sends a command to register a shot on the enemy's board.
@@ -173,18 +337,30 @@ class Player:
             dict: The server's response with the result of the shot.
         """
         response = self.send_command(command_literals.COMMAND_REGISTER_SHOT, row=row, col=col)
+        self.apply_shot_response(row, col, response)
+        return response
+
+    def apply_shot_response(self, row, col, response):
+        """
+        Updates the enemy board view and the battle state from the server's response to a shot.
+
+        Args:
+            row (int): The row where the shot was taken.
+            col (int): The column where the shot was taken.
+            response (dict): The server's response.
+        """
         response_args = response["args"]
 
         if response["status"] == "error":
             if response_args.get("is_timeout", False):
                 self._parse_battle_end(response_args)
-                return response
+                return
 
             if not response_args.get("is_player_turn", False):
-                return response
+                return
 
             if not response_args.get("is_shot_valid", False):
-                return response
+                return
 
         self.enemy_board_view.register_shot_on_view(row, col, response_args["has_hit_ship"])
 
@@ -196,7 +372,6 @@ class Player:
         self.turn_end_time = response_args["turn_end_time"]
 
         self._parse_battle_end(response_args)
-        return response
 
     def ask_to_receive_shot(self):
         """
@@ -206,21 +381,111 @@ class Player:
             dict: The server's response with the shot details and game state.
         """
         response = self.send_command(command_literals.COMMAND_ASK_TO_RECEIVE_SHOT)
+        self.apply_received_shot_response(response)
+        return response
+
+    def apply_received_shot_response(self, response):
+        """
+        Registers the opponent's shot sent in the server's response, or the end of the battle.
+
+        Args:
+            response (dict): The server's response.
+        """
         response_args = response.get("args", None)
 
         if response["status"] == "error":
             if response_args.get("is_timeout", False):
                 self._parse_battle_end(response_args)
-            return response
+            return
 
-        row, col = response_args["row"], response_args["col"]
-        self.board.register_shot(row, col)
-        self.is_turn = response_args["is_turn"]
-        self.turn_end_time = response_args["turn_end_time"]
+        self._register_opponents_shot(response_args)
 
-        self._parse_battle_end(response_args)
+    def subscribe_to_events(self):
+        """
+        Sends a command to receive the opponent's shots and the battle end as pushed events instead of asking for them.
+
+        Returns:
+            dict: The server's response indicating whether events will be pushed.
+        """
+        response = self.send_command(command_literals.COMMAND_SUBSCRIBE_EVENTS)
+        self.apply_subscription_response(response)
         return response
 
+    def apply_subscription_response(self, response):
+        """
+        Records whether the server will push events to the player.
+
+        Args:
+            response (dict): The server's response.
+        """
+        self.is_subscribed_to_events = response["status"] == "success"
+
+    def receive_events(self):
+        """
+        Applies the events pushed by the server since the last call.
+
+        Returns:
+            list: The received events as dictionaries.
+        """
+        events = self.network_client.receive_events()
+        self._apply_events(events)
+        return events
+
+    def fetch_events(self, limit=None):
+        """
+        Fetches and applies the events of the room that the player has not received, acknowledging the ones it has.
+        Used to catch up after events or responses were lost, for example after reconnecting.
+
+        Args:
+            limit (int, optional): The maximal number of events to fetch. Defaults to None, meaning all of them.
+
+        Returns:
+            dict: The server's response with the fetched events.
+        """
+        response = self.send_command(
+            command_literals.COMMAND_FETCH_EVENTS, after_sequence=self.last_event_sequence, limit=limit
+        )
+        if response["status"] == "success":
+            self._apply_events(response["args"]["events"])
+        return response
+
+    def _apply_events(self, events):
+        """
+        Applies events received from the server. Events of the event log that were already applied are skipped, so
+        an event delivered twice is applied once.
+
+        Args:
+            events (list): The events as dictionaries.
+        """
+        for event in events:
+            if event["event"] == command_literals.EVENT_OPPONENT_SHOT:
+                self._register_opponents_shot(event["args"])
+            elif event["event"] == command_literals.EVENT_BATTLE_END:
+                self._parse_battle_end(event["args"])
+            elif event["event"] == command_literals.EVENT_OPPONENT_READY:
+                self._register_battle_start(event["args"])
+
+    def _register_opponents_shot(self, shot_args):
+        """
+        Registers a shot made by the opponent on the player's board and updates the turn state, unless the shot
+        was already registered.
+
+        Args:
+            shot_args (dict): The arguments describing the opponent's shot.
+        """
+        sequence = shot_args.get("sequence")
+        if sequence is not None:
+            if sequence <= self.last_event_sequence:
+                return
+            self.last_event_sequence = sequence
+
+        row, col = shot_args["row"], shot_args["col"]
+        self.board.register_shot(row, col)
+        self.is_turn = shot_args["is_turn"]
+        self.turn_end_time = shot_args["turn_end_time"]
+
+        self._parse_battle_end(shot_args)
+
     def _parse_battle_end(self, response_args):
         """
         Parses the battle end state based on the response arguments.
@@ -0,0 +1,190 @@
+"""
+Module that creates an asyncio based server for managing multiplayer game sessions. All client connections are
+served from a single event loop instead of one thread per connection.
+"""
+
+import argparse
+import asyncio
+import importlib
+import logging
+
+from game.server.game_server import GameServer
+from game.server.framing import FrameError, encode_frame, read_frame
+from game.server.flow_control import drain_stream, push_to_stream
+from game.server.room_directory import SQLiteRoomDirectory
+from game.server.metrics import add_metrics_arguments, start_metrics_endpoint
+from game.logging_setup import add_logging_arguments, configure_logging
+from game.tracing import add_tracing_arguments, configure_tracing
+from game.players.placement_heatmap import PlacementHeatmap
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_event_loop_policy(loop_name):
+    """
+    Returns the event loop policy for a loop name.
+
+    Args:
+        loop_name (str): "asyncio" for the default loop, "uvloop" for uvloop or a "module:PolicyClass" path
+            of any other event loop policy.
+
+    Returns:
+        asyncio.AbstractEventLoopPolicy: The event loop policy.
+
+    Raises:
+        ImportError: If the module providing the policy is not installed.
+    """
+    if loop_name in (None, "asyncio"):
+        return asyncio.DefaultEventLoopPolicy()
+
+    if loop_name == "uvloop":
+        loop_name = "uvloop:EventLoopPolicy"
+
+    module_name, _, policy_name = loop_name.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, policy_name)()
+
+
+class AsyncMultiplayerServer(GameServer):
+    """
+    A server for managing multiplayer game sessions with network communication using asyncio streams.
+
+    Drives the same CommandHandler as MultiplayerServer, keeping every connection as a coroutine in one event loop.
+    """
+
+    TIME_PER_TURN = 60
+    DEFAULT_HOST = "localhost"
+    DEFAULT_PORT = 5555
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, loop_name=None, room_directory=None, placement_heatmap=None):
+        """
+        Initializes the AsyncMultiplayerServer instance.
+
+        Args:
+            host (str, optional): The address to listen on. Defaults to DEFAULT_HOST.
+            port (int, optional): The port to listen on, 0 picks a free one. Defaults to DEFAULT_PORT.
+            loop_name (str, optional): The event loop to run on, see `get_event_loop_policy`. Defaults to None.
+            room_directory (RoomDirectory, optional): Directory of the rooms shared with the other server nodes.
+                Defaults to None, meaning that the rooms are not shared.
+            placement_heatmap (PlacementHeatmap, optional): Heatmap that accumulates the boards revealed at the
+                end of the battles. Defaults to None, meaning the one persisted to PlacementHeatmap.DEFAULT_STORAGE_PATH.
+        """
+        if placement_heatmap is None:
+            placement_heatmap = PlacementHeatmap(PlacementHeatmap.DEFAULT_STORAGE_PATH, save_in_background=True)
+        super().__init__(self.TIME_PER_TURN, placement_heatmap, room_directory, f"{host}:{port}")
+        self.server = host
+        self.port = port
+        self.loop_name = loop_name
+        self.async_server = None
+        self.housekeeping_task = None
+
+    def run(self):
+        """
+        Installs the configured event loop policy and serves clients until the process is stopped.
+        """
+        asyncio.set_event_loop_policy(get_event_loop_policy(self.loop_name))
+        asyncio.run(self.serve())
+
+    async def start(self):
+        """
+        Starts listening for incoming connections and the housekeeping task that expires waits and rooms.
+
+        Returns:
+            asyncio.Server: The started asyncio server.
+        """
+        self.async_server = await asyncio.start_server(self._handle_client, self.server, self.port)
+        self.port = self.async_server.sockets[0].getsockname()[1]
+        self.node_id = f"{self.server}:{self.port}"
+        self.housekeeping_task = asyncio.create_task(self._run_housekeeping_periodically())
+        LOGGER.info("Server started, listening on %s:%s", self.server, self.port)
+        return self.async_server
+
+    async def serve(self):
+        """
+        Starts the server and serves clients forever.
+        """
+        await self.start()
+        async with self.async_server:
+            await self.async_server.serve_forever()
+
+    async def _run_housekeeping_periodically(self):
+        """
+        Runs the housekeeping of the server, waking up at every turn deadline and at least every
+        HOUSEKEEPING_INTERVAL seconds.
+        """
+        while True:
+            await asyncio.sleep(self.get_housekeeping_delay())
+            try:
+                self.run_housekeeping()
+            except Exception:  # pylint: disable=W0703
+                LOGGER.exception("Exception running housekeeping")
+
+    async def _handle_client(self, reader, writer):
+        """
+        Handles communication with a connected client.
+
+        Receives framed commands from the client, processes them using the command handler, and sends framed
+        responses back encoded with the client's codec. The client is identified by the session opened for the
+        connection, whose token is sent in the greeting. The commands are rate limited, and a client whose outbound
+        buffer stays full is disconnected.
+
+        Args:
+            reader (asyncio.StreamReader): The stream to read commands from.
+            writer (asyncio.StreamWriter): The stream to write responses to.
+        """
+        rate_limiter = self.create_rate_limiter()
+        session = self.open_session(writer.transport.abort)
+        self.register_event_pusher(
+            session.client,
+            lambda event_message: push_to_stream(
+                writer, encode_frame(self.encode_for_client(session.client, event_message))
+            ),
+        )
+        writer.write(encode_frame(self.get_greeting(session)))
+        try:
+            await writer.drain()
+            while True:
+                try:
+                    data = await read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    LOGGER.debug("Client disconnected")
+                    break
+
+                writer.write(encode_frame(self.handle_message(session.client, data, rate_limiter)))
+                await drain_stream(writer)
+
+        except (ConnectionError, FrameError) as exception:
+            LOGGER.warning("Exception handling client: %s", exception)
+        except Exception:  # pylint: disable=W0703
+            LOGGER.exception("Exception handling client")
+        finally:
+            LOGGER.debug("Lost connection")
+            self.client_disconnected(session.client)
+            writer.close()
+
+
+def main():
+    """
+    Entry point for running the asyncio server.
+    """
+    parser = argparse.ArgumentParser(description="Battleships asyncio multiplayer server.")
+    parser.add_argument("--host", default=AsyncMultiplayerServer.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=AsyncMultiplayerServer.DEFAULT_PORT)
+    parser.add_argument("--loop", default="asyncio", help='"asyncio", "uvloop" or a "module:PolicyClass" path.')
+    parser.add_argument("--room-directory", help="SQLite file of the room directory shared with other nodes.")
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    add_tracing_arguments(parser)
+    arguments = parser.parse_args()
+
+    configure_logging(arguments.log_level)
+    configure_tracing(arguments.trace_file, arguments.profile_output)
+    room_directory = SQLiteRoomDirectory(arguments.room_directory) if arguments.room_directory else None
+    server = AsyncMultiplayerServer(arguments.host, arguments.port, arguments.loop, room_directory)
+    if arguments.metrics_port is not None:
+        start_metrics_endpoint(server, arguments.metrics_port)
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,558 @@
+"""
+Module for the encodings of the messages exchanged between the clients and the server.
+
+Messages are dictionaries. A connection starts with JSON, and a client can negotiate the compact binary encoding
+right after connecting with the `negotiate_codec` command. From then on the server encodes the responses and events
+for the client in binary. JSON stays available for debugging by not negotiating.
+
+Every JSON message starts with "{" and every binary message starts with a tag byte that is never "{", so a message
+can be decoded without knowing the codec of the connection with `decode_message`.
+"""
+
+import json
+import math
+import re
+import struct
+
+from game.players import command_literals
+
+
+class CodecError(ValueError):
+    """Raised when a received message cannot be decoded."""
+
+
+class JsonCodec:
+    """
+    Encodes the messages as JSON objects.
+    """
+
+    NAME = "json"
+    EVENT_PREFIX = b'{"event": '
+    COMMAND_NAME_PATTERN = re.compile(rb'\{\s*"command"\s*:\s*"([a-z_]{1,64})"')
+
+    @staticmethod
+    def encode(message):
+        """
+        Encodes a message.
+
+        Args:
+            message (dict): The message.
+
+        Returns:
+            bytes: The encoded message.
+        """
+        return json.dumps(message).encode("utf-8")
+
+    @staticmethod
+    def decode(data):
+        """
+        Decodes a message.
+
+        Args:
+            data (bytes): The encoded message.
+
+        Returns:
+            dict: The message.
+
+        Raises:
+            CodecError: If the data is not a JSON object.
+        """
+        try:
+            message = json.loads(data)
+        except ValueError as exception:
+            raise CodecError("Invalid JSON format") from exception
+
+        if not isinstance(message, dict):
+            raise CodecError("Invalid JSON format")
+        return message
+
+    @staticmethod
+    def is_event_message(data):
+        """
+        Checks if an encoded message is an event without decoding it. The "event" key of the events always comes
+        first.
+
+        Args:
+            data (bytes): The encoded message.
+
+        Returns:
+            bool: True if the message is an event, False otherwise.
+        """
+        return data.startswith(JsonCodec.EVENT_PREFIX)
+
+    @staticmethod
+    def peek_command_name(data, start=0):
+        """
+        Reads the name of a command without decoding it, if "command" is its first key as in the messages of the
+        clients.
+
+        Args:
+            data (bytes): The encoded command.
+            start (int, optional): The index where the JSON object starts. Defaults to 0.
+
+        Returns:
+            str: The name of the command, or None if it is not found.
+        """
+        match = JsonCodec.COMMAND_NAME_PATTERN.match(data, start)
+        return None if match is None else match.group(1).decode("ascii")
+
+
+class BinaryCodec:
+    """
+    Encodes the frequent fixed-shape messages of a battle - shots, shot results and the opponent's shots - as
+    struct-packed records, and every other message as a tagged JSON object.
+
+    A message is only packed if it can be restored exactly, otherwise it falls back to JSON.
+    """
+
+    NAME = "binary"
+
+    TAG_JSON = 0
+    TAG_REGISTER_SHOT = 1
+    TAG_ASK_TO_RECEIVE_SHOT = 2
+    TAG_SHOT_RESULT = 3
+    TAG_OPPONENT_SHOT = 4
+    TAG_OPPONENT_SHOT_EVENT = 5
+
+    TAG_COMMANDS = {
+        TAG_REGISTER_SHOT: command_literals.COMMAND_REGISTER_SHOT,
+        TAG_ASK_TO_RECEIVE_SHOT: command_literals.COMMAND_ASK_TO_RECEIVE_SHOT,
+    }
+
+    HAS_HIT_SHIP = 1
+    HAS_SUNK_SHIP = 2
+    IS_TURN = 4
+    HAS_BATTLE_ENDED = 8
+    IS_WINNER = 16
+    IS_TIMEOUT = 32
+    HAS_SUNK_SHIP_DATA = 64
+
+    SHOT_RESULT_MESSAGE = "Shot registered!"
+    OPPONENT_SHOT_MESSAGE = "Shot was made by the opponent!"
+
+    SHOT_RESULT_FLAGS = (
+        ("has_hit_ship", HAS_HIT_SHIP),
+        ("has_sunk_ship", HAS_SUNK_SHIP),
+        ("is_turn", IS_TURN),
+        ("has_battle_ended", HAS_BATTLE_ENDED),
+        ("is_winner", IS_WINNER),
+        ("is_timeout", IS_TIMEOUT),
+    )
+    OPPONENT_SHOT_FLAGS = (
+        ("is_turn", IS_TURN),
+        ("has_battle_ended", HAS_BATTLE_ENDED),
+        ("is_winner", IS_WINNER),
+        ("is_timeout", IS_TIMEOUT),
+    )
+    SHOT_RESULT_KEYS = frozenset(("sunk_ship", "turn_end_time", *(key for key, _ in SHOT_RESULT_FLAGS)))
+    OPPONENT_SHOT_KEYS = frozenset(("row", "col", "turn_end_time", "sequence", *(key for key, _ in OPPONENT_SHOT_FLAGS)))
+
+    TAG = struct.Struct(">B")
+    SHOT = struct.Struct(">BBB")
+    SHOT_RESULT = struct.Struct(">BBd")
+    SHIP_DATA_SIZE = struct.Struct(">H")
+    OPPONENT_SHOT = struct.Struct(">BBBBdI")
+
+    def encode(self, message):
+        """
+        Encodes a message, packing it as a record if it has one of the known shapes.
+
+        Args:
+            message (dict): The message.
+
+        Returns:
+            bytes: The encoded message.
+        """
+        if "command" in message:
+            data = self._encode_command(message)
+        elif "event" in message:
+            data = self._encode_event(message)
+        else:
+            data = self._encode_response(message)
+
+        if data is None:
+            data = self.TAG.pack(self.TAG_JSON) + JsonCodec.encode(message)
+        return data
+
+    def decode(self, data):
+        """
+        Decodes a message.
+
+        Args:
+            data (bytes): The encoded message.
+
+        Returns:
+            dict: The message.
+
+        Raises:
+            CodecError: If the data is not a valid binary message.
+        """
+        try:
+            tag = data[0]
+            if tag == self.TAG_JSON:
+                return JsonCodec.decode(data[1:])
+            if tag == self.TAG_REGISTER_SHOT:
+                _, row, col = self.SHOT.unpack(data)
+                return {"command": command_literals.COMMAND_REGISTER_SHOT, "args": {"row": row, "col": col}}
+            if tag == self.TAG_ASK_TO_RECEIVE_SHOT and len(data) == 1:
+                return {"command": command_literals.COMMAND_ASK_TO_RECEIVE_SHOT, "args": {}}
+            if tag == self.TAG_SHOT_RESULT:
+                return self._decode_shot_result(data)
+            if tag in (self.TAG_OPPONENT_SHOT, self.TAG_OPPONENT_SHOT_EVENT):
+                return self._decode_opponent_shot(data)
+        except (IndexError, struct.error, UnicodeDecodeError) as exception:
+            raise CodecError("Invalid binary message") from exception
+
+        raise CodecError("Invalid binary message")
+
+    def is_event_message(self, data):
+        """
+        Checks if an encoded message is an event without decoding it.
+
+        Args:
+            data (bytes): The encoded message.
+
+        Returns:
+            bool: True if the message is an event, False otherwise.
+        """
+        if not data:
+            return False
+        if data[0] == self.TAG_OPPONENT_SHOT_EVENT:
+            return True
+        return data[0] == self.TAG_JSON and data.startswith(JsonCodec.EVENT_PREFIX, 1)
+
+    def peek_command_name(self, data):
+        """
+        Reads the name of a command without decoding it.
+
+        Args:
+            data (bytes): The encoded command.
+
+        Returns:
+            str: The name of the command, or None if it is not found.
+        """
+        if not data:
+            return None
+        if data[0] == self.TAG_JSON:
+            return JsonCodec.peek_command_name(data, 1)
+        return self.TAG_COMMANDS.get(data[0])
+
+    def _encode_command(self, message):
+        """
+        Packs the shot commands.
+
+        Args:
+            message (dict): The command.
+
+        Returns:
+            bytes: The packed command, or None if it has no record.
+        """
+        command = message["command"]
+        args = message.get("args")
+        if command == command_literals.COMMAND_REGISTER_SHOT and isinstance(args, dict) and args.keys() == {"row", "col"}:
+            row, col = args["row"], args["col"]
+            if _is_byte(row) and _is_byte(col):
+                return self.SHOT.pack(self.TAG_REGISTER_SHOT, row, col)
+        if command == command_literals.COMMAND_ASK_TO_RECEIVE_SHOT and args == {} and len(message) == 2:
+            return self.TAG.pack(self.TAG_ASK_TO_RECEIVE_SHOT)
+        return None
+
+    def _encode_response(self, message):
+        """
+        Packs the shot results and the opponent's shots sent as responses.
+
+        Args:
+            message (dict): The response.
+
+        Returns:
+            bytes: The packed response, or None if it has no record.
+        """
+        if message.get("status") != "success" or message.keys() != {"status", "message", "args"}:
+            return None
+
+        if message["message"] == self.SHOT_RESULT_MESSAGE:
+            return self._encode_shot_result(message["args"])
+        if message["message"] == self.OPPONENT_SHOT_MESSAGE:
+            return self._encode_opponent_shot(self.TAG_OPPONENT_SHOT, message["args"])
+        return None
+
+    def _encode_event(self, message):
+        """
+        Packs the opponent's shots pushed as events.
+
+        Args:
+            message (dict): The event.
+
+        Returns:
+            bytes: The packed event, or None if it has no record.
+        """
+        if (
+            message["event"] != command_literals.EVENT_OPPONENT_SHOT
+            or message.keys() != {"event", "status", "message", "args"}
+            or message["status"] != "success"
+            or message["message"] != self.OPPONENT_SHOT_MESSAGE
+        ):
+            return None
+        return self._encode_opponent_shot(self.TAG_OPPONENT_SHOT_EVENT, message["args"])
+
+    def _encode_shot_result(self, args):
+        """
+        Packs the arguments of a shot result.
+
+        Args:
+            args (dict): The arguments.
+
+        Returns:
+            bytes: The packed shot result, or None if the arguments do not fit the record.
+        """
+        if args.keys() != self.SHOT_RESULT_KEYS or not _is_time(args["turn_end_time"]):
+            return None
+
+        flags = _pack_flags(args, self.SHOT_RESULT_FLAGS)
+        sunk_ship = args["sunk_ship"]
+        if flags is None or not (sunk_ship is None or isinstance(sunk_ship, str)):
+            return None
+
+        if sunk_ship is None:
+            return self.SHOT_RESULT.pack(self.TAG_SHOT_RESULT, flags, _pack_time(args["turn_end_time"]))
+
+        ship_data = sunk_ship.encode("utf-8")
+        return (
+            self.SHOT_RESULT.pack(self.TAG_SHOT_RESULT, flags | self.HAS_SUNK_SHIP_DATA, _pack_time(args["turn_end_time"]))
+            + self.SHIP_DATA_SIZE.pack(len(ship_data))
+            + ship_data
+        )
+
+    def _decode_shot_result(self, data):
+        """
+        Unpacks a shot result.
+
+        Args:
+            data (bytes): The packed shot result.
+
+        Returns:
+            dict: The response.
+        """
+        _, flags, turn_end_time = self.SHOT_RESULT.unpack_from(data)
+        sunk_ship = None
+        if flags & self.HAS_SUNK_SHIP_DATA:
+            offset = self.SHOT_RESULT.size
+            (size,) = self.SHIP_DATA_SIZE.unpack_from(data, offset)
+            start = offset + self.SHIP_DATA_SIZE.size
+            end = start + size
+            sunk_ship = data[start:end].decode("utf-8")
+
+        args = _unpack_flags(flags, self.SHOT_RESULT_FLAGS)
+        args["sunk_ship"] = sunk_ship
+        args["turn_end_time"] = _unpack_time(turn_end_time)
+        return {"status": "success", "message": self.SHOT_RESULT_MESSAGE, "args": args}
+
+    def _encode_opponent_shot(self, tag, args):
+        """
+        Packs the arguments of an opponent's shot.
+
+        Args:
+            tag (int): The tag of the record, telling a response from an event.
+            args (dict): The arguments.
+
+        Returns:
+            bytes: The packed shot, or None if the arguments do not fit the record.
+        """
+        if args.keys() != self.OPPONENT_SHOT_KEYS or not _is_time(args["turn_end_time"]):
+            return None
+
+        flags = _pack_flags(args, self.OPPONENT_SHOT_FLAGS)
+        if flags is None or not _is_byte(args["row"]) or not _is_byte(args["col"]) or not _is_sequence(args["sequence"]):
+            return None
+        return self.OPPONENT_SHOT.pack(
+            tag, args["row"], args["col"], flags, _pack_time(args["turn_end_time"]), args["sequence"]
+        )
+
+    def _decode_opponent_shot(self, data):
+        """
+        Unpacks an opponent's shot.
+
+        Args:
+            data (bytes): The packed shot.
+
+        Returns:
+            dict: The response or the event.
+        """
+        tag, row, col, flags, turn_end_time, sequence = self.OPPONENT_SHOT.unpack(data)
+        args = {"row": row, "col": col, "turn_end_time": _unpack_time(turn_end_time), "sequence": sequence}
+        args.update(_unpack_flags(flags, self.OPPONENT_SHOT_FLAGS))
+
+        message = {"status": "success", "message": self.OPPONENT_SHOT_MESSAGE, "args": args}
+        if tag == self.TAG_OPPONENT_SHOT_EVENT:
+            return {"event": command_literals.EVENT_OPPONENT_SHOT, **message}
+        return message
+
+
+def _is_byte(value):
+    """
+    Checks if a value is an integer that fits in an unsigned byte.
+
+    Args:
+        value (object): The value.
+
+    Returns:
+        bool: True if the value fits, False otherwise.
+    """
+    return type(value) is int and 0 <= value <= 255  # pylint: disable=C0123
+
+
+def _is_sequence(value):
+    """
+    Checks if a value is a sequence number of the event log that fits in an unsigned 32-bit integer.
+
+    Args:
+        value (object): The value.
+
+    Returns:
+        bool: True if the value fits, False otherwise.
+    """
+    return type(value) is int and 0 <= value <= 0xFFFFFFFF  # pylint: disable=C0123
+
+
+def _is_time(value):
+    """
+    Checks if a value is a timestamp that a double restores exactly.
+
+    Args:
+        value (object): The value.
+
+    Returns:
+        bool: True if the value is a float or None, False otherwise.
+    """
+    return value is None or (type(value) is float and not math.isnan(value))  # pylint: disable=C0123
+
+
+def _pack_time(value):
+    """
+    Converts a timestamp to a double, None becoming NaN.
+
+    Args:
+        value (float): The timestamp, or None.
+
+    Returns:
+        float: The double.
+    """
+    return math.nan if value is None else value
+
+
+def _unpack_time(value):
+    """
+    Converts a double back to a timestamp, NaN becoming None.
+
+    Args:
+        value (float): The double.
+
+    Returns:
+        float: The timestamp, or None.
+    """
+    return None if math.isnan(value) else value
+
+
+def _pack_flags(args, flags):
+    """
+    Packs boolean arguments into a bit field.
+
+    Args:
+        args (dict): The arguments.
+        flags (tuple): The (key, bit) pairs of the flags.
+
+    Returns:
+        int: The bit field, or None if an argument is not a boolean.
+    """
+    packed = 0
+    for key, bit in flags:
+        value = args[key]
+        if value is True:
+            packed |= bit
+        elif value is not False:
+            return None
+    return packed
+
+
+def _unpack_flags(packed, flags):
+    """
+    Unpacks boolean arguments from a bit field.
+
+    Args:
+        packed (int): The bit field.
+        flags (tuple): The (key, bit) pairs of the flags.
+
+    Returns:
+        dict: The arguments.
+    """
+    return {key: bool(packed & bit) for key, bit in flags}
+
+
+CODECS = {JsonCodec.NAME: JsonCodec(), BinaryCodec.NAME: BinaryCodec()}
+JSON_CODEC = CODECS[JsonCodec.NAME]
+BINARY_CODEC = CODECS[BinaryCodec.NAME]
+
+
+def choose_codec(codec_names):
+    """
+    Chooses the first codec of a client's preference list that is supported.
+
+    Args:
+        codec_names (list): The names of the codecs the client supports, preferred first.
+
+    Returns:
+        JsonCodec or BinaryCodec: The chosen codec, or None if none is supported.
+    """
+    for codec_name in codec_names:
+        if isinstance(codec_name, str) and codec_name in CODECS:
+            return CODECS[codec_name]
+    return None
+
+
+def decode_message(data):
+    """
+    Decodes a message encoded with any codec.
+
+    Args:
+        data (bytes): The encoded message.
+
+    Returns:
+        dict: The message.
+
+    Raises:
+        CodecError: If the data is not a valid message.
+    """
+    if data[:1] == b"{":
+        return JSON_CODEC.decode(data)
+    if not data:
+        raise CodecError("Empty message")
+    return BINARY_CODEC.decode(data)
+
+
+def is_event_message(data):
+    """
+    Checks if a message encoded with any codec is an event without decoding it.
+
+    Args:
+        data (bytes): The encoded message.
+
+    Returns:
+        bool: True if the message is an event, False otherwise.
+    """
+    return JSON_CODEC.is_event_message(data) or BINARY_CODEC.is_event_message(data)
+
+
+def peek_command_name(data):
+    """
+    Reads the name of a command encoded with any codec without decoding it, for example to reject it before paying
+    for its decoding.
+
+    Args:
+        data (bytes): The encoded command.
+
+    Returns:
+        str: The name of the command, or None if it is not found.
+    """
+    if data[:1] == b"{":
+        return JSON_CODEC.peek_command_name(data)
+    return BINARY_CODEC.peek_command_name(data)
@@ -1,9 +1,13 @@
 """Module that handles commands received from clients and executes appropriate server methods."""
 
 import json
+import logging
+import time
 from collections import namedtuple
 from game.players import command_literals
 
+LOGGER = logging.getLogger(__name__)
+
 # Define a Command namedtuple to store command details
 Command = namedtuple("Command", ["name", "handler", "required_args"])
 
@@ -13,6 +17,12 @@ class CommandHandler:
     Handles commands received from clients and executes appropriate server methods.
     """
 
+    MAX_BATCH_SIZE = 100
+    BATCH_HANDLED_MESSAGE = "Batch handled!"
+    RATE_LIMITED_MESSAGE = "Too many commands!"
+    REDACTED_LOG_FIELDS = frozenset(["session_token"])
+    SIZED_LOG_FIELDS = frozenset(["board_json", "enemy_board_data"])
+
     def __init__(self, server):
         """
         Initializes the CommandHandler with server instance and sets up commands.
@@ -21,6 +31,7 @@ class CommandHandler:
             server (Server): The server instance that will handle the commands.
         """
         self.server = server
+        self.metrics = None
         self.commands = {
             command_literals.COMMAND_CREATE_ROOM: Command(
                 command_literals.COMMAND_CREATE_ROOM,
@@ -77,6 +88,41 @@ class CommandHandler:
                 self.server.send_enemy_board,
                 [],
             ),
+            command_literals.COMMAND_SUBSCRIBE_EVENTS: Command(
+                command_literals.COMMAND_SUBSCRIBE_EVENTS,
+                self.server.subscribe_events,
+                [],
+            ),
+            command_literals.COMMAND_WAIT_FOR_OPPONENT_JOIN: Command(
+                command_literals.COMMAND_WAIT_FOR_OPPONENT_JOIN,
+                self.server.wait_for_opponent_join,
+                [],
+            ),
+            command_literals.COMMAND_WAIT_FOR_OPPONENT_READY: Command(
+                command_literals.COMMAND_WAIT_FOR_OPPONENT_READY,
+                self.server.wait_for_opponent_ready,
+                [],
+            ),
+            command_literals.COMMAND_FETCH_EVENTS: Command(
+                command_literals.COMMAND_FETCH_EVENTS,
+                self.server.fetch_events,
+                [],
+            ),
+            command_literals.COMMAND_BATCH: Command(
+                command_literals.COMMAND_BATCH,
+                self.handle_batch,
+                ["commands"],
+            ),
+            command_literals.COMMAND_NEGOTIATE_CODEC: Command(
+                command_literals.COMMAND_NEGOTIATE_CODEC,
+                self.server.negotiate_codec,
+                ["codecs"],
+            ),
+            command_literals.COMMAND_RESUME_SESSION: Command(
+                command_literals.COMMAND_RESUME_SESSION,
+                self.server.resume_session,
+                ["session_token"],
+            ),
         }
 
     def handle_command(self, json_command, client):
@@ -88,11 +134,56 @@ class CommandHandler:
             client (Client): The client instance sending the command.
 
         Returns:
-            str: The JSON string representing the response.
+            dict: The response.
         """
         try:
-            print(f"Received command: {json_command}")
             command_data = json.loads(json_command)
+        except json.JSONDecodeError:
+            return CommandHandler.error_response("Invalid JSON format")
+
+        return self.handle_command_data(command_data, client)
+
+    def handle_command_data(self, command_data, client, rate_limiter=None):
+        """
+        Handles a decoded command by invoking the corresponding server method. Handled commands are logged at the
+        DEBUG level, sampled for the frequent ones, and only built when it is enabled. When `metrics` is set, the
+        command's latency and errors are recorded, under "unknown" for the commands that do not exist.
+
+        Args:
+            command_data (dict): The command, with the "command" name and its "args".
+            client (Client): The client instance sending the command.
+            rate_limiter (ConnectionRateLimiter, optional): The limiter of the client's connection, which also limits
+                the commands of a batch. Defaults to None, meaning that the commands are not limited.
+
+        Returns:
+            dict: The response.
+        """
+        if self.metrics is None:
+            return self._handle_command_data(command_data, client, rate_limiter)
+
+        start_time = time.perf_counter()
+        response = self._handle_command_data(command_data, client, rate_limiter)
+        duration = time.perf_counter() - start_time
+
+        cmd = command_data.get("command") if isinstance(command_data, dict) else None
+        command_name = cmd if isinstance(cmd, str) and cmd in self.commands else "unknown"
+        self.metrics.record_command(command_name, duration, response["status"] == "error")
+        return response
+
+    def _handle_command_data(self, command_data, client, rate_limiter=None):
+        """
+        Handles a decoded command by invoking the corresponding server method.
+
+        Args:
+            command_data (dict): The command, with the "command" name and its "args".
+            client (Client): The client instance sending the command.
+            rate_limiter (ConnectionRateLimiter, optional): The limiter of the client's connection. Defaults to None.
+
+        Returns:
+            dict: The response.
+        """
+        cmd = None
+        try:
             cmd = command_data.get("command")
             args = command_data.get("args", {})
 
@@ -101,23 +192,118 @@ class CommandHandler:
 
             command = self.commands.get(cmd)
             if command is None:
+                LOGGER.debug("Unknown command %s", cmd)
                 return CommandHandler.error_response("Unknown command")
 
             missing_args = [arg for arg in command.required_args if arg not in args]
             if missing_args:
                 return CommandHandler.error_response(f"Missing arguments: {', '.join(missing_args)}")
 
-            return command.handler(client, **args)
-        except json.JSONDecodeError:
-            return CommandHandler.error_response("Invalid JSON format")
-        except Exception as exception:  # pylint: disable=W0703
-            print(exception)
+            handler_args = args
+            if command.name == command_literals.COMMAND_BATCH:
+                # The limiter comes from the connection, never from the arguments sent by the client
+                handler_args = dict(args, rate_limiter=rate_limiter)
+
+            response = command.handler(client, **handler_args)
+            if LOGGER.isEnabledFor(logging.DEBUG):
+                fields = {"args": self._get_loggable(args), "response": self._get_loggable(response)}
+                LOGGER.debug("Handled command %s", cmd, extra={"sample_key": cmd, "fields": fields})
+            return response
+        except Exception:  # pylint: disable=W0703
+            LOGGER.exception("Error handling command %s", cmd)
             return CommandHandler.error_response("Server error!")
 
+    @classmethod
+    def _get_loggable(cls, value):
+        """
+        Returns a copy of the arguments or the response of a command that can be logged: the session tokens are
+        redacted and the boards are replaced with their size, also within the commands and responses of a batch.
+
+        Args:
+            value: The arguments or the response, or a value within them.
+
+        Returns:
+            The value to log.
+        """
+        if isinstance(value, list):
+            return [cls._get_loggable(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+
+        loggable = {}
+        for key, item in value.items():
+            if key in cls.REDACTED_LOG_FIELDS:
+                loggable[key] = "<redacted>"
+            elif key in cls.SIZED_LOG_FIELDS and isinstance(item, (str, bytes)):
+                loggable[f"{key}_size"] = len(item)
+            else:
+                loggable[key] = cls._get_loggable(item)
+        return loggable
+
+    def handle_batch(self, client, commands, stop_on_error=False, rate_limiter=None):
+        """
+        Handles a batch of commands sent in one message, in order, as if they were sent one after another. Every
+        command takes the tokens it would take if it was sent on its own, and the ones over the limits are rejected.
+
+        Args:
+            client (Client): The client instance sending the commands.
+            commands (list): The commands, each with the "command" name and its "args".
+            stop_on_error (bool, optional): Whether the commands after the first one that fails are skipped.
+                Defaults to False.
+            rate_limiter (ConnectionRateLimiter, optional): The limiter of the client's connection. Defaults to None,
+                meaning that the commands are not limited.
+
+        Returns:
+            dict: A response with the responses of the handled commands, in order.
+        """
+        if not isinstance(commands, list):
+            return CommandHandler.error_response("Invalid batch!")
+        if len(commands) > self.MAX_BATCH_SIZE:
+            return CommandHandler.error_response(f"Batch exceeds {self.MAX_BATCH_SIZE} commands!")
+
+        responses = []
+        for command_data in commands:
+            exhausted_limit = None
+            if rate_limiter is not None:
+                command_name = command_data.get("command") if isinstance(command_data, dict) else None
+                exhausted_limit = rate_limiter.check_command(command_name if isinstance(command_name, str) else None)
+
+            if exhausted_limit is not None:
+                if self.metrics is not None:
+                    self.metrics.record_rejection(exhausted_limit)
+                response = CommandHandler.rate_limited_response(exhausted_limit)
+            elif not isinstance(command_data, dict):
+                response = CommandHandler.error_response("Invalid command")
+            elif command_data.get("command") == command_literals.COMMAND_BATCH:
+                response = CommandHandler.error_response("Nested batches are not allowed!")
+            elif command_data.get("command") == command_literals.COMMAND_RESUME_SESSION:
+                response = CommandHandler.error_response("Sessions can not be resumed in a batch!")
+            else:
+                response = self.handle_command_data(command_data, client, rate_limiter)
+
+            responses.append(response)
+            if stop_on_error and response.get("status") != "success":
+                break
+
+        return CommandHandler.success_response(self.BATCH_HANDLED_MESSAGE, responses=responses)
+
+    @staticmethod
+    def rate_limited_response(limit):
+        """
+        Creates the response to a command rejected by the rate limits of its connection.
+
+        Args:
+            limit (str): The name of the exhausted limit.
+
+        Returns:
+            dict: The error response, with the name of the limit.
+        """
+        return CommandHandler.error_response(CommandHandler.RATE_LIMITED_MESSAGE, limit=limit)
+
     @staticmethod
     def format_response(status, message, **kwargs):
         """
-        Formats the response as a JSON string.
+        Formats the response, which the transport encodes with the codec of the client.
 
         Args:
             status (str): The status of the response ("success" or "error").
@@ -125,11 +311,38 @@ class CommandHandler:
             **kwargs: Additional arguments to include in the response.
 
         Returns:
-            str: The JSON string representing the formatted response.
+            dict: The formatted response.
+        """
+        return {"status": status, "message": message, "args": kwargs}
+
+    @staticmethod
+    def event_message(event, message, **kwargs):
+        """
+        Formats an event pushed by the server. The "event" key always comes first, which lets the clients tell
+        JSON events apart from responses without parsing them.
+
+        Args:
+            event (str): The name of the event.
+            message (str): The message to include in the event.
+            **kwargs: Additional arguments to include in the event.
+
+        Returns:
+            dict: The event.
+        """
+        return {"event": event, "status": "success", "message": message, "args": kwargs}
+
+    @staticmethod
+    def is_event_message(message):
+        """
+        Checks if a message received from the server is a pushed event rather than a response.
+
+        Args:
+            message (dict): The decoded message received from the server.
+
+        Returns:
+            bool: True if the message is an event, False otherwise.
         """
-        response_data = {"status": status, "message": message, "args": kwargs}
-        response_json = json.dumps(response_data)
-        return response_json
+        return "event" in message
 
     @staticmethod
     def success_response(message, **kwargs):
@@ -141,7 +354,7 @@ class CommandHandler:
             **kwargs: Additional arguments to include in the response.
 
         Returns:
-            str: The JSON string representing the success response.
+            dict: The success response.
         """
         return CommandHandler.format_response("success", message, **kwargs)
 
@@ -155,6 +368,6 @@ class CommandHandler:
             **kwargs: Additional arguments to include in the response.
 
         Returns:
-            str: The JSON string representing the error response.
+            dict: The error response.
         """
         return CommandHandler.format_response("error", message, **kwargs)
@@ -0,0 +1,134 @@
+"""
+Module for the scheduler of exact deadlines, such as the ends of the turns. Deadlines are kept in a binary heap, so
+scheduling one costs O(log n) and the next deadline is always known, which lets the server sleep until it.
+"""
+
+import heapq
+import itertools
+import threading
+from time import monotonic
+
+
+class DeadlineScheduler:
+    """
+    Thread-safe min-heap of deadlines keyed by arbitrary hashable keys, with at most one deadline per key.
+
+    Rescheduled and cancelled deadlines are not searched for in the heap. Their stale entries are skipped when they
+    reach the top and the heap is rebuilt when stale entries outnumber the live ones.
+    """
+
+    COMPACTION_MIN_SIZE = 64
+
+    def __init__(self):
+        """
+        Initializes an empty DeadlineScheduler.
+        """
+        self.heap = []
+        self.deadlines = {}
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+
+    def schedule(self, key, deadline):
+        """
+        Schedules the deadline of a key, replacing its previous deadline.
+
+        Args:
+            key (hashable): The key of the deadline.
+            deadline (float): The monotonic time of the deadline.
+        """
+        with self.lock:
+            if self.deadlines.get(key) == deadline:
+                return
+
+            self.deadlines[key] = deadline
+            heapq.heappush(self.heap, (deadline, next(self.sequence), key))
+            self._compact_if_needed()
+
+    def cancel(self, key):
+        """
+        Cancels the deadline of a key if it has one.
+
+        Args:
+            key (hashable): The key of the deadline.
+
+        Returns:
+            bool: True if a deadline was cancelled, False otherwise.
+        """
+        with self.lock:
+            return self.deadlines.pop(key, None) is not None
+
+    def pop_due(self, now=None):
+        """
+        Removes and returns the keys whose deadline has passed, earliest first.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to None, meaning `time.monotonic()`.
+
+        Returns:
+            list: The keys of the passed deadlines.
+        """
+        with self.lock:
+            now = monotonic() if now is None else now
+            due_keys = []
+            while self._discard_stale_top() and self.heap[0][0] <= now:
+                _, _, key = heapq.heappop(self.heap)
+                del self.deadlines[key]
+                due_keys.append(key)
+            return due_keys
+
+    def get_next_deadline(self):
+        """
+        Returns the earliest scheduled deadline.
+
+        Returns:
+            float: The monotonic time of the deadline, or None if nothing is scheduled.
+        """
+        with self.lock:
+            if not self._discard_stale_top():
+                return None
+            return self.heap[0][0]
+
+    def _discard_stale_top(self):
+        """
+        Pops the stale entries from the top of the heap.
+
+        Returns:
+            bool: True if a live entry is left on the top, False if the heap is empty.
+        """
+        while self.heap:
+            deadline, _, key = self.heap[0]
+            if self.deadlines.get(key) == deadline:
+                return True
+            heapq.heappop(self.heap)
+        return False
+
+    def _compact_if_needed(self):
+        """
+        Rebuilds the heap from the live deadlines when most of its entries are stale.
+        """
+        if len(self.heap) < max(self.COMPACTION_MIN_SIZE, 2 * len(self.deadlines)):
+            return
+
+        self.heap = [(deadline, next(self.sequence), key) for key, deadline in self.deadlines.items()]
+        heapq.heapify(self.heap)
+
+    def __contains__(self, key):
+        """
+        Checks if a key has a scheduled deadline.
+
+        Args:
+            key (hashable): The key of the deadline.
+
+        Returns:
+            bool: True if the key has a deadline, False otherwise.
+        """
+        return key in self.deadlines
+
+    def __len__(self):
+        """
+        Returns the number of scheduled deadlines.
+
+        Returns:
+            int: The number of deadlines.
+        """
+        return len(self.deadlines)
@@ -0,0 +1,240 @@
+"""
+Module for the sequenced log of the events of a room.
+
+Every event of a room gets the next sequence number of the room and is kept for its recipient until the recipient
+acknowledges it. The recipient's cursor is the last acknowledged sequence number: events after it are delivered again
+when they are fetched, so a client that lost a response or reconnected can catch up, and delivering an event twice is
+harmless because the client can skip the sequence numbers it has already seen.
+"""
+
+from bisect import bisect_right
+from collections import namedtuple
+
+LoggedEvent = namedtuple("LoggedEvent", ["sequence", "event", "args"])
+
+
+class EventStream:
+    """
+    The events of a room addressed to one recipient, in sequence order.
+
+    Acknowledged events are dropped from the front by moving an offset, and the list is compacted once most of it is
+    dropped, so every operation takes constant amortized time except looking up an arbitrary sequence number.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty EventStream.
+        """
+        self.events = []
+        self.sequences = []
+        self.acknowledged_index = 0
+        self.delivered_index = 0
+
+    def append(self, logged_event):
+        """
+        Appends an event.
+
+        Args:
+            logged_event (LoggedEvent): The event.
+        """
+        self.events.append(logged_event)
+        self.sequences.append(logged_event.sequence)
+
+    def deliver_next(self):
+        """
+        Returns the oldest event that was not delivered yet and marks it as delivered.
+
+        Returns:
+            LoggedEvent: The event, or None if every event was delivered.
+        """
+        if self.delivered_index == len(self.events):
+            return None
+
+        logged_event = self.events[self.delivered_index]
+        self.delivered_index += 1
+        return logged_event
+
+    def read(self, limit=None):
+        """
+        Returns the events that were not acknowledged yet, delivered or not, and marks them as delivered.
+
+        Args:
+            limit (int, optional): The maximal number of returned events. Defaults to None, meaning all of them.
+
+        Returns:
+            list: The LoggedEvent instances in sequence order.
+        """
+        start = self.acknowledged_index
+        end = len(self.events) if limit is None else min(len(self.events), start + max(limit, 0))
+        self.delivered_index = max(self.delivered_index, end)
+        return self.events[start:end]
+
+    def acknowledge(self, sequence):
+        """
+        Drops the events up to a sequence number, which the recipient has received.
+
+        Args:
+            sequence (int): The last received sequence number.
+        """
+        index = bisect_right(self.sequences, sequence, self.acknowledged_index)
+        if index <= self.acknowledged_index:
+            return
+
+        self.acknowledged_index = index
+        self.delivered_index = max(self.delivered_index, index)
+        if self.acknowledged_index * 2 >= len(self.events):
+            self._compact()
+
+    def get_undelivered_count(self):
+        """
+        Returns the number of events that were not delivered yet.
+
+        Returns:
+            int: The number of events.
+        """
+        return len(self.events) - self.delivered_index
+
+    def get_unacknowledged_count(self):
+        """
+        Returns the number of events that were not acknowledged yet.
+
+        Returns:
+            int: The number of events.
+        """
+        return len(self.events) - self.acknowledged_index
+
+    def _compact(self):
+        """
+        Frees the acknowledged events at the front of the lists.
+        """
+        del self.events[: self.acknowledged_index]
+        del self.sequences[: self.acknowledged_index]
+        self.delivered_index -= self.acknowledged_index
+        self.acknowledged_index = 0
+
+
+class EventLog:
+    """
+    Append-only log of the events of a room, numbered with one sequence shared by all recipients. The log is guarded
+    by the lock of its room.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty EventLog.
+        """
+        self.last_sequence = 0
+        self.streams = {}
+
+    def append(self, recipient, event, args):
+        """
+        Appends an event for a recipient.
+
+        Args:
+            recipient (str): The client the event is addressed to.
+            event (str): The name of the event.
+            args (dict): The arguments of the event.
+
+        Returns:
+            int: The sequence number of the event.
+        """
+        self.last_sequence += 1
+        self._get_stream(recipient).append(LoggedEvent(self.last_sequence, event, args))
+        return self.last_sequence
+
+    def deliver_next(self, recipient):
+        """
+        Returns the oldest event of a recipient that was not delivered yet and marks it as delivered.
+
+        Args:
+            recipient (str): The client the events are addressed to.
+
+        Returns:
+            LoggedEvent: The event, or None if every event was delivered.
+        """
+        stream = self.streams.get(recipient)
+        return None if stream is None else stream.deliver_next()
+
+    def read(self, recipient, after_sequence=None, limit=None):
+        """
+        Acknowledges the events of a recipient up to a sequence number and returns the ones after it, including
+        those delivered before but not acknowledged.
+
+        Args:
+            recipient (str): The client the events are addressed to.
+            after_sequence (int, optional): The last sequence number the recipient has received. Defaults to None,
+                meaning that nothing new is acknowledged.
+            limit (int, optional): The maximal number of returned events. Defaults to None, meaning all of them.
+
+        Returns:
+            list: The LoggedEvent instances in sequence order.
+        """
+        stream = self.streams.get(recipient)
+        if stream is None:
+            return []
+
+        if after_sequence is not None:
+            stream.acknowledge(after_sequence)
+        return stream.read(limit)
+
+    def acknowledge(self, recipient, sequence):
+        """
+        Drops the events of a recipient up to a sequence number, which the recipient has received.
+
+        Args:
+            recipient (str): The client the events are addressed to.
+            sequence (int): The last received sequence number.
+        """
+        stream = self.streams.get(recipient)
+        if stream is not None:
+            stream.acknowledge(sequence)
+
+    def get_undelivered_count(self, recipient):
+        """
+        Returns the number of events of a recipient that were not delivered yet.
+
+        Args:
+            recipient (str): The client the events are addressed to.
+
+        Returns:
+            int: The number of events.
+        """
+        stream = self.streams.get(recipient)
+        return 0 if stream is None else stream.get_undelivered_count()
+
+    def get_unacknowledged_count(self, recipient):
+        """
+        Returns the number of events of a recipient that were not acknowledged yet.
+
+        Args:
+            recipient (str): The client the events are addressed to.
+
+        Returns:
+            int: The number of events.
+        """
+        stream = self.streams.get(recipient)
+        return 0 if stream is None else stream.get_unacknowledged_count()
+
+    def get_depth(self):
+        """
+        Returns the number of events kept for all the recipients, the ones not acknowledged yet.
+
+        Returns:
+            int: The number of events.
+        """
+        return sum(stream.get_unacknowledged_count() for stream in self.streams.values())
+
+    def _get_stream(self, recipient):
+        """
+        Returns the stream of a recipient, creating it if needed.
+
+        Args:
+            recipient (str): The client the events are addressed to.
+
+        Returns:
+            EventStream: The stream.
+        """
+        stream = self.streams.get(recipient)
+        if stream is None:
+            stream = self.streams[recipient] = EventStream()
+        return stream
@@ -0,0 +1,311 @@
+"""
+Module for the flow control of the connections of the network servers, which keeps one noisy client from taking the
+time of the others.
+
+The commands of every connection are limited by token buckets, one for the connection and one per expensive command.
+A message over the limits is rejected from the name of its command, read without decoding the message, so a flood
+costs neither parsing nor the locks of the rooms. The frames sent to a connection are bounded too, and a connection
+that stops reading them is disconnected instead of buffering without end.
+"""
+
+import asyncio
+import logging
+import queue
+import socket
+import threading
+import time
+
+from game.server.codec import peek_command_name
+from game.players import command_literals
+
+LOGGER = logging.getLogger(__name__)
+
+CONNECTION_LIMIT = "connection"
+UNIDENTIFIED_LIMIT = "unidentified"
+
+SEND_STALL_TIMEOUT = 10
+MAX_SEND_BUFFER_SIZE = 1024 * 1024
+
+
+class SendBufferFullError(ConnectionError):
+    """Raised when a frame is sent to a connection whose outbound buffer stays full."""
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at a constant rate up to its capacity. Taking a token costs a few float operations.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate, capacity, now):
+        """
+        Initializes a full TokenBucket.
+
+        Args:
+            rate (float): The tokens added per second.
+            capacity (float): The maximal number of tokens, the largest burst.
+            now (float): The current monotonic time.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def try_take(self, now):
+        """
+        Takes a token if one is left.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            bool: True if a token was taken, False otherwise.
+        """
+        tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if tokens < 1:
+            self.tokens = tokens
+            return False
+
+        self.tokens = tokens - 1
+        return True
+
+
+class RateLimitPolicy:
+    """
+    The rates at which a connection may send commands, as (commands per second, burst) pairs. Every message takes a
+    token of the connection, and the limited commands a token of their own bucket. The messages whose command can not
+    be read without decoding them share the UNIDENTIFIED_LIMIT bucket, since the clients always send the name of the
+    command first.
+    """
+
+    CONNECTION_RATE = 50
+    CONNECTION_BURST = 100
+
+    DEFAULT_COMMAND_LIMITS = {
+        command_literals.COMMAND_CREATE_ROOM: (2, 10),
+        command_literals.COMMAND_JOIN_ROOM_WITH_ID: (5, 20),
+        command_literals.COMMAND_JOIN_RANDOM_ROOM: (2, 10),
+        command_literals.COMMAND_SEND_BOARD: (2, 5),
+        command_literals.COMMAND_REGISTER_SHOT: (20, 20),
+        command_literals.COMMAND_REQUEST_ENEMY_BOARD: (2, 5),
+        command_literals.COMMAND_BATCH: (5, 10),
+        UNIDENTIFIED_LIMIT: (5, 10),
+    }
+
+    def __init__(self, connection_rate=CONNECTION_RATE, connection_burst=CONNECTION_BURST, command_limits=None):
+        """
+        Initializes the RateLimitPolicy.
+
+        Args:
+            connection_rate (float, optional): The messages per second of a connection. Defaults to CONNECTION_RATE.
+            connection_burst (float, optional): The burst of messages of a connection. Defaults to CONNECTION_BURST.
+            command_limits (dict, optional): The (rate, burst) of the limited commands, by name. Defaults to None,
+                meaning DEFAULT_COMMAND_LIMITS.
+        """
+        self.connection_rate = connection_rate
+        self.connection_burst = connection_burst
+        self.command_limits = self.DEFAULT_COMMAND_LIMITS if command_limits is None else command_limits
+
+    def create_limiter(self):
+        """
+        Creates the rate limiter of a new connection.
+
+        Returns:
+            ConnectionRateLimiter: The limiter, with full buckets.
+        """
+        return ConnectionRateLimiter(self)
+
+
+class ConnectionRateLimiter:
+    """
+    The token buckets of one connection. It is used by the thread or the coroutine reading the connection only.
+    """
+
+    def __init__(self, policy, now=None):
+        """
+        Initializes the ConnectionRateLimiter.
+
+        Args:
+            policy (RateLimitPolicy): The rates of the connection.
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+        """
+        self.policy = policy
+        self.connection_bucket = TokenBucket(
+            policy.connection_rate, policy.connection_burst, time.monotonic() if now is None else now
+        )
+        self.command_buckets = {}
+
+    def check(self, data, now=None):
+        """
+        Checks a received message against the limits, without decoding it, and takes its tokens.
+
+        Args:
+            data (bytes): The encoded command.
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+
+        Returns:
+            str: None if the message is admitted, otherwise the name of the exhausted limit, CONNECTION_LIMIT or
+                the name of the command.
+        """
+        command_name = peek_command_name(data)
+        return self.check_command(UNIDENTIFIED_LIMIT if command_name is None else command_name, now)
+
+    def check_command(self, command_name, now=None):
+        """
+        Checks a command whose name is known against the limits and takes its tokens, for example a command of a
+        batch, which takes the tokens it would take if it was sent on its own.
+
+        Args:
+            command_name (str): The name of the command, or None if it has none.
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+
+        Returns:
+            str: None if the command is admitted, otherwise the name of the exhausted limit, CONNECTION_LIMIT or
+                the name of the command.
+        """
+        if now is None:
+            now = time.monotonic()
+        if not self.connection_bucket.try_take(now):
+            return CONNECTION_LIMIT
+
+        bucket = self.command_buckets.get(command_name)
+        if bucket is None:
+            limit = self.policy.command_limits.get(command_name)
+            if limit is None:
+                return None
+            bucket = self.command_buckets[command_name] = TokenBucket(*limit, now)
+
+        return None if bucket.try_take(now) else command_name
+
+
+class SendQueue:
+    """
+    Bounded queue of the frames sent to a blocking socket, written by a thread of its own, so the threads pushing
+    events to the connection never wait for a slow client while they hold the lock of a room.
+
+    A frame that finds the queue full waits at most its timeout, and then the connection is disconnected.
+    """
+
+    MAX_QUEUED_FRAMES = 256
+
+    def __init__(self, conn, max_queued_frames=MAX_QUEUED_FRAMES, stall_timeout=SEND_STALL_TIMEOUT):
+        """
+        Initializes the SendQueue and starts its writer thread, which closes the socket once it stops.
+
+        Args:
+            conn (socket.socket): The socket of the connection.
+            max_queued_frames (int, optional): The number of frames waiting to be written. Defaults to
+                MAX_QUEUED_FRAMES.
+            stall_timeout (float, optional): The seconds the frames of the connection's own thread wait for room in
+                the queue. Defaults to SEND_STALL_TIMEOUT.
+        """
+        self.conn = conn
+        self.frames = queue.Queue(max_queued_frames)
+        self.stall_timeout = stall_timeout
+        self.is_closed = False
+        self.thread = threading.Thread(target=self._write_frames, name="send-queue", daemon=True)
+        self.thread.start()
+
+    def send(self, frame, wait=True):
+        """
+        Queues a frame to be written.
+
+        Args:
+            frame (bytes): The framed message.
+            wait (bool, optional): Whether to wait up to the stall timeout for room in the queue. The events pushed
+                by the threads of other connections do not wait. Defaults to True.
+
+        Raises:
+            SendBufferFullError: If the queue stays full, in which case the connection is disconnected.
+            ConnectionError: If the connection is closed.
+        """
+        if self.is_closed:
+            raise ConnectionError("Connection closed")
+
+        try:
+            self.frames.put(frame, wait, self.stall_timeout)
+        except queue.Full as exception:
+            LOGGER.warning("Disconnecting a client that does not read its messages")
+            self.abort()
+            raise SendBufferFullError("Outbound buffer full") from exception
+
+    def close(self):
+        """
+        Stops the writer thread once the queued frames are written, or at once if the queue is full.
+        """
+        self.is_closed = True
+        try:
+            self.frames.put_nowait(None)
+        except queue.Full:
+            self.abort()
+
+    def abort(self):
+        """
+        Disconnects the client, which wakes the threads reading and writing the socket.
+        """
+        self.is_closed = True
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _write_frames(self):
+        """
+        Writes the queued frames until the queue is closed or the connection is lost, then closes the socket.
+        """
+        try:
+            while True:
+                frame = self.frames.get()
+                if frame is None:
+                    break
+                self.conn.sendall(frame)
+        except OSError as exception:
+            LOGGER.debug("Could not send to the client: %s", exception)
+            self.abort()
+        finally:
+            self.conn.close()
+
+
+def push_to_stream(writer, frame, max_buffer_size=MAX_SEND_BUFFER_SIZE):
+    """
+    Writes a frame pushed to an asyncio stream, unless the stream already buffers too much.
+
+    Args:
+        writer (asyncio.StreamWriter): The stream of the connection.
+        frame (bytes): The framed message.
+        max_buffer_size (int, optional): The bytes the stream may buffer. Defaults to MAX_SEND_BUFFER_SIZE.
+
+    Raises:
+        SendBufferFullError: If the buffer is full, in which case the connection is disconnected.
+    """
+    if writer.transport.get_write_buffer_size() > max_buffer_size:
+        LOGGER.warning("Disconnecting a client that does not read its messages")
+        writer.transport.abort()
+        raise SendBufferFullError("Outbound buffer full")
+
+    writer.write(frame)
+
+
+async def drain_stream(writer, stall_timeout=SEND_STALL_TIMEOUT):
+    """
+    Waits until an asyncio stream buffers few enough bytes to be written to again.
+
+    Args:
+        writer (asyncio.StreamWriter): The stream of the connection.
+        stall_timeout (float, optional): The seconds to wait. Defaults to SEND_STALL_TIMEOUT.
+
+    Raises:
+        SendBufferFullError: If the buffer stays full, in which case the connection is disconnected.
+    """
+    if not writer.transport.get_write_buffer_size():
+        await writer.drain()
+        return
+
+    try:
+        await asyncio.wait_for(writer.drain(), stall_timeout)
+    except asyncio.TimeoutError as exception:
+        LOGGER.warning("Disconnecting a client that does not read its messages")
+        writer.transport.abort()
+        raise SendBufferFullError("Outbound buffer full") from exception
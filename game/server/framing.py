@@ -0,0 +1,162 @@
+"""
+Module for the length-prefixed framing of the messages exchanged between the clients and the server.
+
+Every message is sent as a 4-byte big-endian length followed by the payload, so messages of any size arrive whole
+and back-to-back messages are never merged.
+"""
+
+import struct
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 1024 * 1024
+RECV_CHUNK_SIZE = 64 * 1024
+
+
+class FrameError(ValueError):
+    """Raised when a received frame is malformed."""
+
+
+def encode_frame(payload):
+    """
+    Prefixes a payload with its length.
+
+    Args:
+        payload (bytes or str): The message to frame. Strings are encoded as UTF-8.
+
+    Returns:
+        bytes: The framed message.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    return HEADER.pack(len(payload)) + payload
+
+
+def read_frame_size(header):
+    """
+    Parses and validates a frame header.
+
+    Args:
+        header (bytes): The header of the frame.
+
+    Returns:
+        int: The size of the payload.
+
+    Raises:
+        FrameError: If the frame is larger than MAX_FRAME_SIZE.
+    """
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {size} bytes exceeds the maximum size.")
+    return size
+
+
+class FrameDecoder:
+    """
+    Incremental decoder that splits a byte stream into frames.
+
+    Received data is appended to a reused buffer and every complete message is copied out of it exactly once.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty FrameDecoder.
+        """
+        self.buffer = bytearray()
+        self.offset = 0
+
+    def feed(self, data):
+        """
+        Adds received data and extracts the complete messages.
+
+        Args:
+            data (bytes): The received data.
+
+        Returns:
+            list: The payloads of the completed frames as bytes.
+
+        Raises:
+            FrameError: If a frame is larger than MAX_FRAME_SIZE.
+        """
+        self.buffer += data
+        messages = []
+        view = memoryview(self.buffer)
+        try:
+            while len(self.buffer) - self.offset >= HEADER.size:
+                offset = self.offset
+                start = offset + HEADER.size
+                size = read_frame_size(view[offset:start])
+                end = start + size
+                if len(self.buffer) < end:
+                    break
+                messages.append(bytes(view[start:end]))
+                self.offset = end
+        finally:
+            view.release()
+
+        if self.offset == len(self.buffer):
+            self.buffer.clear()
+            self.offset = 0
+        elif self.offset > len(self.buffer) // 2:
+            consumed = self.offset
+            del self.buffer[:consumed]
+            self.offset = 0
+
+        return messages
+
+
+def recv_exactly(sock, size):
+    """
+    Receives exactly a number of bytes from a blocking socket. The buffer grows with the received chunks instead of
+    being allocated from the size, which is read from the unauthenticated header of a frame.
+
+    Args:
+        sock (socket.socket): The socket to receive from.
+        size (int): The number of bytes to receive.
+
+    Returns:
+        bytearray: The received bytes, or None if the connection was closed.
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(min(size - len(data), RECV_CHUNK_SIZE))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def recv_frame(sock):
+    """
+    Receives one whole frame from a blocking socket.
+
+    Args:
+        sock (socket.socket): The socket to receive from.
+
+    Returns:
+        bytearray: The payload of the frame, or None if the connection was closed.
+
+    Raises:
+        FrameError: If the frame is larger than MAX_FRAME_SIZE.
+    """
+    header = recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    return recv_exactly(sock, read_frame_size(header))
+
+
+async def read_frame(reader):
+    """
+    Reads one whole frame from an asyncio stream.
+
+    Args:
+        reader (asyncio.StreamReader): The stream to read from.
+
+    Returns:
+        bytes: The payload of the frame.
+
+    Raises:
+        asyncio.IncompleteReadError: If the stream ends before the frame is complete.
+        FrameError: If the frame is larger than MAX_FRAME_SIZE.
+    """
+    header = await reader.readexactly(HEADER.size)
+    return await reader.readexactly(read_frame_size(header))
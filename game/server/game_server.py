@@ -5,34 +5,111 @@ This module defines the `GameServer` and `SinglePlayerServer` classes for managi
 game rooms, handling commands, and managing multiplayer or single-player game scenarios.
 """
 
+import functools
+import logging
+import math
 import random
-import json
+from time import monotonic
 
 from game.server.room import Room
 from game.server.command_handler import CommandHandler
+from game.server.codec import CODECS, JSON_CODEC, CodecError, choose_codec, decode_message
+from game.server.wait_registry import WaitRegistry
+from game.server.room_directory import InMemoryRoomDirectory
+from game.server.timer_wheel import TimerWheel
+from game.server.deadline_scheduler import DeadlineScheduler
+from game.server.room_registry import ShardedRegistry
+from game.server.session_registry import SessionRegistry
+from game.server.metrics import ServerMetrics
+from game.server.flow_control import RateLimitPolicy
+from game.tracing import span, traced
 from game.players.battle_bot import BattleBot
+from game.players.placement_heatmap import PlacementHeatmap
+from game.players.placement_strategy import AdversarialPlacementStrategy
+from game.players.density_grid import DensityGridCache
+from game.interface.base_board import BaseBoard
 from game.server.network import OfflineNetwork
 from game.players import command_literals
 
+LOGGER = logging.getLogger(__name__)
+
+
+def locks_client_room(method):
+    """
+    Decorator that runs a GameServer method taking the client as the first argument with the lock of the client's
+    room held. The commands of both players of a room are serialized, while other rooms proceed in parallel.
+
+    Args:
+        method (callable): The method to decorate.
+
+    Returns:
+        callable: The decorated method.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, client, *args, **kwargs):
+        room = self._lock_client_room(client)
+        try:
+            return method(self, client, *args, **kwargs)
+        finally:
+            if room is not None:
+                room.lock.release()
+
+    return wrapper
+
 
 class GameServer:
     """
     Manages game rooms and client interactions for a client-server based game.
 
-    Handles room creation, player management, and game state transitions.
+    Handles room creation, player management, and game state transitions. The rooms and the client mappings are kept
+    in sharded registries and every change of a room happens with the room's lock held, so the server can be used
+    from many threads.
     """
 
-    def __init__(self, time_per_turn=None):
+    WAIT_TIMEOUT_DEFAULT = 30
+    WAIT_TIMEOUT_MAX = 120
+    HOUSEKEEPING_INTERVAL = 1
+
+    ROOM_IDLE_TIMEOUT = 600
+    ROOM_FINISHED_TIMEOUT = 120
+    ROOM_ORPHANED_TIMEOUT = 10
+
+    SESSION_GRACE_PERIOD = 30
+
+    LOCAL_NODE_ID = "local"
+
+    LOGGED_EVENT_MESSAGES = {command_literals.EVENT_OPPONENT_SHOT: "Shot was made by the opponent!"}
+
+    def __init__(self, time_per_turn=None, placement_heatmap=None, room_directory=None, node_id=LOCAL_NODE_ID):
         """
         Initializes the GameServer instance.
 
         Args:
             time_per_turn (int, optional): Time allotted per turn in seconds. Defaults to None.
+            placement_heatmap (PlacementHeatmap, optional): Heatmap that accumulates the boards revealed at the
+                end of battles. Defaults to None, meaning that boards are not recorded.
+            room_directory (RoomDirectory, optional): Directory of the rooms shared with the other server nodes.
+                Defaults to None, meaning an InMemoryRoomDirectory used by this server only.
+            node_id (str, optional): The ID of this node in the room directory, the "host:port" address the clients
+                can connect to in multi-node deployments. Defaults to LOCAL_NODE_ID.
         """
-        self.rooms = {}
-        self.clients_to_rooms = {}
+        self.rooms = ShardedRegistry()
+        self.clients_to_rooms = ShardedRegistry()
         self.command_handler = CommandHandler(self)
         self.time_per_turn = time_per_turn
+        self.placement_heatmap = placement_heatmap
+        self.event_pushers = {}
+        self.event_subscribers = set()
+        self.client_codecs = {}
+        self.wait_registry = WaitRegistry()
+        self.room_directory = room_directory or InMemoryRoomDirectory()
+        self.node_id = node_id
+        self.room_reaper = TimerWheel()
+        self.turn_deadlines = DeadlineScheduler()
+        self.sessions = SessionRegistry()
+        self.metrics = None
+        self.rate_limit_policy = RateLimitPolicy()
 
     def run(self):
         """
@@ -53,26 +130,41 @@ class GameServer:
             if room_id not in self.rooms:
                 return room_id
 
-    def create_room(self, client, client_name):
+    @traced
+    def create_room(self, client, client_name, bucket=None):
         """
         Creates a new room and adds the client to it.
 
         Args:
             client (str): The client identifier.
             client_name (str): The name of the client.
+            bucket (str, optional): The matchmaking bucket of the room, for example a skill level or a region.
+                Defaults to None, the default bucket.
 
         Returns:
-            str: A JSON response indicating the success or failure of the operation.
+            dict: A response indicating the success or failure of the operation.
         """
+        if bucket is not None and not isinstance(bucket, str):
+            return CommandHandler.error_response("Invalid matchmaking bucket!")
         if self.is_client_in_room(client):
             return CommandHandler.error_response("Client is already in a room!")
 
-        room_id = self.generate_unique_room_id()
-        room = Room(room_id, client, client_name, self.time_per_turn)
-        self.rooms[room_id] = room
-        self.clients_to_rooms[client] = room_id
-        return CommandHandler.success_response(f"Room {room_id} created!", room_id=room_id)
-
+        while True:
+            room_id = self.generate_unique_room_id()
+            room = Room(room_id, client, client_name, self.time_per_turn, bucket)
+            with room.lock:
+                if not self.rooms.add_if_absent(room_id, room):
+                    continue
+                if not self.room_directory.register_room(room_id, self.node_id):
+                    self.rooms.pop(room_id)
+                    continue
+
+                self._map_client_to_room(client, room_id)
+                self.room_directory.add_open_room(room_id, bucket)
+                self._schedule_room_reaping(room)
+                return CommandHandler.success_response(f"Room {room_id} created!", room_id=room_id)
+
+    @traced
     def join_room_with_id(self, client, room_id, client_name):
         """
         Allows a client to join an existing room.
@@ -83,19 +175,76 @@ class GameServer:
             client_name (str): The name of the client.
 
         Returns:
-            str: A JSON response indicating the success or failure of the operation.
+            dict: A response indicating the success or failure of the operation.
         """
         if self.is_client_in_room(client):
             return CommandHandler.error_response("Client is already in a room!")
 
-        if not self.does_room_exist(room_id):
+        room = self.rooms.get(room_id)
+        if room is None:
+            return self._room_not_found_response(room_id)
+
+        with room.lock:
+            if self.rooms.get(room_id) is not room:
+                return CommandHandler.error_response("Room ID not found!")
+
+            if not room.add_player(client, client_name):
+                return CommandHandler.error_response("Room is full or player is already in the room!")
+
+            return self._finish_joining_room(client, room)
+
+    def _room_not_found_response(self, room_id):
+        """
+        Creates the response to joining a room that is not hosted by this node, which tells the client the node
+        hosting it if the room exists elsewhere.
+
+        Args:
+            room_id (str): The ID of the room.
+
+        Returns:
+            dict: An error response.
+        """
+        node_id = self.room_directory.get_room_node(room_id)
+        if node_id is None or node_id == self.node_id:
             return CommandHandler.error_response("Room ID not found!")
+        return self._room_on_other_node_response(room_id, node_id)
+
+    @staticmethod
+    def _room_on_other_node_response(room_id, node_id):
+        """
+        Creates the response redirecting a client to the node hosting a room.
 
-        room = self.rooms[room_id]
-        if not room.add_player(client, client_name):
-            return CommandHandler.error_response("Room is full or player is already in the room!")
+        Args:
+            room_id (str): The ID of the room.
+            node_id (str): The ID of the node hosting the room.
+
+        Returns:
+            dict: An error response with the room ID and the node ID.
+        """
+        return CommandHandler.error_response("Room is hosted on another node!", room_id=room_id, node_id=node_id)
 
-        return self._finish_joining_room(client, room)
+    def _get_directory_client_key(self, client):
+        """
+        Returns the key of a client in the room directory, which is unique across the nodes.
+
+        Args:
+            client (str): The client identifier.
+
+        Returns:
+            str: The key of the client.
+        """
+        return f"{self.node_id}/{client}"
+
+    def _map_client_to_room(self, client, room_id):
+        """
+        Records the room of a client locally and in the room directory.
+
+        Args:
+            client (str): The client identifier.
+            room_id (str): The ID of the room.
+        """
+        self.clients_to_rooms[client] = room_id
+        self.room_directory.set_client_room(self._get_directory_client_key(client), room_id)
 
     def _finish_joining_room(self, client, room):
         """
@@ -106,9 +255,13 @@ class GameServer:
             room (Room): The room instance.
 
         Returns:
-            str: A JSON response with details about the room and opponent.
+            dict: A response with details about the room and opponent.
         """
-        self.clients_to_rooms[client] = room.room_id
+        self._map_client_to_room(client, room.room_id)
+        room.touch()
+        if not room.is_open():
+            self.room_directory.remove_open_room(room.room_id)
+        self._notify_waiters(room, command_literals.COMMAND_WAIT_FOR_OPPONENT_JOIN, client)
 
         opponent_name = room.get_opponent_room_client(client).client_name
         return CommandHandler.success_response(
@@ -117,28 +270,46 @@ class GameServer:
             opponent_name=opponent_name,
         )
 
-    def join_random_room(self, client, client_name):
+    @traced
+    def join_random_room(self, client, client_name, bucket=None):
         """
-        Allows a client to join a random available room.
+        Allows a client to join the oldest open public room of a matchmaking bucket.
 
         Args:
             client (str): The client identifier.
             client_name (str): The name of the client.
+            bucket (str, optional): The matchmaking bucket to join a room in. Defaults to None, the default bucket.
 
         Returns:
-            str: A JSON response indicating the success or failure of the operation.
+            dict: A response indicating the success or failure of the operation.
         """
+        if bucket is not None and not isinstance(bucket, str):
+            return CommandHandler.error_response("Invalid matchmaking bucket!")
         if self.is_client_in_room(client):
             return CommandHandler.error_response("Client is already in a room!")
 
-        for room in self.rooms.values():
-            if room.is_private:
+        while True:
+            room_id = self.room_directory.peek_open_room(bucket)
+            if room_id is None:
+                return CommandHandler.error_response("No available rooms to join!")
+
+            room = self.rooms.get(room_id)
+            if room is None:
+                node_id = self.room_directory.get_room_node(room_id)
+                if node_id is not None and node_id != self.node_id:
+                    # The room stays queued until the client joins it on its node, which may not be reachable
+                    return self._room_on_other_node_response(room_id, node_id)
+                self.room_directory.remove_open_room(room_id)
                 continue
-            if room.add_player(client, client_name):
-                return self._finish_joining_room(client, room)
 
-        return CommandHandler.error_response("No available rooms to join!")
+            with room.lock:
+                if not self.room_directory.remove_open_room(room_id):
+                    continue
+                if self.rooms.get(room_id) is room and room.is_open() and room.add_player(client, client_name):
+                    return self._finish_joining_room(client, room)
 
+    @traced
+    @locks_client_room
     def change_room_publicity(self, client):
         """
         Toggles the publicity of the room the client is in.
@@ -147,18 +318,24 @@ class GameServer:
             client (str): The client identifier.
 
         Returns:
-            str: A JSON response indicating the success or failure of the operation.
+            dict: A response indicating the success or failure of the operation.
         """
         if not self.is_client_in_room(client):
             return CommandHandler.error_response("Client is not in a room!")
 
-        room_id = self.clients_to_rooms.get(client)
-        room = self.rooms[room_id]
+        room = self._get_client_room(client)
+        room_id = room.room_id
 
         is_private = room.change_publicity()
+        if room.is_open():
+            self.room_directory.add_open_room(room_id, room.matchmaking_bucket)
+        else:
+            self.room_directory.remove_open_room(room_id)
 
         return CommandHandler.success_response(f"Room {room_id} publicity changed!", is_private=is_private)
 
+    @traced
+    @locks_client_room
     def exit_room(self, client):
         """
         Removes a client from their current room.
@@ -167,16 +344,18 @@ class GameServer:
             client (str): The client identifier.
 
         Returns:
-            str: A JSON response indicating the success or failure of the operation.
+            dict: A response indicating the success or failure of the operation.
         """
         if not self.is_client_in_room(client):
             return CommandHandler.error_response("Client is not in a room!")
 
-        room_id = self.clients_to_rooms.pop(client)
-        self.rooms.pop(room_id)
+        room_id = self.clients_to_rooms[client]
+        self._remove_room(room_id)
 
         return CommandHandler.success_response(f"Client exited from room {room_id}!")
 
+    @traced
+    @locks_client_room
     def has_opponent_joined(self, client):
         """
         Checks if the opponent has joined the room.
@@ -185,13 +364,12 @@ class GameServer:
             client (str): The client identifier.
 
         Returns:
-            str: A JSON response indicating the opponent's status.
+            dict: A response indicating the opponent's status.
         """
         if not self.is_client_in_room(client):
             return CommandHandler.error_response("Client is not in a room!")
 
-        room_id = self.clients_to_rooms.get(client)
-        room = self.rooms[room_id]
+        room = self._get_client_room(client)
 
         if not room.is_full:
             return CommandHandler.error_response("Opponent has not joined the room!")
@@ -202,6 +380,125 @@ class GameServer:
             opponent_name=opponent_name,
         )
 
+    @traced
+    @locks_client_room
+    def wait_for_opponent_join(self, client, timeout=WAIT_TIMEOUT_DEFAULT):
+        """
+        Answers right away if the opponent has joined the room, otherwise registers the client to be notified with
+        an event when the opponent joins or when the timeout expires.
+
+        Args:
+            client (str): The client identifier.
+            timeout (float, optional): Seconds to wait, capped at WAIT_TIMEOUT_MAX. Defaults to WAIT_TIMEOUT_DEFAULT.
+
+        Returns:
+            dict: A response with the opponent's name, or indicating that the client is waiting.
+        """
+        if not self.is_client_in_room(client):
+            return CommandHandler.error_response("Client is not in a room!")
+
+        room = self._get_client_room(client)
+        if room.is_full:
+            return self.has_opponent_joined(client)
+
+        return self._add_waiter(client, room, command_literals.COMMAND_WAIT_FOR_OPPONENT_JOIN, timeout)
+
+    @traced
+    @locks_client_room
+    def wait_for_opponent_ready(self, client, timeout=WAIT_TIMEOUT_DEFAULT):
+        """
+        Answers right away if the opponent has sent the board, otherwise registers the client to be notified with
+        an event when the opponent sends it or when the timeout expires.
+
+        Args:
+            client (str): The client identifier.
+            timeout (float, optional): Seconds to wait, capped at WAIT_TIMEOUT_MAX. Defaults to WAIT_TIMEOUT_DEFAULT.
+
+        Returns:
+            dict: A response with the game's readiness status, or indicating that the client is waiting.
+        """
+        if not self.is_client_in_room(client):
+            return CommandHandler.error_response("Client is not in a room!")
+
+        room = self._get_client_room(client)
+        opponent = room.get_opponent_room_client(client)
+        if opponent is None or room.does_client_have_board(opponent.client):
+            return self.is_opponent_ready(client)
+
+        return self._add_waiter(client, room, command_literals.COMMAND_WAIT_FOR_OPPONENT_READY, timeout)
+
+    def _add_waiter(self, client, room, condition, timeout):
+        """
+        Registers a client that waits for a condition of its room.
+
+        Args:
+            client (str): The client identifier.
+            room (Room): The room instance.
+            condition (str): The wait command naming the condition.
+            timeout (float): Seconds to wait, capped at WAIT_TIMEOUT_MAX. NaN and infinite values are rejected.
+
+        Returns:
+            dict: A response indicating the success or failure of the operation.
+        """
+        if client not in self.event_pushers:
+            return CommandHandler.error_response("Events can not be pushed to the client!")
+
+        try:
+            timeout = float(timeout)
+        except (TypeError, ValueError):
+            return CommandHandler.error_response("Invalid timeout!")
+        if not math.isfinite(timeout):
+            return CommandHandler.error_response("Invalid timeout!")
+
+        timeout = min(max(timeout, 0), self.WAIT_TIMEOUT_MAX)
+        self.wait_registry.add(client, condition, room.room_id, timeout)
+        return CommandHandler.success_response("Waiting for the opponent!", is_waiting=True, timeout=timeout)
+
+    def _notify_waiters(self, room, condition, changed_client):
+        """
+        Pushes the answer to the clients of a room whose wait was fulfilled by a change made by another client.
+
+        Args:
+            room (Room): The room instance.
+            condition (str): The wait command naming the fulfilled condition.
+            changed_client (str): The client whose action changed the room.
+        """
+        for waiter in self.wait_registry.pop_room_waiters(room.room_id, condition, changed_client):
+            if condition == command_literals.COMMAND_WAIT_FOR_OPPONENT_JOIN:
+                opponent_name = room.get_opponent_room_client(waiter.client).client_name
+                event_message = CommandHandler.event_message(
+                    command_literals.EVENT_OPPONENT_JOINED,
+                    f"Opponent {opponent_name} has joined the room!",
+                    opponent_name=opponent_name,
+                )
+            else:
+                room.start_battle()
+                self._schedule_turn_timeout(room)
+                event_message = CommandHandler.event_message(
+                    command_literals.EVENT_OPPONENT_READY,
+                    "Starting game!",
+                    is_turn=room.is_client_turn(waiter.client),
+                    turn_end_time=room.turn_end_time,
+                )
+            self.deliver_event(waiter.client, event_message)
+
+    def expire_waiters(self, now=None):
+        """
+        Notifies the waiting clients whose timeout has expired.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+        """
+        for waiter in self.wait_registry.pop_expired(now):
+            self.deliver_event(
+                waiter.client,
+                CommandHandler.event_message(
+                    command_literals.EVENT_WAIT_TIMEOUT, "Waiting timed out!", command=waiter.condition
+                ),
+            )
+
+    @traced
+    @locks_client_room
     def receive_board(self, client, board_json):
         """
         Receives and validates the board sent by the client.
@@ -211,19 +508,21 @@ class GameServer:
             board_json (str): The board configuration in JSON format.
 
         Returns:
-            str: A JSON response indicating the success or failure of the operation.
+            dict: A response indicating the success or failure of the operation.
         """
         if not self.is_client_in_room(client):
             return CommandHandler.error_response("Client is not in a room!")
 
-        room_id = self.clients_to_rooms.get(client)
-        room = self.rooms[room_id]
+        room = self._get_client_room(client)
 
         if not room.add_board_for_client(client, board_json):
             return CommandHandler.error_response("Invalid board!")
 
+        self._notify_waiters(room, command_literals.COMMAND_WAIT_FOR_OPPONENT_READY, client)
         return CommandHandler.success_response("Board added successfully!")
 
+    @traced
+    @locks_client_room
     def is_opponent_ready(self, client):
         """
         Checks if the opponent is ready and starts the battle if both players are ready.
@@ -232,13 +531,12 @@ class GameServer:
             client (str): The client identifier.
 
         Returns:
-            str: A JSON response indicating the game's readiness status.
+            dict: A response indicating the game's readiness status.
         """
         if not self.is_client_in_room(client):
             return CommandHandler.error_response("Client is not in a room!")
 
-        room_id = self.clients_to_rooms.get(client)
-        room = self.rooms[room_id]
+        room = self._get_client_room(client)
 
         opponent = room.get_opponent_room_client(client)
 
@@ -249,6 +547,7 @@ class GameServer:
             return CommandHandler.error_response("Opponent has no board yet!")
 
         room.start_battle()
+        self._schedule_turn_timeout(room)
 
         return CommandHandler.success_response(
             "Starting game!",
@@ -266,7 +565,7 @@ class GameServer:
             room (Room): The room instance.
 
         Returns:
-            str: A JSON response with battle end details.
+            dict: A response with battle end details.
         """
         return CommandHandler.error_response(
             "The battle has ended!",
@@ -275,6 +574,8 @@ class GameServer:
             is_timeout=room.is_timeout,
         )
 
+    @traced
+    @locks_client_room
     def register_shot(self, client, row, col):
         """
         Registers a shot made by the client and updates the game state.
@@ -285,13 +586,12 @@ class GameServer:
             col (int): The column of the shot.
 
         Returns:
-            str: A JSON response with the result of the shot registration.
+            dict: A response with the result of the shot registration.
         """
         if not self.is_client_in_room(client):
             return CommandHandler.error_response("Client is not in a room!")
 
-        room_id = self.clients_to_rooms.get(client)
-        room = self.rooms[room_id]
+        room = self._get_client_room(client)
 
         if room.has_battle_ended:
             return GameServer._send_end_battle_response(client, room)
@@ -300,7 +600,7 @@ class GameServer:
             return CommandHandler.error_response("Not player's turn!", is_player_turn=False)
 
         if room.is_turn_late():
-            room.end_battle_due_to_timeout()
+            self._end_battle_due_to_timeout(room, client)
             return GameServer._send_end_battle_response(client, room)
 
         if not room.is_client_shot_valid(client, row, col):
@@ -315,6 +615,12 @@ class GameServer:
             room.turn_end_time,
         ) = room.register_shot_for_client(client, row, col)
         is_turn = room.is_client_turn(client)
+        self._push_opponents_shot(room, room.get_opponent_room_client(client).client)
+        if has_battle_ended:
+            self.turn_deadlines.cancel(room.room_id)
+            self._schedule_room_reaping(room)
+        else:
+            self._schedule_turn_timeout(room)
 
         return CommandHandler.success_response(
             "Shot registered!",
@@ -328,6 +634,71 @@ class GameServer:
             is_timeout=room.is_timeout,
         )
 
+    def _schedule_turn_timeout(self, room):
+        """
+        Schedules the end of the battle at the deadline of the current turn, replacing the previous turn's deadline.
+
+        Args:
+            room (Room): The room instance.
+        """
+        if room.turn_deadline is not None and not room.has_battle_ended:
+            self.turn_deadlines.schedule(room.room_id, room.turn_deadline)
+
+    def end_expired_turns(self, now=None):
+        """
+        Ends the battles whose current turn has run out of time and notifies both players.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+        """
+        for room_id in self.turn_deadlines.pop_due(now):
+            room = self.rooms.get(room_id)
+            if room is None:
+                continue
+
+            with room.lock:
+                if self.rooms.get(room_id) is not room or room.has_battle_ended:
+                    continue
+
+                room.is_timeout = True
+                self._end_battle_due_to_timeout(room)
+
+    def _end_battle_due_to_timeout(self, room, responding_client=None):
+        """
+        Ends a battle because the turn ran out of time and pushes the end to the players.
+
+        Args:
+            room (Room): The room instance.
+            responding_client (str, optional): The client that learns about the end from the response to its
+                command and is not pushed an event. Defaults to None.
+        """
+        room.end_battle_due_to_timeout()
+        self.turn_deadlines.cancel(room.room_id)
+        self._schedule_room_reaping(room)
+
+        for client in room.clients:
+            if client != responding_client:
+                self._push_battle_end(room, client)
+
+    def get_housekeeping_delay(self, now=None):
+        """
+        Returns how long the housekeeping can sleep, which is until the next turn deadline but at most
+        HOUSEKEEPING_INTERVAL seconds.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+
+        Returns:
+            float: The number of seconds to sleep.
+        """
+        now = monotonic() if now is None else now
+        next_deadline = self.turn_deadlines.get_next_deadline()
+        if next_deadline is None:
+            return self.HOUSEKEEPING_INTERVAL
+        return min(max(next_deadline - now, 0), self.HOUSEKEEPING_INTERVAL)
+
+    @traced
+    @locks_client_room
     def send_opponents_shot(self, client):
         """
         Sends the last shot made by the opponent to the client.
@@ -336,42 +707,270 @@ class GameServer:
             client (str): The client identifier.
 
         Returns:
-            str: A JSON response with the opponent's last shot details.
+            dict: A response with the opponent's last shot details.
         """
         if not self.is_client_in_room(client):
             return CommandHandler.error_response("Client is not in a room!")
 
-        room_id = self.clients_to_rooms.get(client)
-        room = self.rooms[room_id]
+        room = self._get_client_room(client)
 
         if room.is_turn_late():
-            room.end_battle_due_to_timeout()
+            if not room.has_battle_ended:
+                self._end_battle_due_to_timeout(room, client)
             return GameServer._send_end_battle_response(client, room)
 
         last_shot = room.give_shot_from_history(client)
         if last_shot is None:
             return CommandHandler.error_response("Client has not made a shot yet!")
 
-        (
-            row,
-            col,
-            is_turn,
-            has_battle_ended,
-            is_winner,
-            turn_end_time,
-        ) = last_shot
-
+        room.event_log.acknowledge(client, last_shot.sequence)
         return CommandHandler.success_response(
-            "Shot was made by the opponent!",
-            row=row,
-            col=col,
-            is_turn=is_turn,
-            turn_end_time=turn_end_time,
-            has_battle_ended=has_battle_ended,
-            is_winner=is_winner,
-            is_timeout=room.is_timeout,
+            self.LOGGED_EVENT_MESSAGES[last_shot.event], **self._get_logged_event_args(last_shot)
         )
 
+    @traced
+    @locks_client_room
+    def fetch_events(self, client, after_sequence=None, limit=None):
+        """
+        Sends the events of the client's room that the client has not acknowledged. Fetching acknowledges the events
+        up to the given sequence number, so events delivered before but lost are sent again until acknowledged.
+
+        Args:
+            client (str): The client identifier.
+            after_sequence (int, optional): The sequence number of the last event the client has received. Defaults
+                to None, meaning that nothing new is acknowledged.
+            limit (int, optional): The maximal number of events to send. Defaults to None, meaning all of them.
+
+        Returns:
+            dict: A response with the events, as they are pushed, and the last sequence number of the room.
+        """
+        if not self.is_client_in_room(client):
+            return CommandHandler.error_response("Client is not in a room!")
+
+        if not all(value is None or type(value) is int for value in (after_sequence, limit)):  # pylint: disable=C0123
+            return CommandHandler.error_response("Invalid event cursor!")
+
+        room = self._get_client_room(client)
+        events = [
+            CommandHandler.event_message(
+                logged_event.event,
+                self.LOGGED_EVENT_MESSAGES[logged_event.event],
+                **self._get_logged_event_args(logged_event),
+            )
+            for logged_event in room.event_log.read(client, after_sequence, limit)
+        ]
+        return CommandHandler.success_response("Events fetched!", events=events, last_sequence=room.event_log.last_sequence)
+
+    @staticmethod
+    def _get_logged_event_args(logged_event):
+        """
+        Builds the arguments of an event of the event log, including its sequence number.
+
+        Args:
+            logged_event (LoggedEvent): The event.
+
+        Returns:
+            dict: The arguments.
+        """
+        return {**logged_event.args, "sequence": logged_event.sequence}
+
+    def register_event_pusher(self, client, pusher):
+        """
+        Registers the function that delivers pushed events to a client over its transport.
+
+        Args:
+            client (str): The client identifier.
+            pusher (callable): Function accepting an event.
+        """
+        self.event_pushers[client] = pusher
+
+    def unregister_event_pusher(self, client):
+        """
+        Removes the event pusher, the subscription and the wait of a client, for example when it disconnects.
+
+        Args:
+            client (str): The client identifier.
+        """
+        self.event_pushers.pop(client, None)
+        self.event_subscribers.discard(client)
+        self.wait_registry.remove(client)
+
+    @traced
+    def subscribe_events(self, client):
+        """
+        Subscribes the client to pushed events instead of polling for the opponent's shots.
+
+        Args:
+            client (str): The client identifier.
+
+        Returns:
+            dict: A response indicating the success or failure of the operation.
+        """
+        if client not in self.event_pushers:
+            return CommandHandler.error_response("Events can not be pushed to the client!")
+
+        self.event_subscribers.add(client)
+        return CommandHandler.success_response("Subscribed to events!")
+
+    @traced
+    def negotiate_codec(self, client, codecs):
+        """
+        Chooses the codec of the messages sent to the client from the ones it supports. The response to the
+        negotiation is still sent with the previous codec, the following messages with the chosen one.
+
+        Args:
+            client (str): The client identifier.
+            codecs (list): The names of the codecs the client supports, preferred first.
+
+        Returns:
+            dict: A response with the name of the chosen codec, or an error response listing the supported ones.
+        """
+        codec = choose_codec(codecs if isinstance(codecs, list) else [])
+        if codec is None:
+            return CommandHandler.error_response("No supported codec!", codecs=list(CODECS))
+
+        self.client_codecs[client] = codec
+        return CommandHandler.success_response(f"Using the {codec.NAME} codec!", codec=codec.NAME)
+
+    def encode_for_client(self, client, message):
+        """
+        Encodes a response or an event with the codec negotiated by a client, JSON by default.
+
+        Args:
+            client (str): The client identifier.
+            message (dict): The response or the event.
+
+        Returns:
+            bytes: The encoded message.
+        """
+        return self.client_codecs.get(client, JSON_CODEC).encode(message)
+
+    def create_rate_limiter(self):
+        """
+        Creates the rate limiter of a new connection of a network server.
+
+        Returns:
+            ConnectionRateLimiter: The limiter, or None if the connections are not limited.
+        """
+        return None if self.rate_limit_policy is None else self.rate_limit_policy.create_limiter()
+
+    @traced
+    def handle_message(self, client, data, rate_limiter=None):
+        """
+        Handles a command received by a network server. Commands are accepted in any codec, and the response is
+        encoded with the codec the client had negotiated before the command. A command over the limits of its
+        connection is rejected before it is decoded, and the commands of a batch are limited one by one.
+
+        Args:
+            client (str): The client identifier.
+            data (bytes): The encoded command.
+            rate_limiter (ConnectionRateLimiter, optional): The limiter of the client's connection. Defaults to None,
+                meaning that the command is not limited.
+
+        Returns:
+            bytes: The encoded response.
+        """
+        codec = self.client_codecs.get(client, JSON_CODEC)
+        if rate_limiter is not None:
+            exhausted_limit = rate_limiter.check(data)
+            if exhausted_limit is not None:
+                if self.metrics is not None:
+                    self.metrics.record_rejection(exhausted_limit)
+                return codec.encode(CommandHandler.rate_limited_response(exhausted_limit))
+
+        try:
+            with span("decode_message", size=len(data)):
+                command_data = decode_message(data)
+        except CodecError as exception:
+            return codec.encode(CommandHandler.error_response(str(exception)))
+
+        response = self.command_handler.handle_command_data(command_data, client, rate_limiter)
+        with span("encode_response", codec=codec.NAME):
+            return codec.encode(response)
+
+    def push_event(self, client, event_message):
+        """
+        Pushes an event to a subscribed client.
+
+        Args:
+            client (str): The client identifier.
+            event_message (dict): The event.
+
+        Returns:
+            bool: True if the event was pushed, False otherwise.
+        """
+        if client not in self.event_subscribers:
+            return False
+
+        return self.deliver_event(client, event_message)
+
+    def deliver_event(self, client, event_message):
+        """
+        Delivers an event through the pusher of a client, whether or not it is subscribed.
+
+        Args:
+            client (str): The client identifier.
+            event_message (dict): The event.
+
+        Returns:
+            bool: True if the event was delivered, False otherwise.
+        """
+        pusher = self.event_pushers.get(client)
+        if pusher is None:
+            return False
+
+        try:
+            pusher(event_message)
+        except OSError as exception:
+            LOGGER.warning("Could not push event: %s", exception)
+            self.unregister_event_pusher(client)
+            return False
+
+        return True
+
+    def _push_opponents_shot(self, room, client):
+        """
+        Pushes the pending opponent's shot to a subscribed client, marking it as delivered in the event log.
+
+        Args:
+            room (Room): The room instance.
+            client (str): The client that was shot at.
+        """
+        if client not in self.event_subscribers:
+            return
+
+        last_shot = room.give_shot_from_history(client)
+        if last_shot is None:
+            return
+
+        self.push_event(
+            client,
+            CommandHandler.event_message(
+                last_shot.event, self.LOGGED_EVENT_MESSAGES[last_shot.event], **self._get_logged_event_args(last_shot)
+            ),
+        )
+
+    def _push_battle_end(self, room, client):
+        """
+        Pushes the end of the battle to a subscribed client.
+
+        Args:
+            room (Room): The room instance.
+            client (str): The client to notify.
+        """
+        self.push_event(
+            client,
+            CommandHandler.event_message(
+                command_literals.EVENT_BATTLE_END,
+                "The battle has ended!",
+                has_battle_ended=room.has_battle_ended,
+                is_winner=room.is_client_winner(client),
+                is_timeout=room.is_timeout,
+            ),
+        )
+
+    @traced
+    @locks_client_room
     def send_enemy_board(self, client):
         """
         Sends the enemy's board to the client if the battle has ended.
@@ -380,21 +979,331 @@ class GameServer:
             client (str): The client identifier.
 
         Returns:
-            str: A JSON response with the enemy's board data.
+            dict: A response with the enemy's board data.
         """
         if not self.is_client_in_room(client):
             return CommandHandler.error_response("Client is not in a room!")
 
-        room_id = self.clients_to_rooms.get(client)
-        room = self.rooms[room_id]
+        room = self._get_client_room(client)
 
         if not room.has_battle_ended:
             return CommandHandler.error_response("Battle is still going!")
 
         enemy_board_data = room.get_enemy_board(client)
+        self._record_revealed_board(room.clients[client], enemy_board_data)
 
         return CommandHandler.success_response("Return the enemy board!", enemy_board_data=enemy_board_data)
 
+    def _record_revealed_board(self, room_client, enemy_board_data):
+        """
+        Records the enemy board revealed to a client in the placement heatmap, once per client.
+
+        Args:
+            room_client (RoomClient): The room client the board was revealed to.
+            enemy_board_data (str): The serialized enemy board.
+        """
+        if self.placement_heatmap is None or room_client.has_recorded_enemy_board:
+            return
+
+        room_client.has_recorded_enemy_board = True
+        self.placement_heatmap.record_board(enemy_board_data)
+
+    def _lock_client_room(self, client):
+        """
+        Acquires the lock of the room a client is in. The room is looked up again once the lock is held, in case
+        it was removed or the client left it in the meantime.
+
+        Args:
+            client (str): The client identifier.
+
+        Returns:
+            Room: The locked room, or None if the client is not in a room.
+        """
+        while True:
+            room_id = self.clients_to_rooms.get(client)
+            room = self.rooms.get(room_id) if room_id is not None else None
+            if room is None:
+                return None
+
+            room.lock.acquire()
+            if self.clients_to_rooms.get(client) == room_id and self.rooms.get(room_id) is room:
+                return room
+            room.lock.release()
+
+    def _get_client_room(self, client):
+        """
+        Returns the room of a client and records the client's activity in it.
+
+        Args:
+            client (str): The client identifier, which has to be in a room.
+
+        Returns:
+            Room: The room instance.
+        """
+        room = self.rooms[self.clients_to_rooms[client]]
+        room.touch()
+        return room
+
+    def _get_room_timeout(self, room):
+        """
+        Returns the number of inactive seconds after which a room is reaped, depending on its state.
+
+        Args:
+            room (Room): The room instance.
+
+        Returns:
+            float: The timeout in seconds.
+        """
+        if room.are_all_clients_disconnected():
+            return self.ROOM_ORPHANED_TIMEOUT
+        if room.has_battle_ended:
+            return self.ROOM_FINISHED_TIMEOUT
+        return self.ROOM_IDLE_TIMEOUT
+
+    def _schedule_room_reaping(self, room, now=None):
+        """
+        Schedules the reaping of a room after its timeout counted from its last activity.
+
+        Args:
+            room (Room): The room instance.
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+        """
+        now = monotonic() if now is None else now
+        delay = room.last_activity_time + self._get_room_timeout(room) - now
+        self.room_reaper.schedule(room.room_id, delay, now)
+
+    def reap_rooms(self, now=None):
+        """
+        Removes the idle, finished and orphaned rooms whose timeout has expired. Rooms that were active since their
+        timer was scheduled get a new timer instead, so activity itself never touches the timer wheel.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+        """
+        now = monotonic() if now is None else now
+        for room_id in self.room_reaper.advance(now):
+            room = self.rooms.get(room_id)
+            if room is None:
+                continue
+
+            with room.lock:
+                if self.rooms.get(room_id) is not room:
+                    continue
+
+                if room.last_activity_time + self._get_room_timeout(room) <= now:
+                    LOGGER.info("Reaping room %s", room_id)
+                    self._remove_room(room_id)
+                else:
+                    self._schedule_room_reaping(room, now)
+
+    def _remove_room(self, room_id):
+        """
+        Removes a room together with the mappings of its clients, its matchmaking entry, waits and timer. The lock
+        of the room has to be held.
+
+        Args:
+            room_id (str): The ID of the room.
+        """
+        room = self.rooms.pop(room_id)
+        for client in room.clients:
+            self.clients_to_rooms.remove_if_equal(client, room_id)
+
+        self.room_directory.unregister_room(room_id)
+        self.wait_registry.remove_room(room_id)
+        self.room_reaper.cancel(room_id)
+        self.turn_deadlines.cancel(room_id)
+
+    def open_session(self, close_connection=None):
+        """
+        Opens the session of a new connection of a network server. The transport uses the `client` of the session
+        as the client identifier, reading it again for every message since it changes when the session is resumed.
+
+        Args:
+            close_connection (callable, optional): Closes the connection, called when another connection takes the
+                session over. Defaults to None.
+
+        Returns:
+            ClientSession: The session.
+        """
+        return self.sessions.open(close_connection)
+
+    @staticmethod
+    def get_greeting(session):
+        """
+        Returns the greeting sent on a new connection, which gives the client the token of its session.
+
+        Args:
+            session (ClientSession): The session of the connection.
+
+        Returns:
+            bytes: The greeting, encoded with JSON since no codec is negotiated yet.
+        """
+        return JSON_CODEC.encode(CommandHandler.success_response("Connected!", session_token=session.client))
+
+    @traced
+    def resume_session(self, client, session_token):
+        """
+        Moves the connection of a client to the session of a lost connection, so the client continues in the room
+        of that session. The events the client missed are fetched afterwards with `fetch_events`. A connection that
+        still holds the session, which is half-open if the client reconnected, is closed and its events go to the
+        new connection.
+
+        Args:
+            client (str): The client identifier of the new connection.
+            session_token (str): The token of the session to resume.
+
+        Returns:
+            dict: A response with the token of the resumed session, or an error response if the session expired.
+        """
+        if session_token == client:
+            return CommandHandler.success_response("Session resumed!", session_token=client)
+        if not isinstance(session_token, str):
+            return CommandHandler.error_response("Session not found!")
+        if self.is_client_in_room(client):
+            return CommandHandler.error_response("Client is already in a room!")
+
+        room = self._lock_client_room(session_token)
+        try:
+            if not self.sessions.resume(client, session_token):
+                return CommandHandler.error_response("Session not found!")
+
+            self.unregister_event_pusher(session_token)
+            self.client_codecs.pop(session_token, None)
+            pusher = self.event_pushers.pop(client, None)
+            if pusher is not None:
+                self.event_pushers[session_token] = pusher
+            if client in self.event_subscribers:
+                self.event_subscribers.discard(client)
+                self.event_subscribers.add(session_token)
+            codec = self.client_codecs.pop(client, None)
+            if codec is not None:
+                self.client_codecs[session_token] = codec
+            if room is not None:
+                room.touch()
+
+            LOGGER.debug("Resumed session, in room %s", None if room is None else room.room_id)
+            return CommandHandler.success_response("Session resumed!", session_token=session_token)
+        finally:
+            if room is not None:
+                room.lock.release()
+
+    @locks_client_room
+    def client_disconnected(self, client):
+        """
+        Forgets the connection of a disconnected client. The session of a client in a room is kept for
+        SESSION_GRACE_PERIOD seconds, so a new connection can resume it, and the client leaves the room once the
+        session expires.
+
+        Args:
+            client (str): The client identifier.
+        """
+        self.unregister_event_pusher(client)
+        self.client_codecs.pop(client, None)
+        if not self.is_client_in_room(client):
+            self.sessions.close(client)
+            return
+
+        if not self.sessions.disconnect(client, self.SESSION_GRACE_PERIOD):
+            self._leave_room_on_disconnect(client)
+
+    def expire_sessions(self, now=None):
+        """
+        Makes the clients whose session expired without being resumed leave their rooms.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+        """
+        for client in self.sessions.pop_expired(now):
+            self._expire_session(client)
+
+    @locks_client_room
+    def _expire_session(self, client):
+        """
+        Makes a client whose session expired leave its room, if the room still exists.
+
+        Args:
+            client (str): The client identifier.
+        """
+        if self.is_client_in_room(client):
+            LOGGER.debug("Session expired")
+            self._leave_room_on_disconnect(client)
+
+    def _leave_room_on_disconnect(self, client):
+        """
+        Marks a disconnected client as gone from its room. The room is kept for the opponent and reaped soon once
+        every client of it has disconnected. The lock of the room has to be held.
+
+        Args:
+            client (str): The client identifier.
+        """
+        room = self.rooms[self.clients_to_rooms.pop(client)]
+        self.room_directory.remove_client(self._get_directory_client_key(client))
+        room.clients[client].is_connected = False
+        room.touch()
+
+        if room.are_all_clients_disconnected():
+            self.room_directory.remove_open_room(room.room_id)
+            self._schedule_room_reaping(room)
+
+    @traced
+    def run_housekeeping(self, now=None):
+        """
+        Ends the expired turns, expires the waits and the sessions of the clients and reaps the expired rooms. Called
+        by the network servers after sleeping for `get_housekeeping_delay`.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+        """
+        self.end_expired_turns(now)
+        self.expire_waiters(now)
+        self.expire_sessions(now)
+        self.reap_rooms(now)
+
+    def enable_metrics(self):
+        """
+        Starts recording the number, errors and latency of the handled commands.
+
+        Returns:
+            ServerMetrics: The metrics of the server.
+        """
+        if self.metrics is None:
+            self.metrics = self.command_handler.metrics = ServerMetrics()
+        return self.metrics
+
+    def get_gauges(self):
+        """
+        Reads the gauges of the server's state: the rooms, the rooms in every phase, the connections and the events
+        kept in the event logs of the rooms.
+
+        Returns:
+            dict: The gauges.
+        """
+        rooms_by_phase = {"waiting": 0, "placement": 0, "battle": 0, "ended": 0}
+        event_log_depth = 0
+        rooms = self.rooms.values()
+        for room in rooms:
+            with room.lock:
+                rooms_by_phase[room.get_phase()] += 1
+                event_log_depth += room.event_log.get_depth()
+
+        return {
+            "rooms": len(rooms),
+            "rooms_by_phase": rooms_by_phase,
+            "clients_in_rooms": len(self.clients_to_rooms),
+            "connections": self.sessions.get_connected_count(),
+            "event_subscribers": len(self.event_subscribers),
+            "event_log_depth": event_log_depth,
+        }
+
+    def get_metrics_snapshot(self):
+        """
+        Returns the metrics of the handled commands, empty unless they are enabled, and the gauges.
+
+        Returns:
+            dict: The snapshot, see `ServerMetrics.get_snapshot`.
+        """
+        return (self.metrics or ServerMetrics()).get_snapshot(self.get_gauges())
+
     def is_client_in_room(self, client):
         """
         Checks if a client is currently in a room.
@@ -432,7 +1341,15 @@ class SinglePlayerServer(GameServer):
         Initializes the SinglePlayerServer instance.
         """
         super().__init__()
-        self.battle_bot = BattleBot(OfflineNetwork(is_player=False))
+        placement_prior = PlacementHeatmap(PlacementHeatmap.DEFAULT_STORAGE_PATH).get_prior(
+            BaseBoard.BOARD_ROWS_DEFAULT, BaseBoard.BOARD_COLS_DEFAULT
+        )
+        self.battle_bot = BattleBot(
+            OfflineNetwork(is_player=False),
+            placement_prior=placement_prior,
+            placement_strategy=AdversarialPlacementStrategy(placement_prior),
+            density_cache=DensityGridCache(),
+        )
         self.battle_bot.network_client.add_server_instance(self)
 
     def set_up_game_room(self, player):
@@ -450,26 +1367,50 @@ class SinglePlayerServer(GameServer):
         self.battle_bot.send_board()
 
         room_id = response["args"]["room_id"]
+        self.register_event_pusher("Player", player.network_client.push)
 
         return room_id
 
-    def handle_offline_client(self, command, is_player):
+    def handle_offline_client(self, command_data, is_player):
         """
-        Handles commands from the offline client (battle bot).
+        Handles a command of an offline client, passed in process without being encoded. The command handler is the
+        one of the network servers, so the commands behave the same. The battle bot plays its turns once the player
+        has shot.
 
         Args:
-            command (str): The command in JSON format.
+            command_data (dict): The command, with the "command" name and its "args".
             is_player (bool): Indicates if the command is from a player.
 
         Returns:
-            str: A JSON response from the command handler.
+            dict: The response from the command handler.
         """
         client = self.battle_bot.name if not is_player else "Player"
-        response = self.command_handler.handle_command(command, client)
+        response = self.command_handler.handle_command_data(command_data, client)
 
-        if is_player:
-            command_json = json.loads(command)
-            if command_json.get("command") == command_literals.COMMAND_REGISTER_SHOT:
-                self.battle_bot.start_main_loop()
+        if is_player and self._has_shot_command(command_data):
+            self.battle_bot.start_main_loop()
 
         return response
+
+    @staticmethod
+    def _has_shot_command(command_data):
+        """
+        Checks if a command is a shot or a batch containing a shot.
+
+        Args:
+            command_data (dict): The command, with the "command" name and its "args".
+
+        Returns:
+            bool: True if the command registers a shot, False otherwise.
+        """
+        command = command_data.get("command")
+        if command == command_literals.COMMAND_REGISTER_SHOT:
+            return True
+        if command != command_literals.COMMAND_BATCH:
+            return False
+
+        commands = command_data.get("args", {}).get("commands")
+        return isinstance(commands, list) and any(
+            isinstance(batched_command, dict) and batched_command.get("command") == command_literals.COMMAND_REGISTER_SHOT
+            for batched_command in commands
+        )
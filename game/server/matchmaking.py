@@ -0,0 +1,112 @@
+"""
+Module for the index of the rooms that can be joined with a random join. Every bucket, for example a skill level or
+a region, keeps its own queue of open public rooms, so finding a room to join does not depend on the number of rooms.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class MatchmakingQueue:
+    """
+    Thread-safe FIFO queues of open public room IDs, one per bucket. The oldest open room of a bucket is matched
+    first.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty MatchmakingQueue.
+        """
+        self.buckets = {}
+        self.rooms_to_buckets = {}
+        self.lock = threading.RLock()
+
+    def add(self, room_id, bucket=None):
+        """
+        Adds an open room to the end of the queue of its bucket. Adding a room that is queued does nothing.
+
+        Args:
+            room_id (str): The ID of the room.
+            bucket (str, optional): The bucket of the room. Defaults to None, the default bucket.
+        """
+        with self.lock:
+            if room_id in self.rooms_to_buckets:
+                return
+
+            self.rooms_to_buckets[room_id] = bucket
+            self.buckets.setdefault(bucket, OrderedDict())[room_id] = None
+
+    def remove(self, room_id):
+        """
+        Removes a room from the queue if it is queued.
+
+        Args:
+            room_id (str): The ID of the room.
+
+        Returns:
+            bool: True if the room was queued, False otherwise.
+        """
+        with self.lock:
+            if room_id not in self.rooms_to_buckets:
+                return False
+
+            bucket = self.rooms_to_buckets.pop(room_id)
+            bucket_rooms = self.buckets[bucket]
+            del bucket_rooms[room_id]
+            if not bucket_rooms:
+                self.buckets.pop(bucket)
+            return True
+
+    def peek(self, bucket=None):
+        """
+        Returns the oldest open room of a bucket without removing it.
+
+        Args:
+            bucket (str, optional): The bucket to match in. Defaults to None, the default bucket.
+
+        Returns:
+            str: The ID of the room, or None if the bucket has no open rooms.
+        """
+        with self.lock:
+            bucket_rooms = self.buckets.get(bucket)
+            return next(iter(bucket_rooms)) if bucket_rooms else None
+
+    def pop(self, bucket=None):
+        """
+        Removes and returns the oldest open room of a bucket.
+
+        Args:
+            bucket (str, optional): The bucket to match in. Defaults to None, the default bucket.
+
+        Returns:
+            str: The ID of the room, or None if the bucket has no open rooms.
+        """
+        with self.lock:
+            bucket_rooms = self.buckets.get(bucket)
+            if not bucket_rooms:
+                return None
+
+            room_id = next(iter(bucket_rooms))
+            self.remove(room_id)
+            return room_id
+
+    def __contains__(self, room_id):
+        """
+        Checks if a room is queued.
+
+        Args:
+            room_id (str): The ID of the room.
+
+        Returns:
+            bool: True if the room is queued, False otherwise.
+        """
+        return room_id in self.rooms_to_buckets
+
+    def __len__(self):
+        """
+        Returns the number of queued rooms.
+
+        Returns:
+            int: The number of queued rooms.
+        """
+        return len(self.rooms_to_buckets)
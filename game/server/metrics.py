@@ -0,0 +1,333 @@
+"""
+Module for the metrics of the game servers: the number, errors and latency of the handled commands, and gauges of
+the server's state read when the metrics are requested. Nothing is measured until the metrics of a server are
+enabled, and the gauges cost nothing between two requests. The metrics can be served on a local HTTP endpoint, as
+text at /metrics and as JSON at /metrics.json.
+"""
+
+import bisect
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _get_bucket_bounds(lowest, highest, sub_buckets):
+    """
+    Returns the upper bounds of log-linear buckets: every doubling of the value is split in `sub_buckets` buckets
+    of equal width, so the relative error of a bucket is at most 1 / `sub_buckets`.
+
+    Args:
+        lowest (float): The upper bound of the first bucket.
+        highest (float): The value the last bound reaches.
+        sub_buckets (int): The number of buckets per doubling.
+
+    Returns:
+        list: The increasing upper bounds.
+    """
+    bounds = []
+    power = lowest
+    while power < highest:
+        bounds.extend(power * (1 + index / sub_buckets) for index in range(sub_buckets))
+        power *= 2
+    bounds.append(power)
+    return bounds
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations over fixed buckets, from one microsecond to about two minutes with a relative error of
+    at most 25%. Recording costs one binary search and does not allocate.
+    """
+
+    BUCKET_BOUNDS = _get_bucket_bounds(0.000001, 100, 4)
+
+    def __init__(self):
+        """
+        Initializes an empty LatencyHistogram.
+        """
+        self.counts = [0] * (len(self.BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, duration):
+        """
+        Records a duration.
+
+        Args:
+            duration (float): The duration in seconds.
+        """
+        self.counts[bisect.bisect_left(self.BUCKET_BOUNDS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.maximum:
+            self.maximum = duration
+
+    def merge(self, other):
+        """
+        Adds the durations recorded by another histogram, for example one filled by another process.
+
+        Args:
+            other (LatencyHistogram): The other histogram.
+        """
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+
+    def get_percentile(self, percentile):
+        """
+        Returns an upper estimate of a percentile, the upper bound of the bucket holding it.
+
+        Args:
+            percentile (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The duration in seconds, or None if nothing was recorded.
+        """
+        if self.count == 0:
+            return None
+
+        rank = max(percentile / 100 * self.count, 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+
+        return min(self.BUCKET_BOUNDS[index], self.maximum) if index < len(self.BUCKET_BOUNDS) else self.maximum
+
+    def get_summary(self):
+        """
+        Returns the statistics of the histogram in milliseconds.
+
+        Returns:
+            dict: The number of durations and the mean, median, 95th and 99th percentile and maximal durations.
+        """
+
+        def to_milliseconds(seconds):
+            return None if seconds is None else round(seconds * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean_ms": to_milliseconds(self.total / self.count if self.count else None),
+            "p50_ms": to_milliseconds(self.get_percentile(50)),
+            "p95_ms": to_milliseconds(self.get_percentile(95)),
+            "p99_ms": to_milliseconds(self.get_percentile(99)),
+            "max_ms": to_milliseconds(self.maximum if self.count else None),
+        }
+
+
+class CommandStatistics:
+    """
+    The number of calls, the number of errors and the latency of one command.
+    """
+
+    def __init__(self):
+        """
+        Initializes empty CommandStatistics.
+        """
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    def get_summary(self):
+        """
+        Returns the statistics of the command.
+
+        Returns:
+            dict: The latency summary, with the number of errors.
+        """
+        summary = self.latency.get_summary()
+        summary["errors"] = self.errors
+        return summary
+
+
+class ServerMetrics:
+    """
+    Thread-safe metrics of the commands handled by a server. The commands of a batch are recorded on their own and
+    within the batch.
+    """
+
+    def __init__(self):
+        """
+        Initializes empty ServerMetrics.
+        """
+        self.commands = {}
+        self.rejections = {}
+        self.lock = threading.Lock()
+
+    def record_command(self, command, duration, is_error):
+        """
+        Records a handled command.
+
+        Args:
+            command (str): The name of the command.
+            duration (float): The time taken to handle the command, in seconds.
+            is_error (bool): Whether the command was answered with an error.
+        """
+        with self.lock:
+            statistics = self.commands.get(command)
+            if statistics is None:
+                statistics = self.commands[command] = CommandStatistics()
+            statistics.latency.record(duration)
+            if is_error:
+                statistics.errors += 1
+
+    def record_rejection(self, limit):
+        """
+        Records a command rejected by the rate limits of its connection.
+
+        Args:
+            limit (str): The name of the exhausted limit, "connection" or the name of the command.
+        """
+        with self.lock:
+            self.rejections[limit] = self.rejections.get(limit, 0) + 1
+
+    def get_snapshot(self, gauges=None):
+        """
+        Returns the current metrics.
+
+        Args:
+            gauges (dict, optional): The gauges of the server's state to include. Defaults to None.
+
+        Returns:
+            dict: The statistics of every command under "commands", the commands rejected by every rate limit under
+                "rate_limited", and the gauges under "gauges".
+        """
+        with self.lock:
+            commands = {command: statistics.get_summary() for command, statistics in sorted(self.commands.items())}
+            rejections = dict(sorted(self.rejections.items()))
+        return {"commands": commands, "rate_limited": rejections, "gauges": gauges or {}}
+
+    @staticmethod
+    def format_text(snapshot):
+        """
+        Formats a snapshot in the Prometheus text format.
+
+        Args:
+            snapshot (dict): The snapshot, see `get_snapshot`.
+
+        Returns:
+            str: One "name{labels} value" line per metric.
+        """
+        lines = []
+        for command, summary in snapshot["commands"].items():
+            for key, value in summary.items():
+                if value is not None:
+                    lines.append(f'battleships_command_{key}{{command="{command}"}} {value}')
+
+        for limit, count in snapshot["rate_limited"].items():
+            lines.append(f'battleships_rate_limited{{limit="{limit}"}} {count}')
+
+        for name, value in snapshot["gauges"].items():
+            if isinstance(value, dict):
+                lines.extend(f'battleships_{name}{{key="{key}"}} {item}' for key, item in value.items())
+            else:
+                lines.append(f"battleships_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsEndpoint:
+    """
+    Local HTTP endpoint serving the metrics of a server on its own thread, as text at /metrics and as JSON at
+    /metrics.json.
+    """
+
+    DEFAULT_HOST = "localhost"
+
+    def __init__(self, server, port, host=DEFAULT_HOST):
+        """
+        Initializes the MetricsEndpoint and binds its socket.
+
+        Args:
+            server (GameServer): The server whose metrics are served. Its metrics must be enabled.
+            port (int): The port to listen on, 0 picks a free one.
+            host (str, optional): The address to listen on. Defaults to DEFAULT_HOST.
+        """
+        game_server = server
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            """
+            Answers the requests of the metrics.
+            """
+
+            def do_GET(self):  # pylint: disable=C0103
+                """
+                Answers a GET request with the metrics.
+                """
+                if self.path == "/metrics":
+                    body = ServerMetrics.format_text(game_server.get_metrics_snapshot())
+                    content_type = "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(game_server.get_metrics_snapshot())
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):  # pylint: disable=W0622
+                """
+                Logs the requests at the DEBUG level instead of writing them to stderr.
+                """
+                LOGGER.debug(format, *args)
+
+        self.http_server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        self.port = self.http_server.server_address[1]
+        self.thread = None
+
+    def start(self):
+        """
+        Starts serving the metrics on a daemon thread.
+        """
+        self.thread = threading.Thread(target=self.http_server.serve_forever, name="metrics-endpoint", daemon=True)
+        self.thread.start()
+        LOGGER.info("Metrics served on http://%s:%s/metrics", *self.http_server.server_address[:2])
+
+    def close(self):
+        """
+        Stops serving the metrics and closes the socket.
+        """
+        if self.thread is not None:
+            self.http_server.shutdown()
+            self.thread.join()
+        self.http_server.server_close()
+
+
+def add_metrics_arguments(parser):
+    """
+    Adds the metrics options of the servers to a command line parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser.
+    """
+    parser.add_argument(
+        "--metrics-port", type=int, default=None, help="Serve the metrics on localhost at this port, disabled if unset."
+    )
+
+
+def start_metrics_endpoint(server, port):
+    """
+    Enables the metrics of a server and serves them on a local endpoint.
+
+    Args:
+        server (GameServer): The server.
+        port (int): The port to listen on.
+
+    Returns:
+        MetricsEndpoint: The started endpoint.
+    """
+    server.enable_metrics()
+    endpoint = MetricsEndpoint(server, port)
+    endpoint.start()
+    return endpoint
@@ -1,8 +1,19 @@
 """Module that creates a server for managing multiplayer game sessions with network communication."""
 
+import argparse
+import logging
 import socket
+import time
 from _thread import start_new_thread
 from game.server.game_server import GameServer
+from game.server.framing import encode_frame, recv_frame
+from game.server.flow_control import SendQueue
+from game.players.placement_heatmap import PlacementHeatmap
+from game.server.metrics import add_metrics_arguments, start_metrics_endpoint
+from game.logging_setup import add_logging_arguments, configure_logging
+from game.tracing import add_tracing_arguments, configure_tracing
+
+LOGGER = logging.getLogger(__name__)
 
 
 class MultiplayerServer(GameServer):
@@ -15,15 +26,29 @@ class MultiplayerServer(GameServer):
 
     TIME_PER_TURN = 60
 
-    def __init__(self):
+    DEFAULT_HOST = "localhost"
+    DEFAULT_PORT = 5555
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, room_directory=None):
         """
         Initializes the MultiplayerServer instance and sets up the server socket.
 
         Configures the server to listen for incoming client connections on a specified address and port.
+
+        Args:
+            host (str, optional): The address to listen on. Defaults to DEFAULT_HOST.
+            port (int, optional): The port to listen on. Defaults to DEFAULT_PORT.
+            room_directory (RoomDirectory, optional): Directory of the rooms shared with the other server nodes.
+                Defaults to None, meaning that the rooms are not shared.
         """
-        super().__init__(self.TIME_PER_TURN)
-        self.server = "localhost"
-        self.port = 5555
+        super().__init__(
+            self.TIME_PER_TURN,
+            PlacementHeatmap(PlacementHeatmap.DEFAULT_STORAGE_PATH),
+            room_directory,
+            f"{host}:{port}",
+        )
+        self.server = host
+        self.port = port
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.setup_server()
 
@@ -38,9 +63,9 @@ class MultiplayerServer(GameServer):
         try:
             self.server_socket.bind((self.server, self.port))
             self.server_socket.listen(5)
-            print(f"Server started, listening on {self.server}:{self.port}")
+            LOGGER.info("Server started, listening on %s:%s", self.server, self.port)
         except socket.error as exception:
-            print(f"Socket error during setup: {exception}")
+            LOGGER.error("Socket error during setup: %s", exception)
             self.server_socket.close()
             raise
 
@@ -48,46 +73,91 @@ class MultiplayerServer(GameServer):
         """
         Main loop for accepting client connections and handling them in separate threads.
 
-        Continuously accepts new client connections and starts a new thread to handle each client.
+        Continuously accepts new client connections and starts a new thread to handle each client. A single
+        housekeeping thread expires the waits of the clients and the abandoned rooms.
         """
+        start_new_thread(self._run_housekeeping_periodically, ())
         while True:
             try:
                 conn, addr = self.server_socket.accept()
-                print(f"Connected to: {addr}")
+                LOGGER.debug("Connected to: %s", addr)
                 start_new_thread(self._handle_client, (conn,))
-            except Exception as exception:  # pylint: disable=W0703
-                print(f"Exception in accepting connections: {exception}")
+            except Exception:  # pylint: disable=W0703
+                LOGGER.exception("Exception in accepting connections")
+
+    def _run_housekeeping_periodically(self):
+        """
+        Runs the housekeeping of the server, waking up at every turn deadline and at least every
+        HOUSEKEEPING_INTERVAL seconds.
+        """
+        while True:
+            time.sleep(self.get_housekeeping_delay())
+            try:
+                self.run_housekeeping()
+            except Exception:  # pylint: disable=W0703
+                LOGGER.exception("Exception running housekeeping")
 
     def _handle_client(self, conn):
         """
         Handles communication with a connected client.
 
-        Receives commands from the client, processes them using the command handler, and sends responses back.
+        Receives framed commands from the client, processes them using the command handler, and sends framed
+        responses back encoded with the client's codec. The client is identified by the session opened for the
+        connection, whose token is sent in the greeting. The commands are rate limited, and the responses and the
+        events pushed from other threads go through the connection's bounded send queue, which disconnects a client
+        that stops reading them.
 
         Args:
             conn (socket.socket): The socket object for the connected client.
         """
-        conn.send(str.encode("Connected"))
+        send_queue = SendQueue(conn)
+        rate_limiter = self.create_rate_limiter()
+
+        session = self.open_session(send_queue.abort)
+        self.register_event_pusher(
+            session.client,
+            lambda event_message: send_queue.send(
+                encode_frame(self.encode_for_client(session.client, event_message)), wait=False
+            ),
+        )
+        send_queue.send(encode_frame(self.get_greeting(session)))
         while True:
             try:
-                data = conn.recv(2048)
-                if not data:
-                    print("Client disconnected")
+                data = recv_frame(conn)
+                if data is None:
+                    LOGGER.debug("Client disconnected")
                     break
 
-                command = data.decode("utf-8")
-                response = self.command_handler.handle_command(command, conn)
-                print("Sending response:", response)
-                conn.sendall(str.encode(response))
+                send_queue.send(encode_frame(self.handle_message(session.client, data, rate_limiter)))
 
             except Exception as exception:  # pylint: disable=W0703
-                print(f"Exception handling client: {exception}")
+                LOGGER.warning("Exception handling client: %s", exception)
                 break
 
-        print("Lost connection")
-        conn.close()
+        LOGGER.debug("Lost connection")
+        self.client_disconnected(session.client)
+        send_queue.close()
 
 
-if __name__ == "__main__":
-    server = MultiplayerServer()
+def main():
+    """
+    Entry point for running the threaded server.
+    """
+    parser = argparse.ArgumentParser(description="Battleships threaded multiplayer server.")
+    parser.add_argument("--host", default=MultiplayerServer.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=MultiplayerServer.DEFAULT_PORT)
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    add_tracing_arguments(parser)
+    arguments = parser.parse_args()
+
+    configure_logging(arguments.log_level)
+    configure_tracing(arguments.trace_file, arguments.profile_output)
+    server = MultiplayerServer(arguments.host, arguments.port)
+    if arguments.metrics_port is not None:
+        start_metrics_endpoint(server, arguments.metrics_port)
     server.run()
+
+
+if __name__ == "__main__":
+    main()
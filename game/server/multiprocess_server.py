@@ -0,0 +1,840 @@
+"""
+Module that runs the multiplayer server as several worker processes, so the game logic is not limited to one core.
+
+Every worker is an `AsyncMultiplayerServer` that owns the rooms whose IDs hash to it. The clients connect to a front
+`RoomRoutingProxy`, which forwards the commands of each client to the worker that owns the client's room:
+
+- a room is created on the worker the client was assigned to when it connected, which gives it an ID it owns;
+- joining a room with an ID is forwarded to the worker that the ID hashes to;
+- joining a random room tries the worker the client is assigned to first and then the others in turn.
+
+Every other command goes to the worker the client was last placed on, and the events pushed by the workers are
+forwarded to the clients as they arrive. The messages are forwarded in the codec the client negotiated, which is
+negotiated again on every worker the client is placed on.
+"""
+
+import argparse
+import asyncio
+import glob
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import signal
+import sys
+import zlib
+
+from game.server.async_multiplayer_server import AsyncMultiplayerServer, get_event_loop_policy
+from game.server.command_handler import CommandHandler
+from game.server.codec import CODECS, JSON_CODEC, CodecError, decode_message, is_event_message
+from game.logging_setup import add_logging_arguments, configure_logging
+from game.server.framing import FrameError, encode_frame, read_frame
+from game.server.flow_control import SendBufferFullError, drain_stream, push_to_stream
+from game.server.session_registry import SessionRegistry
+from game.players.placement_heatmap import PlacementHeatmap
+from game.players import command_literals
+
+LOGGER = logging.getLogger(__name__)
+
+ROOM_NOT_FOUND_MESSAGE = "Room ID not found!"
+NO_AVAILABLE_ROOMS_MESSAGE = "No available rooms to join!"
+
+# Commands that never contain any of these markers are forwarded without being parsed
+ROUTING_MARKERS = (
+    b"room",
+    command_literals.COMMAND_SUBSCRIBE_EVENTS.encode("utf-8"),
+    command_literals.COMMAND_NEGOTIATE_CODEC.encode("utf-8"),
+)
+ROOM_ENTERING_COMMANDS = (
+    command_literals.COMMAND_CREATE_ROOM,
+    command_literals.COMMAND_JOIN_ROOM_WITH_ID,
+    command_literals.COMMAND_JOIN_RANDOM_ROOM,
+)
+RESUME_SESSION_MARKER = command_literals.COMMAND_RESUME_SESSION.encode("utf-8")
+SUBSCRIBE_EVENTS_COMMAND = json.dumps({"command": command_literals.COMMAND_SUBSCRIBE_EVENTS, "args": {}})
+
+
+def get_room_worker_index(room_id, workers_count):
+    """
+    Returns the index of the worker that owns a room. The hash is stable across processes, unlike `hash`.
+
+    Args:
+        room_id (str): The ID of the room.
+        workers_count (int): The number of workers.
+
+    Returns:
+        int: The index of the worker.
+    """
+    return zlib.crc32(str(room_id).encode("utf-8")) % workers_count
+
+
+def decode_response(response):
+    """
+    Decodes a response received from a worker, whatever codec the client negotiated.
+
+    Args:
+        response (bytes): The encoded response.
+
+    Returns:
+        dict: The response, or an empty dictionary if the response is malformed.
+    """
+    try:
+        return decode_message(response)
+    except CodecError:
+        return {}
+
+
+def get_response_message(response):
+    """
+    Returns the message of a response received from a worker.
+
+    Args:
+        response (bytes): The encoded response.
+
+    Returns:
+        str: The message of the response, or None if the response is malformed.
+    """
+    return decode_response(response).get("message")
+
+
+def is_success_response(response):
+    """
+    Checks if a response received from a worker reports a success.
+
+    Args:
+        response (bytes): The encoded response.
+
+    Returns:
+        bool: True if the command succeeded, False otherwise.
+    """
+    return decode_response(response).get("status") == "success"
+
+
+def is_join_command(command_data):
+    """
+    Checks if a command of a batch joins a room, which may move the client to another worker.
+
+    Args:
+        command_data (dict): The command.
+
+    Returns:
+        bool: True if the command joins a room, False otherwise.
+    """
+    return isinstance(command_data, dict) and command_data.get("command") in (
+        command_literals.COMMAND_JOIN_ROOM_WITH_ID,
+        command_literals.COMMAND_JOIN_RANDOM_ROOM,
+    )
+
+
+class RoomWorkerServer(AsyncMultiplayerServer):
+    """
+    An AsyncMultiplayerServer run as one of several workers, which only creates rooms with the IDs it owns.
+    """
+
+    HEATMAP_STORAGE_PATH = "placement_heatmaps_worker_{worker_index}.npz"
+
+    def __init__(self, worker_index, workers_count, host=AsyncMultiplayerServer.DEFAULT_HOST, port=0, loop_name=None):
+        """
+        Initializes the RoomWorkerServer instance.
+
+        Args:
+            worker_index (int): The index of the worker.
+            workers_count (int): The number of workers.
+            host (str, optional): The address to listen on. Defaults to AsyncMultiplayerServer.DEFAULT_HOST.
+            port (int, optional): The port to listen on, 0 picks a free one. Defaults to 0.
+            loop_name (str, optional): The event loop to run on, see `get_event_loop_policy`. Defaults to None.
+        """
+        # Every worker persists the boards of its own battles to a file of its own, so the processes never write the
+        # same file, and MultiProcessServer adds them to the shared heatmap
+        placement_heatmap = PlacementHeatmap(
+            self.HEATMAP_STORAGE_PATH.format(worker_index=worker_index), save_in_background=True
+        )
+        super().__init__(host, port, loop_name, placement_heatmap=placement_heatmap)
+        self.worker_index = worker_index
+        self.workers_count = workers_count
+
+    def generate_unique_room_id(self):
+        """
+        Generates a unique room ID that hashes to this worker.
+
+        Returns:
+            str: A unique room ID owned by the worker.
+        """
+        while True:
+            room_id = super().generate_unique_room_id()
+            if get_room_worker_index(room_id, self.workers_count) == self.worker_index:
+                return room_id
+
+
+class WorkerConnection:
+    """
+    A connection of the proxy to a worker on behalf of one client. The worker sees the connection as the client.
+
+    Responses are handed to the pending request and events are forwarded to the client as soon as they arrive.
+    """
+
+    def __init__(self, reader, writer, forward_event):
+        """
+        Initializes the WorkerConnection and starts reading the messages of the worker.
+
+        Args:
+            reader (asyncio.StreamReader): The stream to read the messages of the worker from.
+            writer (asyncio.StreamWriter): The stream to write the commands to.
+            forward_event (callable): Called with every event received from the worker.
+        """
+        self.writer = writer
+        self.responses = asyncio.Queue()
+        self.reading_task = asyncio.create_task(self._read_messages(reader, forward_event))
+
+    @classmethod
+    async def open(cls, address, forward_event):
+        """
+        Connects to a worker and consumes its greeting.
+
+        Args:
+            address (tuple): The host and port of the worker.
+            forward_event (callable): Called with every event received from the worker.
+
+        Returns:
+            WorkerConnection: The open connection.
+        """
+        reader, writer = await asyncio.open_connection(*address)
+        await read_frame(reader)
+        return cls(reader, writer, forward_event)
+
+    async def _read_messages(self, reader, forward_event):
+        """
+        Reads the messages of the worker until the connection is closed, which is signalled with a None response.
+
+        Args:
+            reader (asyncio.StreamReader): The stream to read from.
+            forward_event (callable): Called with every received event.
+        """
+        try:
+            while True:
+                message = await read_frame(reader)
+                if is_event_message(message):
+                    forward_event(message)
+                else:
+                    self.responses.put_nowait(message)
+        except (asyncio.IncompleteReadError, ConnectionError, FrameError):
+            pass
+        self.responses.put_nowait(None)
+
+    async def request(self, command):
+        """
+        Sends a command to the worker and waits for its response.
+
+        Args:
+            command (bytes): The command.
+
+        Returns:
+            bytes: The response, or None if the connection was closed.
+        """
+        self.writer.write(encode_frame(command))
+        await self.writer.drain()
+        return await self.responses.get()
+
+    def close(self):
+        """
+        Closes the connection, which the worker handles as a disconnect of the client.
+        """
+        self.reading_task.cancel()
+        self.writer.close()
+
+
+class ProxiedClient:
+    """
+    The routing state of one client connected to the proxy.
+
+    The client is only ever in a room on the worker it is placed on. Connections to other workers are opened while
+    looking for a room to join and closed once the client joins one.
+    """
+
+    def __init__(self, worker_addresses, writer, worker_index):
+        """
+        Initializes the ProxiedClient instance.
+
+        Args:
+            worker_addresses (list): The host and port of every worker.
+            writer (asyncio.StreamWriter): The stream to write to the client.
+            worker_index (int): The index of the worker the client is placed on initially.
+        """
+        self.worker_addresses = worker_addresses
+        self.writer = writer
+        self.session_token = secrets.token_urlsafe(SessionRegistry.TOKEN_BYTES)
+        self.worker_index = worker_index
+        self.worker_connections = {}
+        self.may_be_in_room = False
+        self.is_subscribed = False
+        self.codec = JSON_CODEC
+        self.negotiate_codec_command = None
+
+    def _forward_event(self, event_message):
+        """
+        Forwards an event pushed by a worker to the client, disconnecting the client if it does not read them.
+
+        Args:
+            event_message (bytes): The event.
+        """
+        if not self.writer.is_closing():
+            try:
+                push_to_stream(self.writer, encode_frame(event_message))
+            except SendBufferFullError:
+                pass
+
+    async def _get_worker_connection(self, worker_index):
+        """
+        Returns the connection to a worker, opening it and renewing the codec negotiation and the event
+        subscription if needed.
+
+        Args:
+            worker_index (int): The index of the worker.
+
+        Returns:
+            WorkerConnection: The connection to the worker.
+        """
+        connection = self.worker_connections.get(worker_index)
+        if connection is None:
+            connection = await WorkerConnection.open(self.worker_addresses[worker_index], self._forward_event)
+            self.worker_connections[worker_index] = connection
+            if self.negotiate_codec_command is not None:
+                await connection.request(self.negotiate_codec_command)
+            if self.is_subscribed:
+                await connection.request(SUBSCRIBE_EVENTS_COMMAND.encode("utf-8"))
+        return connection
+
+    async def _request(self, worker_index, command):
+        """
+        Sends a command to a worker on behalf of the client.
+
+        Args:
+            worker_index (int): The index of the worker.
+            command (bytes): The command.
+
+        Returns:
+            bytes: The response of the worker, or an error response if the worker cannot be reached.
+        """
+        try:
+            connection = await self._get_worker_connection(worker_index)
+            response = await connection.request(command)
+        except (OSError, asyncio.IncompleteReadError) as exception:
+            LOGGER.warning("Exception reaching worker %s: %s", worker_index, exception)
+            response = None
+
+        if response is None:
+            connection = self.worker_connections.pop(worker_index, None)
+            if connection is not None:
+                connection.close()
+            return self.codec.encode(CommandHandler.error_response("Server error!"))
+        return response
+
+    async def handle_command(self, command):
+        """
+        Forwards a command of the client to the worker that has to handle it.
+
+        Args:
+            command (bytes): The framed command of the client.
+
+        Returns:
+            bytes: The response to send to the client.
+        """
+        if not any(marker in command for marker in ROUTING_MARKERS):
+            return await self._request(self.worker_index, command)
+
+        try:
+            command_data = decode_message(command)
+            command_name = command_data.get("command")
+            args = command_data.get("args", {})
+        except CodecError:
+            return await self._request(self.worker_index, command)
+
+        if command_name == command_literals.COMMAND_BATCH and isinstance(args, dict):
+            return await self._handle_batch(command, args)
+        if command_name == command_literals.COMMAND_JOIN_ROOM_WITH_ID and isinstance(args, dict) and "room_id" in args:
+            response = await self._join_room_with_id(command, args["room_id"])
+        elif command_name == command_literals.COMMAND_JOIN_RANDOM_ROOM:
+            response = await self._join_random_room(command)
+        else:
+            response = await self._request(self.worker_index, command)
+
+        response_data = decode_response(response)
+        if response_data.get("status") == "success":
+            self._update_state(command_data, response_data)
+        return response
+
+    async def _handle_batch(self, command, args):
+        """
+        Forwards a batch of commands. A batch without joins is forwarded as is to the worker the client is placed
+        on. A batch with joins is split around them, since a join may move the client to another worker, and the
+        responses of the parts are joined into one response.
+
+        Args:
+            command (bytes): The batch command.
+            args (dict): The arguments of the batch command.
+
+        Returns:
+            bytes: The response to send to the client.
+        """
+        commands = args.get("commands")
+        if (
+            not isinstance(commands, list)
+            or len(commands) > CommandHandler.MAX_BATCH_SIZE
+            or not any(is_join_command(command_data) for command_data in commands)
+        ):
+            response = await self._request(self.worker_index, command)
+            response_data = decode_response(response)
+            if response_data.get("status") == "success" and isinstance(commands, list):
+                for command_data, command_response in zip(commands, response_data["args"]["responses"]):
+                    if command_response.get("status") == "success":
+                        self._update_state(command_data, command_response)
+            return response
+
+        codec = self.codec
+        stop_on_error = args.get("stop_on_error", False)
+        responses = []
+        for is_join, group in itertools.groupby(commands, key=is_join_command):
+            if is_join:
+                for join_command in group:
+                    responses.append(decode_response(await self.handle_command(JSON_CODEC.encode(join_command))))
+                    if stop_on_error and responses[-1].get("status") != "success":
+                        break
+            else:
+                group_command = {
+                    "command": command_literals.COMMAND_BATCH,
+                    "args": {"commands": list(group), "stop_on_error": stop_on_error},
+                }
+                group_response = decode_response(await self.handle_command(JSON_CODEC.encode(group_command)))
+                if group_response.get("status") != "success":
+                    return codec.encode(group_response)
+                responses.extend(group_response["args"]["responses"])
+
+            # A batch run with stop_on_error ends with its first failed command
+            if stop_on_error and responses and responses[-1].get("status") != "success":
+                break
+
+        return codec.encode(CommandHandler.success_response(CommandHandler.BATCH_HANDLED_MESSAGE, responses=responses))
+
+    def _update_state(self, command_data, response_data):
+        """
+        Updates the routing state after a command succeeded.
+
+        Args:
+            command_data (dict): The command.
+            response_data (dict): The response of the worker.
+        """
+        command_name = command_data.get("command")
+        if command_name in ROOM_ENTERING_COMMANDS:
+            self.may_be_in_room = True
+            self._close_other_worker_connections()
+        elif command_name == command_literals.COMMAND_EXIT_ROOM:
+            self.may_be_in_room = False
+        elif command_name == command_literals.COMMAND_SUBSCRIBE_EVENTS:
+            self.is_subscribed = True
+        elif command_name == command_literals.COMMAND_NEGOTIATE_CODEC:
+            self.codec = CODECS[response_data["args"]["codec"]]
+            self.negotiate_codec_command = JSON_CODEC.encode(command_data)
+
+    async def _join_room_with_id(self, command, room_id):
+        """
+        Forwards a join with a room ID to the worker owning the room.
+
+        If the client may still be in a room on another worker, that worker is asked first, so a client never ends
+        up in rooms on two workers.
+
+        Args:
+            command (bytes): The command.
+            room_id (str): The ID of the room to join.
+
+        Returns:
+            bytes: The response to send to the client.
+        """
+        owner_index = get_room_worker_index(room_id, len(self.worker_addresses))
+        if owner_index != self.worker_index and self.may_be_in_room:
+            response = await self._request(self.worker_index, command)
+            if get_response_message(response) != ROOM_NOT_FOUND_MESSAGE:
+                return response
+
+        response = await self._request(owner_index, command)
+        if is_success_response(response):
+            self.worker_index = owner_index
+        return response
+
+    async def _join_random_room(self, command):
+        """
+        Tries to join a random room on the worker the client is placed on first and then on the other workers.
+
+        Args:
+            command (bytes): The command.
+
+        Returns:
+            bytes: The response to send to the client.
+        """
+        workers_count = len(self.worker_addresses)
+        worker_indexes = [(self.worker_index + offset) % workers_count for offset in range(workers_count)]
+        for worker_index in worker_indexes:
+            response = await self._request(worker_index, command)
+            if is_success_response(response):
+                self.worker_index = worker_index
+                return response
+            if get_response_message(response) != NO_AVAILABLE_ROOMS_MESSAGE:
+                return response
+        return response
+
+    def _close_other_worker_connections(self):
+        """
+        Closes the connections to the workers other than the one the client is placed on.
+        """
+        for worker_index in list(self.worker_connections):
+            if worker_index != self.worker_index:
+                self.worker_connections.pop(worker_index).close()
+
+    def close(self):
+        """
+        Closes all connections to the workers.
+        """
+        for connection in self.worker_connections.values():
+            connection.close()
+        self.worker_connections.clear()
+
+
+class RoomRoutingProxy:
+    """
+    The front server of the multi-process mode, which accepts the clients and routes their commands to the workers.
+    """
+
+    DEFAULT_HOST = "localhost"
+    DEFAULT_PORT = 5555
+    WORKER_START_TIMEOUT = 10
+    SESSION_GRACE_PERIOD = AsyncMultiplayerServer.SESSION_GRACE_PERIOD
+
+    def __init__(self, worker_addresses, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Initializes the RoomRoutingProxy instance.
+
+        Args:
+            worker_addresses (list): The host and port of every worker.
+            host (str, optional): The address to listen on. Defaults to DEFAULT_HOST.
+            port (int, optional): The port to listen on, 0 picks a free one. Defaults to DEFAULT_PORT.
+        """
+        self.worker_addresses = worker_addresses
+        self.server = host
+        self.port = port
+        self.async_server = None
+        self.worker_indexes = itertools.cycle(range(len(worker_addresses)))
+        self.connected_clients = {}
+        self.detached_clients = {}
+
+    async def start(self):
+        """
+        Waits for the workers to start and starts listening for incoming connections.
+
+        Returns:
+            asyncio.Server: The started asyncio server.
+        """
+        await self._wait_for_workers()
+        self.async_server = await asyncio.start_server(self._handle_client, self.server, self.port)
+        self.port = self.async_server.sockets[0].getsockname()[1]
+        LOGGER.info("Proxy started, listening on %s:%s for %s workers", self.server, self.port, len(self.worker_addresses))
+        return self.async_server
+
+    async def serve(self):
+        """
+        Starts the proxy and serves clients forever.
+        """
+        await self.start()
+        async with self.async_server:
+            await self.async_server.serve_forever()
+
+    async def _wait_for_workers(self):
+        """
+        Waits until every worker accepts connections.
+
+        Raises:
+            TimeoutError: If a worker does not start within WORKER_START_TIMEOUT seconds.
+        """
+        deadline = asyncio.get_running_loop().time() + self.WORKER_START_TIMEOUT
+        for address in self.worker_addresses:
+            while True:
+                try:
+                    _, writer = await asyncio.open_connection(*address)
+                    writer.close()
+                    break
+                except OSError as exception:
+                    if asyncio.get_running_loop().time() > deadline:
+                        raise TimeoutError(f"Worker at {address} did not start in time.") from exception
+                    await asyncio.sleep(0.1)
+
+    async def _handle_client(self, reader, writer):
+        """
+        Handles communication with a connected client, forwarding its commands and sending back the responses.
+
+        Args:
+            reader (asyncio.StreamReader): The stream to read commands from.
+            writer (asyncio.StreamWriter): The stream to write responses and events to.
+        """
+        client = ProxiedClient(self.worker_addresses, writer, next(self.worker_indexes))
+        self.connected_clients[client.session_token] = client
+        writer.write(encode_frame(JSON_CODEC.encode(self._get_greeting(client))))
+        try:
+            await writer.drain()
+            while True:
+                try:
+                    command = await read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    LOGGER.debug("Client disconnected")
+                    break
+
+                if RESUME_SESSION_MARKER in command:
+                    client, response = await self._resume_session(client, command)
+                else:
+                    response = await client.handle_command(command)
+                writer.write(encode_frame(response))
+                await drain_stream(writer)
+
+        except (ConnectionError, FrameError) as exception:
+            LOGGER.warning("Exception handling client: %s", exception)
+        except Exception:  # pylint: disable=W0703
+            LOGGER.exception("Exception handling client")
+        finally:
+            # A client taken over by a new connection is not detached, it writes to the new connection already
+            if client.writer is writer:
+                self.connected_clients.pop(client.session_token, None)
+                self._detach_client(client)
+            writer.close()
+
+    @staticmethod
+    def _get_greeting(client):
+        """
+        Returns the greeting sent on a new connection, which gives the client the token of its session.
+
+        Args:
+            client (ProxiedClient): The client.
+
+        Returns:
+            dict: The greeting.
+        """
+        return CommandHandler.success_response("Connected!", session_token=client.session_token)
+
+    async def _resume_session(self, client, command):
+        """
+        Moves a new connection of a client to the detached client of a lost connection, whose worker connections
+        stayed open, so the client continues in its room. A client whose connection is still open, which is
+        half-open if the client reconnected, is taken over and its old connection is closed.
+
+        Args:
+            client (ProxiedClient): The client of the new connection.
+            command (bytes): The command of the client, forwarded as usual if it does not resume a session.
+
+        Returns:
+            tuple: The client handling the connection from now on and the response to send to the client.
+        """
+        try:
+            command_data = decode_message(command)
+        except CodecError:
+            return client, await client.handle_command(command)
+        if command_data.get("command") != command_literals.COMMAND_RESUME_SESSION:
+            return client, await client.handle_command(command)
+
+        args = command_data.get("args")
+        session_token = args.get("session_token") if isinstance(args, dict) else None
+        if session_token == client.session_token:
+            return client, client.codec.encode(
+                CommandHandler.success_response("Session resumed!", session_token=session_token)
+            )
+        if client.may_be_in_room:
+            return client, client.codec.encode(CommandHandler.error_response("Client is already in a room!"))
+
+        if not isinstance(session_token, str):
+            return client, client.codec.encode(CommandHandler.error_response("Session not found!"))
+
+        detached = self.detached_clients.pop(session_token, None)
+        if detached is not None:
+            resumed_client, expiry_handle = detached
+            expiry_handle.cancel()
+        else:
+            resumed_client = self.connected_clients.get(session_token)
+            if resumed_client is None:
+                return client, client.codec.encode(CommandHandler.error_response("Session not found!"))
+            resumed_client.writer.transport.abort()
+
+        resumed_client.writer = client.writer
+        self.connected_clients.pop(client.session_token, None)
+        self.connected_clients[session_token] = resumed_client
+        client.close()
+        LOGGER.debug("Resumed session on worker %s", resumed_client.worker_index)
+        return resumed_client, client.codec.encode(
+            CommandHandler.success_response("Session resumed!", session_token=session_token)
+        )
+
+    def _detach_client(self, client):
+        """
+        Keeps the worker connections of a client that lost its connection while in a room for SESSION_GRACE_PERIOD
+        seconds, so a new connection can resume the session. The workers do not notice the lost connection.
+
+        Args:
+            client (ProxiedClient): The client.
+        """
+        if not client.may_be_in_room:
+            client.close()
+            return
+
+        expiry_handle = asyncio.get_running_loop().call_later(
+            self.SESSION_GRACE_PERIOD, self._expire_session, client.session_token
+        )
+        self.detached_clients[client.session_token] = (client, expiry_handle)
+
+    def _expire_session(self, session_token):
+        """
+        Closes the worker connections of a detached client whose session was not resumed in time.
+
+        Args:
+            session_token (str): The token of the session.
+        """
+        client, _ = self.detached_clients.pop(session_token)
+        LOGGER.debug("Session expired on worker %s", client.worker_index)
+        client.close()
+
+
+def run_worker(worker_index, workers_count, port, loop_name, log_level):
+    """
+    Runs one worker server, used as the target of the worker processes.
+
+    Args:
+        worker_index (int): The index of the worker.
+        workers_count (int): The number of workers.
+        port (int): The port to listen on.
+        loop_name (str): The event loop to run on.
+        log_level (int or str): The minimal level of the logged records.
+    """
+    configure_logging(log_level)
+    # Exits on SIGTERM instead of being killed, and saves the boards recorded since the last save of the heatmap,
+    # since the worker processes do not run the atexit handlers
+    signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+    server = RoomWorkerServer(worker_index, workers_count, MultiProcessServer.WORKER_HOST, port, loop_name)
+    try:
+        server.run()
+    finally:
+        server.placement_heatmap.flush()
+
+
+def merge_worker_heatmaps():
+    """
+    Adds the heatmaps persisted by the workers to the shared one at PlacementHeatmap.DEFAULT_STORAGE_PATH, which the
+    bots read, and removes the files of the workers. It also merges the files left by a server that was killed.
+    """
+    worker_storage_paths = sorted(glob.glob(RoomWorkerServer.HEATMAP_STORAGE_PATH.format(worker_index="*")))
+    if not worker_storage_paths:
+        return
+
+    placement_heatmap = PlacementHeatmap(PlacementHeatmap.DEFAULT_STORAGE_PATH)
+    merged_storage_paths = []
+    for storage_path in worker_storage_paths:
+        try:
+            placement_heatmap.merge_file(storage_path)
+        except (OSError, ValueError):
+            LOGGER.exception("Could not merge the placement heatmaps of %s", storage_path)
+        else:
+            merged_storage_paths.append(storage_path)
+
+    try:
+        placement_heatmap.save()
+    except OSError:
+        LOGGER.exception("Could not save the merged placement heatmaps")
+        return
+
+    for storage_path in merged_storage_paths:
+        os.remove(storage_path)
+    LOGGER.info("Merged the placement heatmaps of %s workers", len(merged_storage_paths))
+
+
+class MultiProcessServer:
+    """
+    Runs the workers in their own processes and the routing proxy in the current one.
+    """
+
+    WORKER_HOST = "localhost"
+    DEFAULT_WORKER_BASE_PORT = 5556
+
+    def __init__(
+        self,
+        workers_count=None,
+        host=RoomRoutingProxy.DEFAULT_HOST,
+        port=RoomRoutingProxy.DEFAULT_PORT,
+        worker_base_port=DEFAULT_WORKER_BASE_PORT,
+        loop_name=None,
+        log_level=logging.INFO,
+    ):
+        """
+        Initializes the MultiProcessServer instance.
+
+        Args:
+            workers_count (int, optional): The number of worker processes. Defaults to None, one per core.
+            host (str, optional): The address the proxy listens on. Defaults to RoomRoutingProxy.DEFAULT_HOST.
+            port (int, optional): The port the proxy listens on. Defaults to RoomRoutingProxy.DEFAULT_PORT.
+            worker_base_port (int, optional): The port of the first worker, the others use the following ports.
+                Defaults to DEFAULT_WORKER_BASE_PORT.
+            loop_name (str, optional): The event loop to run on, see `get_event_loop_policy`. Defaults to None.
+            log_level (int or str, optional): The minimal level of the records logged by the workers. Defaults to
+                logging.INFO.
+        """
+        self.workers_count = workers_count or os.cpu_count() or 1
+        self.host = host
+        self.port = port
+        self.worker_ports = [worker_base_port + worker_index for worker_index in range(self.workers_count)]
+        self.loop_name = loop_name
+        self.log_level = log_level
+
+    def run(self):
+        """
+        Starts the worker processes and serves clients through the proxy until the process is stopped. The workers
+        are stopped with the proxy, also when it is terminated with SIGTERM.
+        """
+        signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+        merge_worker_heatmaps()
+        processes = [
+            multiprocessing.Process(
+                target=run_worker,
+                args=(worker_index, self.workers_count, worker_port, self.loop_name, self.log_level),
+                daemon=True,
+            )
+            for worker_index, worker_port in enumerate(self.worker_ports)
+        ]
+        for process in processes:
+            process.start()
+
+        try:
+            worker_addresses = [(self.WORKER_HOST, worker_port) for worker_port in self.worker_ports]
+            asyncio.set_event_loop_policy(get_event_loop_policy(self.loop_name))
+            asyncio.run(RoomRoutingProxy(worker_addresses, self.host, self.port).serve())
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+            merge_worker_heatmaps()
+
+
+def main():
+    """
+    Entry point for running the multi-process server.
+    """
+    parser = argparse.ArgumentParser(description="Battleships multi-process multiplayer server.")
+    parser.add_argument("--host", default=RoomRoutingProxy.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=RoomRoutingProxy.DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes, one per core if unset.")
+    parser.add_argument("--worker-base-port", type=int, default=MultiProcessServer.DEFAULT_WORKER_BASE_PORT)
+    parser.add_argument("--loop", default="asyncio", help='"asyncio", "uvloop" or a "module:PolicyClass" path.')
+    add_logging_arguments(parser)
+    arguments = parser.parse_args()
+
+    configure_logging(arguments.log_level)
+    MultiProcessServer(
+        arguments.workers, arguments.host, arguments.port, arguments.worker_base_port, arguments.loop, arguments.log_level
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
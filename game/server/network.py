@@ -5,8 +5,67 @@ This module defines abstract and concrete classes for network communication,
 including offline simulation and real multiplayer networking.
 """
 
+import logging
+import os
+import random
+import select
 import socket
+import time
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future
+from game.server.framing import FrameDecoder, encode_frame
+from game.server.rtt_statistics import RttStatistics
+from game.server.codec import JSON_CODEC, BinaryCodec, CodecError, JsonCodec, choose_codec, decode_message, is_event_message
+from game.players import command_literals
+
+LOGGER = logging.getLogger(__name__)
+
+
+# Commands that can be sent again when the connection was lost before their response arrived
+IDEMPOTENT_COMMANDS = frozenset(
+    {
+        command_literals.COMMAND_HAS_OPPONENT_JOINED,
+        command_literals.COMMAND_IS_OPPONENT_READY,
+        command_literals.COMMAND_REQUEST_ENEMY_BOARD,
+        command_literals.COMMAND_SUBSCRIBE_EVENTS,
+        command_literals.COMMAND_WAIT_FOR_OPPONENT_JOIN,
+        command_literals.COMMAND_WAIT_FOR_OPPONENT_READY,
+        command_literals.COMMAND_FETCH_EVENTS,
+        command_literals.COMMAND_NEGOTIATE_CODEC,
+    }
+)
+
+
+def parse_endpoint(endpoint):
+    """
+    Parses the address of a server.
+
+    Args:
+        endpoint (str or tuple): The "host:port" address or the (host, port) tuple.
+
+    Returns:
+        tuple: The host and the port.
+    """
+    if isinstance(endpoint, str):
+        host, _, port = endpoint.strip().rpartition(":")
+        return host, int(port)
+
+    host, port = endpoint
+    return host, int(port)
+
+
+def connection_error_response(message):
+    """
+    Returns the response given to a command when the server could not be reached.
+
+    Args:
+        message (str): The message of the response.
+
+    Returns:
+        dict: An error response with "is_connection_error" set.
+    """
+    return {"status": "error", "message": message, "args": {"is_connection_error": True}}
 
 
 class AbstractNetwork(ABC):
@@ -17,15 +76,15 @@ class AbstractNetwork(ABC):
     """
 
     @abstractmethod
-    def send(self, data):
+    def send(self, command_data):
         """
-        Sends data through the network.
+        Sends a command through the network.
 
         Args:
-            data (str): The data to send.
+            command_data (dict): The command, with the "command" name and its "args".
 
         Returns:
-            str: The response received after sending the data.
+            dict: The response received after sending the command.
         """
 
     @abstractmethod
@@ -34,6 +93,81 @@ class AbstractNetwork(ABC):
         Closes the network connection.
         """
 
+    def submit(self, function, *args, callback=None, error_callback=None, **kwargs):
+        """
+        Runs a function that uses the network. Networks answering without waiting on the server run it right away,
+        and a network worker runs it on its thread.
+
+        Args:
+            function (callable): The function.
+            *args: Positional arguments for the function.
+            callback (callable, optional): Called with the result of the function. Defaults to None.
+            error_callback (callable, optional): Called with the exception raised by the function. Defaults to None,
+                meaning that the exception is raised.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            Future: The future of the function's result, which is done.
+        """
+        future = Future()
+        try:
+            future.set_result(function(*args, **kwargs))
+        except Exception as exception:  # pylint: disable=W0703
+            if error_callback is None:
+                raise
+            future.set_exception(exception)
+            error_callback(exception)
+            return future
+
+        if callback is not None:
+            callback(future.result())
+        return future
+
+    def request(self, command_data, callback=None, error_callback=None):
+        """
+        Sends a command without waiting for its response when the network supports it.
+
+        Args:
+            command_data (dict): The command, with the "command" name and its "args".
+            callback (callable, optional): Called with the response. Defaults to None.
+            error_callback (callable, optional): Called with the exception if the command could not be sent.
+                Defaults to None.
+
+        Returns:
+            Future: The future of the response.
+        """
+        return self.submit(self.send, command_data, callback=callback, error_callback=error_callback)
+
+    def receive_events(self):
+        """
+        Returns the events pushed by the server since the last call, without blocking.
+
+        Returns:
+            list: The received events as dictionaries.
+        """
+        return []
+
+    def connect_to_node(self, node_id):
+        """
+        Moves the connection to another server node, the one hosting a room the client was redirected to.
+
+        Args:
+            node_id (str): The "host:port" address of the node.
+
+        Returns:
+            bool: True if the connection was moved, False if the network cannot connect to other nodes.
+        """
+        return False
+
+    def reconnect(self):
+        """
+        Reconnects to the server after the connection was lost and resumes the session of the client.
+
+        Returns:
+            bool: True if the session was resumed, False if the network cannot reconnect.
+        """
+        return False
+
 
 class OfflineNetwork(AbstractNetwork):
     """
@@ -52,6 +186,7 @@ class OfflineNetwork(AbstractNetwork):
         """
         self.is_player = is_player
         self.server_instance = None
+        self.pushed_events = []
 
     def add_server_instance(self, server_instance):
         """
@@ -62,18 +197,36 @@ class OfflineNetwork(AbstractNetwork):
         """
         self.server_instance = server_instance
 
-    def send(self, data):
+    def send(self, command_data):
+        """
+        Passes a command to the offline server in process, without encoding it, and returns its response.
+
+        Args:
+            command_data (dict): The command, with the "command" name and its "args".
+
+        Returns:
+            dict: The response from the server.
+        """
+        return self.server_instance.handle_offline_client(command_data, is_player=self.is_player)
+
+    def push(self, event_message):
         """
-        Simulates sending data to the server and receiving a response.
+        Stores an event pushed by the offline server until it is received.
 
         Args:
-            data (str): The data to send.
+            event_message (dict): The event.
+        """
+        self.pushed_events.append(event_message)
+
+    def receive_events(self):
+        """
+        Returns the events pushed by the offline server since the last call.
 
         Returns:
-            str: The simulated response from the server.
+            list: The received events as dictionaries.
         """
-        response = self.server_instance.handle_offline_client(data, is_player=self.is_player)
-        return response
+        events, self.pushed_events = self.pushed_events, []
+        return events
 
     def close(self):
         """
@@ -85,66 +238,448 @@ class MultiplayerNetwork(AbstractNetwork):
     """
     Handles network communication for multiplayer scenarios using real sockets.
 
-    Connects to a server, sends data, and receives responses over a TCP connection.
+    Keeps a persistent TCP connection to one of the configured server endpoints, sends commands and receives
+    responses over it. Events pushed by the server are kept aside until they are received, even if they arrive while
+    waiting for a response. Right after connecting, the codec of the messages is negotiated with the server, falling
+    back to JSON if the server does not support any other codec.
+
+    A lost connection is reopened with exponential backoff and jitter, trying the other endpoints if the current one
+    is down, and the session of the client is resumed with the token from the server's greeting, so the client
+    stays in its room. Idempotent commands are sent again on the new connection, the others are answered with an
+    error response since they may have been handled already. The round-trip times of the requests are recorded in
+    `rtt_statistics`.
     """
 
-    def __init__(self):
+    RECEIVE_BUFFER_SIZE = 65536
+    DEFAULT_CODEC_NAMES = (BinaryCodec.NAME, JsonCodec.NAME)
+    DEFAULT_ENDPOINTS = ("localhost:5555",)
+    ENDPOINTS_ENVIRONMENT_VARIABLE = "BATTLESHIPS_SERVERS"
+
+    CONNECT_TIMEOUT = 10
+    REQUEST_TIMEOUT = 60
+    KEEPALIVE_IDLE = 10
+    KEEPALIVE_INTERVAL = 5
+    KEEPALIVE_COUNT = 3
+
+    REQUEST_ATTEMPTS = 2
+    RECONNECT_ATTEMPTS = 5
+    BACKOFF_BASE = 0.2
+    BACKOFF_MAX = 5
+
+    def __init__(self, codec_names=DEFAULT_CODEC_NAMES, endpoints=None):
         """
         Initializes a MultiplayerNetwork instance and connects to the server.
+
+        Args:
+            codec_names (tuple, optional): The names of the codecs to negotiate, preferred first. Defaults to
+                DEFAULT_CODEC_NAMES, use ("json",) to keep the messages readable for debugging.
+            endpoints (list, optional): The "host:port" addresses or (host, port) tuples of the servers, tried in
+                order. Defaults to None, meaning the comma-separated addresses of the BATTLESHIPS_SERVERS
+                environment variable or DEFAULT_ENDPOINTS.
+
+        Raises:
+            ConnectionError: If no endpoint can be reached.
         """
-        self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server = "localhost"
-        self.port = 5555
-        self.addr = (self.server, self.port)
+        if endpoints is None:
+            environment_endpoints = os.environ.get(self.ENDPOINTS_ENVIRONMENT_VARIABLE)
+            endpoints = environment_endpoints.split(",") if environment_endpoints else self.DEFAULT_ENDPOINTS
+        self.endpoints = [parse_endpoint(endpoint) for endpoint in endpoints]
+        self.addr = self.endpoints[0]
+        self.client = None
+        self.frame_decoder = FrameDecoder()
+        self.received_messages = deque()
+        self.pending_events = []
+        self.codec_names = codec_names
+        self.codec = JSON_CODEC
+        self.session_token = None
+        self.is_subscribed = False
+        self.rtt_statistics = RttStatistics()
+        self.reconnect_attempts = 0
+        self.next_reconnect_time = 0
         self.connect()
-        print("Connected to server!")
+        LOGGER.info("Connected to server!")
 
     def connect(self):
         """
-        Connects to the server and handles initial communication.
+        Connects to the first reachable endpoint, starting with the current one.
+
+        Returns:
+            bytes: The greeting of the server.
+
+        Raises:
+            ConnectionError: If no endpoint can be reached.
+        """
+        addresses = [self.addr] + [address for address in self.endpoints if address != self.addr]
+        for address in addresses:
+            try:
+                greeting = self._open_connection(address)
+                self.addr = address
+                return greeting
+            except ConnectionError as exception:
+                LOGGER.warning("Could not connect to %s:%s: %s", *address, exception)
+
+        raise ConnectionError("No server endpoint can be reached.")
+
+    def _open_connection(self, address):
+        """
+        Opens a connection to an address, reads the session token from the greeting and negotiates the codec.
+
+        Args:
+            address (tuple): The host and port of the server.
+
+        Returns:
+            bytes: The greeting of the server.
 
         Raises:
             ConnectionError: If the connection times out or encounters a socket error.
         """
+        self.close()
+        self.frame_decoder = FrameDecoder()
+        self.received_messages.clear()
         try:
-            self.client.connect(self.addr)
-            self.client.settimeout(10)
-            return self.client.recv(2048).decode()
+            self.client = socket.create_connection(address, self.CONNECT_TIMEOUT)
+            self._configure_socket(self.client)
+            greeting = self._receive_message()
+            if greeting is None:
+                raise ConnectionError("Connection closed before receiving initial data.")
+            self.client.settimeout(self.REQUEST_TIMEOUT)
+            self.session_token = self._get_session_token(greeting)
+            self._negotiate_codec()
+            return greeting
+        except ConnectionError:
+            self.close()
+            raise
         except socket.timeout as exception:
+            self.close()
             raise ConnectionError("Connection timed out while trying to receive initial data.") from exception
-        except socket.error as exception:
+        except OSError as exception:
+            self.close()
             raise ConnectionError(f"Socket error: {exception}") from exception
 
-    def send(self, data):
+    def _configure_socket(self, client):
+        """
+        Disables the batching of small writes and enables TCP keepalive, so a dead connection is noticed even while
+        the client only waits for pushed events.
+
+        Args:
+            client (socket.socket): The connected socket.
+        """
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        for option_name, value in (
+            ("TCP_KEEPIDLE", self.KEEPALIVE_IDLE),
+            ("TCP_KEEPINTVL", self.KEEPALIVE_INTERVAL),
+            ("TCP_KEEPCNT", self.KEEPALIVE_COUNT),
+        ):
+            if hasattr(socket, option_name):
+                client.setsockopt(socket.IPPROTO_TCP, getattr(socket, option_name), value)
+
+    @staticmethod
+    def _get_session_token(greeting):
         """
-        Sends data to the server and waits for a response.
+        Reads the token of the client's session from the greeting of the server.
 
         Args:
-            data (str): The data to send.
+            greeting (bytes): The greeting.
 
         Returns:
-            str: The response received from the server, or None if an error occurs.
+            str: The token, or None if the server does not give sessions.
         """
         try:
-            print(data)
-            self.client.send(str.encode(data))
-            self.client.settimeout(60)
-            response = self.client.recv(2048).decode()
+            return decode_message(greeting).get("args", {}).get("session_token")
+        except (CodecError, AttributeError):
+            return None
+
+    def _negotiate_codec(self):
+        """
+        Asks the server to use the preferred codec that it supports. The connection stays on JSON if JSON is
+        preferred or if the server rejects the negotiation.
+
+        Raises:
+            OSError: If the connection fails.
+        """
+        self.codec = JSON_CODEC
+        preferred_codec = choose_codec(self.codec_names)
+        if preferred_codec is None or preferred_codec is JSON_CODEC:
+            return
+
+        try:
+            response = self._request(
+                {"command": command_literals.COMMAND_NEGOTIATE_CODEC, "args": {"codecs": list(self.codec_names)}}
+            )
+        except CodecError as exception:
+            LOGGER.warning("Invalid message from the server: %s", exception)
+            return
+        if response["status"] == "success":
+            self.codec = choose_codec([response["args"]["codec"]]) or JSON_CODEC
+        LOGGER.debug("Using the %s codec", self.codec.NAME)
+
+    def connect_to_node(self, node_id):
+        """
+        Closes the connection and connects to another server node, the one hosting a room the client was
+        redirected to. If the node can not be reached, the client reconnects to the server it was connected to.
+
+        Args:
+            node_id (str): The "host:port" address of the node.
+
+        Returns:
+            bool: True once connected to the node.
+
+        Raises:
+            ConnectionError: If the connection to the node fails.
+        """
+        node_address = parse_endpoint(node_id)
+        session_token = self.session_token
+        try:
+            self._open_connection(node_address)
+        except ConnectionError as exception:
+            LOGGER.warning("Could not connect to server node %s: %s", node_id, exception)
+            self.session_token = session_token
+            self.reconnect()
+            raise
+
+        self.addr = node_address
+        self.is_subscribed = False
+        self.pending_events = []
+        LOGGER.info("Connected to server node %s!", node_id)
+        return True
+
+    def reconnect(self):
+        """
+        Opens a new connection to the server and resumes the session of the lost one, so the client stays in its
+        room. If the client was subscribed to events, the subscription is renewed and the events of the room that
+        were not acknowledged are fetched from its event log and received as pushed events, since the ones pushed
+        in the meantime are lost.
+
+        Returns:
+            bool: True if the session was resumed, False if the server could not be reached or if the session
+                expired, in which case the client continues with the new session if it is connected.
+        """
+        session_token = self.session_token
+        try:
+            self.connect()
+            if session_token is None or self.session_token is None:
+                return False
+
+            response = self._request(
+                {"command": command_literals.COMMAND_RESUME_SESSION, "args": {"session_token": session_token}}
+            )
+            if response["status"] != "success":
+                LOGGER.info("Could not resume the session: %s", response["message"])
+                self.is_subscribed = False
+                return False
+
+            self.session_token = session_token
+            if self.is_subscribed:
+                self._request({"command": command_literals.COMMAND_SUBSCRIBE_EVENTS, "args": {}})
+                response = self._request({"command": command_literals.COMMAND_FETCH_EVENTS, "args": {}})
+                if response["status"] == "success":
+                    self.pending_events.extend(response["args"]["events"])
+        except (OSError, CodecError) as exception:
+            LOGGER.warning("Could not reconnect: %s", exception)
+            self.close()
+            return False
+
+        LOGGER.info("Resumed the session!")
+        return True
+
+    def _reconnect_with_backoff(self):
+        """
+        Reconnects to the server, waiting longer after every failed attempt.
+
+        Returns:
+            bool: True if the client is connected again, False if every attempt failed.
+        """
+        for attempt in range(self.RECONNECT_ATTEMPTS):
+            if attempt:
+                time.sleep(self._get_backoff_delay(attempt))
+            self.reconnect()
+            if self.client is not None:
+                return True
+        return False
+
+    def _reconnect_when_due(self):
+        """
+        Makes one reconnection attempt if the backoff delay since the previous one has passed, without blocking
+        otherwise. Used while the client only waits for pushed events.
+        """
+        now = time.monotonic()
+        if now < self.next_reconnect_time:
+            return
+
+        self.reconnect()
+        if self.client is None:
+            self.reconnect_attempts += 1
+            self.next_reconnect_time = now + self._get_backoff_delay(self.reconnect_attempts)
+        else:
+            self.reconnect_attempts = 0
+
+    def _get_backoff_delay(self, attempt):
+        """
+        Returns the delay before a reconnection attempt: a random delay up to an exponentially growing cap ("full
+        jitter"), so many clients dropped at once do not reconnect in lockstep.
+
+        Args:
+            attempt (int): The number of failed attempts so far.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        return random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2**attempt))
+
+    def send(self, command_data):
+        """
+        Sends a command to the server as one frame, encoded with the negotiated codec, and waits for the framed
+        response. If the connection is lost, it is reopened and idempotent commands are sent again.
+
+        Args:
+            command_data (dict): The command, with the "command" name and its "args".
+
+        Returns:
+            dict: The response received from the server, or an error response with "is_connection_error" set if
+                the server could not be reached.
+        """
+        for attempt in range(self.REQUEST_ATTEMPTS):
+            if self.client is None and not self._reconnect_with_backoff():
+                return connection_error_response("Could not reach the server!")
+            if attempt and command_data.get("command") not in IDEMPOTENT_COMMANDS:
+                return connection_error_response("Connection lost, the command may not have been handled!")
+
+            try:
+                response = self._request(command_data)
+            except CodecError as exception:
+                LOGGER.warning("Invalid message from the server: %s", exception)
+                return connection_error_response("Invalid message from the server!")
+            except OSError as exception:
+                LOGGER.warning("Connection lost while sending %s: %s", command_data.get("command"), exception)
+                self.close()
+                continue
+
+            self._track_subscription(command_data, response)
             return response
-        except socket.timeout:
-            print("Socket timed out while waiting for a response.")
-        except socket.error as exception:
-            print(f"Socket error: {exception}")
-        return None
 
-    def close(self):
+        return connection_error_response("Connection lost!")
+
+    def _request(self, command_data):
         """
-        Closes the socket connection to the server.
+        Sends a command and waits for its response, keeping aside the events received in the meantime, and records
+        the round-trip time.
+
+        Args:
+            command_data (dict): The command.
+
+        Returns:
+            dict: The response.
 
         Raises:
-            socket.error: If a socket error occurs during the closing process.
+            OSError: If the connection fails or is closed.
+            CodecError: If the response is not a valid message.
+        """
+        LOGGER.debug("Sending %s", command_data)
+        started = time.perf_counter()
+        self.client.sendall(encode_frame(self.codec.encode(command_data)))
+        while True:
+            message = self._receive_message()
+            if message is None:
+                raise ConnectionError("Connection closed by the server.")
+            if not is_event_message(message):
+                response = decode_message(message)
+                self.rtt_statistics.add(time.perf_counter() - started)
+                return response
+            self._keep_event(message)
+
+    def _track_subscription(self, command_data, response):
+        """
+        Records whether the client is subscribed to events, to renew the subscription after a reconnection.
+
+        Args:
+            command_data (dict): The command.
+            response (dict): The response of the server.
+        """
+        if command_data.get("command") == command_literals.COMMAND_BATCH and response["status"] == "success":
+            for sub_command_data, sub_response in zip(command_data["args"]["commands"], response["args"]["responses"]):
+                self._track_subscription(sub_command_data, sub_response)
+        elif command_data.get("command") == command_literals.COMMAND_SUBSCRIBE_EVENTS:
+            self.is_subscribed = response["status"] == "success"
+
+    def get_rtt_statistics(self):
+        """
+        Returns the round-trip time statistics of the requests.
+
+        Returns:
+            dict: The statistics in milliseconds, see `RttStatistics.get_summary`.
+        """
+        return self.rtt_statistics.get_summary()
+
+    def _receive_message(self):
+        """
+        Blocks until the next whole message from the server is available.
+
+        Returns:
+            bytes: The received message, or None if the connection was closed.
+        """
+        while not self.received_messages:
+            data = self.client.recv(self.RECEIVE_BUFFER_SIZE)
+            if not data:
+                return None
+            self.received_messages.extend(self.frame_decoder.feed(data))
+
+        return self.received_messages.popleft()
+
+    def _keep_event(self, message):
+        """
+        Keeps a pushed event until it is received.
+
+        Args:
+            message (bytes): The encoded event.
+        """
+        try:
+            self.pending_events.append(decode_message(message))
+        except CodecError as exception:
+            LOGGER.warning("Dropping invalid event: %s", exception)
+
+    def receive_events(self):
         """
+        Returns the events pushed by the server since the last call, reading only the data that already arrived.
+        A lost connection is reopened when the backoff delay allows it.
+
+        Returns:
+            list: The received events as dictionaries.
+        """
+        if self.client is None:
+            self._reconnect_when_due()
+
+        if self.client is not None:
+            try:
+                while select.select([self.client], [], [], 0)[0]:
+                    data = self.client.recv(self.RECEIVE_BUFFER_SIZE)
+                    if not data:
+                        raise ConnectionError("Connection closed by the server.")
+                    self.received_messages.extend(self.frame_decoder.feed(data))
+            except OSError as exception:
+                LOGGER.warning("Connection lost: %s", exception)
+                self.close()
+                self._reconnect_when_due()
+
+        while self.received_messages:
+            message = self.received_messages.popleft()
+            if is_event_message(message):
+                self._keep_event(message)
+            else:
+                LOGGER.warning("Dropping unexpected response: %s", message)
+
+        events, self.pending_events = self.pending_events, []
+        return events
+
+    def close(self):
+        """
+        Closes the socket connection to the server, if it is open.
+        """
+        if self.client is None:
+            return
+
         try:
             self.client.close()
-        except socket.error as exception:
-            print(f"Socket error during close: {exception}")
+        except OSError as exception:
+            LOGGER.warning("Socket error during close: %s", exception)
+        self.client = None
@@ -0,0 +1,302 @@
+"""
+Module for the network worker of the client. The worker owns the network and talks to the server on a background
+thread, so that the pygame loop never waits for the server. The callbacks of the completed requests are queued and
+run by the thread processing the queue, which is the pygame loop once per frame.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+from game.server.network import AbstractNetwork
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CompletedRequests:
+    """
+    Thread-safe queue of the completed requests whose callbacks wait to be run.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty CompletedRequests queue.
+        """
+        self.requests = queue.SimpleQueue()
+
+    def put(self, future, callback, error_callback):
+        """
+        Queues a completed request.
+
+        Args:
+            future (Future): The future of the request, which is done.
+            callback (callable): Called with the result of the request if it succeeded, or None.
+            error_callback (callable): Called with the exception of the request if it failed, or None.
+        """
+        self.requests.put((future, callback, error_callback))
+
+    def process(self):
+        """
+        Runs the callbacks of the requests completed so far. Requests completed while the callbacks run are left for
+        the next call, so a frame is never stalled by a stream of responses.
+
+        Returns:
+            int: The number of processed requests.
+        """
+        count = self.requests.qsize()
+        for _ in range(count):
+            future, callback, error_callback = self.requests.get_nowait()
+            exception = future.exception()
+            if exception is None:
+                if callback is not None:
+                    callback(future.result())
+            elif error_callback is not None:
+                error_callback(exception)
+            else:
+                LOGGER.error("Request failed: %s", exception, exc_info=exception)
+
+        return count
+
+
+# The queue drained by the application once per frame
+COMPLETED_REQUESTS = CompletedRequests()
+
+
+class NetworkWorker(AbstractNetwork):
+    """
+    Runs a network on a background thread. The requests are sent in the order they were submitted, and while no
+    request waits the worker reads the events pushed by the server, which `receive_events` returns without blocking.
+
+    The blocking methods of the network interface are still available: called from another thread they wait for the
+    worker, and called from the worker itself, by a function it runs, they use the network directly.
+
+    Example:
+        network_client = NetworkWorker(MultiplayerNetwork)
+        network_client.connect(callback=on_connected, error_callback=on_connection_error)
+        network_client.request(command_data, callback=on_response)
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, network_factory, completed_requests=COMPLETED_REQUESTS):
+        """
+        Initializes a NetworkWorker and starts its thread. The network is created by `connect`.
+
+        Args:
+            network_factory (callable): Creates the network, connecting it to the server.
+            completed_requests (CompletedRequests, optional): The queue of the completed requests with callbacks.
+                Defaults to COMPLETED_REQUESTS, the queue drained by the application.
+        """
+        self.network_factory = network_factory
+        self.completed_requests = completed_requests
+        self.network = None
+        self.tasks = queue.SimpleQueue()
+        self.events = queue.SimpleQueue()
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, name="network-worker", daemon=True)
+        self.thread.start()
+
+    def connect(self, callback=None, error_callback=None):
+        """
+        Creates the network on the worker thread.
+
+        Args:
+            callback (callable, optional): Called with the network once it is connected. Defaults to None.
+            error_callback (callable, optional): Called with the exception if the network could not connect.
+                Defaults to None.
+
+        Returns:
+            Future: The future of the network.
+        """
+        return self.submit(self._create_network, callback=callback, error_callback=error_callback)
+
+    def _create_network(self):
+        """
+        Creates the network with the factory.
+
+        Returns:
+            AbstractNetwork: The network.
+        """
+        self.network = self.network_factory()
+        return self.network
+
+    def submit(self, function, *args, callback=None, error_callback=None, **kwargs):
+        """
+        Runs a function on the worker thread, after the functions submitted before it.
+
+        Args:
+            function (callable): The function, which can use the network.
+            *args: Positional arguments for the function.
+            callback (callable, optional): Called with the result of the function when the completed requests are
+                processed. Defaults to None.
+            error_callback (callable, optional): Called with the exception raised by the function when the completed
+                requests are processed. Defaults to None, meaning that the exception is logged.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            Future: The future of the function's result.
+        """
+        future = Future()
+        if not self.is_running:
+            future.set_exception(ConnectionError("The network worker is closed."))
+            if callback is not None or error_callback is not None:
+                self.completed_requests.put(future, callback, error_callback)
+        else:
+            self.tasks.put((future, function, args, kwargs, callback, error_callback))
+        return future
+
+    def request(self, command_data, callback=None, error_callback=None):
+        """
+        Sends a command on the worker thread.
+
+        Args:
+            command_data (dict): The command, with the "command" name and its "args".
+            callback (callable, optional): Called with the response when the completed requests are processed.
+                Defaults to None.
+            error_callback (callable, optional): Called with the exception if the command could not be sent.
+                Defaults to None.
+
+        Returns:
+            Future: The future of the response.
+        """
+        return self.submit(self._send, command_data, callback=callback, error_callback=error_callback)
+
+    def _send(self, command_data):
+        """
+        Sends a command with the network.
+
+        Args:
+            command_data (dict): The command, with the "command" name and its "args".
+
+        Returns:
+            dict: The response.
+        """
+        return self.network.send(command_data)
+
+    def _call_network(self, method_name, *args):
+        """
+        Calls a method of the network on the worker thread and waits for its result.
+
+        Args:
+            method_name (str): The name of the method.
+            *args: Arguments for the method.
+
+        Returns:
+            The result of the method.
+        """
+        if threading.current_thread() is self.thread:
+            return getattr(self.network, method_name)(*args)
+        return self.submit(lambda: getattr(self.network, method_name)(*args)).result()
+
+    def send(self, command_data):
+        """
+        Sends a command and waits for its response.
+
+        Args:
+            command_data (dict): The command, with the "command" name and its "args".
+
+        Returns:
+            dict: The response.
+        """
+        return self._call_network("send", command_data)
+
+    def connect_to_node(self, node_id):
+        """
+        Moves the connection to another server node and waits until it is moved.
+
+        Args:
+            node_id (str): The "host:port" address of the node.
+
+        Returns:
+            bool: True if the connection was moved, False otherwise.
+        """
+        return self._call_network("connect_to_node", node_id)
+
+    def reconnect(self):
+        """
+        Reconnects to the server and waits until the session is resumed.
+
+        Returns:
+            bool: True if the session was resumed, False otherwise.
+        """
+        return self._call_network("reconnect")
+
+    def receive_events(self):
+        """
+        Returns the events that the worker received since the last call, without blocking.
+
+        Returns:
+            list: The received events as dictionaries.
+        """
+        events = []
+        while not self.events.empty():
+            events.append(self.events.get_nowait())
+        return events
+
+    def close(self):
+        """
+        Stops the worker once the submitted functions have run, and closes the network. Does not wait for the
+        worker, whose thread can be joined to do so.
+        """
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        self.tasks.put(None)
+
+    def _run(self):
+        """
+        Runs the submitted functions and receives the pushed events until the worker is closed.
+        """
+        while True:
+            try:
+                task = self.tasks.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                self._receive_events()
+                continue
+
+            if task is None:
+                break
+
+            self._run_task(*task)
+            self._receive_events()
+
+        if self.network is not None:
+            self.network.close()
+
+    def _run_task(self, future, function, args, kwargs, callback, error_callback):
+        """
+        Runs a submitted function and queues its callbacks.
+
+        Args:
+            future (Future): The future of the function's result.
+            function (callable): The function.
+            args (tuple): Positional arguments for the function.
+            kwargs (dict): Keyword arguments for the function.
+            callback (callable): Called with the result, or None.
+            error_callback (callable): Called with the exception, or None.
+        """
+        if not future.set_running_or_notify_cancel():
+            return
+
+        try:
+            future.set_result(function(*args, **kwargs))
+        except Exception as exception:  # pylint: disable=W0703
+            future.set_exception(exception)
+
+        if callback is not None or error_callback is not None:
+            self.completed_requests.put(future, callback, error_callback)
+
+    def _receive_events(self):
+        """
+        Keeps the events pushed by the server until `receive_events` returns them.
+        """
+        if self.network is None:
+            return
+
+        try:
+            for event in self.network.receive_events():
+                self.events.put(event)
+        except Exception:  # pylint: disable=W0703
+            LOGGER.exception("Exception receiving events")
@@ -1,12 +1,19 @@
 """Module that makes a room environment for a battle between clients."""
 
-from time import time
+import logging
+import threading
+from time import time, monotonic
 from game.interface.base_board import BaseBoard
+from game.server.event_log import EventLog
+from game.tracing import traced
+from game.players import command_literals
+
+LOGGER = logging.getLogger(__name__)
 
 
 class RoomClient:
     """
-    Represents a client in a room, including their game board and shot history.
+    Represents a client in a room, including their game board.
     """
 
     def __init__(self, client, client_name):
@@ -20,9 +27,10 @@ class RoomClient:
         self.client = client
         self.client_name = client_name
         self.board = None
-        self.shot_history = []
         self.has_board = False
         self.is_turn = False
+        self.has_recorded_enemy_board = False
+        self.is_connected = True
 
     def add_board(self, board_json):
         """
@@ -37,7 +45,7 @@ class RoomClient:
         try:
             self.board = BaseBoard.deserialize_board(board_json)
         except ValueError as exception:
-            print(exception)
+            LOGGER.info("Rejected board: %s", exception)
             return False
 
         self.has_board = True
@@ -65,27 +73,14 @@ class RoomClient:
         """
         return self.board.are_all_ships_sunk()
 
-    def add_shot_history_of_enemy(self, row, col, is_turn, has_battle_ended, is_winner, turn_end_time):
-        """
-        Adds an entry to the shot history.
-
-        Args:
-            row (int): The row of the shot.
-            col (int): The column of the shot.
-            is_turn (bool): Whether it was the client's turn.
-            has_battle_ended (bool): Whether the battle has ended.
-            is_winner (bool): Whether the client is a winner.
-            turn_end_time (float): The end time of the turn.
-        """
-        self.shot_history.append((row, col, is_turn, has_battle_ended, is_winner, turn_end_time))
-
 
 class Room:
     """
-    Represents a room where a battle occurs between clients.
+    Represents a room where a battle occurs between clients. The shots are recorded in the room's event log for the
+    client that was shot at.
     """
 
-    def __init__(self, room_id, client, client_name, time_per_turn):
+    def __init__(self, room_id, client, client_name, time_per_turn, matchmaking_bucket=None):
         """
         Initializes a Room instance.
 
@@ -94,6 +89,7 @@ class Room:
             client (Client): The client creating or joining the room.
             client_name (str): The name of the client.
             time_per_turn (int): The time allowed per turn in seconds.
+            matchmaking_bucket (str, optional): The matchmaking bucket random joins are matched in. Defaults to None.
         """
         self.room_id = room_id
         self.clients = {client: RoomClient(client, client_name)}
@@ -105,7 +101,12 @@ class Room:
         self.loser = None
         self.time_per_turn = time_per_turn
         self.turn_end_time = None
+        self.turn_deadline = None
         self.is_timeout = False
+        self.matchmaking_bucket = matchmaking_bucket
+        self.last_activity_time = monotonic()
+        self.event_log = EventLog()
+        self.lock = threading.RLock()
 
     def change_publicity(self):
         """
@@ -117,6 +118,43 @@ class Room:
         self.is_private = not self.is_private
         return self.is_private
 
+    def touch(self):
+        """
+        Records that a client of the room was active.
+        """
+        self.last_activity_time = monotonic()
+
+    def are_all_clients_disconnected(self):
+        """
+        Checks if every client of the room has disconnected.
+
+        Returns:
+            bool: True if no client of the room is connected, False otherwise.
+        """
+        return not any(room_client.is_connected for room_client in self.clients.values())
+
+    def is_open(self):
+        """
+        Checks if the room can be joined with a random join.
+
+        Returns:
+            bool: True if the room is public and not full, False otherwise.
+        """
+        return not self.is_private and not self.is_full
+
+    def get_phase(self):
+        """
+        Returns the phase of the room.
+
+        Returns:
+            str: "waiting" for an opponent, "placement" of the ships, "battle" or "ended".
+        """
+        if self.has_battle_ended:
+            return "ended"
+        if self.has_battle_started:
+            return "battle"
+        return "placement" if self.is_full else "waiting"
+
     def add_board_for_client(self, client, board_json):
         """
         Adds a board for a specific client.
@@ -169,7 +207,7 @@ class Room:
         """
         self.clients[client].is_turn = True
         self.get_opponent_room_client(client).is_turn = False
-        self.turn_end_time = self._get_end_of_turn()
+        self._restart_turn_time()
 
     def take_client_turn(self, client):
         """
@@ -180,7 +218,7 @@ class Room:
         """
         self.clients[client].is_turn = False
         self.get_opponent_room_client(client).is_turn = True
-        self.turn_end_time = self._get_end_of_turn()
+        self._restart_turn_time()
 
     def is_client_shot_valid(self, client, row, col):
         """
@@ -197,6 +235,7 @@ class Room:
         target_client = self.get_opponent_room_client(client)
         return target_client.is_shot_valid(row, col)
 
+    @traced
     def register_shot_for_client(self, client, row, col):
         """
         Registers a shot from a specific client.
@@ -219,13 +258,18 @@ class Room:
 
         self.check_has_battle_ended()
 
-        target_client.add_shot_history_of_enemy(
-            row,
-            col,
-            target_client.is_turn,
-            self.has_battle_ended,
-            self.is_client_winner(target_client.client),
-            self.turn_end_time,
+        self.event_log.append(
+            target_client.client,
+            command_literals.EVENT_OPPONENT_SHOT,
+            {
+                "row": row,
+                "col": col,
+                "is_turn": target_client.is_turn,
+                "turn_end_time": self.turn_end_time,
+                "has_battle_ended": self.has_battle_ended,
+                "is_winner": self.is_client_winner(target_client.client),
+                "is_timeout": self.is_timeout,
+            },
         )
 
         return (
@@ -239,19 +283,16 @@ class Room:
 
     def give_shot_from_history(self, client):
         """
-        Retrieves and removes the next shot from the client's shot history.
+        Retrieves the next opponent's shot that was not delivered to the client yet and marks it as delivered. It
+        stays in the event log until the client acknowledges it.
 
         Args:
-            client (Client): The client whose shot history is being accessed.
+            client (Client): The client that was shot at.
 
         Returns:
-            tuple: The next shot from the history or None if history is empty.
+            LoggedEvent: The next shot, or None if every shot was delivered.
         """
-        shot_history = self.clients[client].shot_history
-        if len(shot_history) == 0:
-            return None
-
-        return shot_history.pop(0)
+        return self.event_log.deliver_next(client)
 
     def get_opponent_room_client(self, client):
         """
@@ -299,12 +340,20 @@ class Room:
         Returns:
             bool: True if the turn is late, False otherwise.
         """
-        if self.time_per_turn is None:
+        if self.time_per_turn is None or self.turn_deadline is None:
             return False
 
-        self.is_timeout = self.turn_end_time - time() < 0
+        self.is_timeout = monotonic() >= self.turn_deadline
         return self.is_timeout
 
+    def _restart_turn_time(self):
+        """
+        Starts the time of a new turn. The wall clock end of the turn is sent to the clients, while the server
+        measures the turn against a monotonic deadline that is not affected by changes of the system time.
+        """
+        self.turn_end_time = self._get_end_of_turn()
+        self.turn_deadline = None if self.time_per_turn is None else monotonic() + self.time_per_turn
+
     def _get_end_of_turn(self):
         """
         Calculates the end time of the current turn.
@@ -0,0 +1,448 @@
+"""
+Module for the room directory shared by the server nodes of a deployment. The directory knows which node hosts every
+room, which rooms are open for a random join and which room every client is in, so the nodes can share one lobby
+while each of them keeps its own rooms in memory.
+"""
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from game.server.matchmaking import MatchmakingQueue
+
+
+class RoomDirectory(ABC):
+    """
+    Abstract directory of rooms, open rooms and clients, shared by the server nodes.
+
+    Clients are identified by keys that are unique across the nodes. Implementations have to be thread-safe.
+    """
+
+    @abstractmethod
+    def register_room(self, room_id, node_id):
+        """
+        Registers a room hosted by a node, unless a room with the same ID exists on any node.
+
+        Args:
+            room_id (str): The ID of the room.
+            node_id (str): The ID of the node hosting the room.
+
+        Returns:
+            bool: True if the room was registered, False if the ID is taken.
+        """
+
+    @abstractmethod
+    def unregister_room(self, room_id):
+        """
+        Removes a room together with its open room entry and the mappings of its clients.
+
+        Args:
+            room_id (str): The ID of the room.
+        """
+
+    @abstractmethod
+    def get_room_node(self, room_id):
+        """
+        Returns the node hosting a room.
+
+        Args:
+            room_id (str): The ID of the room.
+
+        Returns:
+            str: The ID of the node, or None if the room does not exist.
+        """
+
+    @abstractmethod
+    def add_open_room(self, room_id, bucket=None):
+        """
+        Adds a room to the end of the open room queue of its matchmaking bucket. Adding a queued room does nothing.
+
+        Args:
+            room_id (str): The ID of the room.
+            bucket (str, optional): The matchmaking bucket of the room. Defaults to None, the default bucket.
+        """
+
+    @abstractmethod
+    def remove_open_room(self, room_id):
+        """
+        Removes a room from the open room queue if it is queued.
+
+        Args:
+            room_id (str): The ID of the room.
+
+        Returns:
+            bool: True if the room was queued, False otherwise.
+        """
+
+    @abstractmethod
+    def peek_open_room(self, bucket=None):
+        """
+        Returns the oldest open room of a matchmaking bucket without removing it from the queue.
+
+        Args:
+            bucket (str, optional): The bucket to match in. Defaults to None, the default bucket.
+
+        Returns:
+            str: The ID of the room, or None if the bucket has no open rooms.
+        """
+
+    @abstractmethod
+    def pop_open_room(self, bucket=None):
+        """
+        Removes and returns the oldest open room of a matchmaking bucket.
+
+        Args:
+            bucket (str, optional): The bucket to match in. Defaults to None, the default bucket.
+
+        Returns:
+            str: The ID of the room, or None if the bucket has no open rooms.
+        """
+
+    @abstractmethod
+    def is_room_open(self, room_id):
+        """
+        Checks if a room is in the open room queue.
+
+        Args:
+            room_id (str): The ID of the room.
+
+        Returns:
+            bool: True if the room is queued, False otherwise.
+        """
+
+    @abstractmethod
+    def get_open_rooms_count(self):
+        """
+        Returns the number of queued open rooms in all buckets.
+
+        Returns:
+            int: The number of open rooms.
+        """
+
+    @abstractmethod
+    def set_client_room(self, client_key, room_id):
+        """
+        Records the room a client is in.
+
+        Args:
+            client_key (str): The key of the client.
+            room_id (str): The ID of the room.
+        """
+
+    @abstractmethod
+    def remove_client(self, client_key):
+        """
+        Forgets the room of a client.
+
+        Args:
+            client_key (str): The key of the client.
+        """
+
+    @abstractmethod
+    def get_client_room(self, client_key):
+        """
+        Returns the room a client is in.
+
+        Args:
+            client_key (str): The key of the client.
+
+        Returns:
+            str: The ID of the room, or None if the client is not in a room.
+        """
+
+    def close(self):
+        """
+        Releases the resources of the directory.
+        """
+
+
+class InMemoryRoomDirectory(RoomDirectory):
+    """
+    Room directory kept in the memory of one process, for deployments with a single node.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty InMemoryRoomDirectory.
+        """
+        self.rooms_to_nodes = {}
+        self.clients_to_rooms = {}
+        self.rooms_to_clients = {}
+        self.open_rooms = MatchmakingQueue()
+        self.lock = threading.Lock()
+
+    def register_room(self, room_id, node_id):
+        """
+        Registers a room in memory unless its ID is taken, see `RoomDirectory.register_room`.
+        """
+        with self.lock:
+            if room_id in self.rooms_to_nodes:
+                return False
+            self.rooms_to_nodes[room_id] = node_id
+            return True
+
+    def unregister_room(self, room_id):
+        """
+        Removes a room, its open room entry and its clients, see `RoomDirectory.unregister_room`.
+        """
+        self.open_rooms.remove(room_id)
+        with self.lock:
+            self.rooms_to_nodes.pop(room_id, None)
+            for client_key in self.rooms_to_clients.pop(room_id, ()):
+                del self.clients_to_rooms[client_key]
+
+    def get_room_node(self, room_id):
+        """
+        Returns the node hosting a room, see `RoomDirectory.get_room_node`.
+        """
+        return self.rooms_to_nodes.get(room_id)
+
+    def add_open_room(self, room_id, bucket=None):
+        """
+        Queues an open room, see `RoomDirectory.add_open_room`.
+        """
+        self.open_rooms.add(room_id, bucket)
+
+    def remove_open_room(self, room_id):
+        """
+        Removes a room from the open room queue, see `RoomDirectory.remove_open_room`.
+        """
+        return self.open_rooms.remove(room_id)
+
+    def peek_open_room(self, bucket=None):
+        """
+        Returns the oldest open room of a bucket, see `RoomDirectory.peek_open_room`.
+        """
+        return self.open_rooms.peek(bucket)
+
+    def pop_open_room(self, bucket=None):
+        """
+        Pops the oldest open room of a bucket, see `RoomDirectory.pop_open_room`.
+        """
+        return self.open_rooms.pop(bucket)
+
+    def is_room_open(self, room_id):
+        """
+        Checks if a room is queued, see `RoomDirectory.is_room_open`.
+        """
+        return room_id in self.open_rooms
+
+    def get_open_rooms_count(self):
+        """
+        Returns the number of open rooms, see `RoomDirectory.get_open_rooms_count`.
+        """
+        return len(self.open_rooms)
+
+    def set_client_room(self, client_key, room_id):
+        """
+        Records the room of a client, see `RoomDirectory.set_client_room`.
+        """
+        with self.lock:
+            self._remove_client(client_key)
+            self.clients_to_rooms[client_key] = room_id
+            self.rooms_to_clients.setdefault(room_id, set()).add(client_key)
+
+    def remove_client(self, client_key):
+        """
+        Forgets the room of a client, see `RoomDirectory.remove_client`.
+        """
+        with self.lock:
+            self._remove_client(client_key)
+
+    def _remove_client(self, client_key):
+        """
+        Forgets the room of a client. The lock of the directory has to be held.
+
+        Args:
+            client_key (str): The key of the client.
+        """
+        room_id = self.clients_to_rooms.pop(client_key, None)
+        if room_id is None:
+            return
+
+        room_clients = self.rooms_to_clients[room_id]
+        room_clients.discard(client_key)
+        if not room_clients:
+            del self.rooms_to_clients[room_id]
+
+    def get_client_room(self, client_key):
+        """
+        Returns the room of a client, see `RoomDirectory.get_client_room`.
+        """
+        return self.clients_to_rooms.get(client_key)
+
+
+class SQLiteRoomDirectory(RoomDirectory):
+    """
+    Room directory stored in an SQLite database file, which lets several server nodes on one host share a lobby.
+
+    It is a local stand-in for a networked store. Every node opens the same file, and the writes that read first are
+    done in immediate transactions, so two nodes never register the same room ID or pop the same open room.
+    """
+
+    BUSY_TIMEOUT = 5
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rooms (room_id TEXT PRIMARY KEY, node_id TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS open_rooms (
+            sequence INTEGER PRIMARY KEY AUTOINCREMENT,
+            room_id TEXT NOT NULL UNIQUE,
+            bucket TEXT
+        );
+        CREATE INDEX IF NOT EXISTS open_rooms_bucket ON open_rooms (bucket, sequence);
+        CREATE TABLE IF NOT EXISTS clients (client_key TEXT PRIMARY KEY, room_id TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS clients_room ON clients (room_id);
+    """
+
+    def __init__(self, database_path):
+        """
+        Initializes the SQLiteRoomDirectory, creating the database file and its tables if needed.
+
+        Args:
+            database_path (str): The path of the database file shared by the nodes.
+        """
+        self.database_path = database_path
+        self.connection = sqlite3.connect(
+            database_path, timeout=self.BUSY_TIMEOUT, isolation_level=None, check_same_thread=False
+        )
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Runs the statements of the block in one immediate transaction, which holds the write lock of the database
+        from its start.
+
+        Yields:
+            sqlite3.Connection: The connection to run the statements on.
+        """
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def _execute(self, statement, parameters=()):
+        """
+        Runs a single statement in its own transaction.
+
+        Args:
+            statement (str): The SQL statement.
+            parameters (tuple, optional): The parameters of the statement. Defaults to ().
+
+        Returns:
+            sqlite3.Cursor: The cursor of the statement.
+        """
+        with self.lock:
+            return self.connection.execute(statement, parameters)
+
+    def _fetch_value(self, statement, parameters=()):
+        """
+        Runs a query and returns the first column of its first row.
+
+        Args:
+            statement (str): The SQL query.
+            parameters (tuple, optional): The parameters of the query. Defaults to ().
+
+        Returns:
+            object: The value, or None if the query returned no rows.
+        """
+        with self.lock:
+            row = self.connection.execute(statement, parameters).fetchone()
+        return None if row is None else row[0]
+
+    def register_room(self, room_id, node_id):
+        """
+        Inserts a room unless its ID is taken on any node, see `RoomDirectory.register_room`.
+        """
+        cursor = self._execute("INSERT OR IGNORE INTO rooms (room_id, node_id) VALUES (?, ?)", (room_id, node_id))
+        return cursor.rowcount == 1
+
+    def unregister_room(self, room_id):
+        """
+        Deletes a room, its open room entry and its clients in one transaction, see `RoomDirectory.unregister_room`.
+        """
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM rooms WHERE room_id = ?", (room_id,))
+            connection.execute("DELETE FROM open_rooms WHERE room_id = ?", (room_id,))
+            connection.execute("DELETE FROM clients WHERE room_id = ?", (room_id,))
+
+    def get_room_node(self, room_id):
+        """
+        Returns the node hosting a room, see `RoomDirectory.get_room_node`.
+        """
+        return self._fetch_value("SELECT node_id FROM rooms WHERE room_id = ?", (room_id,))
+
+    def add_open_room(self, room_id, bucket=None):
+        """
+        Queues an open room, see `RoomDirectory.add_open_room`.
+        """
+        self._execute("INSERT OR IGNORE INTO open_rooms (room_id, bucket) VALUES (?, ?)", (room_id, bucket))
+
+    def remove_open_room(self, room_id):
+        """
+        Removes a room from the open room queue, see `RoomDirectory.remove_open_room`.
+        """
+        return self._execute("DELETE FROM open_rooms WHERE room_id = ?", (room_id,)).rowcount == 1
+
+    def peek_open_room(self, bucket=None):
+        """
+        Returns the oldest open room of a bucket, see `RoomDirectory.peek_open_room`.
+        """
+        return self._fetch_value("SELECT room_id FROM open_rooms WHERE bucket IS ? ORDER BY sequence LIMIT 1", (bucket,))
+
+    def pop_open_room(self, bucket=None):
+        """
+        Pops the oldest open room of a bucket in one transaction, see `RoomDirectory.pop_open_room`.
+        """
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT sequence, room_id FROM open_rooms WHERE bucket IS ? ORDER BY sequence LIMIT 1", (bucket,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("DELETE FROM open_rooms WHERE sequence = ?", (row[0],))
+            return row[1]
+
+    def is_room_open(self, room_id):
+        """
+        Checks if a room is queued, see `RoomDirectory.is_room_open`.
+        """
+        return self._fetch_value("SELECT 1 FROM open_rooms WHERE room_id = ?", (room_id,)) is not None
+
+    def get_open_rooms_count(self):
+        """
+        Returns the number of open rooms, see `RoomDirectory.get_open_rooms_count`.
+        """
+        return self._fetch_value("SELECT COUNT(*) FROM open_rooms")
+
+    def set_client_room(self, client_key, room_id):
+        """
+        Records the room of a client, see `RoomDirectory.set_client_room`.
+        """
+        self._execute("INSERT OR REPLACE INTO clients (client_key, room_id) VALUES (?, ?)", (client_key, room_id))
+
+    def remove_client(self, client_key):
+        """
+        Forgets the room of a client, see `RoomDirectory.remove_client`.
+        """
+        self._execute("DELETE FROM clients WHERE client_key = ?", (client_key,))
+
+    def get_client_room(self, client_key):
+        """
+        Returns the room of a client, see `RoomDirectory.get_client_room`.
+        """
+        return self._fetch_value("SELECT room_id FROM clients WHERE client_key = ?", (client_key,))
+
+    def close(self):
+        """
+        Closes the connection to the database.
+        """
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,200 @@
+"""
+Module for the thread-safe registry that maps room IDs to rooms and clients to room IDs. The registry is split into
+shards with one lock each, so threads working with unrelated rooms rarely wait for each other.
+"""
+
+import threading
+
+_MISSING = object()
+
+
+class ShardedRegistry:
+    """
+    Dictionary-like mapping split into shards by the hash of the key, each shard guarded by its own lock.
+
+    Single operations are atomic. Operations that span several keys, such as `values`, return a snapshot taken one
+    shard at a time.
+    """
+
+    SHARDS_COUNT = 16
+
+    def __init__(self, shards_count=SHARDS_COUNT):
+        """
+        Initializes an empty ShardedRegistry.
+
+        Args:
+            shards_count (int, optional): The number of shards. Defaults to SHARDS_COUNT.
+        """
+        self.shards = [{} for _ in range(shards_count)]
+        self.locks = [threading.Lock() for _ in range(shards_count)]
+
+    def _get_shard_index(self, key):
+        """
+        Returns the index of the shard holding a key.
+
+        Args:
+            key (hashable): The key.
+
+        Returns:
+            int: The index of the shard.
+        """
+        return hash(key) % len(self.shards)
+
+    def get(self, key, default=None):
+        """
+        Returns the value of a key.
+
+        Args:
+            key (hashable): The key.
+            default (object, optional): The value returned if the key is missing. Defaults to None.
+
+        Returns:
+            object: The value of the key, or the default.
+        """
+        return self.shards[self._get_shard_index(key)].get(key, default)
+
+    def __getitem__(self, key):
+        """
+        Returns the value of a key.
+
+        Args:
+            key (hashable): The key.
+
+        Returns:
+            object: The value of the key.
+
+        Raises:
+            KeyError: If the key is missing.
+        """
+        return self.shards[self._get_shard_index(key)][key]
+
+    def __setitem__(self, key, value):
+        """
+        Sets the value of a key.
+
+        Args:
+            key (hashable): The key.
+            value (object): The value.
+        """
+        shard_index = self._get_shard_index(key)
+        with self.locks[shard_index]:
+            self.shards[shard_index][key] = value
+
+    def add_if_absent(self, key, value):
+        """
+        Sets the value of a key only if the key is missing.
+
+        Args:
+            key (hashable): The key.
+            value (object): The value.
+
+        Returns:
+            bool: True if the value was set, False if the key was already present.
+        """
+        shard_index = self._get_shard_index(key)
+        with self.locks[shard_index]:
+            shard = self.shards[shard_index]
+            if key in shard:
+                return False
+            shard[key] = value
+            return True
+
+    def pop(self, key, default=_MISSING):
+        """
+        Removes a key and returns its value.
+
+        Args:
+            key (hashable): The key.
+            default (object, optional): The value returned if the key is missing. Defaults to raising KeyError.
+
+        Returns:
+            object: The value of the key, or the default.
+
+        Raises:
+            KeyError: If the key is missing and no default is given.
+        """
+        shard_index = self._get_shard_index(key)
+        with self.locks[shard_index]:
+            if default is _MISSING:
+                return self.shards[shard_index].pop(key)
+            return self.shards[shard_index].pop(key, default)
+
+    def remove_if_equal(self, key, value):
+        """
+        Removes a key only if it still has a given value.
+
+        Args:
+            key (hashable): The key.
+            value (object): The expected value.
+
+        Returns:
+            bool: True if the key was removed, False otherwise.
+        """
+        shard_index = self._get_shard_index(key)
+        with self.locks[shard_index]:
+            shard = self.shards[shard_index]
+            if key not in shard or shard[key] != value:
+                return False
+            del shard[key]
+            return True
+
+    def __contains__(self, key):
+        """
+        Checks if a key is present.
+
+        Args:
+            key (hashable): The key.
+
+        Returns:
+            bool: True if the key is present, False otherwise.
+        """
+        return key in self.shards[self._get_shard_index(key)]
+
+    def __len__(self):
+        """
+        Returns the number of keys.
+
+        Returns:
+            int: The number of keys.
+        """
+        return sum(len(shard) for shard in self.shards)
+
+    def items(self):
+        """
+        Returns a snapshot of the key and value pairs.
+
+        Returns:
+            list: The (key, value) pairs.
+        """
+        items = []
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                items.extend(shard.items())
+        return items
+
+    def keys(self):
+        """
+        Returns a snapshot of the keys.
+
+        Returns:
+            list: The keys.
+        """
+        return [key for key, _ in self.items()]
+
+    def values(self):
+        """
+        Returns a snapshot of the values.
+
+        Returns:
+            list: The values.
+        """
+        return [value for _, value in self.items()]
+
+    def __iter__(self):
+        """
+        Iterates over a snapshot of the keys.
+
+        Returns:
+            iterator: The iterator over the keys.
+        """
+        return iter(self.keys())
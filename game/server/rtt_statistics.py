@@ -0,0 +1,91 @@
+"""
+Module for the round-trip time statistics of the requests a client sends to the server.
+"""
+
+import math
+from collections import deque
+
+
+class RttStatistics:
+    """
+    Round-trip times of the requests of one connection manager. The smoothed time and its variation follow the
+    estimators of TCP (RFC 6298), and the percentiles are computed over a window of the most recent samples.
+    """
+
+    WINDOW_SIZE = 256
+    SMOOTHING_FACTOR = 1 / 8
+    VARIATION_FACTOR = 1 / 4
+
+    def __init__(self, window_size=WINDOW_SIZE):
+        """
+        Initializes empty RttStatistics.
+
+        Args:
+            window_size (int, optional): The number of recent samples kept for the percentiles. Defaults to
+                WINDOW_SIZE.
+        """
+        self.samples = deque(maxlen=window_size)
+        self.count = 0
+        self.smoothed = None
+        self.variation = None
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, rtt):
+        """
+        Records the round-trip time of a request.
+
+        Args:
+            rtt (float): The round-trip time in seconds.
+        """
+        self.samples.append(rtt)
+        self.count += 1
+        if self.smoothed is None:
+            self.smoothed = rtt
+            self.variation = rtt / 2
+            self.minimum = self.maximum = rtt
+            return
+
+        self.variation += self.VARIATION_FACTOR * (abs(self.smoothed - rtt) - self.variation)
+        self.smoothed += self.SMOOTHING_FACTOR * (rtt - self.smoothed)
+        self.minimum = min(self.minimum, rtt)
+        self.maximum = max(self.maximum, rtt)
+
+    def get_percentile(self, percentile):
+        """
+        Returns a percentile of the recent round-trip times, with the nearest-rank method.
+
+        Args:
+            percentile (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The round-trip time in seconds, or None if no request was recorded.
+        """
+        if not self.samples:
+            return None
+
+        ordered_samples = sorted(self.samples)
+        rank = max(math.ceil(percentile / 100 * len(ordered_samples)), 1)
+        return ordered_samples[rank - 1]
+
+    def get_summary(self):
+        """
+        Returns the statistics in milliseconds.
+
+        Returns:
+            dict: The number of requests and the last, smoothed, minimal, median, 95th percentile and maximal
+                round-trip times, None while no request was recorded.
+        """
+
+        def to_milliseconds(seconds):
+            return None if seconds is None else round(seconds * 1000, 3)
+
+        return {
+            "count": self.count,
+            "last_ms": to_milliseconds(self.samples[-1] if self.samples else None),
+            "smoothed_ms": to_milliseconds(self.smoothed),
+            "min_ms": to_milliseconds(self.minimum),
+            "p50_ms": to_milliseconds(self.get_percentile(50)),
+            "p95_ms": to_milliseconds(self.get_percentile(95)),
+            "max_ms": to_milliseconds(self.maximum),
+        }
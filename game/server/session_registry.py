@@ -0,0 +1,180 @@
+"""
+Module for the sessions of the clients connected to a network server. Every connection is given a session with a
+random token, which is the identity of the client in the rooms. When the connection is lost, the session is kept for
+a grace period during which a new connection can resume it with the token and continue in the same room.
+"""
+
+import secrets
+import threading
+
+from game.server.timer_wheel import TimerWheel
+
+
+class ClientSession:
+    """
+    The session of one connection. The transport keeps the session for the lifetime of the connection and reads
+    `client` at every message, since resuming another session changes it.
+    """
+
+    def __init__(self, client, close_connection=None):
+        """
+        Initializes a connected ClientSession.
+
+        Args:
+            client (str): The token of the session, used as the client identifier.
+            close_connection (callable, optional): Closes the connection of the session, called without arguments
+                when a new connection takes the session over. Defaults to None.
+        """
+        self.client = client
+        self.close_connection = close_connection
+        self.is_connected = True
+
+
+class SessionRegistry:
+    """
+    Thread-safe store of the sessions, which expires the sessions of lost connections with a timer wheel.
+    """
+
+    TOKEN_BYTES = 16
+
+    def __init__(self):
+        """
+        Initializes an empty SessionRegistry.
+        """
+        self.sessions = {}
+        self.grace_timers = TimerWheel()
+        self.lock = threading.Lock()
+
+    def open(self, close_connection=None):
+        """
+        Opens the session of a new connection.
+
+        Args:
+            close_connection (callable, optional): Closes the connection, see `ClientSession`. Defaults to None.
+
+        Returns:
+            ClientSession: The session, with a new random token.
+        """
+        with self.lock:
+            session = ClientSession(self._generate_token(), close_connection)
+            self.sessions[session.client] = session
+            return session
+
+    def _generate_token(self):
+        """
+        Generates a token that no session has. The lock of the registry has to be held.
+
+        Returns:
+            str: The token.
+        """
+        while True:
+            token = secrets.token_urlsafe(self.TOKEN_BYTES)
+            if token not in self.sessions:
+                return token
+
+    def disconnect(self, client, grace_period, now=None):
+        """
+        Keeps the session of a lost connection until the grace period ends.
+
+        Args:
+            client (str): The client identifier.
+            grace_period (float): The number of seconds during which the session can be resumed.
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+
+        Returns:
+            bool: True if the client has a session, False otherwise.
+        """
+        with self.lock:
+            session = self.sessions.get(client)
+            if session is None:
+                return False
+
+            session.is_connected = False
+            self.grace_timers.schedule(client, grace_period, now)
+            return True
+
+    def close(self, client):
+        """
+        Forgets the session of a client.
+
+        Args:
+            client (str): The client identifier.
+        """
+        with self.lock:
+            self.sessions.pop(client, None)
+            self.grace_timers.cancel(client)
+
+    def resume(self, client, token):
+        """
+        Moves the connection of a client to the session with a token. The session of the connection takes the token,
+        and its own token is forgotten.
+
+        A session that still counts as connected is taken over too, since its connection may be half-open: a client
+        whose link dropped reconnects before the server notices it. The old connection is given a token of its own,
+        outside of any room, and closed.
+
+        Args:
+            client (str): The client identifier of the connection.
+            token (str): The token of the session to resume.
+
+        Returns:
+            bool: True if the session was resumed, False if the connection has no session or if no session has the
+                token.
+        """
+        with self.lock:
+            session = self.sessions.get(client)
+            resumed_session = self.sessions.get(token)
+            if session is None or resumed_session is None or session is resumed_session:
+                return False
+
+            stale_session = resumed_session if resumed_session.is_connected else None
+            if stale_session is not None:
+                stale_session.client = self._generate_token()
+                self.sessions[stale_session.client] = stale_session
+
+            self.grace_timers.cancel(token)
+            del self.sessions[client]
+            session.client = token
+            self.sessions[token] = session
+
+        if stale_session is not None and stale_session.close_connection is not None:
+            stale_session.close_connection()
+        return True
+
+    def pop_expired(self, now=None):
+        """
+        Forgets the sessions whose grace period has ended.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to None, meaning the current time.
+
+        Returns:
+            list: The client identifiers of the expired sessions.
+        """
+        with self.lock:
+            expired_clients = self.grace_timers.advance(now)
+            for client in expired_clients:
+                del self.sessions[client]
+            return expired_clients
+
+    def get_connected_count(self):
+        """
+        Returns the number of sessions whose connection is open.
+
+        Returns:
+            int: The number of sessions.
+        """
+        with self.lock:
+            return sum(1 for session in self.sessions.values() if session.is_connected)
+
+    def __contains__(self, client):
+        """
+        Checks if a client has a session.
+
+        Args:
+            client (str): The client identifier.
+
+        Returns:
+            bool: True if the client has a session, False otherwise.
+        """
+        return client in self.sessions
@@ -0,0 +1,130 @@
+"""
+Module for the hashed timer wheel that drives the expiry of server-side timeouts. Scheduling, rescheduling and
+cancelling a timer are O(1) and advancing the wheel only visits the slots of the elapsed ticks.
+"""
+
+import math
+import threading
+from time import monotonic
+
+
+class TimerWheel:
+    """
+    Thread-safe hashed timer wheel keyed by arbitrary hashable keys, with at most one timer per key.
+
+    Time is split into ticks of `tick_duration` seconds and a timer expiring at a tick is stored in the slot
+    `tick % slots_count`. Timers further away than one turn of the wheel share slots with nearer ones and are kept
+    until the wheel reaches their tick. A timer never expires before its delay has passed.
+    """
+
+    TICK_DURATION = 1
+    SLOTS_COUNT = 512
+
+    def __init__(self, tick_duration=TICK_DURATION, slots_count=SLOTS_COUNT, now=None):
+        """
+        Initializes an empty TimerWheel.
+
+        Args:
+            tick_duration (float, optional): The length of a tick in seconds. Defaults to TICK_DURATION.
+            slots_count (int, optional): The number of slots of the wheel. Defaults to SLOTS_COUNT.
+            now (float, optional): The current monotonic time. Defaults to None, meaning `time.monotonic()`.
+        """
+        self.tick_duration = tick_duration
+        self.slots = [{} for _ in range(slots_count)]
+        self.timers = {}
+        self.lock = threading.RLock()
+        self.current_tick = self._get_tick(monotonic() if now is None else now)
+
+    def _get_tick(self, now):
+        """
+        Returns the last tick that has started at a time.
+
+        Args:
+            now (float): The monotonic time.
+
+        Returns:
+            int: The tick.
+        """
+        return math.floor(now / self.tick_duration)
+
+    def schedule(self, key, delay, now=None):
+        """
+        Schedules the timer of a key, replacing its previous timer.
+
+        Args:
+            key (hashable): The key of the timer.
+            delay (float): The number of seconds after which the timer expires.
+            now (float, optional): The current monotonic time. Defaults to None, meaning `time.monotonic()`.
+        """
+        with self.lock:
+            self.cancel(key)
+
+            now = monotonic() if now is None else now
+            expiry_tick = max(math.ceil((now + delay) / self.tick_duration), self.current_tick + 1)
+            self.slots[expiry_tick % len(self.slots)][key] = expiry_tick
+            self.timers[key] = expiry_tick
+
+    def cancel(self, key):
+        """
+        Cancels the timer of a key if it has one.
+
+        Args:
+            key (hashable): The key of the timer.
+
+        Returns:
+            bool: True if a timer was cancelled, False otherwise.
+        """
+        with self.lock:
+            expiry_tick = self.timers.pop(key, None)
+            if expiry_tick is None:
+                return False
+
+            del self.slots[expiry_tick % len(self.slots)][key]
+            return True
+
+    def advance(self, now=None):
+        """
+        Moves the wheel to the current time and removes the timers that expired on the way.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to None, meaning `time.monotonic()`.
+
+        Returns:
+            list: The keys of the expired timers.
+        """
+        with self.lock:
+            target_tick = self._get_tick(monotonic() if now is None else now)
+            elapsed_ticks = min(target_tick - self.current_tick, len(self.slots))
+
+            expired_keys = []
+            for tick in range(self.current_tick + 1, self.current_tick + 1 + elapsed_ticks):
+                slot = self.slots[tick % len(self.slots)]
+                slot_expired_keys = [key for key, expiry_tick in slot.items() if expiry_tick <= target_tick]
+                for key in slot_expired_keys:
+                    del slot[key]
+                    del self.timers[key]
+                expired_keys.extend(slot_expired_keys)
+
+            self.current_tick = max(self.current_tick, target_tick)
+            return expired_keys
+
+    def __contains__(self, key):
+        """
+        Checks if a key has a scheduled timer.
+
+        Args:
+            key (hashable): The key of the timer.
+
+        Returns:
+            bool: True if the key has a timer, False otherwise.
+        """
+        return key in self.timers
+
+    def __len__(self):
+        """
+        Returns the number of scheduled timers.
+
+        Returns:
+            int: The number of timers.
+        """
+        return len(self.timers)
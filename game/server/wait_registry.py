@@ -0,0 +1,133 @@
+"""
+Module for keeping track of the clients that wait for a change in their room. A waiting client is only an entry in
+the `WaitRegistry` - no thread is held for it - and it is answered with a pushed event once the room changes or its
+deadline passes.
+"""
+
+import threading
+from collections import namedtuple
+from time import monotonic
+
+from game.server.deadline_scheduler import DeadlineScheduler
+
+# A client waiting for a condition of its room, with the monotonic time at which the wait expires
+Waiter = namedtuple("Waiter", ["client", "condition", "room_id", "deadline"])
+
+
+class WaitRegistry:
+    """
+    Thread-safe store of the waiting clients indexed by room, so a change in a room finds its waiters without
+    scanning the others. Their deadlines are kept in a `DeadlineScheduler`, so expiring the waits only visits the
+    due ones.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty WaitRegistry.
+        """
+        self.waiters = {}
+        self.rooms_to_waiters = {}
+        self.deadlines = DeadlineScheduler()
+        self.lock = threading.RLock()
+
+    def add(self, client, condition, room_id, timeout):
+        """
+        Registers a waiting client, replacing any previous wait of the same client.
+
+        Args:
+            client (str): The client identifier.
+            condition (str): The name of the condition the client waits for.
+            room_id (str): The ID of the room the client is in.
+            timeout (float): The number of seconds after which the wait expires.
+
+        Returns:
+            Waiter: The registered waiter.
+        """
+        with self.lock:
+            self.remove(client)
+
+            waiter = Waiter(client, condition, room_id, monotonic() + timeout)
+            self.waiters[client] = waiter
+            self.rooms_to_waiters.setdefault(room_id, {})[client] = waiter
+            self.deadlines.schedule(client, waiter.deadline)
+            return waiter
+
+    def remove(self, client):
+        """
+        Removes the wait of a client if there is one.
+
+        Args:
+            client (str): The client identifier.
+
+        Returns:
+            Waiter: The removed waiter, or None if the client was not waiting.
+        """
+        with self.lock:
+            waiter = self.waiters.pop(client, None)
+            if waiter is None:
+                return None
+
+            self.deadlines.cancel(client)
+            room_waiters = self.rooms_to_waiters[waiter.room_id]
+            room_waiters.pop(client)
+            if not room_waiters:
+                self.rooms_to_waiters.pop(waiter.room_id)
+            return waiter
+
+    def remove_room(self, room_id):
+        """
+        Removes the waits of all clients in a room.
+
+        Args:
+            room_id (str): The ID of the room.
+        """
+        with self.lock:
+            for client in list(self.rooms_to_waiters.get(room_id, {})):
+                self.remove(client)
+
+    def pop_room_waiters(self, room_id, condition, changed_client):
+        """
+        Removes and returns the waiters of a room whose condition was fulfilled by a change made by a client.
+
+        Args:
+            room_id (str): The ID of the room that changed.
+            condition (str): The name of the fulfilled condition.
+            changed_client (str): The client whose action changed the room, which is never its own waiter.
+
+        Returns:
+            list: The fulfilled waiters.
+        """
+        with self.lock:
+            fulfilled_waiters = [
+                waiter
+                for waiter in self.rooms_to_waiters.get(room_id, {}).values()
+                if waiter.condition == condition and waiter.client != changed_client
+            ]
+            for waiter in fulfilled_waiters:
+                self.remove(waiter.client)
+            return fulfilled_waiters
+
+    def pop_expired(self, now=None):
+        """
+        Removes and returns the waiters whose deadline has passed, earliest first.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to None, meaning `time.monotonic()`.
+
+        Returns:
+            list: The expired waiters.
+        """
+        with self.lock:
+            return [self.remove(client) for client in self.deadlines.pop_due(now)]
+
+    def is_waiting(self, client):
+        """
+        Checks if a client is waiting.
+
+        Args:
+            client (str): The client identifier.
+
+        Returns:
+            bool: True if the client is waiting, False otherwise.
+        """
+        return client in self.waiters
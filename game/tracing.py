@@ -0,0 +1,394 @@
+"""
+Module for tracing where the time of the game server goes. The server's operations, the decoding and encoding of the
+messages and the (de)serialization of the boards run in spans, which call the begin and end of the installed hooks.
+While no hook is installed a span does nothing, so the spans stay in the code.
+
+Hooks can record the spans (`SpanRecorder`), write them to a trace file that Perfetto or chrome://tracing open
+(`TraceFileExporter`) or run cProfile during some of them (`ProfilerHook`). The servers install the last two with
+the --trace-file and --profile-output options.
+
+Example:
+    recorder = SpanRecorder()
+    add_span_hook(recorder)
+    with span("decode_message", size=len(data)):
+        ...
+"""
+
+import atexit
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+_hooks = ()
+_hooks_lock = threading.Lock()
+_local = threading.local()
+
+
+class Span:
+    """
+    A timed operation, nested in the span that was active on the same thread when it began.
+    """
+
+    __slots__ = ("name", "attributes", "parent", "depth", "thread_id", "start_time", "end_time")
+
+    def __init__(self, name, attributes, parent):
+        """
+        Initializes a Span that has not begun.
+
+        Args:
+            name (str): The name of the operation.
+            attributes (dict): Details of the operation, such as the command's name.
+            parent (Span): The enclosing span, or None.
+        """
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.thread_id = threading.get_ident()
+        self.start_time = None
+        self.end_time = None
+
+    @property
+    def duration(self):
+        """
+        Returns the duration of the span.
+
+        Returns:
+            float: The duration in seconds, or None if the span has not ended.
+        """
+        return None if self.end_time is None else self.end_time - self.start_time
+
+    def __enter__(self):
+        """
+        Begins the span and calls the begin of the hooks.
+
+        Returns:
+            Span: The span.
+        """
+        _local.active_span = self
+        for hook in _hooks:
+            hook.begin(self)
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Ends the span and calls the end of the hooks, in reverse order.
+
+        Args:
+            exc_type (type): The type of the raised exception, or None.
+            exc_value (Exception): The raised exception, or None.
+            traceback (traceback): The traceback of the raised exception, or None.
+        """
+        self.end_time = time.perf_counter()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        for hook in reversed(_hooks):
+            hook.end(self)
+        _local.active_span = self.parent
+
+
+class _NoSpan:
+    """
+    The span used while no hook is installed, which does nothing.
+    """
+
+    def __enter__(self):
+        """
+        Enters the span, which does nothing.
+
+        Returns:
+            None: There is no span.
+        """
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Does nothing.
+
+        Args:
+            exc_type (type): The type of the raised exception, or None.
+            exc_value (Exception): The raised exception, or None.
+            traceback (traceback): The traceback of the raised exception, or None.
+        """
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, **attributes):
+    """
+    Returns the context manager of a span.
+
+    Args:
+        name (str): The name of the operation.
+        **attributes: Details of the operation.
+
+    Returns:
+        Span: The span, or a context manager that does nothing while no hook is installed.
+    """
+    if not _hooks:
+        return _NO_SPAN
+    return Span(name, attributes, getattr(_local, "active_span", None))
+
+
+def traced(function):
+    """
+    Decorator that runs every call of a function in a span named after its qualified name.
+
+    Args:
+        function (callable): The function to decorate.
+
+    Returns:
+        callable: The decorated function.
+    """
+    name = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _hooks:
+            return function(*args, **kwargs)
+        with Span(name, {}, getattr(_local, "active_span", None)):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def add_span_hook(hook):
+    """
+    Installs a hook, called at the begin and the end of every span from then on.
+
+    Args:
+        hook (SpanHook): The hook.
+    """
+    global _hooks  # pylint: disable=W0603
+    with _hooks_lock:
+        _hooks = _hooks + (hook,)
+
+
+def remove_span_hook(hook):
+    """
+    Uninstalls a hook.
+
+    Args:
+        hook (SpanHook): The hook.
+    """
+    global _hooks  # pylint: disable=W0603
+    with _hooks_lock:
+        _hooks = tuple(installed_hook for installed_hook in _hooks if installed_hook is not hook)
+
+
+class SpanHook:
+    """
+    Base class of the hooks, whose begin and end are called on the thread running the span. Spans on different
+    threads can overlap, so hooks keeping state across spans have to be thread-safe.
+    """
+
+    def begin(self, span_):
+        """
+        Called when a span begins.
+
+        Args:
+            span_ (Span): The span.
+        """
+
+    def end(self, span_):
+        """
+        Called when a span ends.
+
+        Args:
+            span_ (Span): The span, with its duration.
+        """
+
+
+class SpanRecorder(SpanHook):
+    """
+    Keeps the most recent ended spans in memory.
+    """
+
+    def __init__(self, max_spans=10000):
+        """
+        Initializes an empty SpanRecorder.
+
+        Args:
+            max_spans (int, optional): The number of spans kept. Defaults to 10000.
+        """
+        self.spans = deque(maxlen=max_spans)
+
+    def end(self, span_):
+        """
+        Keeps an ended span.
+
+        Args:
+            span_ (Span): The span.
+        """
+        self.spans.append(span_)
+
+    def get_total_durations(self):
+        """
+        Returns the time spent in every operation, from the longest.
+
+        Returns:
+            dict: The total duration in seconds of the kept spans of every name.
+        """
+        totals = {}
+        for recorded_span in list(self.spans):
+            totals[recorded_span.name] = totals.get(recorded_span.name, 0) + recorded_span.duration
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+class TraceFileExporter(SpanHook):
+    """
+    Writes the ended spans to a file in the Trace Event format, which Perfetto and chrome://tracing open.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the TraceFileExporter and creates the file.
+
+        Args:
+            path (str): The path of the trace file.
+        """
+        self.file = open(path, "w", encoding="utf-8")  # pylint: disable=R1732
+        self.file.write("[\n")
+        self.separator = ""
+        self.process_id = os.getpid()
+        self.lock = threading.Lock()
+
+    def end(self, span_):
+        """
+        Writes an ended span as a complete event, in microseconds.
+
+        Args:
+            span_ (Span): The span.
+        """
+        event = {
+            "name": span_.name,
+            "ph": "X",
+            "ts": round(span_.start_time * 1_000_000, 3),
+            "dur": round(span_.duration * 1_000_000, 3),
+            "pid": self.process_id,
+            "tid": span_.thread_id,
+            "args": span_.attributes,
+        }
+        line = json.dumps(event, default=str)
+        with self.lock:
+            if not self.file.closed:
+                self.file.write(self.separator + line)
+                self.separator = ",\n"
+
+    def close(self):
+        """
+        Ends the trace and closes the file.
+        """
+        with self.lock:
+            if not self.file.closed:
+                self.file.write("\n]\n")
+                self.file.close()
+
+
+class ProfilerHook(SpanHook):
+    """
+    Runs cProfile during the spans with some names, one span at a time, since a profiler can only be active on one
+    thread. The spans beginning while another one is profiled are not profiled.
+    """
+
+    def __init__(self, span_names, profiler=None):
+        """
+        Initializes the ProfilerHook.
+
+        Args:
+            span_names (collection): The names of the profiled spans.
+            profiler (cProfile.Profile, optional): The profiler accumulating the statistics. Defaults to None,
+                meaning a new one.
+        """
+        self.span_names = frozenset(span_names)
+        self.profiler = profiler or cProfile.Profile()
+        self.profiled_span = None
+        self.lock = threading.Lock()
+
+    def begin(self, span_):
+        """
+        Starts profiling if the span is profiled and no other span is.
+
+        Args:
+            span_ (Span): The span.
+        """
+        if span_.name not in self.span_names:
+            return
+
+        with self.lock:
+            if self.profiled_span is not None:
+                return
+            self.profiled_span = span_
+
+        self.profiler.enable()
+
+    def end(self, span_):
+        """
+        Stops profiling at the end of the profiled span.
+
+        Args:
+            span_ (Span): The span.
+        """
+        if span_ is not self.profiled_span:
+            return
+
+        self.profiler.disable()
+        with self.lock:
+            self.profiled_span = None
+
+    def dump_stats(self, path):
+        """
+        Writes the statistics of the profiled spans, which `pstats` and snakeviz read.
+
+        Args:
+            path (str): The path of the statistics file.
+        """
+        self.profiler.dump_stats(path)
+
+
+def add_tracing_arguments(parser):
+    """
+    Adds the tracing options of the servers to a command line parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser.
+    """
+    parser.add_argument("--trace-file", default=None, help="Write the spans of the server to this trace file.")
+    parser.add_argument(
+        "--profile-output", default=None, help="Profile the handled messages with cProfile and write the stats here."
+    )
+
+
+def configure_tracing(trace_file=None, profile_output=None, profiled_span_names=("GameServer.handle_message",)):
+    """
+    Installs the hooks selected by the tracing options. The trace file is ended and the profile written when the
+    process exits.
+
+    Args:
+        trace_file (str, optional): The path of the trace file. Defaults to None, meaning no trace file.
+        profile_output (str, optional): The path of the profile statistics. Defaults to None, meaning no profiling.
+        profiled_span_names (collection, optional): The names of the profiled spans. Defaults to the handling of
+            the messages received by the network servers.
+
+    Returns:
+        list: The installed hooks.
+    """
+    hooks = []
+    if trace_file:
+        exporter = TraceFileExporter(trace_file)
+        atexit.register(exporter.close)
+        hooks.append(exporter)
+    if profile_output:
+        profiler_hook = ProfilerHook(profiled_span_names)
+        atexit.register(profiler_hook.dump_stats, profile_output)
+        hooks.append(profiler_hook)
+
+    for hook in hooks:
+        add_span_hook(hook)
+    return hooks
@@ -4,6 +4,8 @@ It includes the `VisualTile`, `VisualBoard`, and `VisualBoardEnemyView` classes,
 classes and integrate graphical rendering.
 """
 
+import random
+
 import pygame
 from pygame.sprite import Sprite
 
@@ -115,11 +117,14 @@ class VisualBoard(Sprite, BaseBoard):
         for ship in self.unplaced_ships:
             ship.coordinate_size = self.get_tile_size()
 
-    def random_shuffle_ships(self):
+    def random_shuffle_ships(self, rng=random):
         """
         Randomly shuffles the ships on the board and updates their visual positions.
+
+        Args:
+            rng (random.Random, optional): The random generator. Defaults to the random module.
         """
-        BaseBoard.random_shuffle_ships(self)
+        BaseBoard.random_shuffle_ships(self, rng)
         self._update_ships_visual_position()
 
     def _update_ships_visual_position(self):
@@ -0,0 +1,75 @@
+import io
+import logging
+
+import pytest
+
+from game.logging_setup import LOGGER_NAME, SamplingFilter, configure_logging, stop_logging
+from game.server.game_server import GameServer
+from game.players import command_literals
+
+
+@pytest.fixture
+def restore_game_logger():
+    yield
+    stop_logging()
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.handlers = []
+    logger.propagate = True
+    logger.setLevel(logging.NOTSET)
+
+
+def _make_record(sample_key=None):
+    record = logging.LogRecord("game.test", logging.DEBUG, __file__, 1, "message", (), None)
+    if sample_key is not None:
+        record.sample_key = sample_key
+    return record
+
+
+def test_sampling_filter_keeps_first_and_every_nth_record():
+    sampling_filter = SamplingFilter({"shot": 3})
+
+    kept = [sampling_filter.filter(_make_record("shot")) for _ in range(7)]
+
+    assert kept == [True, False, False, True, False, False, True]
+    assert sampling_filter.filter(_make_record("other"))
+    assert sampling_filter.filter(_make_record())
+
+
+def test_configured_logging_writes_structured_records(restore_game_logger):
+    stream = io.StringIO()
+    configure_logging(logging.DEBUG, sample_rates={"shot": 2}, stream=stream)
+    logger = logging.getLogger("game.test")
+
+    logger.info("Room %s created", "123456", extra={"fields": {"bucket": "eu"}})
+    logger.debug("Shot", extra={"sample_key": "shot"})
+    logger.debug("Shot", extra={"sample_key": "shot"})
+    stop_logging()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("INFO game.test: Room 123456 created bucket='eu'")
+    assert lines[1].endswith("DEBUG game.test: Shot sampled_1_in=2")
+
+
+def test_commands_are_not_logged_below_debug_level(restore_game_logger):
+    stream = io.StringIO()
+    configure_logging(logging.INFO, stream=stream)
+
+    GameServer().command_handler.handle_command(
+        f'{{"command": "{command_literals.COMMAND_CREATE_ROOM}", "args": {{"client_name": "Player1"}}}}', "client1"
+    )
+    stop_logging()
+
+    assert stream.getvalue() == ""
+
+
+def test_handled_commands_are_logged_at_debug_level(caplog):
+    with caplog.at_level(logging.DEBUG, logger="game.server.command_handler"):
+        GameServer().command_handler.handle_command(
+            f'{{"command": "{command_literals.COMMAND_CREATE_ROOM}", "args": {{"client_name": "Player1"}}}}', "client1"
+        )
+
+    record = caplog.records[-1]
+    assert record.getMessage() == f"Handled command {command_literals.COMMAND_CREATE_ROOM}"
+    assert record.sample_key == command_literals.COMMAND_CREATE_ROOM
+    assert record.fields["args"] == {"client_name": "Player1"}
@@ -1,6 +1,10 @@
+import numpy as np
 import pytest
 from unittest.mock import Mock, patch
 from game.players.battle_bot import BattleBot
+from game.players.density_grid import DensityGridCache
+from game.interface.base_board import BaseBoard, BaseBoardEnemyView
+from game.interface.ship import Ship
 
 
 @pytest.fixture
@@ -198,3 +202,24 @@ def test_add_positions_to_stack(bot):
     bot_instance._add_positions_to_stack([(2, 3), (3, 4)])
 
     assert bot_instance.hit_stack == [(3, 4)]
+
+
+def test_select_weighted_position_uses_prior():
+    prior = np.zeros((10, 10))
+    prior[4, 7] = 1.0
+    bot_instance = BattleBot(Mock(), placement_prior=prior)
+
+    assert bot_instance._select_random_position() == (4, 7)
+
+
+def test_placement_prior_with_wrong_shape_is_ignored():
+    bot_instance = BattleBot(Mock(), placement_prior=np.ones((5, 5)))
+    assert bot_instance.placement_prior is None
+
+
+def test_select_densest_position():
+    bot_instance = BattleBot(Mock(), density_cache=DensityGridCache())
+    bot_instance.board = BaseBoard(rows_count=1, columns_count=3, unplaced_ships={Ship(2)})
+    bot_instance.enemy_board_view = BaseBoardEnemyView(rows_count=1, columns_count=3)
+
+    assert bot_instance._select_random_position() == (0, 1)
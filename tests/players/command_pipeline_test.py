@@ -0,0 +1,72 @@
+from game.server.command_handler import CommandHandler
+from game.server.network import connection_error_response
+from game.server.game_server import GameServer
+from game.players.player import Player
+from game.players import command_literals
+
+
+class ServerNetwork:
+    def __init__(self, game_server, client, supports_batches=True, batch_error=None):
+        self.game_server = game_server
+        self.client = client
+        self.supports_batches = supports_batches
+        self.batch_error = batch_error
+        self.round_trips = 0
+
+    def send(self, command_data):
+        self.round_trips += 1
+        if not self.supports_batches and command_data["command"] == command_literals.COMMAND_BATCH:
+            return CommandHandler.error_response("Unknown command")
+        if self.batch_error is not None and command_data["command"] == command_literals.COMMAND_BATCH:
+            return self.batch_error
+        return self.game_server.command_handler.handle_command_data(command_data, self.client)
+
+
+def _make_player(game_server, client, name, supports_batches=True):
+    player = Player(name, ServerNetwork(game_server, client, supports_batches))
+    player.board.random_shuffle_ships()
+    return player
+
+
+def test_lobby_pipeline_takes_one_round_trip_and_applies_responses():
+    game_server = GameServer()
+    host = _make_player(game_server, "client_1", "Alice")
+    host.last_event_sequence = 5
+
+    with host.pipeline() as pipeline:
+        pipeline.create_room().send_board().subscribe_to_events()
+
+    assert host.network_client.round_trips == 1
+    assert host.last_event_sequence == 0
+    assert host.has_sent_board == "success"
+    assert host.is_subscribed_to_events is False
+    assert game_server.rooms[game_server.clients_to_rooms["client_1"]].clients["client_1"].board is not None
+
+
+def test_pipeline_falls_back_to_single_commands_and_stops_on_error():
+    game_server = GameServer()
+    host = _make_player(game_server, "client_1", "Alice", supports_batches=False)
+
+    pipeline = host.pipeline(stop_on_error=True)
+    responses = pipeline.add(command_literals.COMMAND_HAS_OPPONENT_JOINED).create_room().send()
+
+    assert len(pipeline) == 0
+    assert [response["message"] for response in responses] == ["Client is not in a room!"]
+    assert host.network_client.round_trips == 2
+    assert "client_1" not in game_server.clients_to_rooms
+
+
+def test_pipeline_does_not_resend_the_commands_of_a_failed_batch():
+    game_server = GameServer()
+    connection_lost = connection_error_response("Connection lost, the command may not have been handled!")
+    host = Player("Alice", ServerNetwork(game_server, "client_1", batch_error=connection_lost))
+    received_responses = []
+
+    pipeline = host.pipeline()
+    pipeline.add(command_literals.COMMAND_CREATE_ROOM, received_responses.append, client_name="Alice")
+    pipeline.add(command_literals.COMMAND_REGISTER_SHOT, received_responses.append, row=0, col=0)
+    responses = pipeline.send()
+
+    assert responses == received_responses == [connection_lost, connection_lost]
+    assert host.network_client.round_trips == 1
+    assert "client_1" not in game_server.clients_to_rooms
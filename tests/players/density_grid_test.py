@@ -0,0 +1,51 @@
+import random
+
+import numpy as np
+
+from game.players.density_grid import DensityGridCache
+
+
+def test_compute_grid_counts_placements():
+    grid = DensityGridCache.compute_grid(1, 3, set(), (2,))
+    assert grid.tolist() == [[1, 2, 1]]
+
+
+def test_compute_grid_skips_blocked_cells():
+    grid = DensityGridCache.compute_grid(3, 3, {(1, 1)}, (3,))
+    assert grid[1, 1] == 0
+    assert grid[0, 0] == 2
+    assert grid[0, 1] == 1
+
+
+def test_get_grid_counts_hits_and_misses():
+    cache = DensityGridCache()
+    cache.get_grid(10, 10, [(0, 0)], [3, 2])
+    cache.get_grid(10, 10, [(0, 0)], [2, 3])
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_get_grid_evicts_least_recently_used():
+    cache = DensityGridCache(max_size=2)
+    cache.get_grid(5, 5, [(0, 0)], [2])
+    cache.get_grid(5, 5, [(1, 1)], [2])
+    cache.get_grid(5, 5, [(0, 0)], [2])
+    cache.get_grid(5, 5, [(2, 2)], [2])
+
+    assert len(cache.grids) == 2
+    assert DensityGridCache.make_key(5, 5, [(1, 1)], [2]) not in cache.grids
+
+
+def test_incremental_update_matches_full_computation():
+    rng = random.Random(7)
+    ship_lengths = [1, 1, 2, 2, 3, 4]
+    cache = DensityGridCache()
+    blocked = set()
+
+    for _ in range(30):
+        blocked.add((rng.randrange(10), rng.randrange(10)))
+        grid = cache.get_grid(10, 10, blocked, ship_lengths)
+        assert np.array_equal(grid, DensityGridCache.compute_grid(10, 10, blocked, ship_lengths))
+
+    assert cache.incremental_updates > 0
@@ -0,0 +1,98 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from game.interface.base_board import BaseBoard
+from game.interface.ship import Ship
+from game.players.placement_heatmap import PlacementHeatmap
+
+
+@pytest.fixture
+def board_data():
+    board = BaseBoard(unplaced_ships={Ship(2), Ship(1)})
+    board.place_ship(Ship(2, 0, 0, True))
+    board.place_ship(Ship(1, 5, 5, True))
+    return board.serialize_board()
+
+
+def test_record_board_counts_ship_cells(board_data):
+    heatmap = PlacementHeatmap()
+    heatmap.record_board(board_data)
+    heatmap.record_board(board_data)
+
+    counts = heatmap.counts[(10, 10)]
+    assert counts.dtype == PlacementHeatmap.COUNTS_DTYPE
+    assert counts[0, 0] == 2
+    assert counts[0, 1] == 2
+    assert counts[5, 5] == 2
+    assert counts.sum() == 6
+    assert heatmap.get_boards_count(10, 10) == 2
+
+
+def test_get_prior_without_boards():
+    assert PlacementHeatmap().get_prior(10, 10) is None
+
+
+def test_get_prior_is_smoothed(board_data):
+    heatmap = PlacementHeatmap()
+    heatmap.record_board(board_data)
+
+    prior = heatmap.get_prior(10, 10)
+    assert prior.shape == (10, 10)
+    assert prior[0, 0] == pytest.approx(2 / 3)
+    assert prior[9, 9] == pytest.approx(1 / 3)
+
+
+def test_heatmap_is_persisted(tmp_path, board_data):
+    storage_path = str(tmp_path / "heatmaps.npz")
+    heatmap = PlacementHeatmap(storage_path, save_every_boards=2)
+    heatmap.record_board(board_data)
+    heatmap.record_board(board_data)
+
+    loaded_heatmap = PlacementHeatmap(storage_path)
+    assert loaded_heatmap.get_boards_count(10, 10) == 2
+    assert np.array_equal(loaded_heatmap.counts[(10, 10)], heatmap.counts[(10, 10)])
+
+
+def test_merge_file_adds_the_persisted_heatmaps(tmp_path, board_data):
+    storage_path = str(tmp_path / "heatmaps.npz")
+    other_heatmap = PlacementHeatmap(storage_path)
+    other_heatmap.record_board(board_data)
+    other_heatmap.save()
+
+    heatmap = PlacementHeatmap()
+    heatmap.record_board(board_data)
+    heatmap.merge_file(storage_path)
+
+    assert heatmap.get_boards_count(10, 10) == 2
+    assert heatmap.counts[(10, 10)][0, 0] == 2
+    assert heatmap.unsaved_boards == 2
+
+
+def test_concurrent_saves_leave_a_complete_file(tmp_path, board_data):
+    storage_path = str(tmp_path / "heatmaps.npz")
+    heatmap = PlacementHeatmap(storage_path, save_every_boards=1)
+    heatmap.record_board(board_data)
+
+    threads = [threading.Thread(target=heatmap.save) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert PlacementHeatmap(storage_path).get_boards_count(10, 10) == 1
+    assert os.listdir(tmp_path) == ["heatmaps.npz"]
+
+
+def test_background_saves_and_flush_persist_every_board(tmp_path, board_data):
+    storage_path = str(tmp_path / "heatmaps.npz")
+    heatmap = PlacementHeatmap(storage_path, save_every_boards=2, save_in_background=True)
+    for _ in range(3):
+        heatmap.record_board(board_data)
+
+    heatmap.flush()
+
+    assert heatmap.unsaved_boards == 0
+    assert PlacementHeatmap(storage_path).get_boards_count(10, 10) == 3
@@ -0,0 +1,56 @@
+import random
+
+import numpy as np
+
+from game.interface.base_board import BaseBoard
+from game.interface.ship import Ship
+from game.players.placement_strategy import FleetEvaluator, AdversarialPlacementStrategy
+
+
+def test_score_fleets_uses_discovery_rank():
+    row_major_order = [(row, col) for row in range(3) for col in range(3)]
+    evaluator = FleetEvaluator(3, 3, [row_major_order])
+
+    early_fleet = evaluator.encode_fleet([Ship(2, 0, 0, True)])
+    late_fleet = evaluator.encode_fleet([Ship(2, 2, 1, True)])
+    scores = evaluator.score_fleets(np.stack([early_fleet, late_fleet]))
+
+    assert scores.tolist() == [2, 9]
+
+
+def test_score_fleets_averages_hunters():
+    row_major_order = [(row, col) for row in range(2) for col in range(2)]
+    evaluator = FleetEvaluator(2, 2, [row_major_order, row_major_order[::-1]])
+
+    fleet = evaluator.encode_fleet([Ship(1, 0, 0, True)])
+
+    assert evaluator.score_fleets(fleet[None, :]).tolist() == [2.5]
+
+
+def test_get_placements_density_prefers_center():
+    density = FleetEvaluator.get_placements_density(5, 5, [3])
+    assert density[2, 2] > density[0, 0]
+
+
+def test_place_ships_keeps_board_valid():
+    board = BaseBoard()
+    board.random_shuffle_ships()
+    strategy = AdversarialPlacementStrategy(candidates_count=20, rng=random.Random(1))
+
+    strategy.place_ships(board)
+
+    placed_ships = [ship for ship_list in board.ships_map.values() for ship in ship_list]
+    assert len(board.unplaced_ships) == 0
+    assert sorted(ship.ship_length for ship in placed_ships) == [1, 1, 1, 1, 2, 2, 2, 3, 3, 4]
+    assert BaseBoard.deserialize_board(board.serialize_board()) is not None
+
+
+def test_strategies_with_the_same_seed_choose_the_same_fleet():
+    ship_lengths = [1, 1, 1, 1, 2, 2, 2, 3, 3, 4]
+    placements = []
+    for _ in range(2):
+        random.seed(len(placements))
+        strategy = AdversarialPlacementStrategy(candidates_count=10, hunters_count=4, rng=random.Random(7))
+        placements.append(sorted(strategy.choose_placement(10, 10, ship_lengths)))
+
+    assert placements[0] == placements[1]
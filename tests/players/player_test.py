@@ -0,0 +1,23 @@
+from unittest.mock import MagicMock
+
+from game.players.player import Player
+from game.players import command_literals
+
+
+def test_join_random_room_answers_an_error_when_the_hosting_node_is_unreachable():
+    network_client = MagicMock()
+    network_client.send.return_value = {
+        "status": "error",
+        "message": "Room is hosted on another node!",
+        "args": {"room_id": "123456", "node_id": "localhost:5002"},
+    }
+    network_client.connect_to_node.side_effect = ConnectionError("Connection refused")
+    player = Player("Alice", network_client)
+
+    response = player.join_random_room()
+
+    assert response["status"] == "error"
+    assert response["args"]["is_connection_error"]
+    network_client.send.assert_called_once_with(
+        {"command": command_literals.COMMAND_JOIN_RANDOM_ROOM, "args": {"client_name": "Alice", "bucket": None}}
+    )
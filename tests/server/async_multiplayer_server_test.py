@@ -0,0 +1,170 @@
+import asyncio
+import json
+
+import pytest
+
+from game.server.async_multiplayer_server import AsyncMultiplayerServer, get_event_loop_policy
+from game.server.framing import encode_frame, read_frame
+from game.players import command_literals
+
+
+def test_get_event_loop_policy_default():
+    assert isinstance(get_event_loop_policy("asyncio"), asyncio.DefaultEventLoopPolicy)
+
+
+def test_get_event_loop_policy_from_path():
+    policy = get_event_loop_policy("asyncio:DefaultEventLoopPolicy")
+    assert isinstance(policy, asyncio.DefaultEventLoopPolicy)
+
+
+def test_get_event_loop_policy_missing_module():
+    with pytest.raises(ImportError):
+        get_event_loop_policy("not_installed_loop_module:Policy")
+
+
+def test_server_handles_commands():
+    async def scenario():
+        server = AsyncMultiplayerServer(port=0)
+        async_server = await server.start()
+
+        reader, writer = await asyncio.open_connection("localhost", server.port)
+        greeting = json.loads(await read_frame(reader))
+
+        command = {"command": command_literals.COMMAND_CREATE_ROOM, "args": {"client_name": "Alice"}}
+        writer.write(encode_frame(json.dumps(command)))
+        response = json.loads(await read_frame(reader))
+
+        writer.close()
+        async_server.close()
+        await async_server.wait_closed()
+        return greeting, response, len(server.rooms)
+
+    greeting, response, rooms_count = asyncio.run(scenario())
+
+    assert greeting["message"] == "Connected!"
+    assert greeting["args"]["session_token"]
+    assert response["status"] == "success"
+    assert rooms_count == 1
+
+
+def test_reconnected_client_resumes_its_session_in_the_room():
+    async def send(reader, writer, command, **kwargs):
+        writer.write(encode_frame(json.dumps({"command": command, "args": kwargs})))
+        return json.loads(await read_frame(reader))
+
+    async def scenario():
+        server = AsyncMultiplayerServer(port=0)
+        async_server = await server.start()
+
+        reader, writer = await asyncio.open_connection("localhost", server.port)
+        session_token = json.loads(await read_frame(reader))["args"]["session_token"]
+        room_id = (await send(reader, writer, command_literals.COMMAND_CREATE_ROOM, client_name="Alice"))["args"]["room_id"]
+        writer.close()
+        await asyncio.sleep(0.05)
+
+        reader, writer = await asyncio.open_connection("localhost", server.port)
+        await read_frame(reader)
+        unknown = await send(reader, writer, command_literals.COMMAND_RESUME_SESSION, session_token="unknown")
+        resumed = await send(reader, writer, command_literals.COMMAND_RESUME_SESSION, session_token=session_token)
+        joined = await send(reader, writer, command_literals.COMMAND_HAS_OPPONENT_JOINED)
+
+        writer.close()
+        async_server.close()
+        await async_server.wait_closed()
+        return unknown, resumed, joined, server.clients_to_rooms.get(session_token) == room_id
+
+    unknown, resumed, joined, is_in_room = asyncio.run(scenario())
+
+    assert unknown["message"] == "Session not found!"
+    assert resumed["args"]["session_token"]
+    assert joined["message"] == "Opponent has not joined the room!"
+    assert is_in_room
+
+
+def test_session_is_resumed_before_the_old_connection_is_seen_closed():
+    async def send(reader, writer, command, **kwargs):
+        writer.write(encode_frame(json.dumps({"command": command, "args": kwargs})))
+        return json.loads(await read_frame(reader))
+
+    async def scenario():
+        server = AsyncMultiplayerServer(port=0)
+        async_server = await server.start()
+
+        old_reader, old_writer = await asyncio.open_connection("localhost", server.port)
+        session_token = json.loads(await read_frame(old_reader))["args"]["session_token"]
+        await send(old_reader, old_writer, command_literals.COMMAND_CREATE_ROOM, client_name="Alice")
+
+        reader, writer = await asyncio.open_connection("localhost", server.port)
+        await read_frame(reader)
+        resumed = await send(reader, writer, command_literals.COMMAND_RESUME_SESSION, session_token=session_token)
+        old_connection_data = await asyncio.wait_for(old_reader.read(), 5)
+        await asyncio.sleep(0.05)
+        joined = await send(reader, writer, command_literals.COMMAND_HAS_OPPONENT_JOINED)
+
+        old_writer.close()
+        writer.close()
+        async_server.close()
+        await async_server.wait_closed()
+        return resumed, old_connection_data, joined
+
+    resumed, old_connection_data, joined = asyncio.run(scenario())
+
+    assert resumed["message"] == "Session resumed!"
+    assert old_connection_data == b""
+    assert joined["message"] == "Opponent has not joined the room!"
+
+
+def test_housekeeping_keeps_running_after_an_exception():
+    async def scenario():
+        server = AsyncMultiplayerServer(port=0)
+        server.get_housekeeping_delay = lambda: 0
+        calls = []
+
+        def run_housekeeping():
+            calls.append(None)
+            if len(calls) == 1:
+                raise RuntimeError("Housekeeping failed")
+
+        server.run_housekeeping = run_housekeeping
+        async_server = await server.start()
+        while len(calls) < 3:
+            await asyncio.sleep(0.01)
+        server.housekeeping_task.cancel()
+        async_server.close()
+        await async_server.wait_closed()
+        return len(calls)
+
+    assert asyncio.run(asyncio.wait_for(scenario(), 5)) >= 3
+
+
+def test_client_is_disconnected_after_an_unexpected_exception():
+    async def scenario():
+        server = AsyncMultiplayerServer(port=0)
+        disconnected_clients = []
+        client_disconnected = server.client_disconnected
+
+        def handle_message(client, data, rate_limiter=None):
+            raise RuntimeError("Handling failed")
+
+        def record_disconnection(client):
+            disconnected_clients.append(client)
+            client_disconnected(client)
+
+        server.handle_message = handle_message
+        server.client_disconnected = record_disconnection
+        async_server = await server.start()
+
+        reader, writer = await asyncio.open_connection("localhost", server.port)
+        session_token = json.loads(await read_frame(reader))["args"]["session_token"]
+        writer.write(encode_frame(json.dumps({"command": command_literals.COMMAND_CREATE_ROOM, "args": {}})))
+        remaining_data = await reader.read()
+
+        writer.close()
+        async_server.close()
+        await async_server.wait_closed()
+        return remaining_data, disconnected_clients == [session_token]
+
+    remaining_data, is_disconnected = asyncio.run(asyncio.wait_for(scenario(), 5))
+
+    assert remaining_data == b""
+    assert is_disconnected
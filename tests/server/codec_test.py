@@ -0,0 +1,106 @@
+import pytest
+
+from game.server.codec import (
+    BINARY_CODEC,
+    JSON_CODEC,
+    CodecError,
+    choose_codec,
+    decode_message,
+    is_event_message,
+    peek_command_name,
+)
+from game.server.command_handler import CommandHandler
+from game.players import command_literals
+
+SHOT_COMMAND = {"command": command_literals.COMMAND_REGISTER_SHOT, "args": {"row": 3, "col": 7}}
+SHOT_RESULT = CommandHandler.success_response(
+    "Shot registered!",
+    has_hit_ship=True,
+    has_sunk_ship=True,
+    sunk_ship='{"row": 3, "col": 7, "size": 1}',
+    is_turn=True,
+    turn_end_time=1234.5,
+    has_battle_ended=False,
+    is_winner=False,
+    is_timeout=False,
+)
+OPPONENT_SHOT_ARGS = {
+    "row": 9,
+    "col": 0,
+    "is_turn": True,
+    "turn_end_time": None,
+    "has_battle_ended": True,
+    "is_winner": False,
+    "is_timeout": True,
+    "sequence": 70000,
+}
+
+MESSAGES = [
+    SHOT_COMMAND,
+    {"command": command_literals.COMMAND_ASK_TO_RECEIVE_SHOT, "args": {}},
+    SHOT_RESULT,
+    CommandHandler.success_response("Shot was made by the opponent!", **OPPONENT_SHOT_ARGS),
+    CommandHandler.event_message(
+        command_literals.EVENT_OPPONENT_SHOT, "Shot was made by the opponent!", **OPPONENT_SHOT_ARGS
+    ),
+    CommandHandler.event_message(command_literals.EVENT_BATTLE_END, "The battle has ended!", is_winner=True),
+    CommandHandler.error_response("Not player's turn!", is_player_turn=False),
+]
+
+
+@pytest.mark.parametrize("codec", [JSON_CODEC, BINARY_CODEC], ids=["json", "binary"])
+@pytest.mark.parametrize("message", MESSAGES)
+def test_messages_round_trip(codec, message):
+    data = codec.encode(message)
+
+    assert codec.decode(data) == message
+    assert decode_message(data) == message
+    assert is_event_message(data) == ("event" in message)
+
+
+def test_binary_codec_packs_shots_as_records():
+    assert len(BINARY_CODEC.encode(SHOT_COMMAND)) == 3
+    assert len(BINARY_CODEC.encode(SHOT_RESULT)) < len(JSON_CODEC.encode(SHOT_RESULT)) / 3
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        {"command": command_literals.COMMAND_REGISTER_SHOT, "args": {"row": 300, "col": 7}},
+        {"command": command_literals.COMMAND_REGISTER_SHOT, "args": {"row": True, "col": 7}},
+        {"command": command_literals.COMMAND_REGISTER_SHOT, "args": {"row": 3, "col": 7, "extra": 1}},
+        CommandHandler.success_response("Shot registered!", **{**SHOT_RESULT["args"], "turn_end_time": 10}),
+        CommandHandler.success_response("Shot registered!", **{**SHOT_RESULT["args"], "is_turn": 1}),
+    ],
+)
+def test_binary_codec_falls_back_to_json_for_other_shapes(message):
+    data = BINARY_CODEC.encode(message)
+
+    assert data[0] == BINARY_CODEC.TAG_JSON
+    assert decode_message(data) == message
+
+
+@pytest.mark.parametrize("data", [b"", b"{not json", b"[1, 2]", b"\x01\x02", b"\x07", b"\x00\xff"])
+def test_decode_message_rejects_invalid_data(data):
+    with pytest.raises(CodecError):
+        decode_message(data)
+
+
+def test_choose_codec():
+    assert choose_codec(["msgpack", "binary", "json"]) is BINARY_CODEC
+    assert choose_codec(["json", "binary"]) is JSON_CODEC
+    assert choose_codec(["msgpack"]) is None
+
+
+@pytest.mark.parametrize("codec", [JSON_CODEC, BINARY_CODEC])
+@pytest.mark.parametrize(
+    "message",
+    [SHOT_COMMAND, {"command": command_literals.COMMAND_SEND_BOARD, "args": {"board_json": "{}"}}],
+)
+def test_peek_command_name(codec, message):
+    assert peek_command_name(codec.encode(message)) == message["command"]
+
+
+@pytest.mark.parametrize("data", [b"", b"{not json", b'{"args": {}, "command": "send_board"}', b"\x03", b"\x00[]"])
+def test_peek_command_name_of_other_data(data):
+    assert peek_command_name(data) is None
@@ -1,4 +1,5 @@
 import json
+import logging
 import pytest
 
 from unittest.mock import MagicMock
@@ -80,19 +81,89 @@ def test_handle_command_server_error(command_handler, mock_client):
     assert response == CommandHandler.error_response("Server error!")
 
 
+def test_debug_log_redacts_session_tokens_and_boards(command_handler, mock_client, caplog):
+    command_handler.server.resume_session.return_value = CommandHandler.success_response(
+        "Session resumed!", session_token="secret-token"
+    )
+    board_json = json.dumps({"rows_count": 10, "columns_count": 10, "ships": []})
+
+    with caplog.at_level(logging.DEBUG, logger="game.server.command_handler"):
+        command_handler.handle_command_data(
+            {"command": command_literals.COMMAND_RESUME_SESSION, "args": {"session_token": "secret-token"}}, mock_client
+        )
+        command_handler.handle_command_data(
+            {"command": command_literals.COMMAND_SEND_BOARD, "args": {"board_json": board_json}}, mock_client
+        )
+
+    resume_fields, board_fields = [record.fields for record in caplog.records]
+    assert resume_fields["args"] == {"session_token": "<redacted>"}
+    assert resume_fields["response"]["args"] == {"session_token": "<redacted>"}
+    assert board_fields["args"] == {"board_json_size": len(board_json)}
+    assert "secret-token" not in caplog.text
+
+
 def test_format_response():
     response = CommandHandler.format_response("success", "Operation completed", key="value")
-    expected_response = json.dumps({"status": "success", "message": "Operation completed", "args": {"key": "value"}})
+    expected_response = {"status": "success", "message": "Operation completed", "args": {"key": "value"}}
     assert response == expected_response
 
 
 def test_success_response():
     response = CommandHandler.success_response("Operation completed", key="value")
-    expected_response = json.dumps({"status": "success", "message": "Operation completed", "args": {"key": "value"}})
+    expected_response = {"status": "success", "message": "Operation completed", "args": {"key": "value"}}
     assert response == expected_response
 
 
 def test_error_response():
     response = CommandHandler.error_response("Operation failed", key="value")
-    expected_response = json.dumps({"status": "error", "message": "Operation failed", "args": {"key": "value"}})
+    expected_response = {"status": "error", "message": "Operation failed", "args": {"key": "value"}}
     assert response == expected_response
+
+
+def _batch_command(commands, stop_on_error=False):
+    return json.dumps(
+        {"command": command_literals.COMMAND_BATCH, "args": {"commands": commands, "stop_on_error": stop_on_error}}
+    )
+
+
+def test_handle_batch_runs_commands_in_order(command_handler, mock_client):
+    commands = [
+        {"command": command_literals.COMMAND_CREATE_ROOM, "args": {"client_name": "Player1"}},
+        {"command": "UNKNOWN_COMMAND", "args": {}},
+        {"command": command_literals.COMMAND_BATCH, "args": {"commands": []}},
+        {"command": command_literals.COMMAND_SEND_BOARD, "args": {"board_json": "{}"}},
+    ]
+    response = command_handler.handle_command(_batch_command(commands), mock_client)
+    assert response == CommandHandler.success_response(
+        CommandHandler.BATCH_HANDLED_MESSAGE,
+        responses=[
+            "Room created",
+            CommandHandler.error_response("Unknown command"),
+            CommandHandler.error_response("Nested batches are not allowed!"),
+            "Board received",
+        ],
+    )
+
+
+def test_handle_batch_stops_on_error(command_handler, mock_client):
+    command_handler.server.create_room.return_value = CommandHandler.success_response("Room created")
+    commands = [
+        {"command": command_literals.COMMAND_CREATE_ROOM, "args": {"client_name": "Player1"}},
+        {"command": command_literals.COMMAND_CREATE_ROOM, "args": {}},
+        {"command": command_literals.COMMAND_SEND_BOARD, "args": {"board_json": "{}"}},
+    ]
+    response = command_handler.handle_command(_batch_command(commands, stop_on_error=True), mock_client)
+    assert response["args"]["responses"] == [
+        CommandHandler.success_response("Room created"),
+        CommandHandler.error_response("Missing arguments: client_name"),
+    ]
+    command_handler.server.receive_board.assert_not_called()
+
+
+def test_handle_batch_rejects_invalid_batches(command_handler, mock_client):
+    too_many = [{"command": command_literals.COMMAND_HAS_OPPONENT_JOINED, "args": {}}] * (CommandHandler.MAX_BATCH_SIZE + 1)
+    assert command_handler.handle_command(_batch_command("commands"), mock_client) == CommandHandler.error_response(
+        "Invalid batch!"
+    )
+    assert command_handler.handle_command(_batch_command(too_many), mock_client)["status"] == "error"
+    command_handler.server.has_opponent_joined.assert_not_called()
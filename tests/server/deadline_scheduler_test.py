@@ -0,0 +1,41 @@
+from game.server.deadline_scheduler import DeadlineScheduler
+
+
+def test_pop_due_in_deadline_order():
+    scheduler = DeadlineScheduler()
+    scheduler.schedule("second", 20)
+    scheduler.schedule("first", 10)
+    scheduler.schedule("third", 30)
+
+    assert scheduler.pop_due(now=5) == []
+    assert scheduler.pop_due(now=20) == ["first", "second"]
+    assert scheduler.get_next_deadline() == 30
+
+
+def test_reschedule_replaces_deadline():
+    scheduler = DeadlineScheduler()
+    scheduler.schedule("room", 10)
+    scheduler.schedule("room", 50)
+
+    assert scheduler.get_next_deadline() == 50
+    assert scheduler.pop_due(now=20) == []
+    assert scheduler.pop_due(now=50) == ["room"]
+
+
+def test_cancel():
+    scheduler = DeadlineScheduler()
+    scheduler.schedule("room", 10)
+
+    assert scheduler.cancel("room")
+    assert not scheduler.cancel("room")
+    assert scheduler.get_next_deadline() is None
+    assert scheduler.pop_due(now=100) == []
+
+
+def test_stale_entries_are_compacted():
+    scheduler = DeadlineScheduler()
+    for deadline in range(1000):
+        scheduler.schedule("room", deadline)
+
+    assert len(scheduler) == 1
+    assert len(scheduler.heap) <= DeadlineScheduler.COMPACTION_MIN_SIZE
@@ -0,0 +1,54 @@
+from game.server.event_log import EventLog
+
+EVENT = "opponent_shot"
+
+
+def _append_shots(event_log, recipient, count):
+    return [event_log.append(recipient, EVENT, {"row": index, "col": 0}) for index in range(count)]
+
+
+def test_sequence_is_shared_by_the_recipients_of_a_room():
+    event_log = EventLog()
+
+    assert event_log.append("client_1", EVENT, {}) == 1
+    assert event_log.append("client_2", EVENT, {}) == 2
+    assert event_log.append("client_1", EVENT, {}) == 3
+    assert [logged_event.sequence for logged_event in event_log.read("client_1")] == [1, 3]
+
+
+def test_deliver_next_gives_every_event_once_in_order():
+    event_log = EventLog()
+    sequences = _append_shots(event_log, "client_1", 3)
+
+    delivered = [event_log.deliver_next("client_1") for _ in range(4)]
+
+    assert [logged_event.sequence for logged_event in delivered[:3]] == sequences
+    assert delivered[3] is None
+    assert event_log.deliver_next("client_2") is None
+
+
+def test_read_redelivers_until_acknowledged():
+    event_log = EventLog()
+    sequences = _append_shots(event_log, "client_1", 4)
+    event_log.deliver_next("client_1")
+
+    first_read = event_log.read("client_1", limit=3)
+    second_read = event_log.read("client_1", after_sequence=sequences[1])
+
+    assert [logged_event.sequence for logged_event in first_read] == sequences[:3]
+    assert [logged_event.sequence for logged_event in second_read] == sequences[2:]
+    assert event_log.get_undelivered_count("client_1") == 0
+    assert event_log.get_unacknowledged_count("client_1") == 2
+
+
+def test_acknowledge_is_idempotent_and_compacts_the_stream():
+    event_log = EventLog()
+    sequences = _append_shots(event_log, "client_1", 10)
+
+    event_log.acknowledge("client_1", sequences[6])
+    event_log.acknowledge("client_1", sequences[2])
+    stream = event_log.streams["client_1"]
+
+    assert len(stream.events) == 3
+    assert event_log.deliver_next("client_1").sequence == sequences[7]
+    assert [logged_event.sequence for logged_event in event_log.read("client_1")] == sequences[7:]
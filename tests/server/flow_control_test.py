@@ -0,0 +1,141 @@
+import socket
+from unittest.mock import MagicMock
+
+import pytest
+
+from game.server import game_server as game_server_module
+from game.server.codec import BINARY_CODEC, JSON_CODEC
+from game.server.flow_control import (
+    CONNECTION_LIMIT,
+    UNIDENTIFIED_LIMIT,
+    ConnectionRateLimiter,
+    RateLimitPolicy,
+    SendBufferFullError,
+    SendQueue,
+    TokenBucket,
+    push_to_stream,
+)
+from game.server.game_server import GameServer
+from game.players import command_literals
+
+
+def _encode(command, codec=JSON_CODEC, **args):
+    return codec.encode({"command": command, "args": args})
+
+
+def test_token_bucket_allows_bursts_and_refills():
+    bucket = TokenBucket(rate=2, capacity=3, now=0)
+
+    assert [bucket.try_take(0) for _ in range(4)] == [True, True, True, False]
+    assert not bucket.try_take(0.25)
+    assert bucket.try_take(0.5)
+    assert [bucket.try_take(100) for _ in range(4)] == [True, True, True, False]
+
+
+def test_limiter_limits_commands_apart_and_connections_as_a_whole():
+    policy = RateLimitPolicy(
+        connection_rate=1, connection_burst=6, command_limits={command_literals.COMMAND_REGISTER_SHOT: (1, 2)}
+    )
+    limiter = ConnectionRateLimiter(policy, now=0)
+    shot = _encode(command_literals.COMMAND_REGISTER_SHOT, BINARY_CODEC, row=1, col=2)
+    poll = _encode(command_literals.COMMAND_IS_OPPONENT_READY)
+
+    assert [limiter.check(shot, now=0) for _ in range(3)] == [None, None, command_literals.COMMAND_REGISTER_SHOT]
+    assert [limiter.check(poll, now=0) for _ in range(4)] == [None, None, None, CONNECTION_LIMIT]
+    assert limiter.check(shot, now=1) is None
+
+
+def test_limiter_limits_commands_it_can_not_identify_together():
+    limiter = ConnectionRateLimiter(RateLimitPolicy(), now=0)
+    reordered = b'{"args": {"client_name": "A"}, "command": "create_room"}'
+    rate, burst = RateLimitPolicy.DEFAULT_COMMAND_LIMITS[UNIDENTIFIED_LIMIT]
+
+    results = [limiter.check(reordered, now=0) for _ in range(burst)] + [limiter.check(b"\xff", now=0)]
+
+    assert results == [None] * burst + [UNIDENTIFIED_LIMIT]
+    assert limiter.check(b"\xff", now=1 / rate) is None
+
+
+def test_limited_messages_are_rejected_before_decoding(monkeypatch):
+    game_server = GameServer()
+    game_server.enable_metrics()
+    game_server.rate_limit_policy = RateLimitPolicy(connection_burst=1, connection_rate=0.001)
+    rate_limiter = game_server.create_rate_limiter()
+    create_room = _encode(command_literals.COMMAND_CREATE_ROOM, client_name="Alice")
+
+    first_response = JSON_CODEC.decode(game_server.handle_message("client_1", create_room, rate_limiter))
+    monkeypatch.setattr(game_server_module, "decode_message", MagicMock(side_effect=AssertionError))
+    second_response = JSON_CODEC.decode(game_server.handle_message("client_1", create_room, rate_limiter))
+
+    assert first_response["status"] == "success"
+    assert second_response == {"status": "error", "message": "Too many commands!", "args": {"limit": CONNECTION_LIMIT}}
+    assert len(game_server.rooms) == 1
+    assert game_server.get_metrics_snapshot()["rate_limited"] == {CONNECTION_LIMIT: 1}
+
+
+def test_commands_of_a_batch_are_limited_one_by_one():
+    game_server = GameServer()
+    game_server.enable_metrics()
+    rate_limiter = ConnectionRateLimiter(game_server.rate_limit_policy, now=0)
+    _, burst = RateLimitPolicy.DEFAULT_COMMAND_LIMITS[command_literals.COMMAND_CREATE_ROOM]
+    create_and_exit = [
+        {"command": command_literals.COMMAND_CREATE_ROOM, "args": {"client_name": "Alice"}},
+        {"command": command_literals.COMMAND_EXIT_ROOM, "args": {}},
+    ]
+    batch = _encode(command_literals.COMMAND_BATCH, commands=create_and_exit * (burst + 5))
+
+    response = JSON_CODEC.decode(game_server.handle_message("client_1", batch, rate_limiter))
+
+    create_responses = response["args"]["responses"][::2]
+    assert [create_response["status"] for create_response in create_responses] == ["success"] * burst + ["error"] * 5
+    assert create_responses[-1] == {
+        "status": "error",
+        "message": "Too many commands!",
+        "args": {"limit": command_literals.COMMAND_CREATE_ROOM},
+    }
+    assert game_server.get_metrics_snapshot()["rate_limited"] == {command_literals.COMMAND_CREATE_ROOM: 5}
+
+
+def test_send_queue_disconnects_a_client_that_does_not_read():
+    server_socket, client_socket = socket.socketpair()
+    send_queue = SendQueue(server_socket, max_queued_frames=2, stall_timeout=0.1)
+
+    with pytest.raises(SendBufferFullError):
+        for _ in range(100):
+            send_queue.send(b"x" * 1024 * 1024)
+
+    send_queue.thread.join(5)
+    assert not send_queue.thread.is_alive()
+    with pytest.raises(ConnectionError):
+        send_queue.send(b"x", wait=False)
+    client_socket.close()
+
+
+def test_send_queue_writes_the_queued_frames_before_closing():
+    server_socket, client_socket = socket.socketpair()
+    send_queue = SendQueue(server_socket)
+
+    send_queue.send(b"first ")
+    send_queue.send(b"second", wait=False)
+    send_queue.close()
+    send_queue.thread.join(5)
+
+    received = b""
+    while chunk := client_socket.recv(1024):
+        received += chunk
+    assert received == b"first second"
+    client_socket.close()
+
+
+def test_push_to_stream_disconnects_a_full_stream():
+    writer = MagicMock()
+    writer.transport.get_write_buffer_size.return_value = 100
+
+    push_to_stream(writer, b"event", max_buffer_size=100)
+    writer.write.assert_called_once_with(b"event")
+
+    writer.transport.get_write_buffer_size.return_value = 101
+    with pytest.raises(SendBufferFullError):
+        push_to_stream(writer, b"event", max_buffer_size=100)
+    writer.transport.abort.assert_called_once()
+    assert writer.write.call_count == 1
@@ -0,0 +1,70 @@
+import socket
+
+import pytest
+
+from game.server.framing import (
+    FrameDecoder,
+    FrameError,
+    HEADER,
+    MAX_FRAME_SIZE,
+    RECV_CHUNK_SIZE,
+    encode_frame,
+    recv_frame,
+)
+
+
+def test_encode_frame_prefixes_length():
+    assert encode_frame("abc") == b"\x00\x00\x00\x03abc"
+
+
+def test_decoder_handles_partial_frames():
+    decoder = FrameDecoder()
+    frame = encode_frame(b"hello")
+
+    assert decoder.feed(frame[:2]) == []
+    assert decoder.feed(frame[2:6]) == []
+    assert decoder.feed(frame[6:]) == [b"hello"]
+    assert len(decoder.buffer) == 0
+
+
+def test_decoder_splits_merged_frames():
+    decoder = FrameDecoder()
+    data = encode_frame(b"first") + encode_frame(b"") + encode_frame(b"third") + encode_frame(b"four")[:3]
+
+    assert decoder.feed(data) == [b"first", b"", b"third"]
+    assert decoder.feed(encode_frame(b"four")[3:]) == [b"four"]
+
+
+def test_decoder_rejects_oversized_frame():
+    with pytest.raises(FrameError):
+        FrameDecoder().feed(HEADER.pack(MAX_FRAME_SIZE + 1))
+
+
+def test_recv_frame_receives_large_message():
+    sender, receiver = socket.socketpair()
+    payload = b"x" * 100000
+    sender.sendall(encode_frame(payload) + encode_frame(b"next"))
+
+    assert recv_frame(receiver) == payload
+    assert recv_frame(receiver) == b"next"
+
+    sender.close()
+    assert recv_frame(receiver) is None
+    receiver.close()
+
+
+def test_recv_frame_reads_a_truncated_frame_in_chunks():
+    class ChunkSocket:
+        def __init__(self, data):
+            self.data = data
+            self.requested_sizes = []
+
+        def recv(self, size):
+            self.requested_sizes.append(size)
+            chunk, self.data = self.data[:size], self.data[size:]
+            return chunk
+
+    sock = ChunkSocket(HEADER.pack(MAX_FRAME_SIZE) + b"x" * 3)
+
+    assert recv_frame(sock) is None
+    assert max(sock.requested_sizes) == RECV_CHUNK_SIZE
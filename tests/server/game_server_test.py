@@ -1,6 +1,16 @@
-import json
+import threading
+from time import monotonic
+
 import pytest
-from game.server.game_server import GameServer
+from game.server.game_server import GameServer, SinglePlayerServer
+from game.server.network import OfflineNetwork
+from game.players.player import Player
+from game.server.room_directory import SQLiteRoomDirectory
+from game.players.placement_heatmap import PlacementHeatmap
+from game.interface.base_board import BaseBoard
+from game.server.command_handler import CommandHandler
+from game.server.codec import BINARY_CODEC, JSON_CODEC
+from game.players import command_literals
 
 
 @pytest.fixture
@@ -20,8 +30,8 @@ def test_create_room_success(game_server):
     client = "client_1"
     client_name = "Alice"
     response = game_server.create_room(client, client_name)
-    assert "success" in response
-    assert "Room" in response
+    assert response["status"] == "success"
+    assert "Room" in response["message"]
 
 
 def test_create_room_client_already_in_room(game_server):
@@ -29,8 +39,8 @@ def test_create_room_client_already_in_room(game_server):
     client_name = "Alice"
     game_server.create_room(client, client_name)
     response = game_server.create_room(client, client_name)
-    assert "error" in response
-    assert "Client is already in a room" in response
+    assert response["status"] == "error"
+    assert "Client is already in a room" in response["message"]
 
 
 def test_join_room_with_id_success(game_server):
@@ -39,10 +49,10 @@ def test_join_room_with_id_success(game_server):
     client_name1 = "Alice"
     client_name2 = "Bob"
 
-    response1 = json.loads(game_server.create_room(client1, client_name1))
+    response1 = game_server.create_room(client1, client_name1)
     room_id = response1["args"]["room_id"]
 
-    response2 = json.loads(game_server.join_room_with_id(client2, room_id, client_name2))
+    response2 = game_server.join_room_with_id(client2, room_id, client_name2)
     assert "success" in response2["status"]
     assert room_id in response2["args"]["room_id"]
 
@@ -54,8 +64,8 @@ def test_join_room_with_id_client_already_in_room(game_server):
 
     game_server.create_room(client1, client_name1)
     response = game_server.join_room_with_id(client1, "123456", client_name1)
-    assert "error" in response
-    assert "Client is already in a room" in response
+    assert response["status"] == "error"
+    assert "Client is already in a room" in response["message"]
 
 
 def test_exit_room_success(game_server):
@@ -63,12 +73,533 @@ def test_exit_room_success(game_server):
     client_name = "Alice"
     game_server.create_room(client, client_name)
     response = game_server.exit_room(client)
-    assert "success" in response
-    assert "Client exited from room" in response
+    assert response["status"] == "success"
+    assert "Client exited from room" in response["message"]
 
 
 def test_exit_room_client_not_in_room(game_server):
     client = "client_1"
     response = game_server.exit_room(client)
-    assert "error" in response
-    assert "Client is not in a room" in response
+    assert response["status"] == "error"
+    assert "Client is not in a room" in response["message"]
+
+
+def test_send_enemy_board_records_board_once():
+    placement_heatmap = PlacementHeatmap()
+    game_server = GameServer(placement_heatmap=placement_heatmap)
+    room_id = game_server.create_room("client_1", "Alice")["args"]["room_id"]
+    game_server.join_room_with_id("client_2", room_id, "Bob")
+    board = BaseBoard()
+    board.random_shuffle_ships()
+    for client in ("client_1", "client_2"):
+        game_server.receive_board(client, board.serialize_board())
+    game_server.rooms[room_id].has_battle_ended = True
+
+    game_server.send_enemy_board("client_1")
+    game_server.send_enemy_board("client_1")
+
+    assert placement_heatmap.get_boards_count(10, 10) == 1
+
+
+def _start_battle(game_server):
+    room_id = game_server.create_room("client_1", "Alice")["args"]["room_id"]
+    game_server.join_room_with_id("client_2", room_id, "Bob")
+    board = BaseBoard()
+    board.random_shuffle_ships()
+    for client in ("client_1", "client_2"):
+        game_server.receive_board(client, board.serialize_board())
+    game_server.is_opponent_ready("client_1")
+    room = game_server.rooms[room_id]
+    shooter = "client_1" if room.is_client_turn("client_1") else "client_2"
+    target = "client_2" if shooter == "client_1" else "client_1"
+    return room, shooter, target
+
+
+def test_handle_message_negotiates_binary_codec(game_server):
+    room, shooter, target = _start_battle(game_server)
+    negotiate_command = {"command": command_literals.COMMAND_NEGOTIATE_CODEC, "args": {"codecs": ["msgpack", "binary"]}}
+
+    negotiated = game_server.handle_message(shooter, JSON_CODEC.encode(negotiate_command))
+    shot_command = {"command": command_literals.COMMAND_REGISTER_SHOT, "args": {"row": 0, "col": 0}}
+    response = game_server.handle_message(shooter, BINARY_CODEC.encode(shot_command))
+
+    assert JSON_CODEC.decode(negotiated)["args"]["codec"] == "binary"
+    assert response[0] == BINARY_CODEC.TAG_SHOT_RESULT
+    assert BINARY_CODEC.decode(response)["message"] == "Shot registered!"
+    assert room.give_shot_from_history(target) is not None
+
+
+def test_handle_message_rejects_unsupported_codecs_and_invalid_data(game_server):
+    negotiate_command = {"command": command_literals.COMMAND_NEGOTIATE_CODEC, "args": {"codecs": ["msgpack"]}}
+
+    rejected = JSON_CODEC.decode(game_server.handle_message("client_1", JSON_CODEC.encode(negotiate_command)))
+    invalid = JSON_CODEC.decode(game_server.handle_message("client_1", b"\x7f"))
+
+    assert rejected["message"] == "No supported codec!"
+    assert rejected["args"]["codecs"] == ["json", "binary"]
+    assert invalid["status"] == "error"
+    assert "client_1" not in game_server.client_codecs
+
+
+def test_subscribe_events_without_pusher(game_server):
+    response = game_server.subscribe_events("client_1")
+    assert response["status"] == "error"
+
+
+def test_register_shot_pushes_event_to_subscriber(game_server):
+    room, shooter, target = _start_battle(game_server)
+    pushed_events = []
+    game_server.register_event_pusher(target, pushed_events.append)
+    game_server.subscribe_events(target)
+
+    game_server.register_shot(shooter, 0, 0)
+
+    assert len(pushed_events) == 1
+    assert CommandHandler.is_event_message(pushed_events[0])
+    event = pushed_events[0]
+    assert event["event"] == command_literals.EVENT_OPPONENT_SHOT
+    assert (event["args"]["row"], event["args"]["col"]) == (0, 0)
+    assert room.give_shot_from_history(target) is None
+
+
+def test_fetch_events_redelivers_pushed_shots_until_acknowledged(game_server):
+    room, shooter, target = _start_battle(game_server)
+    game_server.register_event_pusher(target, lambda event_message: None)
+    game_server.subscribe_events(target)
+    registered_cols = [
+        col
+        for col in range(3)
+        if room.is_client_turn(shooter) and game_server.register_shot(shooter, 9, col)["status"] == "success"
+    ]
+    shots_count = room.event_log.get_unacknowledged_count(target)
+
+    fetched = game_server.fetch_events(target)
+    events = fetched["args"]["events"]
+    refetched = game_server.fetch_events(target, after_sequence=events[0]["args"]["sequence"], limit=1)
+
+    assert shots_count == len(registered_cols) > 0
+    assert [event["event"] for event in events] == [command_literals.EVENT_OPPONENT_SHOT] * shots_count
+    assert [event["args"]["col"] for event in events] == registered_cols
+    assert fetched["args"]["last_sequence"] == room.event_log.last_sequence
+    assert refetched["args"]["events"] == events[1:2]
+    assert game_server.fetch_events(target, after_sequence="1")["message"] == "Invalid event cursor!"
+
+
+def test_register_shot_keeps_history_without_subscription(game_server):
+    room, shooter, target = _start_battle(game_server)
+    pushed_events = []
+    game_server.register_event_pusher(target, pushed_events.append)
+
+    game_server.register_shot(shooter, 0, 0)
+
+    assert pushed_events == []
+    assert room.give_shot_from_history(target) is not None
+
+
+def test_wait_for_opponent_join_without_pusher(game_server):
+    game_server.create_room("client_1", "Alice")
+    response = game_server.wait_for_opponent_join("client_1")
+    assert response["status"] == "error"
+
+
+def test_wait_for_opponent_join_is_answered_on_join(game_server):
+    pushed_events = []
+    game_server.register_event_pusher("client_1", pushed_events.append)
+    room_id = game_server.create_room("client_1", "Alice")["args"]["room_id"]
+
+    response = game_server.wait_for_opponent_join("client_1")
+    assert response["args"]["is_waiting"]
+
+    game_server.join_room_with_id("client_2", room_id, "Bob")
+
+    event = pushed_events[0]
+    assert event["event"] == command_literals.EVENT_OPPONENT_JOINED
+    assert event["args"]["opponent_name"] == "Bob"
+    assert not game_server.wait_registry.is_waiting("client_1")
+
+
+def test_wait_for_opponent_join_answers_at_once_when_full(game_server):
+    room_id = game_server.create_room("client_1", "Alice")["args"]["room_id"]
+    game_server.join_room_with_id("client_2", room_id, "Bob")
+
+    response = game_server.wait_for_opponent_join("client_1")
+
+    assert response["status"] == "success"
+    assert response["args"]["opponent_name"] == "Bob"
+
+
+def test_wait_for_opponent_ready_is_answered_on_board(game_server):
+    pushed_events = []
+    game_server.register_event_pusher("client_1", pushed_events.append)
+    room_id = game_server.create_room("client_1", "Alice")["args"]["room_id"]
+    game_server.join_room_with_id("client_2", room_id, "Bob")
+    board = BaseBoard()
+    board.random_shuffle_ships()
+    game_server.receive_board("client_1", board.serialize_board())
+
+    response = game_server.wait_for_opponent_ready("client_1")
+    assert response["args"]["is_waiting"]
+
+    game_server.receive_board("client_2", board.serialize_board())
+
+    event = pushed_events[0]
+    assert event["event"] == command_literals.EVENT_OPPONENT_READY
+    assert game_server.rooms[room_id].has_battle_started
+    assert event["args"]["is_turn"] == game_server.rooms[room_id].is_client_turn("client_1")
+
+
+def test_expire_waiters_pushes_timeout(game_server):
+    pushed_events = []
+    game_server.register_event_pusher("client_1", pushed_events.append)
+    game_server.create_room("client_1", "Alice")
+    game_server.wait_for_opponent_join("client_1", timeout=5)
+    deadline = game_server.wait_registry.waiters["client_1"].deadline
+
+    game_server.expire_waiters(deadline - 1)
+    assert pushed_events == []
+
+    game_server.expire_waiters(deadline)
+    event = pushed_events[0]
+    assert event["event"] == command_literals.EVENT_WAIT_TIMEOUT
+    assert event["args"]["command"] == command_literals.COMMAND_WAIT_FOR_OPPONENT_JOIN
+
+
+@pytest.mark.parametrize("timeout", [float("nan"), float("inf"), "nan", "soon", None])
+def test_wait_for_opponent_join_rejects_an_invalid_timeout(game_server, timeout):
+    game_server.register_event_pusher("client_1", lambda event_message: None)
+    game_server.create_room("client_1", "Alice")
+
+    response = game_server.wait_for_opponent_join("client_1", timeout=timeout)
+
+    assert response["message"] == "Invalid timeout!"
+    assert not game_server.wait_registry.is_waiting("client_1")
+
+
+def test_exit_room_removes_waiters(game_server):
+    game_server.register_event_pusher("client_1", lambda event_message: None)
+    game_server.create_room("client_1", "Alice")
+    game_server.wait_for_opponent_join("client_1")
+
+    game_server.exit_room("client_1")
+
+    assert not game_server.wait_registry.is_waiting("client_1")
+
+
+def test_join_random_room_skips_private_and_full_rooms(game_server):
+    private_room_id = game_server.create_room("client_1", "Alice")["args"]["room_id"]
+    game_server.change_room_publicity("client_1")
+    full_room_id = game_server.create_room("client_2", "Bob")["args"]["room_id"]
+    game_server.join_room_with_id("client_3", full_room_id, "Carol")
+    open_room_id = game_server.create_room("client_4", "Dave")["args"]["room_id"]
+
+    response = game_server.join_random_room("client_5", "Eve")
+
+    assert response["args"]["room_id"] == open_room_id
+    assert private_room_id in game_server.rooms
+    assert game_server.room_directory.get_open_rooms_count() == 0
+
+
+def test_join_random_room_in_bucket(game_server):
+    game_server.create_room("client_1", "Alice")
+    bucket_room_id = game_server.create_room("client_2", "Bob", bucket="eu")["args"]["room_id"]
+
+    response = game_server.join_random_room("client_3", "Carol", bucket="eu")
+
+    assert response["args"]["room_id"] == bucket_room_id
+    assert game_server.join_random_room("client_4", "Dave", bucket="eu")["status"] == "error"
+
+
+def test_rooms_reject_a_bucket_that_is_not_a_string(game_server):
+    assert game_server.create_room("client_1", "Alice", bucket=["eu"])["message"] == "Invalid matchmaking bucket!"
+    assert game_server.join_random_room("client_1", "Alice", bucket={"eu": 1})["message"] == "Invalid matchmaking bucket!"
+
+    assert not game_server.rooms
+    assert not game_server.is_client_in_room("client_1")
+
+
+def test_change_room_publicity_requeues_room(game_server):
+    room_id = game_server.create_room("client_1", "Alice")["args"]["room_id"]
+    game_server.change_room_publicity("client_1")
+    assert not game_server.room_directory.is_room_open(room_id)
+
+    game_server.change_room_publicity("client_1")
+    assert game_server.room_directory.is_room_open(room_id)
+
+    game_server.exit_room("client_1")
+    assert not game_server.room_directory.is_room_open(room_id)
+
+
+def test_exit_room_removes_both_clients(game_server):
+    room_id = game_server.create_room("client_1", "Alice")["args"]["room_id"]
+    game_server.join_room_with_id("client_2", room_id, "Bob")
+
+    game_server.exit_room("client_1")
+
+    assert len(game_server.rooms) == 0
+    assert len(game_server.clients_to_rooms) == 0
+    assert room_id not in game_server.room_reaper
+
+
+def test_reap_idle_room(game_server):
+    room_id = game_server.create_room("client_1", "Alice")["args"]["room_id"]
+    room = game_server.rooms[room_id]
+
+    game_server.reap_rooms(room.last_activity_time + GameServer.ROOM_IDLE_TIMEOUT - 2)
+    assert room_id in game_server.rooms
+
+    game_server.reap_rooms(room.last_activity_time + GameServer.ROOM_IDLE_TIMEOUT + 1)
+    assert room_id not in game_server.rooms
+    assert not game_server.is_client_in_room("client_1")
+    assert not game_server.room_directory.is_room_open(room_id)
+
+
+def test_reap_reschedules_active_room(game_server):
+    room_id = game_server.create_room("client_1", "Alice")["args"]["room_id"]
+    room = game_server.rooms[room_id]
+    room.last_activity_time += 100
+
+    game_server.reap_rooms(room.last_activity_time - 100 + GameServer.ROOM_IDLE_TIMEOUT + 1)
+
+    assert room_id in game_server.rooms
+    assert room_id in game_server.room_reaper
+
+
+def test_reap_finished_room_early():
+    game_server = GameServer(time_per_turn=60)
+    room, shooter, target = _start_battle(game_server)
+    room.turn_deadline = 0
+    game_server.register_shot(shooter, 0, 0)
+    assert room.has_battle_ended
+
+    game_server.reap_rooms(room.last_activity_time + GameServer.ROOM_FINISHED_TIMEOUT + 1)
+
+    assert room.room_id not in game_server.rooms
+    assert len(game_server.clients_to_rooms) == 0
+
+
+def test_client_disconnected_keeps_room_until_orphaned(game_server):
+    room_id = game_server.create_room("client_1", "Alice")["args"]["room_id"]
+    game_server.join_room_with_id("client_2", room_id, "Bob")
+
+    game_server.client_disconnected("client_1")
+    assert not game_server.is_client_in_room("client_1")
+    assert game_server.is_client_in_room("client_2")
+
+    game_server.client_disconnected("client_2")
+    room = game_server.rooms[room_id]
+    game_server.reap_rooms(room.last_activity_time + GameServer.ROOM_ORPHANED_TIMEOUT + 1)
+
+    assert len(game_server.rooms) == 0
+
+
+def test_disconnected_session_keeps_the_room_until_the_grace_period_ends(game_server):
+    session = game_server.open_session()
+    room_id = game_server.create_room(session.client, "Alice")["args"]["room_id"]
+    now = monotonic()
+
+    game_server.client_disconnected(session.client)
+    game_server.expire_sessions(now + 1)
+    assert game_server.is_client_in_room(session.client)
+
+    game_server.expire_sessions(now + GameServer.SESSION_GRACE_PERIOD + 2)
+    assert not game_server.is_client_in_room(session.client)
+    assert game_server.rooms[room_id].are_all_clients_disconnected()
+
+
+def test_resume_session_moves_the_connection_into_the_room(game_server):
+    lost_session = game_server.open_session()
+    room_id = game_server.create_room(lost_session.client, "Alice")["args"]["room_id"]
+    game_server.client_disconnected(lost_session.client)
+
+    session = game_server.open_session()
+    pushed_events = []
+    game_server.register_event_pusher(session.client, pushed_events.append)
+    game_server.negotiate_codec(session.client, ["binary"])
+    busy_session = game_server.open_session()
+    game_server.create_room(busy_session.client, "Bob")
+
+    assert game_server.resume_session(session.client, "unknown")["message"] == "Session not found!"
+    assert game_server.resume_session(busy_session.client, lost_session.client)["status"] == "error"
+    response = game_server.resume_session(session.client, lost_session.client)
+    game_server.subscribe_events(session.client)
+    guest = game_server.open_session()
+    game_server.join_room_with_id(guest.client, room_id, "Carol")
+
+    assert response["status"] == "success"
+    assert session.client == lost_session.client
+    assert game_server.encode_for_client(session.client, {"status": "success"})[0] == BINARY_CODEC.TAG_JSON
+    assert game_server.has_opponent_joined(session.client)["status"] == "success"
+    assert session.client in game_server.event_subscribers
+    assert game_server.resume_session(guest.client, lost_session.client)["status"] == "error"
+
+
+def test_resumed_session_with_an_equal_token_leaves_no_stale_directory_mapping(game_server):
+    lost_session = game_server.open_session()
+    game_server.create_room(lost_session.client, "Alice")
+    game_server.client_disconnected(lost_session.client)
+    session = game_server.open_session()
+
+    decoded_token = "".join(list(lost_session.client))
+    assert game_server.resume_session(session.client, decoded_token)["status"] == "success"
+    game_server.client_disconnected(session.client)
+    game_server.expire_sessions(monotonic() + GameServer.SESSION_GRACE_PERIOD + 1)
+
+    assert decoded_token is not lost_session.client
+    assert not game_server.is_client_in_room(decoded_token)
+    assert game_server.room_directory.clients_to_rooms == {}
+
+
+def test_end_expired_turns_notifies_both_players():
+    game_server = GameServer(time_per_turn=60)
+    room, shooter, target = _start_battle(game_server)
+    pushed_events = {shooter: [], target: []}
+    for client, events in pushed_events.items():
+        game_server.register_event_pusher(client, events.append)
+        game_server.subscribe_events(client)
+
+    game_server.end_expired_turns(room.turn_deadline - 1)
+    assert not room.has_battle_ended
+
+    game_server.end_expired_turns(room.turn_deadline)
+
+    assert room.has_battle_ended and room.is_timeout
+    assert room.loser == shooter
+    assert room.room_id not in game_server.turn_deadlines
+    for client, events in pushed_events.items():
+        event = events[0]
+        assert event["event"] == command_literals.EVENT_BATTLE_END
+        assert event["args"]["is_winner"] == (client == target)
+
+
+def test_register_shot_moves_turn_deadline():
+    game_server = GameServer(time_per_turn=60)
+    room, shooter, target = _start_battle(game_server)
+    room.turn_deadline -= 30
+    game_server.turn_deadlines.schedule(room.room_id, room.turn_deadline)
+
+    game_server.register_shot(shooter, 0, 0)
+
+    assert game_server.turn_deadlines.get_next_deadline() == room.turn_deadline
+    assert game_server.get_housekeeping_delay(room.turn_deadline - 0.25) == 0.25
+
+
+def test_one_room_hammered_from_both_sides():
+    game_server = GameServer()
+    room, _, _ = _start_battle(game_server)
+    clients = list(room.clients)
+    registered_cells = {client: [] for client in clients}
+    received_shots_counts = {client: 0 for client in clients}
+    errors = []
+
+    def play(client):
+        cells = [(row, col) for row in range(10) for col in range(10)]
+        try:
+            while not room.has_battle_ended and cells:
+                response = game_server.register_shot(client, *cells[-1])
+                if response["message"] == "Shot registered!":
+                    registered_cells[client].append(cells.pop())
+                elif response["message"] == "Invalid shot!":
+                    cells.pop()
+
+                if game_server.send_opponents_shot(client)["status"] == "success":
+                    received_shots_counts[client] += 1
+        except Exception as exception:  # pylint: disable=W0703
+            errors.append(exception)
+
+    threads = [threading.Thread(target=play, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert errors == []
+    assert room.has_battle_ended
+    for client in clients:
+        opponent = room.get_opponent_room_client(client)
+        assert len(set(registered_cells[client])) == len(registered_cells[client])
+        assert all(opponent.board.is_coordinate_shot_at(row, col) for row, col in registered_cells[client])
+        pending_shots_count = room.event_log.get_undelivered_count(opponent.client)
+        assert received_shots_counts[opponent.client] + pending_shots_count == len(registered_cells[client])
+
+
+def test_concurrent_create_and_join_keep_mappings_consistent():
+    game_server = GameServer()
+    threads_count = 8
+    rooms_per_thread = 50
+
+    def create_and_join(thread_index):
+        for room_index in range(rooms_per_thread):
+            creator = f"creator_{thread_index}_{room_index}"
+            game_server.create_room(creator, "Alice")
+            game_server.join_random_room(f"joiner_{thread_index}_{room_index}", "Bob")
+
+    threads = [threading.Thread(target=create_and_join, args=(index,)) for index in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(game_server.rooms) == threads_count * rooms_per_thread
+    assert len(game_server.clients_to_rooms) == 2 * threads_count * rooms_per_thread
+    assert game_server.room_directory.get_open_rooms_count() == 0
+    for client, room_id in game_server.clients_to_rooms.items():
+        assert client in game_server.rooms[room_id].clients
+
+
+def test_nodes_sharing_a_room_directory_redirect_to_the_hosting_node(tmp_path):
+    database_path = str(tmp_path / "rooms.sqlite3")
+    node_a = GameServer(room_directory=SQLiteRoomDirectory(database_path), node_id="localhost:5001")
+    node_b = GameServer(room_directory=SQLiteRoomDirectory(database_path), node_id="localhost:5002")
+
+    room_id = node_a.create_room("client1", "Player1")["args"]["room_id"]
+    join_response = node_b.join_room_with_id("client2", room_id, "Player2")
+    random_response = node_b.join_random_room("client2", "Player2")
+
+    assert join_response["message"] == "Room is hosted on another node!"
+    assert join_response["args"] == {"room_id": room_id, "node_id": "localhost:5001"}
+    assert random_response["args"] == {"room_id": room_id, "node_id": "localhost:5001"}
+    assert node_b.room_directory.is_room_open(room_id)
+    assert node_a.join_room_with_id("client2", room_id, "Player2")["status"] == "success"
+
+    node_a.exit_room("client1")
+    assert node_b.join_room_with_id("client3", room_id, "Player3")["message"] == "Room ID not found!"
+    assert node_b.room_directory.get_client_room("localhost:5001/client2") is None
+
+
+def test_room_ids_are_unique_across_nodes(tmp_path):
+    database_path = str(tmp_path / "rooms.sqlite3")
+    node_a = GameServer(room_directory=SQLiteRoomDirectory(database_path), node_id="localhost:5001")
+    node_b = GameServer(room_directory=SQLiteRoomDirectory(database_path), node_id="localhost:5002")
+    node_a_room_id = node_a.create_room("client1", "Player1")["args"]["room_id"]
+    node_b.generate_unique_room_id = iter([node_a_room_id, "123456"]).__next__
+
+    assert node_b.create_room("client2", "Player2")["args"]["room_id"] == "123456"
+    assert node_a_room_id not in node_b.rooms
+
+
+def test_offline_commands_are_passed_in_process_and_shots_start_the_bot_turns():
+    offline_server = SinglePlayerServer()
+    player = Player("Player", OfflineNetwork(is_player=True))
+    player.network_client.add_server_instance(offline_server)
+    player.board.random_shuffle_ships()
+    offline_server.set_up_game_room(player)
+    player.send_board()
+    player.wait_for_opponent_ready()
+    player.subscribe_to_events()
+
+    command_data = {"command": command_literals.COMMAND_HAS_OPPONENT_JOINED, "args": {}}
+    assert offline_server.handle_offline_client(command_data, is_player=True)["status"] == "success"
+    assert player.is_turn
+
+    while player.is_turn and not player.is_in_finished_battle:
+        row, col = next(
+            (row, col)
+            for row in range(BaseBoard.BOARD_ROWS_DEFAULT)
+            for col in range(BaseBoard.BOARD_COLS_DEFAULT)
+            if not player.enemy_board_view.is_coordinate_shot_at(row, col)
+        )
+        with player.pipeline() as pipeline:
+            pipeline.shot(row, col)
+
+    player.receive_events()
+    assert player.is_in_finished_battle or (player.is_turn and player.board.shot_coordinates)
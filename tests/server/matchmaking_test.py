@@ -0,0 +1,41 @@
+from game.server.matchmaking import MatchmakingQueue
+
+
+def test_pop_is_fifo():
+    queue = MatchmakingQueue()
+    queue.add("111111")
+    queue.add("222222")
+
+    assert queue.pop() == "111111"
+    assert queue.pop() == "222222"
+    assert queue.pop() is None
+
+
+def test_buckets_are_separate():
+    queue = MatchmakingQueue()
+    queue.add("111111", "eu")
+    queue.add("222222")
+
+    assert queue.pop("us") is None
+    assert queue.pop("eu") == "111111"
+    assert queue.pop() == "222222"
+
+
+def test_add_twice_keeps_position():
+    queue = MatchmakingQueue()
+    queue.add("111111")
+    queue.add("222222")
+    queue.add("111111")
+
+    assert len(queue) == 2
+    assert queue.pop() == "111111"
+
+
+def test_remove():
+    queue = MatchmakingQueue()
+    queue.add("111111", "eu")
+
+    assert queue.remove("111111")
+    assert not queue.remove("111111")
+    assert "111111" not in queue
+    assert queue.buckets == {}
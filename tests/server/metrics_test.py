@@ -0,0 +1,97 @@
+import json
+import urllib.request
+
+from game.server.game_server import GameServer
+from game.server.metrics import LatencyHistogram, MetricsEndpoint, ServerMetrics
+from game.players import command_literals
+
+
+def test_histogram_percentiles_are_upper_estimates_within_the_bucket_error():
+    histogram = LatencyHistogram()
+    for milliseconds in range(1, 101):
+        histogram.record(milliseconds / 1000)
+
+    assert histogram.count == 100
+    assert 0.050 <= histogram.get_percentile(50) <= 0.050 * 1.25
+    assert 0.099 <= histogram.get_percentile(99) <= 0.099 * 1.25
+    assert histogram.get_percentile(100) == 0.1
+    assert LatencyHistogram().get_percentile(50) is None
+
+
+def test_merged_histograms_hold_the_durations_of_both():
+    histogram = LatencyHistogram()
+    other_histogram = LatencyHistogram()
+    for milliseconds in range(1, 51):
+        histogram.record(milliseconds / 1000)
+        other_histogram.record((milliseconds + 50) / 1000)
+
+    histogram.merge(other_histogram)
+
+    assert histogram.count == 100
+    assert histogram.maximum == 0.1
+    assert 0.050 <= histogram.get_percentile(50) <= 0.050 * 1.25
+
+
+def test_commands_are_counted_only_once_metrics_are_enabled():
+    game_server = GameServer()
+    handler = game_server.command_handler
+    handler.handle_command_data({"command": command_literals.COMMAND_HAS_OPPONENT_JOINED, "args": {}}, "client_1")
+    assert game_server.get_metrics_snapshot()["commands"] == {}
+
+    game_server.enable_metrics()
+    handler.handle_command_data({"command": command_literals.COMMAND_CREATE_ROOM, "args": {"client_name": "A"}}, "client_1")
+    handler.handle_command_data({"command": command_literals.COMMAND_HAS_OPPONENT_JOINED, "args": {}}, "client_1")
+    handler.handle_command_data({"command": "no_such_command", "args": {}}, "client_1")
+    handler.handle_command_data({"command": ["not", "a", "name"]}, "client_1")
+
+    snapshot = game_server.get_metrics_snapshot()
+
+    assert snapshot["commands"][command_literals.COMMAND_CREATE_ROOM]["count"] == 1
+    assert snapshot["commands"][command_literals.COMMAND_CREATE_ROOM]["errors"] == 0
+    assert snapshot["commands"][command_literals.COMMAND_HAS_OPPONENT_JOINED]["errors"] == 1
+    assert snapshot["commands"]["unknown"] == {**snapshot["commands"]["unknown"], "count": 2, "errors": 2}
+    assert snapshot["gauges"]["rooms"] == 1
+    assert snapshot["gauges"]["rooms_by_phase"] == {"waiting": 1, "placement": 0, "battle": 0, "ended": 0}
+    assert snapshot["gauges"]["clients_in_rooms"] == 1
+
+
+def test_gauges_follow_the_connections_and_the_event_logs():
+    game_server = GameServer()
+    host = game_server.open_session().client
+    guest = game_server.open_session().client
+    game_server.create_room(host, "Host")
+    room_id = game_server.clients_to_rooms[host]
+    game_server.join_room_with_id(guest, room_id, "Guest")
+    game_server.rooms[room_id].event_log.append(host, command_literals.EVENT_OPPONENT_READY, {})
+
+    gauges = game_server.get_gauges()
+
+    assert gauges["connections"] == 2
+    assert gauges["rooms_by_phase"]["placement"] == 1
+    assert gauges["event_log_depth"] == 1
+
+    game_server.client_disconnected(guest)
+    assert game_server.get_gauges()["connections"] == 1
+
+
+def test_endpoint_serves_text_and_json():
+    game_server = GameServer()
+    game_server.enable_metrics()
+    game_server.command_handler.handle_command_data(
+        {"command": command_literals.COMMAND_CREATE_ROOM, "args": {"client_name": "A"}}, "client_1"
+    )
+    endpoint = MetricsEndpoint(game_server, port=0)
+    endpoint.start()
+    try:
+        base_url = f"http://localhost:{endpoint.port}"
+        with urllib.request.urlopen(f"{base_url}/metrics.json", timeout=5) as response:
+            snapshot = json.loads(response.read())
+        with urllib.request.urlopen(f"{base_url}/metrics", timeout=5) as response:
+            text = response.read().decode()
+    finally:
+        endpoint.close()
+
+    assert snapshot["commands"]["create_room"]["count"] == 1
+    assert 'battleships_command_count{command="create_room"} 1' in text
+    assert 'battleships_rooms_by_phase{key="waiting"} 1' in text
+    assert text == ServerMetrics.format_text(snapshot)
@@ -0,0 +1,295 @@
+import asyncio
+import os
+
+from game.server.multiprocess_server import (
+    RoomRoutingProxy,
+    RoomWorkerServer,
+    get_room_worker_index,
+    merge_worker_heatmaps,
+)
+from game.server.framing import encode_frame, read_frame
+from game.server.codec import BINARY_CODEC, JSON_CODEC, decode_message
+from game.interface.base_board import BaseBoard
+from game.interface.ship import Ship
+from game.players.placement_heatmap import PlacementHeatmap
+from game.players import command_literals
+
+WORKERS_COUNT = 3
+
+
+def test_get_room_worker_index_is_stable_and_in_range():
+    indexes = [get_room_worker_index(str(room_id), WORKERS_COUNT) for room_id in range(100000, 100100)]
+
+    assert indexes == [get_room_worker_index(str(room_id), WORKERS_COUNT) for room_id in range(100000, 100100)]
+    assert set(indexes) == set(range(WORKERS_COUNT))
+
+
+def test_worker_generates_only_owned_room_ids():
+    worker = RoomWorkerServer(1, WORKERS_COUNT)
+
+    for _ in range(20):
+        assert get_room_worker_index(worker.generate_unique_room_id(), WORKERS_COUNT) == 1
+
+
+def test_worker_heatmaps_are_merged_into_the_shared_one(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    board = BaseBoard(unplaced_ships={Ship(1)})
+    board.place_ship(Ship(1, 0, 0, True))
+    for worker_index in range(2):
+        worker = RoomWorkerServer(worker_index, 2)
+        worker.placement_heatmap.record_board(board.serialize_board())
+        worker.placement_heatmap.flush()
+
+    merge_worker_heatmaps()
+
+    assert os.listdir(tmp_path) == [PlacementHeatmap.DEFAULT_STORAGE_PATH]
+    assert PlacementHeatmap(PlacementHeatmap.DEFAULT_STORAGE_PATH).get_boards_count(10, 10) == 2
+
+
+async def _start_cluster():
+    workers = [RoomWorkerServer(worker_index, WORKERS_COUNT) for worker_index in range(WORKERS_COUNT)]
+    async_servers = [await worker.start() for worker in workers]
+    proxy = RoomRoutingProxy([("localhost", worker.port) for worker in workers], port=0)
+    async_servers.append(await proxy.start())
+    return workers, proxy, async_servers
+
+
+async def _stop_cluster(async_servers):
+    for async_server in async_servers:
+        async_server.close()
+        await async_server.wait_closed()
+
+
+class ProxyClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.events = []
+        self.codec = JSON_CODEC
+        self.raw_responses = []
+
+    @classmethod
+    async def connect(cls, port):
+        reader, writer = await asyncio.open_connection("localhost", port)
+        client = cls(reader, writer)
+        client.session_token = decode_message(await read_frame(reader))["args"]["session_token"]
+        return client
+
+    async def send(self, command, **kwargs):
+        self.writer.write(encode_frame(self.codec.encode({"command": command, "args": kwargs})))
+        while True:
+            data = await read_frame(self.reader)
+            message = decode_message(data)
+            if "event" not in message:
+                self.raw_responses.append(data)
+                return message
+            self.events.append(message)
+
+    async def receive_event(self):
+        if self.events:
+            return self.events.pop(0)
+        return decode_message(await asyncio.wait_for(read_frame(self.reader), 5))
+
+    def close(self):
+        self.writer.close()
+
+
+def test_join_with_id_is_routed_to_the_worker_owning_the_room():
+    async def scenario():
+        workers, proxy, async_servers = await _start_cluster()
+        owners = []
+        for _ in range(WORKERS_COUNT):
+            host = await ProxyClient.connect(proxy.port)
+            guest = await ProxyClient.connect(proxy.port)
+            created = await host.send(command_literals.COMMAND_CREATE_ROOM, client_name="Host")
+            room_id = created["args"]["room_id"]
+            joined = await guest.send(command_literals.COMMAND_JOIN_ROOM_WITH_ID, room_id=room_id, client_name="Guest")
+            owner = [worker for worker in workers if room_id in worker.rooms]
+            owners.append((joined["status"], joined["args"]["opponent_name"], len(owner)))
+            owners.append(get_room_worker_index(room_id, WORKERS_COUNT) == owner[0].worker_index)
+            host.close()
+            guest.close()
+
+        await _stop_cluster(async_servers)
+        return owners
+
+    results = asyncio.run(scenario())
+
+    assert results == [("success", "Host", 1), True] * WORKERS_COUNT
+
+
+def test_join_random_room_finds_rooms_on_other_workers():
+    async def scenario():
+        _, proxy, async_servers = await _start_cluster()
+        host = await ProxyClient.connect(proxy.port)
+        created = await host.send(command_literals.COMMAND_CREATE_ROOM, client_name="Host")
+        await host.send(command_literals.COMMAND_SUBSCRIBE_EVENTS)
+        waiting = await host.send(command_literals.COMMAND_WAIT_FOR_OPPONENT_JOIN)
+
+        guests = [await ProxyClient.connect(proxy.port) for _ in range(WORKERS_COUNT)]
+        responses = [await guest.send(command_literals.COMMAND_JOIN_RANDOM_ROOM, client_name="Guest") for guest in guests]
+        event = await host.receive_event()
+        joined_guest = guests[[response["status"] for response in responses].index("success")]
+        again = await joined_guest.send(command_literals.COMMAND_JOIN_RANDOM_ROOM, client_name="Guest")
+
+        for client in [host] + guests:
+            client.close()
+        await _stop_cluster(async_servers)
+        return created["args"]["room_id"], waiting, responses, event, again
+
+    room_id, waiting, responses, event, again = asyncio.run(scenario())
+
+    assert waiting["message"] == "Waiting for the opponent!"
+    joined = [response for response in responses if response["status"] == "success"]
+    assert [response["args"]["room_id"] for response in joined] == [room_id]
+    assert event["event"] == command_literals.EVENT_OPPONENT_JOINED
+    assert again["message"] == "Client is already in a room!"
+
+
+def test_client_in_a_room_cannot_join_a_room_on_another_worker():
+    async def scenario():
+        workers, proxy, async_servers = await _start_cluster()
+        clients = [await ProxyClient.connect(proxy.port) for _ in range(WORKERS_COUNT)]
+        room_ids = [
+            (await client.send(command_literals.COMMAND_CREATE_ROOM, client_name="Host"))["args"]["room_id"]
+            for client in clients
+        ]
+        response = await clients[0].send(command_literals.COMMAND_JOIN_ROOM_WITH_ID, room_id=room_ids[1], client_name="Host")
+
+        for client in clients:
+            client.close()
+        await _stop_cluster(async_servers)
+        return response, sum(len(worker.rooms) for worker in workers)
+
+    response, rooms_count = asyncio.run(scenario())
+
+    assert response["message"] == "Client is already in a room!"
+    assert rooms_count == WORKERS_COUNT
+
+
+def test_negotiated_codec_is_used_on_every_worker():
+    async def scenario():
+        _, proxy, async_servers = await _start_cluster()
+        guest = await ProxyClient.connect(proxy.port)
+        negotiated = await guest.send(command_literals.COMMAND_NEGOTIATE_CODEC, codecs=["binary", "json"])
+        guest.codec = BINARY_CODEC
+        no_rooms = await guest.send(command_literals.COMMAND_JOIN_RANDOM_ROOM, client_name="Guest")
+
+        host = await ProxyClient.connect(proxy.port)
+        room_id = (await host.send(command_literals.COMMAND_CREATE_ROOM, client_name="Host"))["args"]["room_id"]
+        joined = await guest.send(command_literals.COMMAND_JOIN_ROOM_WITH_ID, room_id=room_id, client_name="Guest")
+
+        for client in (host, guest):
+            client.close()
+        await _stop_cluster(async_servers)
+        return negotiated, no_rooms, joined, guest.raw_responses, host.raw_responses
+
+    negotiated, no_rooms, joined, guest_responses, host_responses = asyncio.run(scenario())
+
+    assert negotiated["args"]["codec"] == "binary"
+    assert no_rooms["message"] == "No available rooms to join!"
+    assert joined["args"]["opponent_name"] == "Host"
+    assert guest_responses[0].startswith(b"{")
+    assert [response[0] for response in guest_responses[1:]] == [BINARY_CODEC.TAG_JSON] * 2
+    assert host_responses[0].startswith(b"{")
+
+
+def test_batch_with_a_join_is_split_and_routed_to_the_worker_owning_the_room():
+    async def scenario():
+        workers, proxy, async_servers = await _start_cluster()
+        board = BaseBoard()
+        board.random_shuffle_ships()
+        host = await ProxyClient.connect(proxy.port)
+        host_lobby = await host.send(
+            command_literals.COMMAND_BATCH,
+            commands=[
+                {"command": command_literals.COMMAND_CREATE_ROOM, "args": {"client_name": "Host"}},
+                {"command": command_literals.COMMAND_SEND_BOARD, "args": {"board_json": board.serialize_board()}},
+                {"command": command_literals.COMMAND_SUBSCRIBE_EVENTS, "args": {}},
+            ],
+        )
+        room_id = host_lobby["args"]["responses"][0]["args"]["room_id"]
+        guest = await ProxyClient.connect(proxy.port)
+        guest_lobby = await guest.send(
+            command_literals.COMMAND_BATCH,
+            commands=[
+                {"command": command_literals.COMMAND_HAS_OPPONENT_JOINED, "args": {}},
+                {
+                    "command": command_literals.COMMAND_JOIN_ROOM_WITH_ID,
+                    "args": {"room_id": room_id, "client_name": "Guest"},
+                },
+                {"command": command_literals.COMMAND_SEND_BOARD, "args": {"board_json": board.serialize_board()}},
+                {"command": command_literals.COMMAND_IS_OPPONENT_READY, "args": {}},
+            ],
+        )
+        joined = await host.send(command_literals.COMMAND_HAS_OPPONENT_JOINED)
+
+        for client in (host, guest):
+            client.close()
+        await _stop_cluster(async_servers)
+        owner = workers[get_room_worker_index(room_id, WORKERS_COUNT)]
+        return host_lobby, guest_lobby, joined, owner.rooms[room_id]
+
+    host_lobby, guest_lobby, joined, room = asyncio.run(scenario())
+
+    assert [response["status"] for response in host_lobby["args"]["responses"]] == ["success"] * 3
+    assert [response["status"] for response in guest_lobby["args"]["responses"]] == ["error"] + ["success"] * 3
+    assert guest_lobby["args"]["responses"][3]["message"] == "Starting game!"
+    assert joined["args"]["opponent_name"] == "Guest"
+    assert len(room.clients) == 2
+
+
+def test_reconnected_client_resumes_its_session_on_the_same_worker():
+    async def scenario():
+        workers, proxy, async_servers = await _start_cluster()
+        host = await ProxyClient.connect(proxy.port)
+        room_id = (await host.send(command_literals.COMMAND_CREATE_ROOM, client_name="Host"))["args"]["room_id"]
+        host.close()
+        await asyncio.sleep(0.05)
+
+        resumed_host = await ProxyClient.connect(proxy.port)
+        unknown = await resumed_host.send(command_literals.COMMAND_RESUME_SESSION, session_token="unknown")
+        resumed = await resumed_host.send(command_literals.COMMAND_RESUME_SESSION, session_token=host.session_token)
+        guest = await ProxyClient.connect(proxy.port)
+        await guest.send(command_literals.COMMAND_JOIN_ROOM_WITH_ID, room_id=room_id, client_name="Guest")
+        joined = await resumed_host.send(command_literals.COMMAND_HAS_OPPONENT_JOINED)
+
+        for client in (resumed_host, guest):
+            client.close()
+        await asyncio.sleep(0.05)
+        detached_count = len(proxy.detached_clients)
+        await _stop_cluster(async_servers)
+        return unknown, resumed, joined, detached_count
+
+    unknown, resumed, joined, detached_count = asyncio.run(scenario())
+
+    assert unknown["message"] == "Session not found!"
+    assert resumed["message"] == "Session resumed!"
+    assert joined["args"]["opponent_name"] == "Guest"
+    assert detached_count == 2
+
+
+def test_proxy_session_is_taken_over_before_the_old_connection_is_seen_closed():
+    async def scenario():
+        workers, proxy, async_servers = await _start_cluster()
+        host = await ProxyClient.connect(proxy.port)
+        await host.send(command_literals.COMMAND_CREATE_ROOM, client_name="Host")
+
+        resumed_host = await ProxyClient.connect(proxy.port)
+        resumed = await resumed_host.send(command_literals.COMMAND_RESUME_SESSION, session_token=host.session_token)
+        old_connection_data = await asyncio.wait_for(host.reader.read(), 5)
+        await asyncio.sleep(0.05)
+        joined = await resumed_host.send(command_literals.COMMAND_HAS_OPPONENT_JOINED)
+        detached_count = len(proxy.detached_clients)
+
+        for client in (host, resumed_host):
+            client.close()
+        await _stop_cluster(async_servers)
+        return resumed, old_connection_data, joined, detached_count
+
+    resumed, old_connection_data, joined, detached_count = asyncio.run(scenario())
+
+    assert resumed["message"] == "Session resumed!"
+    assert old_connection_data == b""
+    assert joined["message"] == "Opponent has not joined the room!"
+    assert detached_count == 0
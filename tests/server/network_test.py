@@ -0,0 +1,91 @@
+import socket
+import threading
+
+import pytest
+
+from game.server.multiplayer_server import MultiplayerServer
+from game.server.network import MultiplayerNetwork, parse_endpoint
+from game.players import command_literals
+
+
+@pytest.fixture(scope="module")
+def server_port():
+    server = MultiplayerServer(port=0)
+    threading.Thread(target=server.run, daemon=True).start()
+    return server.server_socket.getsockname()[1]
+
+
+def _get_free_port():
+    with socket.socket() as free_socket:
+        free_socket.bind(("localhost", 0))
+        return free_socket.getsockname()[1]
+
+
+def _send(network, command, **kwargs):
+    return network.send({"command": command, "args": kwargs})
+
+
+def test_parse_endpoint():
+    assert parse_endpoint(" example.org:5555") == ("example.org", 5555)
+    assert parse_endpoint(("localhost", "5556")) == ("localhost", 5556)
+
+
+def test_connects_to_the_first_reachable_endpoint(server_port):
+    network = MultiplayerNetwork(endpoints=[("localhost", _get_free_port()), f"localhost:{server_port}"])
+
+    response = _send(network, command_literals.COMMAND_HAS_OPPONENT_JOINED)
+    network.close()
+
+    assert network.addr == ("localhost", server_port)
+    assert response["message"] == "Client is not in a room!"
+    assert network.get_rtt_statistics()["count"] == 2
+
+
+def test_lost_connection_is_resumed_and_only_idempotent_commands_are_resent(server_port):
+    network = MultiplayerNetwork(endpoints=[("localhost", server_port)])
+    session_token = network.session_token
+    _send(network, command_literals.COMMAND_CREATE_ROOM, client_name="Alice")
+    _send(network, command_literals.COMMAND_SUBSCRIBE_EVENTS)
+
+    network.client.shutdown(socket.SHUT_RDWR)
+    joined = _send(network, command_literals.COMMAND_HAS_OPPONENT_JOINED)
+    network.client.shutdown(socket.SHUT_RDWR)
+    exited = _send(network, command_literals.COMMAND_EXIT_ROOM)
+    still_joined = _send(network, command_literals.COMMAND_HAS_OPPONENT_JOINED)
+    network.close()
+
+    assert network.session_token == session_token
+    assert network.is_subscribed
+    assert joined["message"] == "Opponent has not joined the room!"
+    assert exited["args"]["is_connection_error"]
+    assert still_joined["message"] == "Opponent has not joined the room!"
+
+
+def test_unreachable_node_leaves_the_client_connected_to_its_server(server_port):
+    network = MultiplayerNetwork(endpoints=[("localhost", server_port)])
+
+    with pytest.raises(ConnectionError):
+        network.connect_to_node(f"localhost:{_get_free_port()}")
+    is_connected = network.client is not None
+    response = _send(network, command_literals.COMMAND_HAS_OPPONENT_JOINED)
+    network.close()
+
+    assert is_connected
+    assert network.addr == ("localhost", server_port)
+    assert response["message"] == "Client is not in a room!"
+
+
+def test_unreachable_server_gives_an_error_response(server_port):
+    network = MultiplayerNetwork(endpoints=[("localhost", server_port)])
+    network.addr = ("localhost", _get_free_port())
+    network.endpoints = [network.addr]
+    network.RECONNECT_ATTEMPTS = 2
+    network.BACKOFF_BASE = 0.001
+    network.close()
+
+    response = _send(network, command_literals.COMMAND_HAS_OPPONENT_JOINED)
+
+    assert response["status"] == "error"
+    assert response["args"]["is_connection_error"]
+    assert network.receive_events() == []
+    assert network.next_reconnect_time > 0
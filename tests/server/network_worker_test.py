@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+from game.server.command_handler import CommandHandler
+from game.server.game_server import GameServer
+from game.server.network import AbstractNetwork
+from game.server.network_worker import CompletedRequests, NetworkWorker
+from game.players.player import Player
+from game.players import command_literals
+
+
+class SlowServerNetwork(AbstractNetwork):
+    def __init__(self, game_server, client):
+        self.game_server = game_server
+        self.client = client
+        self.release = threading.Event()
+        self.threads = set()
+        self.pending_events = []
+        self.is_closed = False
+
+    def send(self, command_data):
+        self.threads.add(threading.current_thread())
+        self.release.wait(timeout=5)
+        return self.game_server.command_handler.handle_command_data(command_data, self.client)
+
+    def receive_events(self):
+        self.threads.add(threading.current_thread())
+        events, self.pending_events = self.pending_events, []
+        return events
+
+    def close(self):
+        self.is_closed = True
+
+
+def _start_worker(network):
+    completed_requests = CompletedRequests()
+    worker = NetworkWorker(lambda: network, completed_requests)
+    worker.connect().result(timeout=5)
+    return worker, completed_requests
+
+
+def test_requests_do_not_block_and_callbacks_run_when_processed():
+    network = SlowServerNetwork(GameServer(), "client_1")
+    worker, completed_requests = _start_worker(network)
+    player = Player("Alice", worker)
+    responses = []
+
+    future = player.send_command_async(command_literals.COMMAND_CREATE_ROOM, responses.append, client_name="Alice")
+
+    assert not future.done()
+    assert completed_requests.process() == 0
+
+    network.release.set()
+    future.result(timeout=5)
+
+    assert not responses
+    assert completed_requests.process() == 1
+    assert responses[0]["status"] == "success"
+    assert network.threads == {worker.thread}
+
+    worker.close()
+    worker.thread.join(timeout=5)
+    assert network.is_closed
+
+
+def test_player_methods_run_on_the_worker_and_blocking_calls_still_work():
+    game_server = GameServer()
+    network = SlowServerNetwork(game_server, "client_1")
+    network.release.set()
+    worker, completed_requests = _start_worker(network)
+    player = Player("Alice", worker)
+    responses = []
+
+    player.call_async(player.create_room, callback=responses.append).result(timeout=5)
+    completed_requests.process()
+
+    assert responses[0]["message"] == f"Room {responses[0]['args']['room_id']} created!"
+    assert player.has_opponent_joined()["message"] == "Opponent has not joined the room!"
+    assert network.threads == {worker.thread}
+    worker.close()
+
+
+def test_events_are_received_in_the_background():
+    network = SlowServerNetwork(GameServer(), "client_1")
+    worker, _ = _start_worker(network)
+    event = CommandHandler.event_message(command_literals.EVENT_WAIT_TIMEOUT, "Timeout!")
+
+    network.pending_events.append(event)
+    worker.submit(lambda: None).result(timeout=5)
+
+    assert worker.receive_events() == [event]
+    assert worker.receive_events() == []
+    worker.close()
+
+
+def test_failures_reach_the_error_callback_and_closed_worker_rejects_requests():
+    completed_requests = CompletedRequests()
+    worker = NetworkWorker(lambda: (_ for _ in ()).throw(ConnectionError("Refused")), completed_requests)
+    errors = []
+
+    future = worker.connect(callback=errors.append, error_callback=lambda exception: errors.append(str(exception)))
+    with pytest.raises(ConnectionError):
+        future.result(timeout=5)
+    completed_requests.process()
+
+    assert errors == ["Refused"]
+
+    worker.close()
+    with pytest.raises(ConnectionError):
+        worker.submit(lambda: None).result(timeout=5)
+
+    worker.submit(lambda: None, callback=errors.append, error_callback=lambda exception: errors.append(str(exception)))
+    assert completed_requests.process() == 1
+    assert errors == ["Refused", "The network worker is closed."]
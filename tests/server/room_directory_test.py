@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from game.server.room_directory import InMemoryRoomDirectory, SQLiteRoomDirectory
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def room_directory(request, tmp_path):
+    if request.param == "memory":
+        directory = InMemoryRoomDirectory()
+    else:
+        directory = SQLiteRoomDirectory(str(tmp_path / "rooms.sqlite3"))
+    yield directory
+    directory.close()
+
+
+def test_register_room_rejects_taken_id(room_directory):
+    assert room_directory.register_room("111111", "node-a")
+    assert not room_directory.register_room("111111", "node-b")
+    assert room_directory.get_room_node("111111") == "node-a"
+    assert room_directory.get_room_node("222222") is None
+
+
+def test_open_rooms_are_fifo_per_bucket(room_directory):
+    room_directory.add_open_room("111111", "eu")
+    room_directory.add_open_room("222222")
+    room_directory.add_open_room("333333")
+    room_directory.add_open_room("222222")
+
+    assert room_directory.get_open_rooms_count() == 3
+    assert room_directory.pop_open_room("us") is None
+    assert room_directory.peek_open_room("us") is None
+    assert room_directory.peek_open_room() == "222222"
+    assert room_directory.pop_open_room() == "222222"
+    assert room_directory.remove_open_room("333333")
+    assert not room_directory.remove_open_room("333333")
+    assert room_directory.pop_open_room() is None
+    assert room_directory.is_room_open("111111")
+    assert room_directory.pop_open_room("eu") == "111111"
+
+
+def test_unregister_room_removes_open_entry_and_clients(room_directory):
+    room_directory.register_room("111111", "node-a")
+    room_directory.add_open_room("111111")
+    room_directory.set_client_room("node-a/1", "111111")
+    room_directory.set_client_room("node-b/2", "111111")
+    room_directory.set_client_room("node-a/3", "222222")
+
+    room_directory.unregister_room("111111")
+
+    assert room_directory.get_room_node("111111") is None
+    assert not room_directory.is_room_open("111111")
+    assert room_directory.get_client_room("node-a/1") is None
+    assert room_directory.get_client_room("node-b/2") is None
+    assert room_directory.get_client_room("node-a/3") == "222222"
+
+
+def test_set_client_room_replaces_previous_room(room_directory):
+    room_directory.set_client_room("node-a/1", "111111")
+    room_directory.set_client_room("node-a/1", "222222")
+    room_directory.unregister_room("111111")
+
+    assert room_directory.get_client_room("node-a/1") == "222222"
+    room_directory.remove_client("node-a/1")
+    assert room_directory.get_client_room("node-a/1") is None
+
+
+def test_sqlite_nodes_never_pop_the_same_room(tmp_path):
+    database_path = str(tmp_path / "rooms.sqlite3")
+    directories = [SQLiteRoomDirectory(database_path) for _ in range(4)]
+    rooms_count = 50
+    for room_index in range(rooms_count):
+        directories[0].add_open_room(str(room_index))
+
+    popped_rooms = []
+
+    def pop_all(directory):
+        while (room_id := directory.pop_open_room()) is not None:
+            popped_rooms.append(room_id)
+
+    threads = [threading.Thread(target=pop_all, args=(directory,)) for directory in directories]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for directory in directories:
+        directory.close()
+
+    assert sorted(popped_rooms, key=int) == [str(room_index) for room_index in range(rooms_count)]
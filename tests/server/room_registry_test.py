@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+from game.server.room_registry import ShardedRegistry
+
+
+def test_mapping_operations():
+    registry = ShardedRegistry(shards_count=4)
+    registry["a"] = 1
+    registry["b"] = 2
+
+    assert registry["a"] == 1
+    assert registry.get("c") is None
+    assert "b" in registry
+    assert len(registry) == 2
+    assert sorted(registry.items()) == [("a", 1), ("b", 2)]
+    assert registry.pop("a") == 1
+    assert registry.pop("a", None) is None
+    with pytest.raises(KeyError):
+        registry.pop("a")
+
+
+def test_add_if_absent_and_remove_if_equal():
+    registry = ShardedRegistry(shards_count=4)
+
+    assert registry.add_if_absent("room", 1)
+    assert not registry.add_if_absent("room", 2)
+    assert not registry.remove_if_equal("room", 2)
+    assert registry.remove_if_equal("room", 1)
+    assert len(registry) == 0
+
+
+def test_add_if_absent_from_many_threads():
+    registry = ShardedRegistry(shards_count=4)
+    winners = []
+
+    def add(value):
+        for key in range(500):
+            if registry.add_if_absent(key, value):
+                winners.append(key)
+
+    threads = [threading.Thread(target=add, args=(value,)) for value in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(winners) == list(range(500))
@@ -20,9 +20,9 @@ def mock_client():
     return MagicMock()
 
 
-def test_room_client_add_board(mock_client, mock_base_board):
+def test_room_client_add_board(mock_client, mock_base_board, monkeypatch):
     client = RoomClient(mock_client, "TestClient")
-    BaseBoard.deserialize_board = MagicMock(return_value=mock_base_board)
+    monkeypatch.setattr(BaseBoard, "deserialize_board", MagicMock(return_value=mock_base_board))
 
     board_json = '{"some": "json"}'
     assert client.add_board(board_json) == True
@@ -0,0 +1,29 @@
+from game.server.rtt_statistics import RttStatistics
+
+
+def test_summary_is_empty_without_samples():
+    assert RttStatistics().get_summary() == {
+        "count": 0,
+        "last_ms": None,
+        "smoothed_ms": None,
+        "min_ms": None,
+        "p50_ms": None,
+        "p95_ms": None,
+        "max_ms": None,
+    }
+
+
+def test_smoothed_rtt_and_percentiles():
+    statistics = RttStatistics(window_size=100)
+    for milliseconds in range(1, 201):
+        statistics.add(milliseconds / 1000)
+
+    summary = statistics.get_summary()
+
+    assert summary["count"] == 200
+    assert summary["last_ms"] == 200
+    assert summary["min_ms"] == 1
+    assert summary["max_ms"] == 200
+    assert summary["p50_ms"] == 150
+    assert summary["p95_ms"] == 195
+    assert 190 < summary["smoothed_ms"] < 200
@@ -0,0 +1,53 @@
+from time import monotonic
+
+from game.server.session_registry import SessionRegistry
+
+
+def test_open_gives_unique_tokens():
+    registry = SessionRegistry()
+    sessions = [registry.open() for _ in range(100)]
+
+    assert len({session.client for session in sessions}) == 100
+    assert all(session.client in registry for session in sessions)
+
+
+def test_resume_moves_the_connection_to_the_disconnected_session():
+    registry = SessionRegistry()
+    lost_session = registry.open()
+    session = registry.open()
+    new_token = session.client
+
+    registry.disconnect(lost_session.client, 30)
+    assert registry.resume(new_token, lost_session.client)
+
+    assert session.client is lost_session.client
+    assert new_token not in registry
+    assert not registry.resume(new_token, lost_session.client)
+    assert registry.pop_expired(monotonic() + 60) == []
+
+
+def test_resume_takes_over_a_session_whose_connection_is_still_open():
+    registry = SessionRegistry()
+    closed_connections = []
+    stale_session = registry.open(lambda: closed_connections.append("stale"))
+    token = stale_session.client
+    session = registry.open()
+
+    assert registry.resume(session.client, token)
+
+    assert session.client == token
+    assert stale_session.client != token
+    assert stale_session.client in registry
+    assert closed_connections == ["stale"]
+
+
+def test_pop_expired_forgets_sessions_after_the_grace_period():
+    registry = SessionRegistry()
+    session = registry.open()
+    now = monotonic()
+    registry.disconnect(session.client, 5, now)
+
+    assert registry.pop_expired(now + 2) == []
+    assert registry.pop_expired(now + 7) == [session.client]
+    assert session.client not in registry
+    assert not registry.disconnect(session.client, 5, now)
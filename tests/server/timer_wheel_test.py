@@ -0,0 +1,47 @@
+from game.server.timer_wheel import TimerWheel
+
+
+def test_timer_expires_after_delay():
+    wheel = TimerWheel(tick_duration=1, slots_count=8, now=100)
+    wheel.schedule("room", 2.5, now=100)
+
+    assert wheel.advance(now=102) == []
+    assert wheel.advance(now=102.9) == []
+    assert wheel.advance(now=103) == ["room"]
+    assert "room" not in wheel
+
+
+def test_timer_longer_than_wheel_turn():
+    wheel = TimerWheel(tick_duration=1, slots_count=8, now=0)
+    wheel.schedule("room", 20, now=0)
+
+    assert wheel.advance(now=12) == []
+    assert wheel.advance(now=19) == []
+    assert wheel.advance(now=20) == ["room"]
+
+
+def test_advance_over_many_turns():
+    wheel = TimerWheel(tick_duration=1, slots_count=8, now=0)
+    wheel.schedule("first", 3, now=0)
+    wheel.schedule("second", 30, now=0)
+
+    assert set(wheel.advance(now=100)) == {"first", "second"}
+    assert len(wheel) == 0
+
+
+def test_schedule_replaces_and_cancel_removes():
+    wheel = TimerWheel(tick_duration=1, slots_count=8, now=0)
+    wheel.schedule("room", 1, now=0)
+    wheel.schedule("room", 5, now=0)
+
+    assert wheel.advance(now=2) == []
+    assert wheel.cancel("room")
+    assert not wheel.cancel("room")
+    assert wheel.advance(now=10) == []
+
+
+def test_past_deadline_expires_on_next_tick():
+    wheel = TimerWheel(tick_duration=1, slots_count=8, now=10)
+    wheel.schedule("room", -5, now=10)
+
+    assert wheel.advance(now=11) == ["room"]
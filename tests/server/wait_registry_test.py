@@ -0,0 +1,56 @@
+from game.server.wait_registry import WaitRegistry
+
+
+def test_add_replaces_previous_wait():
+    registry = WaitRegistry()
+    registry.add("client_1", "join", "111111", 10)
+    registry.add("client_1", "ready", "222222", 10)
+
+    assert registry.waiters["client_1"].condition == "ready"
+    assert "111111" not in registry.rooms_to_waiters
+
+
+def test_pop_room_waiters_skips_changed_client_and_other_conditions():
+    registry = WaitRegistry()
+    registry.add("client_1", "ready", "111111", 10)
+    registry.add("client_2", "ready", "111111", 10)
+    registry.add("client_3", "join", "111111", 10)
+
+    fulfilled_waiters = registry.pop_room_waiters("111111", "ready", "client_2")
+
+    assert [waiter.client for waiter in fulfilled_waiters] == ["client_1"]
+    assert not registry.is_waiting("client_1")
+    assert registry.is_waiting("client_2")
+    assert registry.is_waiting("client_3")
+
+
+def test_pop_expired():
+    registry = WaitRegistry()
+    waiter = registry.add("client_1", "join", "111111", 5)
+    registry.add("client_2", "join", "222222", 50)
+
+    assert registry.pop_expired(waiter.deadline - 1) == []
+    assert registry.pop_expired(waiter.deadline) == [waiter]
+    assert registry.is_waiting("client_2")
+
+
+def test_pop_expired_skips_removed_and_replaced_waits():
+    registry = WaitRegistry()
+    registry.add("client_1", "join", "111111", 5)
+    registry.add("client_2", "join", "222222", 1)
+    registry.remove("client_2")
+    waiter = registry.add("client_1", "ready", "111111", 50)
+
+    assert registry.pop_expired(waiter.deadline - 1) == []
+    assert registry.pop_expired(waiter.deadline) == [waiter]
+    assert len(registry.deadlines) == 0
+
+
+def test_remove_room():
+    registry = WaitRegistry()
+    registry.add("client_1", "join", "111111", 10)
+    registry.remove_room("111111")
+
+    assert registry.waiters == {}
+    assert registry.rooms_to_waiters == {}
+    assert len(registry.deadlines) == 0
@@ -0,0 +1,84 @@
+import json
+import pstats
+
+import pytest
+
+from game import tracing
+from game.interface.base_board import BaseBoard
+from game.server.game_server import GameServer
+from game.server.codec import JSON_CODEC
+from game.players import command_literals
+
+
+@pytest.fixture
+def recorder():
+    span_recorder = tracing.SpanRecorder()
+    tracing.add_span_hook(span_recorder)
+    yield span_recorder
+    tracing.remove_span_hook(span_recorder)
+
+
+def _send(game_server, client, command, **args):
+    return JSON_CODEC.decode(game_server.handle_message(client, JSON_CODEC.encode({"command": command, "args": args})))
+
+
+def test_spans_do_nothing_without_hooks():
+    with tracing.span("decode_message") as current_span:
+        assert current_span is None
+
+
+def test_spans_of_a_request_are_nested(recorder):
+    game_server = GameServer()
+    board = BaseBoard()
+    board.random_shuffle_ships()
+    board_json = board.serialize_board()
+    _send(game_server, "client_1", command_literals.COMMAND_CREATE_ROOM, client_name="Alice")
+    recorder.spans.clear()
+
+    response = _send(game_server, "client_1", command_literals.COMMAND_SEND_BOARD, board_json=board_json)
+
+    assert response["status"] == "success"
+    spans_by_name = {recorded_span.name: recorded_span for recorded_span in recorder.spans}
+    assert list(spans_by_name) == [
+        "decode_message",
+        "parse_board",
+        "validate_board",
+        "BaseBoard.deserialize_board",
+        "GameServer.receive_board",
+        "encode_response",
+        "GameServer.handle_message",
+    ]
+    assert spans_by_name["parse_board"].parent is spans_by_name["BaseBoard.deserialize_board"]
+    assert spans_by_name["BaseBoard.deserialize_board"].depth == 2
+    assert spans_by_name["encode_response"].attributes == {"codec": "json"}
+    handle_duration = spans_by_name["GameServer.handle_message"].duration
+    assert all(recorded_span.duration <= handle_duration for recorded_span in recorder.spans)
+    assert next(iter(recorder.get_total_durations())) == "GameServer.handle_message"
+
+
+def test_failing_spans_are_marked(recorder):
+    with pytest.raises(ValueError):
+        BaseBoard.deserialize_board("not json")
+
+    assert recorder.spans[-1].name == "BaseBoard.deserialize_board"
+    assert recorder.spans[-1].attributes == {"error": "JSONDecodeError"}
+
+
+def test_trace_file_and_profile(tmp_path):
+    trace_path = tmp_path / "trace.json"
+    exporter, profiler_hook = tracing.configure_tracing(str(trace_path), str(tmp_path / "profile.out"))
+    try:
+        game_server = GameServer()
+        _send(game_server, "client_1", command_literals.COMMAND_CREATE_ROOM, client_name="Alice")
+    finally:
+        tracing.remove_span_hook(exporter)
+        tracing.remove_span_hook(profiler_hook)
+        exporter.close()
+
+    events = json.loads(trace_path.read_text())
+    assert [event["name"] for event in events][-1] == "GameServer.handle_message"
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+    profiler_hook.dump_stats(str(tmp_path / "profile.out"))
+    profiled_functions = {function_name for _, _, function_name in pstats.Stats(str(tmp_path / "profile.out")).stats}
+    assert "create_room" in profiled_functions